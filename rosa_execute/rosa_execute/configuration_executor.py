@@ -195,6 +195,8 @@ class ConfigurationExecutor(Node):
             rp_query = ReconfigurationPlanQuery.Request()
             rp_query.reconfig_plan.start_time = \
                 reconfig_plan.reconfig_plan.start_time
+            rp_query.reconfig_plan.trace_id = \
+                reconfig_plan.reconfig_plan.trace_id
             if reconfig_result is True:
                 rp_query.reconfig_plan.result = 'completed'
             else:
@@ -29,6 +29,34 @@ def generate_launch_description():
     force_data = LaunchConfiguration('force_data')
     force_database = LaunchConfiguration('force_database')
     infer = LaunchConfiguration('infer')
+    backend = LaunchConfiguration('backend')
+    read_cache_size = LaunchConfiguration('read_cache_size')
+    materialize_status = LaunchConfiguration('materialize_status')
+    check_fingerprint = LaunchConfiguration('check_fingerprint')
+    snapshot_dir = LaunchConfiguration('snapshot_dir')
+    bulk_load_workers = LaunchConfiguration('bulk_load_workers')
+    bulk_load_chunk_size = LaunchConfiguration('bulk_load_chunk_size')
+    query_workers = LaunchConfiguration('query_workers')
+    executor_threads = LaunchConfiguration('executor_threads')
+    stats_period = LaunchConfiguration('stats_period')
+    slow_query_log = LaunchConfiguration('slow_query_log')
+    slow_query_threshold = LaunchConfiguration('slow_query_threshold')
+    trace_buffer_size = LaunchConfiguration('trace_buffer_size')
+    trace_file = LaunchConfiguration('trace_file')
+    measurement_flush_period = LaunchConfiguration('measurement_flush_period')
+    measurement_flush_size = LaunchConfiguration('measurement_flush_size')
+    measurement_history_size = LaunchConfiguration(
+        'measurement_history_size')
+    measurement_compaction_period = LaunchConfiguration(
+        'measurement_compaction_period')
+    measurement_retention_count = LaunchConfiguration(
+        'measurement_retention_count')
+    measurement_retention_time = LaunchConfiguration(
+        'measurement_retention_time')
+    measurement_downsample_period = LaunchConfiguration(
+        'measurement_downsample_period')
+    measurement_aggregate_retention = LaunchConfiguration(
+        'measurement_aggregate_retention')
 
     pkg_rosa_kb = get_package_share_directory('rosa_kb')
 
@@ -78,6 +106,138 @@ def generate_launch_description():
         description='use inference engine'
     )
 
+    backend_arg = DeclareLaunchArgument(
+        'backend',
+        default_value='typedb',
+        description='KB backend, typedb, memory or sqlite'
+    )
+
+    materialize_status_arg = DeclareLaunchArgument(
+        'materialize_status',
+        default_value='False',
+        description='store the statuses derived by the rules in the KB'
+    )
+
+    check_fingerprint_arg = DeclareLaunchArgument(
+        'check_fingerprint',
+        default_value='False',
+        description='skip loading schema and data already in the database'
+    )
+
+    snapshot_dir_arg = DeclareLaunchArgument(
+        'snapshot_dir',
+        default_value='',
+        description='directory of KB snapshots, empty disables them'
+    )
+
+    bulk_load_workers_arg = DeclareLaunchArgument(
+        'bulk_load_workers',
+        default_value='0',
+        description='data file chunks loaded in parallel, 0 disables it'
+    )
+
+    bulk_load_chunk_size_arg = DeclareLaunchArgument(
+        'bulk_load_chunk_size',
+        default_value='1000',
+        description='number of insert statements in each data file chunk'
+    )
+
+    query_workers_arg = DeclareLaunchArgument(
+        'query_workers',
+        default_value='4',
+        description='number of KB queries a service performs at once'
+    )
+
+    executor_threads_arg = DeclareLaunchArgument(
+        'executor_threads',
+        default_value='0',
+        description='number of callbacks performed at once, 0 for CPU count'
+    )
+
+    stats_period_arg = DeclareLaunchArgument(
+        'stats_period',
+        default_value='5.0',
+        description='period (s) to publish latency stats, 0 disables it'
+    )
+
+    slow_query_log_arg = DeclareLaunchArgument(
+        'slow_query_log',
+        default_value='',
+        description='path of the slow query log file, empty disables it'
+    )
+
+    slow_query_threshold_arg = DeclareLaunchArgument(
+        'slow_query_threshold',
+        default_value='0.1',
+        description='duration (s) above which a query is logged as slow'
+    )
+
+    trace_buffer_size_arg = DeclareLaunchArgument(
+        'trace_buffer_size',
+        default_value='1000',
+        description='number of MAPE-K loop traces kept in memory'
+    )
+
+    trace_file_arg = DeclareLaunchArgument(
+        'trace_file',
+        default_value='',
+        description='Chrome trace file written on deactivate, empty disables'
+    )
+
+    read_cache_size_arg = DeclareLaunchArgument(
+        'read_cache_size',
+        default_value='256',
+        description='number of KB read query results to cache, 0 disables it'
+    )
+
+    measurement_flush_period_arg = DeclareLaunchArgument(
+        'measurement_flush_period',
+        default_value='0.1',
+        description='period (s) to write buffered measurements in the KB'
+    )
+
+    measurement_flush_size_arg = DeclareLaunchArgument(
+        'measurement_flush_size',
+        default_value='0',
+        description='number of buffered attributes that triggers a write'
+    )
+
+    measurement_history_size_arg = DeclareLaunchArgument(
+        'measurement_history_size',
+        default_value='1000',
+        description='number of measurements kept in memory per attribute'
+    )
+
+    measurement_compaction_period_arg = DeclareLaunchArgument(
+        'measurement_compaction_period',
+        default_value='60.0',
+        description='period (s) to remove old measurements, 0 disables it'
+    )
+
+    measurement_retention_count_arg = DeclareLaunchArgument(
+        'measurement_retention_count',
+        default_value='1000',
+        description='number of measurements kept per attribute, 0 for no limit'
+    )
+
+    measurement_retention_time_arg = DeclareLaunchArgument(
+        'measurement_retention_time',
+        default_value='0.0',
+        description='time (s) measurements are kept, 0 means no limit'
+    )
+
+    measurement_downsample_period_arg = DeclareLaunchArgument(
+        'measurement_downsample_period',
+        default_value='0.0',
+        description='period (s) to aggregate removed measurements, 0 disables'
+    )
+
+    measurement_aggregate_retention_arg = DeclareLaunchArgument(
+        'measurement_aggregate_retention',
+        default_value='0.0',
+        description='time (s) aggregates are kept, 0 means forever'
+    )
+
     rosa_kb_node = Node(
         package='rosa_kb',
         executable='rosa_kb',
@@ -91,6 +251,28 @@ def generate_launch_description():
             'force_data': force_data,
             'force_database': force_database,
             'infer': infer,
+            'backend': backend,
+            'read_cache_size': read_cache_size,
+            'materialize_status': materialize_status,
+            'check_fingerprint': check_fingerprint,
+            'snapshot_dir': snapshot_dir,
+            'bulk_load_workers': bulk_load_workers,
+            'bulk_load_chunk_size': bulk_load_chunk_size,
+            'query_workers': query_workers,
+            'executor_threads': executor_threads,
+            'stats_period': stats_period,
+            'slow_query_log': slow_query_log,
+            'slow_query_threshold': slow_query_threshold,
+            'trace_buffer_size': trace_buffer_size,
+            'trace_file': trace_file,
+            'measurement_flush_period': measurement_flush_period,
+            'measurement_flush_size': measurement_flush_size,
+            'measurement_history_size': measurement_history_size,
+            'measurement_compaction_period': measurement_compaction_period,
+            'measurement_retention_count': measurement_retention_count,
+            'measurement_retention_time': measurement_retention_time,
+            'measurement_downsample_period': measurement_downsample_period,
+            'measurement_aggregate_retention': measurement_aggregate_retention,
         }]
     )
 
@@ -102,5 +284,27 @@ def generate_launch_description():
         force_data_arg,
         force_database_arg,
         infer_arg,
+        backend_arg,
+        read_cache_size_arg,
+        materialize_status_arg,
+        check_fingerprint_arg,
+        snapshot_dir_arg,
+        bulk_load_workers_arg,
+        bulk_load_chunk_size_arg,
+        query_workers_arg,
+        executor_threads_arg,
+        stats_period_arg,
+        slow_query_log_arg,
+        slow_query_threshold_arg,
+        trace_buffer_size_arg,
+        trace_file_arg,
+        measurement_flush_period_arg,
+        measurement_flush_size_arg,
+        measurement_history_size_arg,
+        measurement_compaction_period_arg,
+        measurement_retention_count_arg,
+        measurement_retention_time_arg,
+        measurement_downsample_period_arg,
+        measurement_aggregate_retention_arg,
         rosa_kb_node,
     ])
@@ -0,0 +1,132 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Asynchronous access to ROSA's knowledge model, backed by a thread pool."""
+
+import asyncio
+import functools
+
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+
+class AsyncModelInterface:
+    """
+    Perform the methods of a model interface in a thread pool.
+
+    Every public method of the wrapped model interface can be called through
+    this class, and returns a :class:`concurrent.futures.Future` instead of
+    blocking the calling thread. Thus, independent queries run at the same
+    time, each in its own transaction. With asyncio, use the awaitables
+    returned by :meth:`run` instead.
+
+    Example::
+
+        model = AsyncModelInterface(ModelInterface(...))
+        futures = [
+            model.get_selectable_fds(function)
+            for function in model.get_adaptable_functions().result()]
+        fds = [future.result() for future in futures]
+
+    Queries performed by the pool do not join the :meth:`batch` or
+    :meth:`snapshot` open in the calling thread, so methods that must see
+    the same state of the KB should be called synchronously inside a
+    snapshot instead.
+    """
+
+    def __init__(
+            self,
+            model: Any,
+            max_workers: Optional[int] = 4) -> None:
+        """
+        Create AsyncModelInterface.
+
+        :param model: model interface, e.g.,
+            :class:`rosa_kb.typedb_model_interface.ModelInterface`
+        :param max_workers: number of queries performed at the same time
+        """
+        self.model = model
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='rosa_kb_query')
+
+    def __getattr__(self, name: str) -> Callable[..., Future]:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = getattr(self.model, name)
+        if not callable(method):
+            raise AttributeError(
+                '{!r} is not a method of the model interface'.format(name))
+
+        @functools.wraps(method)
+        def submit(*args, **kwargs):
+            return self.executor.submit(method, *args, **kwargs)
+        return submit
+
+    def submit(
+            self,
+            method: str,
+            *args,
+            **kwargs) -> Future:
+        """
+        Perform a method of the model interface in the thread pool.
+
+        :param method: method name
+        :return: future with the method result
+        """
+        return self.executor.submit(
+            getattr(self.model, method), *args, **kwargs)
+
+    def map(self, method: str, args: Iterable[Any]) -> list[Any]:
+        """
+        Perform a method once for each argument, at the same time.
+
+        Blocks until all calls finish, e.g., ``map('get_selectable_fds',
+        functions)`` returns the selectable function designs of each
+        function.
+
+        :param method: method name
+        :param args: argument of each call
+        :return: results, in the same order as `args`
+        :raises Exception: the first exception raised by a call
+        """
+        futures = [self.submit(method, arg) for arg in args]
+        return [future.result() for future in futures]
+
+    def run(self, method: str, *args, **kwargs) -> Awaitable[Any]:
+        """
+        Perform a method of the model interface from asyncio.
+
+        Example::
+
+            fds = await asyncio.gather(*[
+                model.run('get_selectable_fds', f) for f in functions])
+
+        :param method: method name
+        :return: awaitable with the method result, bound to the running event
+            loop
+        """
+        return asyncio.wrap_future(self.submit(method, *args, **kwargs))
+
+    def shutdown(self, wait: Optional[bool] = True) -> None:
+        """
+        Stop the thread pool.
+
+        :param wait: whether to wait for the pending calls to finish
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
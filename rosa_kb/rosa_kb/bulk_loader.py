@@ -0,0 +1,223 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Parallel loader for large data files with insert queries.
+
+The insert queries of a data file are split into groups of statements that
+do not share variables, see :func:`rosa_kb.tql_parser.split_insert_query`.
+The groups are joined in chunks of about `chunk_size` statements, which are
+written in parallel, each in its own write transaction.
+
+The `rosa_kb_bulk_load` executable can be used as a benchmark, e.g., to
+load a generated model with 20000 components in memory::
+
+    ros2 run rosa_kb rosa_kb_bulk_load --components 20000 --backend memory \
+        config/schema.tql config/ros_schema.tql
+"""
+
+import argparse
+import concurrent.futures
+import os
+import tempfile
+import time
+
+from rosa_kb.kb_snapshot import get_paths
+from rosa_kb.model_types import BulkLoadStatsDict
+from rosa_kb.tql_parser import split_insert_query
+
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+
+
+def create_chunks(
+        groups: list[list[str]], chunk_size: int) -> list[Tuple[str, int]]:
+    """
+    Join groups of statements in insert queries.
+
+    Groups are never split, so a chunk may have more than `chunk_size`
+    statements.
+
+    :param groups: groups of statements, as returned by
+        :func:`rosa_kb.tql_parser.split_insert_query`
+    :param chunk_size: number of statements in each chunk
+    :return: list of tuples with the form (INSERT QUERY, STATEMENTS)
+    """
+    chunks = []
+    statements = []
+    for group in groups:
+        statements.extend(group)
+        if len(statements) >= chunk_size:
+            chunks.append(statements)
+            statements = []
+    if len(statements) > 0:
+        chunks.append(statements)
+    return [
+        ('insert\n' + ''.join(s + ';\n' for s in chunk), len(chunk))
+        for chunk in chunks]
+
+
+def bulk_load(
+        data_path: list[str] | str,
+        write_chunk: Callable[[str], bool],
+        load_file: Callable[[str], object],
+        workers: Optional[int] = 4,
+        chunk_size: Optional[int] = 1000,
+        progress: Optional[Callable[[int, int], None]] = None
+         ) -> BulkLoadStatsDict:
+    """
+    Load data files in parallel chunks.
+
+    Files that cannot be split, e.g., with match-insert queries, are loaded
+    with `load_file` after the chunks of the previous files are written.
+
+    :param data_path: path of the data files
+    :param write_chunk: function that writes an insert query in its own
+        transaction, and returns whether it succeeded
+    :param load_file: function that loads a whole data file
+    :param workers: number of chunks written in parallel
+    :param chunk_size: number of statements in each chunk
+    :param progress: function called with the number of statements written
+        and the total number of statements, after each chunk is written
+    :return: load statistics
+    """
+    stats = {
+        'files': 0,
+        'chunks': 0,
+        'failed_chunks': 0,
+        'statements': 0,
+        'seconds': 0.0,
+        'statements_per_second': 0.0,
+    }
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(workers, 1)) as executor:
+        for path in get_paths(data_path):
+            with open(path, 'r') as file:
+                text = file.read()
+            try:
+                chunks = create_chunks(split_insert_query(text), chunk_size)
+            except ValueError:
+                load_file(path)
+                stats['files'] += 1
+                continue
+            total = sum(size for _, size in chunks)
+            written = 0
+            futures = {
+                executor.submit(write_chunk, query): size
+                for query, size in chunks}
+            for future in concurrent.futures.as_completed(futures):
+                if future.exception() is not None or not future.result():
+                    stats['failed_chunks'] += 1
+                written += futures[future]
+                if progress is not None:
+                    progress(written, total)
+            stats['files'] += 1
+            stats['chunks'] += len(chunks)
+            stats['statements'] += total
+    stats['seconds'] = time.perf_counter() - start
+    if stats['seconds'] > 0:
+        stats['statements_per_second'] = \
+            stats['statements'] / stats['seconds']
+    return stats
+
+
+def generate_architecture_model(components: int) -> str:
+    """
+    Generate data file with a synthetic architecture model.
+
+    Each component has two configurations and is required by a function
+    design of its own function.
+
+    :param components: number of components
+    :return: insert query
+    """
+    statements = []
+    for i in range(components):
+        statements.extend([
+            f'$c{i} isa Component, has component-name "c{i}";',
+            f'$f{i} isa Function, has function-name "f{i}";',
+            f'(function: $f{i}, required-component: $c{i}) isa '
+            f'function-design, has function-design-name "f{i}_fd", '
+            f'has priority 1.0;',
+            f'$p{i} isa ComponentParameter, has parameter-key "p{i}", '
+            f'has parameter-value "1.0", has parameter-type "double";',
+            f'(component: $c{i}, parameter: $p{i}) isa '
+            f'component-configuration, '
+            f'has component-configuration-name "c{i}_low", has priority 1.0;',
+            f'(component: $c{i}, parameter: $p{i}) isa '
+            f'component-configuration, '
+            f'has component-configuration-name "c{i}_high", '
+            f'has priority 2.0;',
+        ])
+    return 'insert\n' + '\n'.join(statements) + '\n'
+
+
+def main():
+    """Load data files in a KB and report the throughput."""
+    # imported here, as the model interfaces import this module
+    from rosa_kb.memory_model_interface import MemoryModelInterface
+    from rosa_kb.sqlite_model_interface import SQLiteModelInterface
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('schema_path', nargs='+', help='schema files')
+    parser.add_argument(
+        '--data-path', nargs='*', default=[], help='data files')
+    parser.add_argument(
+        '--components', type=int, default=0,
+        help='number of components of a generated model to load')
+    parser.add_argument(
+        '--backend', choices=['typedb', 'memory', 'sqlite'],
+        default='typedb')
+    parser.add_argument('--address', default='localhost:1729')
+    parser.add_argument('--database-name', default='rosa_kb_bulk_load')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    data_path = list(args.data_path)
+    if args.components > 0:
+        file = tempfile.NamedTemporaryFile(
+            'w', suffix='.tql', delete=False)
+        with file:
+            file.write(generate_architecture_model(args.components))
+        data_path.append(file.name)
+
+    if args.backend == 'typedb':
+        from rosa_kb.typedb_model_interface import ModelInterface
+        interface_class = ModelInterface
+    elif args.backend == 'sqlite':
+        interface_class = SQLiteModelInterface
+    else:
+        interface_class = MemoryModelInterface
+    model = interface_class(
+        args.address, args.database_name, args.schema_path,
+        force_database=True)
+
+    def progress(written, total):
+        print('\r{}/{} statements'.format(written, total), end='',
+              flush=True)
+
+    try:
+        stats = model.bulk_load(
+            data_path, args.workers, args.chunk_size, progress)
+    finally:
+        if args.components > 0:
+            os.remove(data_path[-1])
+    print()
+    for key, value in stats.items():
+        print('{}: {}'.format(key, value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Changes in the KB announced by the change events.
+
+The KB services record what their writes changed with
+:meth:`ChangeRecorder.record`, and the change event is published once the
+outermost service performing writes returns, i.e., after its writes are
+committed. Services whose writes fail do not record any change, so no event
+is published for them.
+"""
+
+import contextlib
+import threading
+
+from typing import Iterable
+from typing import Iterator
+from typing import Literal
+from typing import TypedDict
+
+
+#: kinds of things announced by the change events
+CHANGE_KINDS = ('attributes', 'components', 'functions', 'actions')
+
+ChangeKind = Literal['attributes', 'components', 'functions', 'actions']
+
+
+class ChangesDict(TypedDict):
+    """TypedDict for the things changed by KB writes."""
+
+    attributes: list[str]  #: QAs/EAs with new measurements
+    components: list[str]  #: components whose status or selection changed
+    functions: list[str]  #: functions whose selected function design changed
+    actions: list[str]  #: actions requested or cancelled
+
+
+class ChangeRecorder:
+    """
+    Collect the changes recorded by the calling thread.
+
+    Changes are only collected inside :meth:`collect`, nested collections
+    join the outermost one, so a single event is published for writes
+    performed by nested services.
+    """
+
+    def __init__(self) -> None:
+        """Create ChangeRecorder."""
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def collect(self) -> Iterator[ChangesDict | None]:
+        """
+        Collect the changes recorded inside it (Context manager).
+
+        :return: dict with the things changed, with the form {KIND: NAMES},
+            filled when the outermost collection exits. None in nested
+            collections, whose changes are collected by the outermost one
+        """
+        if getattr(self._local, 'changes', None) is not None:
+            yield None
+            return
+        changes = {kind: [] for kind in CHANGE_KINDS}
+        self._local.changes = {kind: dict() for kind in CHANGE_KINDS}
+        try:
+            yield changes
+        finally:
+            recorded = self._local.changes
+            self._local.changes = None
+            for kind in CHANGE_KINDS:
+                # dicts keep the names in the order they were recorded
+                changes[kind].extend(recorded[kind])
+
+    def record(self, kind: ChangeKind, names: Iterable[str]) -> None:
+        """
+        Record changed things.
+
+        Nothing is recorded outside :meth:`collect`.
+
+        :param kind: kind of the changed things, one of :data:`CHANGE_KINDS`
+        :param names: names of the changed things
+        """
+        if kind not in CHANGE_KINDS:
+            raise ValueError('invalid change kind {!r}'.format(kind))
+        changes = getattr(self._local, 'changes', None)
+        if changes is None:
+            return
+        changes[kind].update(dict.fromkeys(names))
+
+
+def has_changes(changes: ChangesDict | None) -> bool:
+    """
+    Check if anything was changed.
+
+    :param changes: dict with the things changed
+    :return: whether any thing was changed
+    """
+    return changes is not None and \
+        any(len(changes[kind]) > 0 for kind in CHANGE_KINDS)
@@ -0,0 +1,74 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Fingerprints of the KB schema and data files, and KB snapshot files.
+
+A KB loaded from a set of schema and data files is identified by the
+fingerprint of these files. It is used to skip loading the files when the
+database was already loaded from them, and to name the snapshots exported
+after loading them, so the next time the same KB is restored from the
+snapshot instead of performing the insert queries again.
+"""
+
+import hashlib
+import os
+
+from typing import Iterable
+from typing import Optional
+
+
+def get_paths(path: Optional[list[str] | str]) -> list[str]:
+    """
+    Get list of file paths, as accepted by the model interfaces.
+
+    :param path: path or list of paths, empty paths are ignored
+    :return: list of paths
+    """
+    if path is None:
+        return []
+    if isinstance(path, str):
+        path = [path]
+    return [p for p in path if p != '']
+
+
+def fingerprint_files(paths: Iterable[str]) -> str:
+    """
+    Compute the fingerprint of the content of files.
+
+    The fingerprint depends on the order of the files, but not on their
+    location.
+
+    :param paths: path of the files
+    :return: hex digest of the files content
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            content = file.read()
+        digest.update(len(content).to_bytes(8, 'little'))
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def get_snapshot_path(
+        snapshot_dir: str, fingerprint: str, extension: str) -> str:
+    """
+    Get path of the snapshot of a KB.
+
+    :param snapshot_dir: directory where the snapshots are stored
+    :param fingerprint: fingerprint of the files the KB was loaded from
+    :param extension: file extension of the snapshot format
+    :return: path of the snapshot file
+    """
+    return os.path.join(
+        snapshot_dir, 'rosa_kb-{}.{}'.format(fingerprint, extension))
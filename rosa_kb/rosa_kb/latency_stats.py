@@ -0,0 +1,276 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Latency histograms of the KB services and model interface methods."""
+
+import contextlib
+import functools
+import inspect
+import math
+import threading
+import time
+
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import TypedDict
+
+
+#: smallest latency (s) distinguished by the histograms
+MIN_LATENCY = 1e-6
+#: number of buckets in each doubling of the latency
+BUCKETS_PER_OCTAVE = 4
+#: number of buckets, the last one holds latencies longer than ~4 minutes
+N_BUCKETS = 28 * BUCKETS_PER_OCTAVE + 1
+
+
+class LatencyStatsDict(TypedDict):
+    """TypedDict for the latency statistics of a service or method."""
+
+    count: int  #: number of calls
+    errors: int  #: number of calls that raised an exception
+    mean: float  #: mean latency (s)
+    max: float  #: longest latency (s)
+    p50: float  #: median latency (s)
+    p95: float  #: 95th percentile latency (s)
+    p99: float  #: 99th percentile latency (s)
+
+
+def get_bucket(latency: float) -> int:
+    """
+    Get the histogram bucket of a latency.
+
+    Bucket 0 holds latencies up to :data:`MIN_LATENCY`, and bucket `i` holds
+    latencies up to ``MIN_LATENCY * 2 ** (i / BUCKETS_PER_OCTAVE)``, so
+    percentiles have a relative error of at most ~19%.
+
+    :param latency: latency (s)
+    :return: bucket index
+    """
+    if latency <= MIN_LATENCY:
+        return 0
+    bucket = math.ceil(math.log2(latency / MIN_LATENCY) * BUCKETS_PER_OCTAVE)
+    return min(bucket, N_BUCKETS - 1)
+
+
+def get_bucket_limit(bucket: int) -> float:
+    """
+    Get the longest latency in a histogram bucket.
+
+    :param bucket: bucket index
+    :return: latency (s)
+    """
+    return MIN_LATENCY * 2 ** (bucket / BUCKETS_PER_OCTAVE)
+
+
+class _Shard:
+    # counts recorded by a single thread
+    __slots__ = ('counts', 'errors', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * N_BUCKETS
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class LatencyHistogram:
+    """
+    Log-scale histogram of latencies.
+
+    Each thread records latencies in its own counters, so recording does not
+    take any lock. The counters of all threads are added up when the
+    statistics are computed, which may miss the latencies being recorded at
+    that moment.
+    """
+
+    def __init__(self) -> None:
+        """Create LatencyHistogram."""
+        self._local = threading.local()
+        self._shards = []
+
+    def _get_shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            # list.append is atomic
+            self._shards.append(shard)
+        return shard
+
+    def record(self, latency: float, error: Optional[bool] = False) -> None:
+        """
+        Record a latency.
+
+        :param latency: latency (s)
+        :param error: whether the call raised an exception
+        """
+        shard = self._get_shard()
+        shard.counts[get_bucket(latency)] += 1
+        shard.total += latency
+        if latency > shard.max:
+            shard.max = latency
+        if error is True:
+            shard.errors += 1
+
+    def stats(self) -> LatencyStatsDict:
+        """
+        Get latency statistics.
+
+        Percentiles are the longest latency of the bucket they fall in,
+        limited to the longest latency recorded.
+
+        :return: dict with the number of calls and errors, and the mean,
+            maximum, and 50th, 95th, and 99th percentile latencies
+        """
+        counts = [0] * N_BUCKETS
+        errors = 0
+        total = 0.0
+        _max = 0.0
+        for shard in list(self._shards):
+            for bucket, count in enumerate(shard.counts):
+                counts[bucket] += count
+            errors += shard.errors
+            total += shard.total
+            _max = max(_max, shard.max)
+        count = sum(counts)
+        stats = {
+            'count': count,
+            'errors': errors,
+            'mean': total / count if count > 0 else 0.0,
+            'max': _max,
+        }
+        for key, percentile in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            stats[key] = 0.0
+            if count == 0:
+                continue
+            rank = math.ceil(percentile * count)
+            cumulative = 0
+            for bucket, bucket_count in enumerate(counts):
+                cumulative += bucket_count
+                if cumulative >= rank:
+                    stats[key] = min(get_bucket_limit(bucket), _max)
+                    break
+        return stats
+
+
+class LatencyStats:
+    """Latency histograms identified by name, e.g., a service name."""
+
+    def __init__(self) -> None:
+        """Create LatencyStats."""
+        self._histograms = dict()
+        self._lock = threading.Lock()
+
+    def get_histogram(self, name: str) -> LatencyHistogram:
+        """
+        Get the histogram of a name, creating it if needed.
+
+        :param name: histogram name
+        :return: histogram
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    name, LatencyHistogram())
+        return histogram
+
+    def record(
+            self,
+            name: str,
+            latency: float,
+            error: Optional[bool] = False) -> None:
+        """
+        Record a latency.
+
+        :param name: histogram name
+        :param latency: latency (s)
+        :param error: whether the call raised an exception
+        """
+        self.get_histogram(name).record(latency, error)
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+        Record the latency of the block (Context manager).
+
+        :param name: histogram name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(name, time.perf_counter() - start, True)
+            raise
+        self.record(name, time.perf_counter() - start)
+
+    def stats(self) -> dict[str, LatencyStatsDict]:
+        """
+        Get latency statistics of all histograms.
+
+        :return: dict with the form {NAME: STATS}, sorted by name
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        return {name: histogram.stats() for name, histogram in histograms}
+
+
+def instrument(
+        func: Callable[..., Any],
+        stats: LatencyStats,
+        name: str) -> Callable[..., Any]:
+    """
+    Record the latency of every call of a function.
+
+    :param func: function
+    :param stats: latency stats where the calls are recorded
+    :param name: histogram name
+    :return: function recording its latency
+    """
+    histogram = stats.get_histogram(name)
+
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            histogram.record(time.perf_counter() - start, True)
+            raise
+        histogram.record(time.perf_counter() - start)
+        return result
+    return inner
+
+
+def instrument_methods(
+        obj: Any, stats: LatencyStats, prefix: Optional[str] = '') -> None:
+    """
+    Record the latency of every call of the public methods of an object.
+
+    Context managers, e.g., :meth:`ModelInterface.batch`, are not
+    instrumented. Methods called by other methods of the object are
+    recorded as well, so the histogram of a method includes the latency of
+    the methods it calls.
+
+    :param obj: object, e.g., a model interface
+    :param stats: latency stats where the calls are recorded
+    :param prefix: prefix of the histogram names, which are the method names
+    """
+    for name, func in inspect.getmembers(type(obj), inspect.isfunction):
+        if name.startswith('_') or \
+           inspect.isgeneratorfunction(inspect.unwrap(func)):
+            continue
+        setattr(obj, name, instrument(
+            getattr(obj, name), stats, prefix + name))
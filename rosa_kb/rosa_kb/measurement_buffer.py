@@ -0,0 +1,121 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Write-behind buffer for QA/EA measurements."""
+
+import threading
+
+from typing import TypedDict
+
+
+class MeasurementBufferStatsDict(TypedDict):
+    """TypedDict for measurement buffer statistics."""
+
+    received: int  #: number of measurements added to the buffer
+    coalesced: int  #: measurements overwritten by a newer value
+    flushed: int  #: measurements handed over to be written in the KB
+    dropped: int  #: measurements discarded without being written
+    pending: int  #: measurements waiting to be flushed
+
+
+class MeasurementBuffer:
+    """
+    Buffer that keeps only the newest measurement of each attribute.
+
+    Measurements are added with :meth:`add` and retrieved with :meth:`pop`,
+    which empties the buffer. When a new value is added for an attribute that
+    already has a pending value, the old value is overwritten (coalesced). All
+    methods are thread-safe.
+    """
+
+    def __init__(self, max_size: int = 0) -> None:
+        """
+        Create MeasurementBuffer.
+
+        :param max_size: number of pending attributes that triggers a flush,
+            0 means there is no size threshold
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._pending = dict()
+        self._received = 0
+        self._coalesced = 0
+        self._flushed = 0
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        """Return number of pending measurements."""
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, measurements: dict[str, str | float]) -> bool:
+        """
+        Add measurements to the buffer.
+
+        :param measurements: dict with the form {QA/EA NAME: MEASURED VALUE}
+        :return: whether the size threshold was reached and the buffer should
+            be flushed
+        """
+        with self._lock:
+            for name, value in measurements.items():
+                self._received += 1
+                if name in self._pending:
+                    self._coalesced += 1
+                    # keep insertion order by recency
+                    del self._pending[name]
+                self._pending[name] = value
+            return self.max_size > 0 and len(self._pending) >= self.max_size
+
+    def pop(self) -> dict[str, str | float]:
+        """
+        Remove and return all pending measurements.
+
+        :return: dict with the form {QA/EA NAME: MEASURED VALUE}
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = dict()
+            self._flushed += len(pending)
+            return pending
+
+    def drop(self, measurements: dict[str, str | float] = None) -> None:
+        """
+        Account for measurements that could not be written.
+
+        :param measurements: measurements returned by :meth:`pop` that were
+            not written. When it is None, all pending measurements are
+            discarded
+        """
+        with self._lock:
+            if measurements is None:
+                measurements = self._pending
+                self._pending = dict()
+            else:
+                self._flushed -= len(measurements)
+            self._dropped += len(measurements)
+
+    def stats(self) -> MeasurementBufferStatsDict:
+        """
+        Get buffer statistics.
+
+        :return: dict with the number of received, coalesced, flushed,
+            dropped, and pending measurements
+        """
+        with self._lock:
+            return {
+                'received': self._received,
+                'coalesced': self._coalesced,
+                'flushed': self._flushed,
+                'dropped': self._dropped,
+                'pending': len(self._pending),
+            }
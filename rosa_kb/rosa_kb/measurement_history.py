@@ -0,0 +1,238 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-memory time series of QA/EA measurements."""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+from typing import Optional
+from typing import Tuple
+from typing import TypedDict
+
+
+class MeasurementWindowDict(TypedDict):
+    """TypedDict for measurement window statistics."""
+
+    count: int  #: number of measurements in the window
+    mean: float  #: mean value
+    min: float  #: minimum value
+    max: float  #: maximum value
+    percentiles: list[float]  #: value of the requested percentiles
+    ewma: float  #: exponentially weighted moving average
+
+
+def compute_window_stats(
+        values: np.ndarray,
+        percentiles: list[float] = [],
+        ewma_alpha: float = 0.0) -> MeasurementWindowDict | None:
+    """
+    Compute statistics of a window of measurements.
+
+    The EWMA starts with the oldest value in the window, and is only computed
+    when `ewma_alpha` is in the interval (0, 1], when it is 0 the EWMA is
+    NaN.
+
+    :param values: measurement values in chronological order
+    :param percentiles: percentiles to compute, in the interval [0, 100]
+    :param ewma_alpha: EWMA smoothing factor, in the interval [0, 1]
+    :return: window statistics, or None if the window is empty, or a
+        percentile or `ewma_alpha` is out of its interval
+    """
+    n = len(values)
+    if n == 0 or not 0.0 <= ewma_alpha <= 1.0 or \
+       not all(0.0 <= p <= 100.0 for p in percentiles):
+        return None
+    ewma = math.nan
+    if ewma_alpha > 0.0:
+        weights = ewma_alpha * (1.0 - ewma_alpha) ** np.arange(
+            n - 1, -1, -1, dtype=np.float64)
+        weights[0] = (1.0 - ewma_alpha) ** (n - 1)
+        ewma = float(np.dot(weights, values))
+    return {
+        'count': n,
+        'mean': float(np.mean(values)),
+        'min': float(np.min(values)),
+        'max': float(np.max(values)),
+        'percentiles': [
+            float(p) for p in np.percentile(values, percentiles)]
+        if len(percentiles) > 0 else [],
+        'ewma': ewma,
+    }
+
+
+class RingBuffer:
+    """
+    Fixed-size time series backed by NumPy arrays.
+
+    When the buffer is full, new samples overwrite the oldest ones. Samples
+    are expected to be appended in chronological order.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Create RingBuffer.
+
+        :param capacity: maximum number of samples
+        """
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return number of samples."""
+        return self._size
+
+    def append(self, timestamp: float, value: float) -> None:
+        """
+        Append sample.
+
+        :param timestamp: sample time in seconds since epoch
+        :param value: sample value
+        """
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def get(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get all samples in chronological order.
+
+        :return: tuple with the form (TIMESTAMPS, VALUES), both are copies
+        """
+        start = (self._next - self._size) % self.capacity
+        index = (start + np.arange(self._size)) % self.capacity
+        return self._times[index], self._values[index]
+
+
+class MeasurementHistory:
+    """
+    Recent measurements of each QA/EA, kept in memory.
+
+    Each QA/EA has its own :class:`RingBuffer`, created when its first
+    measurement is added. Values that can't be converted to a finite float
+    are ignored. All methods are thread-safe.
+    """
+
+    def __init__(self, capacity: int = 1000) -> None:
+        """
+        Create MeasurementHistory.
+
+        :param capacity: number of samples kept per QA/EA, 0 disables it
+        """
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._buffers = dict()
+
+    def names(self) -> list[str]:
+        """
+        Get the name of the QAs/EAs with measurements.
+
+        :return: QA/EA names
+        """
+        with self._lock:
+            return list(self._buffers.keys())
+
+    def add(
+            self,
+            measurements: dict[str, str | float],
+            timestamp: Optional[float] = None) -> None:
+        """
+        Add measurements.
+
+        :param measurements: dict with the form {QA/EA NAME: MEASURED VALUE}
+        :param timestamp: measurement time in seconds since epoch, defaults
+            to the current time
+        """
+        if self.capacity <= 0:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for name, value in measurements.items():
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if not math.isfinite(value):
+                    continue
+                if name not in self._buffers:
+                    self._buffers[name] = RingBuffer(self.capacity)
+                self._buffers[name].append(timestamp, value)
+
+    def window(
+            self,
+            name: str,
+            last_n: int = 0,
+            start_time: float = 0.0,
+            end_time: float = 0.0) -> Tuple[np.ndarray, np.ndarray] | None:
+        """
+        Get the measurements of a QA/EA in a window.
+
+        The time range is applied first, then only the `last_n` most recent
+        measurements in the range are returned.
+
+        :param name: QA/EA name
+        :param last_n: maximum number of measurements, 0 means no limit
+        :param start_time: window start in seconds since epoch, 0 means no
+            limit
+        :param end_time: window end in seconds since epoch, 0 means no limit
+        :return: tuple with the form (TIMESTAMPS, VALUES) in chronological
+            order, or None if the QA/EA has no measurements
+        """
+        with self._lock:
+            if name not in self._buffers:
+                return None
+            times, values = self._buffers[name].get()
+        mask = np.ones(len(times), dtype=bool)
+        if start_time > 0.0:
+            mask &= times >= start_time
+        if end_time > 0.0:
+            mask &= times <= end_time
+        times, values = times[mask], values[mask]
+        if last_n > 0:
+            times, values = times[-last_n:], values[-last_n:]
+        return times, values
+
+    def window_stats(
+            self,
+            name: str,
+            last_n: int = 0,
+            start_time: float = 0.0,
+            end_time: float = 0.0,
+            percentiles: list[float] = [],
+            ewma_alpha: float = 0.0) -> MeasurementWindowDict | None:
+        """
+        Get statistics of the measurements of a QA/EA in a window.
+
+        See :meth:`window` for how the window is selected, and
+        :func:`compute_window_stats` for the statistics.
+
+        :param name: QA/EA name
+        :param last_n: maximum number of measurements, 0 means no limit
+        :param start_time: window start in seconds since epoch, 0 means no
+            limit
+        :param end_time: window end in seconds since epoch, 0 means no limit
+        :param percentiles: percentiles to compute, in the interval [0, 100]
+        :param ewma_alpha: EWMA smoothing factor
+        :return: window statistics, or None if the window is empty
+        """
+        window = self.window(name, last_n, start_time, end_time)
+        if window is None:
+            return None
+        return compute_window_stats(window[1], percentiles, ewma_alpha)
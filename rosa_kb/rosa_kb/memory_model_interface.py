@@ -0,0 +1,2733 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-memory implementation of ROSA's knowledge model, without typeDB."""
+
+import contextlib
+import functools
+import math
+import operator
+import os
+import pickle
+import re
+import threading
+
+from datetime import datetime
+from datetime import timedelta
+
+from rosa_kb.bulk_loader import bulk_load
+from rosa_kb.kb_snapshot import fingerprint_files
+from rosa_kb.kb_snapshot import get_paths
+from rosa_kb.kb_snapshot import get_snapshot_path
+from rosa_kb.model_types import BulkLoadStatsDict
+from rosa_kb.model_types import ComponentConfigurationDict
+from rosa_kb.model_types import ComponentDict
+from rosa_kb.model_types import ComponentProcessDict
+from rosa_kb.model_types import convert_component_parameter_value_to_py_type
+from rosa_kb.model_types import MeasurementCompactionStatsDict
+from rosa_kb.model_types import PlanningSnapshotDict
+from rosa_kb.model_types import ReconfigPlanDetailsDict
+from rosa_kb.model_types import ReconfigPlanDict
+from rosa_kb.read_cache import ReadCache
+from rosa_kb.slow_query_log import SlowQueryLog
+from rosa_kb.status_materializer import CONSTRAINED_TYPES
+from rosa_kb.status_materializer import StatusDependenciesDict
+from rosa_kb.tql_parser import format_value
+from rosa_kb.tql_parser import parse_insert_query
+from rosa_kb.tql_parser import parse_match_query
+from rosa_kb.tql_parser import parse_schema_types
+from rosa_kb.tql_parser import TQLThingDict
+
+from typing import Any
+from typing import Callable
+from typing import Generator
+from typing import Iterable
+from typing import Literal
+from typing import NoReturn
+from typing import Optional
+from typing import Tuple
+
+
+#: status attribute of each thing type with a derived status
+STATUS_ATTRIBUTES = {
+    'Action': 'action-status',
+    'Function': 'function-status',
+    'function-design': 'function-design-status',
+    'Component': 'component-status',
+    'component-configuration': 'component-configuration-status',
+    'constraint': 'constraint-status',
+}
+
+#: operators supported by the 'constraint-operator' attribute
+CONSTRAINT_OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+}
+
+#: typeDB value type of the python type of each attribute value
+VALUE_TYPES = {
+    bool: 'boolean',
+    int: 'long',
+    float: 'double',
+    str: 'string',
+    datetime: 'datetime',
+}
+
+
+class Thing:
+    """Entity or relation stored in a :class:`MemoryModelInterface`."""
+
+    __slots__ = ('type', 'attributes', 'players', 'relations')
+
+    def __init__(
+            self,
+            thing_type: str,
+            attributes: dict[str, list] = None,
+            players: list[Tuple[str, 'Thing']] = None) -> None:
+        """
+        Create Thing.
+
+        :param thing_type: thing type
+        :param attributes: dict with the form {ATTRIBUTE: VALUES}
+        :param players: list of tuples with the form (ROLE, THING) with the
+            role players of a relation
+        """
+        self.type = thing_type
+        self.attributes = dict() if attributes is None else attributes
+        self.players = [] if players is None else players
+        #: list of tuples with the form (ROLE, RELATION)
+        self.relations = []
+
+    def get(self, attribute: str) -> list:
+        """
+        Get the stored values of an attribute.
+
+        :param attribute: attribute type
+        :return: attribute values
+        """
+        return self.attributes.get(attribute, [])
+
+    def get_players(self, role: str) -> list['Thing']:
+        """
+        Get the things playing a role in this relation.
+
+        :param role: role name
+        :return: role players
+        """
+        return [thing for _role, thing in self.players if _role == role]
+
+    def get_relations(self, relation: str, role: str) -> list['Thing']:
+        """
+        Get the relations in which this thing plays a role.
+
+        Subtypes of `relation` are not included.
+
+        :param relation: relation type
+        :param role: role name
+        :return: relations
+        """
+        return [
+            r for _role, r in self.relations
+            if _role == role and r.type == relation]
+
+
+def write_method(func: Callable) -> Callable:
+    """
+    Perform a method as a write to the KB (Decorator).
+
+    The method is performed inside :meth:`MemoryModelInterface.batch`, so it
+    holds the KB lock and its changes are undone when it raises an exception.
+    """
+    @functools.wraps(func)
+    def inner(self, *args, **kwargs):
+        with self.batch():
+            return func(self, *args, **kwargs)
+    return inner
+
+
+def read_method(func: Callable) -> Callable:
+    """
+    Perform a method holding the KB lock (Decorator).
+
+    Inside :meth:`MemoryModelInterface.snapshot`, the method reads the KB as
+    it was before the writes performed inside the snapshot.
+    """
+    @functools.wraps(func)
+    def inner(self, *args, **kwargs):
+        with self._lock, self._snapshot_reads():
+            return func(self, *args, **kwargs)
+    return inner
+
+
+def cached_method(func: Callable) -> Callable:
+    """
+    Cache the result of a read method until the KB changes (Decorator).
+
+    Reads performed inside :meth:`MemoryModelInterface.batch` or
+    :meth:`MemoryModelInterface.snapshot`, or with unhashable arguments,
+    e.g., lists, are not cached, see
+    :func:`rosa_kb.typedb_model_interface.cached_query`.
+    """
+    @functools.wraps(func)
+    def inner(self, *args, **kwargs):
+        with self._lock:
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+            if key is None or self.get_open_transaction() is not None:
+                return func(self, *args, **kwargs)
+            return self.read_cache.get_or_compute(
+                key, self.revision, lambda: func(self, *args, **kwargs))
+    return inner
+
+
+class MemoryModelInterface:
+    """
+    ROSA knowledge model kept in indexed python data structures.
+
+    Implements the same interface as
+    :class:`rosa_kb.typedb_model_interface.ModelInterface`, without a typeDB
+    server. The type hierarchy is read from the schema files, and the data
+    files must only contain insert queries, see :mod:`rosa_kb.tql_parser`.
+    The statuses and the 'is-required' attribute derived by the rules in
+    `schema.tql` are computed natively, see :meth:`get_derived_attributes`.
+
+    Generic TypeQL queries are only partially supported: insert queries
+    without a match clause, and fetch and count queries whose match clause
+    is a conjunction of statements, see :meth:`fetch_database`. Generic
+    get, delete, and update queries raise :class:`NotImplementedError`, the
+    specific methods must be used instead. All methods are thread-safe, and
+    every write increases the KB :attr:`revision`. The methods cached by the
+    typeDB interface are also cached, until the revision changes.
+    """
+
+    #: file extension of the snapshots exported by :meth:`export_snapshot`
+    snapshot_extension = 'pickle'
+
+    def __init__(
+            self,
+            address: Optional[str] = None,
+            database_name: Optional[str] = None,
+            schema_path: Optional[list[str] | str] = None,
+            data_path: Optional[list[str] | str] = None,
+            force_database: Optional[bool] = False,
+            force_data: Optional[bool] = False,
+            infer: Optional[bool] = False,
+            cache_size: Optional[int] = 256,
+            materialize_status: Optional[bool] = False,
+            check_fingerprint: Optional[bool] = False,
+            snapshot_dir: Optional[str] = None,
+            bulk_load_workers: Optional[int] = 0,
+            bulk_load_chunk_size: Optional[int] = 1000,
+            slow_query_log: Optional[SlowQueryLog] = None) -> None:
+        """
+        Create MemoryModelInterface.
+
+        The arguments that only make sense for typeDB are ignored, they are
+        accepted so both interfaces can be created in the same way.
+
+        When `snapshot_dir` is set, the KB is restored from the snapshot of
+        the schema and data files :attr:`fingerprint` if it exists, instead
+        of loading the data files. Otherwise, the snapshot is exported after
+        loading them.
+
+        :param address: ignored
+        :param database_name: ignored
+        :param schema_path: path of the schema files
+        :param data_path: path of the data files, always loaded
+        :param force_database: ignored
+        :param force_data: ignored
+        :param infer: only kept in :attr:`infer`, statuses are always
+            derived
+        :param cache_size: maximum number of cached reads, 0 disables the
+            cache
+        :param materialize_status: only sets :attr:`infer` to False, statuses
+            are always derived
+        :param check_fingerprint: ignored, the KB is always empty when it is
+            created
+        :param snapshot_dir: directory of the KB snapshots, snapshots are
+            not used when it is None or empty
+        :param bulk_load_workers: ignored, the data files are loaded by
+            :meth:`load_data`, writes are serialized by the KB lock
+        :param bulk_load_chunk_size: ignored
+        :param slow_query_log: ignored, TypeQL queries are not performed
+        """
+        #: statistics of the bulk load of the data files, always None
+        self.bulk_load_stats = None
+        #: fingerprint of the schema and data files the KB was loaded from,
+        #: None when the KB was modified after loading them
+        self.fingerprint = None
+        self.revision = 0
+        self.read_cache = ReadCache(cache_size)
+        #: same as in the typeDB interface, it does not change how the
+        #: statuses are derived
+        self.infer = infer and not materialize_status
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._snapshot_open = False
+        self._snapshot_state = None
+        self._undo = []
+        self._version = 0
+        self._derived = dict()
+        self._derived_version = -1
+        self._supertypes = dict()
+        self._subtypes = dict()
+        self._things = dict()
+        self._keys = dict()
+        self._last_plan_time = None
+
+        schema_path = get_paths(schema_path)
+        for path in schema_path:
+            with open(path, 'r') as file:
+                self._supertypes.update(parse_schema_types(file.read()))
+
+        data_path = get_paths(data_path)
+        self._load_data_files(
+            fingerprint_files(schema_path + data_path), data_path,
+            snapshot_dir)
+
+    def _load_data_files(
+            self,
+            fingerprint: str,
+            data_path: list[str],
+            snapshot_dir: Optional[str]) -> None:
+        snapshot_path = None
+        if snapshot_dir:
+            snapshot_path = get_snapshot_path(
+                snapshot_dir, fingerprint, self.snapshot_extension)
+        if snapshot_path is not None and os.path.isfile(snapshot_path):
+            self.restore_snapshot(snapshot_path)
+            return
+        for path in data_path:
+            self.load_data(path)
+        self.fingerprint = fingerprint
+        if snapshot_path is not None:
+            self.export_snapshot(snapshot_path)
+
+    def bump_revision(self) -> int:
+        """
+        Increase the KB revision, and clear its :attr:`fingerprint`.
+
+        :return: new KB revision
+        """
+        with self._lock:
+            self.fingerprint = None
+            self.revision += 1
+            return self.revision
+
+    @contextlib.contextmanager
+    def batch(self) -> Generator:
+        """
+        Perform all writes issued inside it atomically.
+
+        Context manager that holds the KB lock, so no other thread reads or
+        writes the KB while it is open. When an exception is raised inside
+        the outermost batch, all its changes are undone and the exception is
+        propagated. Nested batches join the outermost one. The KB
+        :attr:`revision` is increased once per batch.
+
+        :return: the model interface
+        """
+        with self._lock:
+            if self._batch_depth > 0:
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                return
+
+            if self._snapshot_open and self._snapshot_state is None:
+                self._snapshot_state = self._copy_state()
+            self._batch_depth = 1
+            self._undo = []
+            try:
+                yield self
+            except BaseException:
+                for undo in reversed(self._undo):
+                    undo()
+                raise
+            finally:
+                self._undo = []
+                self._batch_depth = 0
+                self._version += 1
+                self.bump_revision()
+
+    @contextlib.contextmanager
+    def snapshot(self) -> Generator:
+        """
+        Perform all reads issued inside it in the same state of the KB.
+
+        Context manager that holds the KB lock, so no other thread writes the
+        KB while it is open. Writes performed inside a snapshot are applied
+        to the KB, but are not visible to the reads in the snapshot, as in
+        :meth:`rosa_kb.typedb_model_interface.ModelInterface.snapshot`. To do
+        so, the first write copies the KB state, so writing inside a
+        snapshot is slower. A snapshot opened inside a batch or another
+        snapshot joins it.
+
+        :return: the model interface
+        """
+        with self._lock:
+            if self._batch_depth > 0 or self._snapshot_open:
+                yield self
+                return
+
+            self._snapshot_open = True
+            try:
+                yield self
+            finally:
+                self._snapshot_open = False
+                self._snapshot_state = None
+
+    def get_open_transaction(self) -> Optional['MemoryModelInterface']:
+        """
+        Get the batch or snapshot open in the calling thread.
+
+        :return: the model interface if the calling thread is inside
+            :meth:`batch` or :meth:`snapshot`, None otherwise
+        """
+        # the lock is held by the thread with an open batch or snapshot
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            if self._batch_depth > 0 or self._snapshot_open:
+                return self
+            return None
+        finally:
+            self._lock.release()
+
+    def _copy_state(self) -> dict[str, Any]:
+        derived = self.get_derived_attributes()
+        copies = {
+            thing: Thing(thing.type, {
+                attribute: list(values)
+                for attribute, values in thing.attributes.items()})
+            for by_type in self._things.values() for thing in by_type}
+        for thing, thing_copy in copies.items():
+            thing_copy.players = [
+                (role, copies[player]) for role, player in thing.players]
+            thing_copy.relations = [
+                (role, copies[relation]) for role, relation in thing.relations]
+        return {
+            '_things': {
+                thing_type: {copies[thing]: None for thing in by_type}
+                for thing_type, by_type in self._things.items()},
+            '_keys': {
+                attribute: {
+                    value: copies[thing] for value, thing in keys.items()
+                    if thing in copies}
+                for attribute, keys in self._keys.items()},
+            '_derived': {
+                copies[thing]: {
+                    attribute: set(values)
+                    for attribute, values in attributes.items()}
+                for thing, attributes in derived.items()},
+            '_derived_version': self._version,
+            '_version': self._version,
+            '_last_plan_time': self._last_plan_time,
+        }
+
+    def _swap_state(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            state[name] = getattr(self, name)
+            setattr(self, name, value)
+
+    @contextlib.contextmanager
+    def _snapshot_reads(self) -> Generator:
+        # reads inside a snapshot use the state copied by the first write
+        state = self._snapshot_state
+        if state is None or self._batch_depth > 0:
+            yield
+            return
+
+        self._snapshot_state = None
+        self._swap_state(state)
+        try:
+            yield
+        finally:
+            self._swap_state(state)
+            self._snapshot_state = state
+
+    def _is_type(self, thing_type: str, supertype: str) -> bool:
+        while thing_type is not None:
+            if thing_type == supertype:
+                return True
+            thing_type = self._supertypes.get(thing_type)
+        return False
+
+    def _instances(self, thing_type: str) -> list[Thing]:
+        if thing_type not in self._subtypes:
+            self._subtypes[thing_type] = [
+                t for t in set(self._supertypes) | {thing_type}
+                if self._is_type(t, thing_type)]
+        return [
+            thing for t in self._subtypes[thing_type]
+            for thing in self._things.get(t, [])]
+
+    def _get_thing(self, thing_type: str, name: Any) -> Thing | None:
+        thing = self._keys.get(
+            '{}-name'.format(thing_type.lower()), dict()).get(name)
+        if thing is None or not self._is_type(thing.type, thing_type):
+            return None
+        return thing
+
+    def _get_plan(self, start_time: datetime) -> Thing | None:
+        plans = [
+            rp for rp in self._instances('reconfiguration-plan')
+            if start_time in rp.get('start-time')]
+        return plans[-1] if len(plans) > 0 else None
+
+    def _link(self, thing: Thing) -> None:
+        self._things.setdefault(thing.type, dict())[thing] = None
+        for attribute, values in thing.attributes.items():
+            if attribute.endswith('-name'):
+                for value in values:
+                    self._keys.setdefault(attribute, dict())[value] = thing
+        for role, player in thing.players:
+            player.relations.append((role, thing))
+
+    def _unlink(self, thing: Thing) -> None:
+        del self._things[thing.type][thing]
+        for attribute, values in thing.attributes.items():
+            if attribute.endswith('-name'):
+                for value in values:
+                    self._keys[attribute].pop(value, None)
+        for role, player in thing.players:
+            player.relations.remove((role, thing))
+
+    def _add(self, thing: Thing) -> Thing:
+        self._link(thing)
+        self._undo.append(lambda: self._unlink(thing))
+        self._version += 1
+        return thing
+
+    def _insert(
+            self,
+            thing_type: str,
+            attributes: list[Tuple[str, Any]] = [],
+            players: list[Tuple[str, Thing]] = []) -> Thing:
+        thing = Thing(thing_type, players=list(players))
+        for attribute, value in attributes:
+            if value not in thing.attributes.setdefault(attribute, []):
+                thing.attributes[attribute].append(value)
+        return self._add(thing)
+
+    def _delete(self, thing: Thing) -> None:
+        self._unlink(thing)
+        self._undo.append(lambda: self._link(thing))
+        self._version += 1
+
+    def _replace_values(
+            self, thing: Thing, attribute: str, values: list) -> None:
+        if attribute.endswith('-name'):
+            keys = self._keys.setdefault(attribute, dict())
+            for value in thing.get(attribute):
+                keys.pop(value, None)
+            for value in values:
+                keys[value] = thing
+        if len(values) > 0:
+            thing.attributes[attribute] = list(values)
+        else:
+            thing.attributes.pop(attribute, None)
+
+    def _set_values(self, thing: Thing, attribute: str, values: list) -> None:
+        old_values = thing.get(attribute)
+        self._replace_values(thing, attribute, values)
+        self._undo.append(
+            lambda: self._replace_values(thing, attribute, old_values))
+        self._version += 1
+
+    @write_method
+    def insert_database(self, query: str) -> list[Thing] | None:
+        """
+        Perform insert query without a match clause.
+
+        :param query: TypeQL insert query, see
+            :func:`rosa_kb.tql_parser.parse_insert_query`
+        :return: inserted things, or None if the query is not supported or a
+            key is already in use
+        """
+        try:
+            statements = parse_insert_query(query)
+        except ValueError:
+            return None
+
+        variables = dict()
+        for statement in statements:
+            if statement['type'] is not None:
+                variables[statement['variable']] = Thing(statement['type'])
+        for statement in statements:
+            thing = variables.get(statement['variable'])
+            if thing is None:
+                return None
+            for attribute, value in statement['attributes']:
+                if attribute.endswith('-name') and \
+                   value in self._keys.get(attribute, dict()):
+                    return None
+                if value not in thing.attributes.setdefault(attribute, []):
+                    thing.attributes[attribute].append(value)
+            for role, variable in statement['players']:
+                if variable not in variables:
+                    return None
+                thing.players.append((role, variables[variable]))
+        return self._add_all(list(variables.values()))
+
+    def _add_all(self, things: list[Thing]) -> list[Thing]:
+        # role players are added before the relations they play in
+        inserted = []
+        added = set()
+        pending = things
+        while len(pending) > 0:
+            ready = [
+                t for t in pending
+                if all(player in added for _, player in t.players)]
+            if len(ready) == 0:
+                ready = pending
+            inserted.extend(self._add(thing) for thing in ready)
+            added.update(ready)
+            pending = [t for t in pending if t not in added]
+        return inserted
+
+    def _update_last_plan_time(self) -> None:
+        times = [
+            t for rp in self._instances('reconfiguration-plan')
+            for t in rp.get('start-time') + rp.get('end-time')]
+        if len(times) > 0 and (
+                self._last_plan_time is None
+                or max(times) > self._last_plan_time):
+            self._last_plan_time = max(times)
+
+    def export_snapshot(self, path: str) -> None:
+        """
+        Export all things in the KB to a snapshot file.
+
+        The snapshot is written to a temporary file, which is then renamed,
+        so an existing snapshot is never left half written.
+
+        :param path: path of the snapshot file
+        """
+        with self._lock:
+            things = [t for by_type in self._things.values() for t in by_type]
+            index = {thing: i for i, thing in enumerate(things)}
+            snapshot = {
+                'fingerprint': self.fingerprint,
+                'things': [(
+                    thing.type,
+                    thing.attributes,
+                    [(role, index[player]) for role, player in thing.players]
+                ) for thing in things],
+            }
+            if os.path.dirname(path) != '':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as file:
+                pickle.dump(snapshot, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+
+    def restore_snapshot(self, path: str) -> list[Thing]:
+        """
+        Replace all things in the KB with the ones in a snapshot file.
+
+        Snapshot files must only be restored from trusted locations, as they
+        are read with :mod:`pickle`.
+
+        :param path: path of the snapshot file, see :meth:`export_snapshot`
+        :return: restored things
+        """
+        with open(path, 'rb') as file:
+            snapshot = pickle.load(file)
+        things = [
+            Thing(thing_type, attributes)
+            for thing_type, attributes, _ in snapshot['things']]
+        for thing, (_, _, players) in zip(things, snapshot['things']):
+            thing.players = [(role, things[i]) for role, i in players]
+        with self._lock:
+            with self.batch():
+                for by_type in list(self._things.values()):
+                    for thing in list(by_type):
+                        self._delete(thing)
+                restored = self._add_all(things)
+                self._update_last_plan_time()
+            self.fingerprint = snapshot['fingerprint']
+        return restored
+
+    def load_data(self, path: str) -> list[Thing] | None:
+        """
+        Load data file.
+
+        :param path: path of a file with insert queries
+        :return: inserted things, or None if the file is not supported
+        """
+        with open(path, 'r') as file:
+            return self.insert_database(file.read())
+
+    def bulk_load(
+            self,
+            data_path: list[str] | str,
+            workers: Optional[int] = 4,
+            chunk_size: Optional[int] = 1000,
+            progress: Optional[Callable[[int, int], None]] = None
+             ) -> BulkLoadStatsDict:
+        """
+        Load data files in chunks, see :func:`rosa_kb.bulk_loader.bulk_load`.
+
+        Chunks are written in parallel, but each holds the KB lock.
+
+        :param data_path: path of the data files
+        :param workers: number of chunks written in parallel
+        :param chunk_size: number of statements in each chunk
+        :param progress: function called with the number of statements
+            written and the total number of statements
+        :return: load statistics
+        """
+        def write_chunk(query):
+            try:
+                with self.batch():
+                    if self.insert_database(query) is None:
+                        raise ValueError('invalid chunk')
+            except ValueError:
+                return False
+            return True
+        return bulk_load(
+            data_path, write_chunk, self.load_data, workers, chunk_size,
+            progress)
+
+    def database_query(self, *args, **kwargs) -> NoReturn:
+        """
+        Perform generic TypeQL query, not supported.
+
+        :raises NotImplementedError: always, use the specific query methods,
+            e.g., :meth:`insert_database` or :meth:`fetch_database`
+        """
+        raise NotImplementedError(
+            '{} does not perform generic TypeQL queries, use '
+            'insert_database or fetch_database'.format(type(self).__name__))
+
+    def create_match_query(
+            self,
+            things_list: list[Tuple[str, str, Any]],
+            prefix: Optional[str] = 't') -> Tuple[str, list[str]]:
+        """
+        Create match query statements, as in `ros_typedb`.
+
+        :param things_list: list of tuples with the form (THING TYPE,
+            ATTRIBUTE, VALUE), each matches the thing with that attribute
+        :param prefix: prefix of the variables, they are numbered in order
+        :return: match statements, and the variables without `$`
+        """
+        match_query = ''
+        prefix_list = []
+        for i, (thing_type, attribute, value) in enumerate(things_list):
+            variable = '{}_{}'.format(prefix, i)
+            match_query += '${} isa {}, has {} {};'.format(
+                variable, thing_type, attribute, format_value(value))
+            prefix_list.append(variable)
+        return match_query, prefix_list
+
+    def create_relationship_query(
+            self,
+            relationship: str,
+            related_dict: dict[str, list[str]],
+            attribute_list: Optional[list[Tuple[str, Any]]] = [],
+            prefix: Optional[str] = 'r') -> str:
+        """
+        Create relation statement, as in `ros_typedb`.
+
+        :param relationship: relation type
+        :param related_dict: dict with the form {ROLE: VARIABLES}, with the
+            variables without `$`
+        :param attribute_list: list of tuples with the form (ATTRIBUTE,
+            VALUE)
+        :param prefix: variable of the relation
+        :return: relation statement
+        """
+        players = ','.join(
+            '{}:${}'.format(role, variable)
+            for role, variables in related_dict.items()
+            for variable in variables)
+        query = '${} ({}) isa {}'.format(prefix, players, relationship)
+        for attribute, value in attribute_list:
+            query += ', has {} {}'.format(attribute, format_value(value))
+        return query + ';'
+
+    @read_method
+    def fetch_database(self, query: str) -> list[dict[str, dict]] | None:
+        """
+        Perform fetch query.
+
+        Only match clauses made of a conjunction of statements are supported,
+        see :func:`rosa_kb.tql_parser.parse_match_query`. The answers have
+        the same form as in typeDB, e.g., `{'name': {'value': 'c1', 'type':
+        {'label': 'component-name', 'root': 'attribute', 'value_type':
+        'string'}}}`. The derived statuses and 'is-required' attribute are
+        matched as stored attributes.
+
+        :param query: TypeQL fetch query
+        :return: one dict with the form {VARIABLE: CONCEPT} per answer, or
+            None if the query is not supported
+        """
+        try:
+            query = parse_match_query(query)
+        except ValueError:
+            return None
+        if query['fetch'] is None:
+            return None
+        answers = self._match(query['patterns'], query['fetch'])
+        if answers is None:
+            return None
+        return [
+            {v: self._fetch_concept(answer[v]) for v in query['fetch']}
+            for answer in answers]
+
+    def get_database(self, query: str) -> NoReturn:
+        """
+        Perform get query, not supported.
+
+        :param query: TypeQL query
+        :raises NotImplementedError: always, use :meth:`fetch_database`, or
+            :meth:`get_aggregate_database` to count the answers
+        """
+        raise NotImplementedError(
+            '{} does not perform get queries, use fetch_database or '
+            'get_aggregate_database'.format(type(self).__name__))
+
+    @read_method
+    def get_aggregate_database(self, query: str) -> int | None:
+        """
+        Perform get count query.
+
+        Only match clauses made of a conjunction of statements are supported,
+        see :meth:`fetch_database`. Other aggregates are not supported.
+
+        :param query: TypeQL get query, ending with `count;`
+        :return: number of distinct answers of the get clause variables, or
+            None if the query is not supported
+        """
+        try:
+            query = parse_match_query(query)
+        except ValueError:
+            return None
+        if not query['count']:
+            return None
+        answers = self._match(query['patterns'], query['get'])
+        return None if answers is None else len(answers)
+
+    def _match(
+            self,
+            patterns: list[TQLThingDict],
+            variables: list[str]) -> list[dict[str, Any]] | None:
+        # answers are dicts with the form {VARIABLE: CONCEPT}, where concepts
+        # are things or tuples with the form (ATTRIBUTE, VALUE)
+        named = [
+            variable for pattern in patterns
+            for variable in [pattern['variable']]
+            + [v for _, v in pattern['players']]
+            + [v for _, v in pattern['variables']]
+            if not variable.startswith('_')]
+        if any(variable not in named for variable in variables):
+            return None
+        variables = variables if len(variables) > 0 else named
+
+        answers = dict()
+
+        def match(binding, pending):
+            if len(pending) == 0:
+                key = tuple(
+                    id(c) if isinstance(c, Thing) else c
+                    for c in (binding[v] for v in variables))
+                answers.setdefault(key, binding)
+                return
+            pattern = min(
+                pending, key=lambda p: self._match_cost(p, binding))
+            pending = [p for p in pending if p is not pattern]
+            for _binding in self._match_pattern(pattern, binding):
+                match(_binding, pending)
+
+        match(dict(), patterns)
+        return list(answers.values())
+
+    def _match_cost(self, pattern: TQLThingDict, binding: dict) -> int:
+        if pattern['variable'] in binding:
+            return 0
+        if any(a.endswith('-name') for a, _ in pattern['attributes']):
+            return 1
+        if any(v in binding for _, v in pattern['players']):
+            return 2
+        return 3
+
+    def _match_pattern(
+            self,
+            pattern: TQLThingDict,
+            binding: dict[str, Any]) -> Generator[dict[str, Any], None, None]:
+        variable = pattern['variable']
+        keys = [
+            (attribute, value) for attribute, value in pattern['attributes']
+            if attribute.endswith('-name')]
+        players = [
+            binding[v] for _, v in pattern['players']
+            if isinstance(binding.get(v), Thing)]
+        if variable in binding:
+            candidates = [binding[variable]] \
+                if isinstance(binding[variable], Thing) else []
+        elif len(keys) > 0:
+            thing = self._keys.get(keys[0][0], dict()).get(keys[0][1])
+            candidates = [] if thing is None else [thing]
+        elif len(players) > 0:
+            candidates = list(dict.fromkeys(
+                relation for _, relation in players[0].relations))
+        elif pattern['type'] is not None:
+            candidates = self._instances(pattern['type'])
+        else:
+            candidates = [
+                thing for by_type in self._things.values()
+                for thing in by_type]
+
+        def bind_players(binding, players, edges):
+            if len(players) == 0:
+                yield binding
+                return
+            (role, variable), players = players[0], players[1:]
+            for i, (_role, player) in enumerate(edges):
+                bound = binding.get(variable, player)
+                if _role != role or bound is not player:
+                    continue
+                yield from bind_players(
+                    {**binding, variable: player}, players,
+                    edges[:i] + edges[i + 1:])
+
+        def bind_values(binding, thing, variables):
+            if len(variables) == 0:
+                yield binding
+                return
+            (attribute, variable), variables = variables[0], variables[1:]
+            for concept in self._attribute_concepts(thing, attribute):
+                if binding.get(variable, concept) != concept:
+                    continue
+                yield from bind_values(
+                    {**binding, variable: concept}, thing, variables)
+
+        for thing in candidates:
+            if pattern['type'] is not None and \
+               not self._is_type(thing.type, pattern['type']):
+                continue
+            if any(value not in [
+                    v for _, v in self._attribute_concepts(thing, attribute)]
+                   for attribute, value in pattern['attributes']):
+                continue
+            for _binding in bind_players(
+                    {**binding, variable: thing}, pattern['players'],
+                    thing.players):
+                yield from bind_values(_binding, thing, pattern['variables'])
+
+    def _attribute_concepts(
+            self, thing: Thing, attribute: str) -> list[Tuple[str, Any]]:
+        # values of the attribute and its subtypes, e.g., 'name' also
+        # matches 'component-name'
+        attributes = set(thing.attributes) | set(
+            self.get_derived_attributes().get(thing, dict()))
+        return [
+            (a, value) for a in sorted(attributes)
+            if self._is_type(a, attribute) for value in self._values(thing, a)]
+
+    def _fetch_concept(self, concept: Thing | Tuple[str, Any]) -> dict:
+        if isinstance(concept, Thing):
+            root = concept.type
+            while root in self._supertypes:
+                root = self._supertypes[root]
+            return {'type': {'label': concept.type, 'root': root}}
+        attribute, value = concept
+        return {
+            'value': value,
+            'type': {
+                'label': attribute,
+                'root': 'attribute',
+                'value_type': VALUE_TYPES.get(type(value)),
+            },
+        }
+
+    def delete_database(self, query: str) -> NoReturn:
+        """
+        Perform delete query, not supported.
+
+        :param query: TypeQL query
+        :raises NotImplementedError: always, use
+            :meth:`delete_attribute_from_thing` or the specific delete
+            methods
+        """
+        raise NotImplementedError(
+            '{} does not perform delete queries, use '
+            'delete_attribute_from_thing'.format(type(self).__name__))
+
+    def update_database(self, query: str) -> NoReturn:
+        """
+        Perform update query, not supported.
+
+        :param query: TypeQL query
+        :raises NotImplementedError: always, use
+            :meth:`update_attribute_in_thing` or the specific update methods
+        """
+        raise NotImplementedError(
+            '{} does not perform update queries, use '
+            'update_attribute_in_thing'.format(type(self).__name__))
+
+    def _find(
+            self,
+            thing_type: str,
+            key_attr_list: list[Tuple[str, Any]]) -> list[Thing]:
+        things = self._instances(thing_type)
+        for key, value in key_attr_list:
+            if key.endswith('-name'):
+                thing = self._keys.get(key, dict()).get(value)
+                things = [thing] if thing in things else []
+            else:
+                things = [t for t in things if value in self._values(t, key)]
+        return things
+
+    @read_method
+    def fetch_attribute_from_thing(
+            self,
+            thing: str,
+            key_attr_list: list[Tuple[str, Any]],
+            attr: str) -> list:
+        """
+        Get the values of an attribute of the things with certain attributes.
+
+        The attributes derived by the schema rules are included.
+
+        :param thing: thing type
+        :param key_attr_list: list of tuples with the form (ATTRIBUTE, VALUE)
+            identifying the things
+        :param attr: attribute type
+        :return: attribute values
+        """
+        return [
+            value for t in self._find(thing, key_attr_list)
+            for value in self._values(t, attr)]
+
+    @write_method
+    def update_attribute_in_thing(
+            self,
+            thing: str,
+            key: str,
+            key_value: Any,
+            attr: str,
+            attr_value: Any) -> list[Thing]:
+        """
+        Replace the values of an attribute of the things with a certain key.
+
+        :param thing: thing type
+        :param key: key attribute type
+        :param key_value: key attribute value
+        :param attr: attribute type
+        :param attr_value: new attribute value
+        :return: updated things
+        """
+        things = self._find(thing, [(key, key_value)])
+        for t in things:
+            self._set_values(t, attr, [attr_value])
+        return things
+
+    @write_method
+    def delete_attribute_from_thing(
+            self,
+            thing: str,
+            key: str,
+            key_value: Any,
+            attr: str) -> list[Thing]:
+        """
+        Delete the values of an attribute of the things with a certain key.
+
+        :param thing: thing type
+        :param key: key attribute type
+        :param key_value: key attribute value
+        :param attr: attribute type
+        :return: updated things
+        """
+        things = self._find(thing, [(key, key_value)])
+        for t in things:
+            self._set_values(t, attr, [])
+        return things
+
+    @read_method
+    def get_derived_attributes(self) -> dict[Thing, dict[str, set]]:
+        """
+        Get the attributes derived by the rules in `schema.tql`.
+
+        The rules are evaluated in the order they depend on each other, i.e.,
+        'is-required', constraint, component configuration, component,
+        function design, function, and action statuses. For each status, the
+        rules are applied from the highest to the lowest precedence, e.g., a
+        component is only 'unsolved' when it is not 'unfeasible', 'failure'
+        or 'configuration error'. The result is cached until the KB changes.
+
+        :return: dict with the form {THING: {ATTRIBUTE: VALUES}}
+        """
+        if self._derived_version != self._version:
+            self._derived = self._derive()
+            self._derived_version = self._version
+        return self._derived
+
+    def _derive(self) -> dict[Thing, dict[str, set]]:
+        derived = dict()
+
+        def values(thing, attribute):
+            return set(thing.get(attribute)) | \
+                derived.get(thing, dict()).get(attribute, set())
+
+        def add(thing, attribute, value):
+            derived.setdefault(thing, dict()).setdefault(
+                attribute, set()).add(value)
+
+        def status(thing):
+            return values(thing, STATUS_ATTRIBUTES[thing_type])
+
+        for ra in self._instances('required-action'):
+            if len(ra.get('result')) == 0:
+                for a in ra.get_players('action'):
+                    add(a, 'is-required', True)
+        for fr in self._instances('functional-requirement'):
+            if any(True in values(a, 'is-required')
+                   for a in fr.get_players('action')):
+                for f in fr.get_players('required-function'):
+                    add(f, 'is-required', True)
+        for fd in self._instances('function-design'):
+            if True in fd.get('is-selected'):
+                for c in fd.get_players('required-component'):
+                    add(c, 'is-required', True)
+
+        thing_type = 'constraint'
+        latest = dict()
+        for m in self._instances('measurement'):
+            if True in m.get('latest'):
+                for a in m.get_players('measured-attribute'):
+                    latest.setdefault(a, []).extend(
+                        m.get('measurement-value'))
+        violated = set()
+        for r in self._instances('constraint'):
+            operators = r.get('constraint-operator') or ['>=']
+            for a in r.get_players('constraint'):
+                if len(latest.get(a, [])) == 0:
+                    if len(r.get_players('constrained')) > 0:
+                        add(r, 'constraint-status', 'not evaluated')
+                    continue
+                for value in r.get('attribute-value'):
+                    for op in operators:
+                        if op not in CONSTRAINT_OPERATORS:
+                            continue
+                        for measurement in latest[a]:
+                            if CONSTRAINT_OPERATORS[op](measurement, value):
+                                add(r, 'constraint-status', 'satisfied')
+                            else:
+                                add(r, 'constraint-status', 'violated')
+            if 'violated' in status(r):
+                violated.update(r.get_players('constrained'))
+
+        thing_type = 'component-configuration'
+        for cc in self._instances(thing_type):
+            if cc in violated:
+                add(cc, STATUS_ATTRIBUTES[thing_type], 'unfeasible')
+            if 'unfeasible' not in status(cc):
+                add(cc, STATUS_ATTRIBUTES[thing_type], 'feasible')
+
+        thing_type = 'Component'
+        for c in self._instances(thing_type):
+            ccs = [
+                values(cc, 'component-configuration-status')
+                for cc in c.get_relations(
+                    'component-configuration', 'component')]
+            selected_ccs = [
+                values(cc, 'component-configuration-status')
+                for cc in c.get_relations(
+                    'component-configuration', 'component')
+                if True in cc.get('is-selected')]
+            required = True in values(c, 'is-required')
+            active = True in c.get('is-active')
+            if (len(ccs) > 0 and all(s <= {'unfeasible'} for s in ccs)) \
+               or c in violated:
+                add(c, 'component-status', 'unfeasible')
+            if required and not status(c) & {'unfeasible', 'failure'} and \
+               any('unfeasible' in s for s in selected_ccs):
+                add(c, 'component-status', 'configuration error')
+            if required and not active and not status(c) & {
+                    'unfeasible', 'failure', 'configuration error'}:
+                add(c, 'component-status', 'unsolved')
+            if required and active and not status(c) & {
+                    'unfeasible', 'failure', 'configuration error',
+                    'unsolved'} and \
+               (any('feasible' in s for s in selected_ccs) or len(ccs) == 0):
+                add(c, 'component-status', 'solved')
+            if not required and not status(c) & {
+                    'unfeasible', 'failure', 'configuration error',
+                    'unsolved', 'solved'} and \
+               (any('feasible' in s for s in ccs) or len(ccs) == 0):
+                add(c, 'component-status', 'feasible')
+
+        thing_type = 'function-design'
+        for fd in self._instances(thing_type):
+            components = [
+                values(c, 'component-status')
+                for c in fd.get_players('required-component')]
+            selected = True in fd.get('is-selected')
+            if any(len(s) > 0 and not s & {
+                    'configuration error', 'unsolved', 'solved', 'feasible'}
+                   for s in components) or fd in violated:
+                add(fd, 'function-design-status', 'unfeasible')
+            if selected and 'unfeasible' not in status(fd) and any(
+                    'configuration error' in s and 'unfeasible' not in s
+                    for s in components):
+                add(fd, 'function-design-status',
+                    'implicit configuration error')
+            if selected and not status(fd) & {
+                    'unfeasible', 'implicit configuration error'} and \
+               any(s - {'failure', 'unfeasible', 'configuration error',
+                        'solved'} for s in components):
+                add(fd, 'function-design-status', 'unsolved')
+            if selected and not status(fd) & {
+                    'unfeasible', 'implicit configuration error',
+                    'unsolved'} and \
+               any(s <= {'solved'} for s in components):
+                add(fd, 'function-design-status', 'solved')
+            if not selected and not status(fd) & {
+                    'unfeasible', 'implicit configuration error', 'unsolved',
+                    'solved'} and \
+               any(not s & {'unfeasible', 'failure'} for s in components):
+                add(fd, 'function-design-status', 'feasible')
+
+        thing_type = 'Function'
+        for f in self._instances(thing_type):
+            fds = [
+                values(fd, 'function-design-status')
+                for fd in f.get_relations('function-design', 'function')]
+            selected_fds = [
+                values(fd, 'function-design-status')
+                for fd in f.get_relations('function-design', 'function')
+                if True in fd.get('is-selected')]
+            required = True in values(f, 'is-required')
+            if all(s <= {'unfeasible'} for s in fds):
+                add(f, 'function-status', 'unfeasible')
+            if required and 'unfeasible' not in status(f) and \
+               any('unfeasible' in s for s in selected_fds):
+                add(f, 'function-status', 'configuration error')
+            if required and not status(f) & {
+                    'unfeasible', 'configuration error'} and \
+               any('implicit configuration error' in s
+                   for s in selected_fds):
+                add(f, 'function-status', 'implicit configuration error')
+            if required and not status(f) & {
+                    'unfeasible', 'configuration error',
+                    'implicit configuration error'} and \
+               any('solved' in s for s in selected_fds):
+                add(f, 'function-status', 'solved')
+            if required and not status(f) & {
+                    'unfeasible', 'configuration error',
+                    'implicit configuration error', 'solved'} and \
+               not any(s & {
+                   'unfeasible', 'implicit configuration error', 'feasible',
+                   'solved'} for s in selected_fds):
+                add(f, 'function-status', 'unsolved')
+            if not required and not status(f) & {
+                    'unfeasible', 'configuration error',
+                    'implicit configuration error', 'unsolved', 'solved'} \
+               and any(s - {'unfeasible'} for s in fds):
+                add(f, 'function-status', 'feasible')
+
+        thing_type = 'Action'
+        for a in self._instances(thing_type):
+            functions = [
+                values(f, 'function-status')
+                for fr in a.get_relations('functional-requirement', 'action')
+                for f in fr.get_players('required-function')]
+            required = True in values(a, 'is-required')
+            if any('unfeasible' in s for s in functions) or a in violated:
+                add(a, 'action-status', 'unfeasible')
+            if required and 'unfeasible' not in status(a) and any(
+                    s & {'configuration error', 'implicit configuration error'}
+                    for s in functions):
+                add(a, 'action-status', 'implicit configuration error')
+            if required and not status(a) & {
+                    'unfeasible', 'implicit configuration error'} and \
+               any('unsolved' in s for s in functions):
+                add(a, 'action-status', 'unsolved')
+            if required and not status(a) & {
+                    'unfeasible', 'implicit configuration error',
+                    'unsolved'} and \
+               any('solved' in s for s in functions):
+                add(a, 'action-status', 'solved')
+            if not required and not status(a) & {
+                    'unfeasible', 'implicit configuration error', 'unsolved',
+                    'solved'} and \
+               any(s - {'unfeasible'} for s in functions):
+                add(a, 'action-status', 'feasible')
+
+        return derived
+
+    def _values(self, thing: Thing, attribute: str) -> list:
+        values = list(thing.get(attribute))
+        derived = self.get_derived_attributes().get(thing, dict())
+        values.extend(
+            v for v in sorted(derived.get(attribute, set()), key=str)
+            if v not in values)
+        return values
+
+    def _status(self, thing: Thing, thing_type: str) -> list[str]:
+        while thing_type not in STATUS_ATTRIBUTES:
+            if thing_type not in self._supertypes:
+                return []
+            thing_type = self._supertypes[thing_type]
+        return self._values(thing, STATUS_ATTRIBUTES[thing_type])
+
+    def _name(self, thing: Thing) -> Any:
+        for attribute, values in thing.attributes.items():
+            if attribute.endswith('-name') and len(values) > 0:
+                return values[0]
+        return None
+
+    @write_method
+    def insert_action(self, action_name: str) -> list[Thing] | None:
+        """
+        Add new Action.
+
+        :param action_name: action name
+        :return: inserted thing, or None if the action already exists
+        """
+        if self._get_thing('Action', action_name) is not None:
+            return None
+        return [self._insert('Action', [('action-name', action_name)])]
+
+    @write_method
+    def insert_functional_requirement(
+            self,
+            action_name: str,
+            functions_names: list[str]) -> list[Thing] | None:
+        """
+        Add new functional-requirement.
+
+        :param action_name: action name
+        :param functions_names: list of required functions
+        :return: inserted thing, or None if a thing does not exist
+        """
+        action = self._get_thing('Action', action_name)
+        functions = [self._get_thing('Function', f) for f in functions_names]
+        if action is None or None in functions:
+            return None
+        return [self._insert(
+            'functional-requirement',
+            players=[('action', action)] + [
+                ('required-function', f) for f in functions])]
+
+    @write_method
+    def insert_function(self, function_name: str) -> list[Thing] | None:
+        """
+        Add new Function.
+
+        :param function_name: function name
+        :return: inserted thing, or None if the function already exists
+        """
+        if self._get_thing('Function', function_name) is not None:
+            return None
+        return [self._insert('Function', [('function-name', function_name)])]
+
+    @write_method
+    def insert_function_design(
+            self,
+            function_design_name: str,
+            function_name: str,
+            components_names: list[str],
+            priority: Optional[float] = None) -> list[Thing] | None:
+        """
+        Add new function-design.
+
+        :param function_design_name: function design name
+        :param function_name: function name
+        :param components_names: list of required components
+        :param priority: function design priority
+        :return: inserted thing, or None if the function design already
+            exists or a related thing does not exist
+        """
+        function = self._get_thing('Function', function_name)
+        components = [
+            self._get_thing('Component', c) for c in components_names]
+        if function is None or None in components or self._get_thing(
+                'function-design', function_design_name) is not None:
+            return None
+        attributes = [('function-design-name', function_design_name)]
+        if priority is not None:
+            attributes.append(('priority', priority))
+        return [self._insert(
+            'function-design',
+            attributes,
+            [('function', function)] + [
+                ('required-component', c) for c in components])]
+
+    @write_method
+    def insert_component(
+            self,
+            component_name: str,
+            always_improve: Optional[bool] = False) -> list[Thing] | None:
+        """
+        Add new Component.
+
+        :param component_name: component name
+        :param always_improve: if it should always try to select the best
+            component configuration
+        :return: inserted thing, or None if the component already exists
+        """
+        if self._get_thing('Component', component_name) is not None:
+            return None
+        return [self._insert(
+            'Component',
+            [('component-name', component_name),
+             ('always-improve', always_improve)])]
+
+    @write_method
+    def insert_ros_node_component(
+            self,
+            component_name: str,
+            package: str,
+            executable: str,
+            always_improve: Optional[bool] = False,
+            lifecycle_node: Optional[bool] = False) -> list[Thing] | None:
+        """
+        Add new ROSNode Component.
+
+        :param component_name: component name
+        :param package: ros package name
+        :param executable: ros executable name
+        :param always_improve: if it should always try to select the best
+            component configuration
+        :param lifecycle_node: if the ros node is a lifecycle node
+        :return: inserted thing, or None if the component already exists
+        """
+        if self._get_thing('Component', component_name) is not None:
+            return None
+        return [self._insert(
+            'LifeCycleNode' if lifecycle_node else 'ROSNode',
+            [('component-name', component_name),
+             ('package', package),
+             ('executable', executable),
+             ('always-improve', always_improve)])]
+
+    @write_method
+    def insert_component_process(
+            self, component_name: str, pid: int) -> list[Thing] | None:
+        """
+        Add new component-process.
+
+        :param component_name: component name
+        :param pid: pid
+        :return: inserted thing, or None if the component does not exist
+        """
+        component = self._get_thing('Component', component_name)
+        if component is None:
+            return None
+        return [self._insert(
+            'component-process',
+            [('component-pid', pid), ('start-time', datetime.now())],
+            [('component', component)])]
+
+    @write_method
+    def request_action(
+            self,
+            action_name: str,
+            preference: Optional[str] = '') -> list[Thing] | None:
+        """
+        Request Action.
+
+        :param action_name: action name
+        :param preference: QA/EA that has preference when selecting a config
+        :return: inserted thing, or None when the action was already
+            required or does not exist
+        """
+        action = self._get_thing('Action', action_name)
+        if action is None or self.is_action_required(action_name) is True:
+            return None
+        players = [('action', action)]
+        if preference != '':
+            attribute = self._get_thing('Attribute', preference)
+            if attribute is None:
+                return None
+            players.append(('preference', attribute))
+        return [self._insert(
+            'required-action', [('start-time', datetime.now())], players)]
+
+    @write_method
+    def cancel_action(self, action_name: str) -> list[Thing] | None:
+        """
+        Cancel Action.
+
+        :param action_name: action name
+        :return: updated things, or None if the action was not required
+        """
+        action = self._get_thing('Action', action_name)
+        if action is None or self.is_action_required(action_name) is False:
+            return None
+        result = []
+        for ra in action.get_relations('required-action', 'action'):
+            if len(ra.get('result')) == 0:
+                self._set_values(ra, 'result', ['abandoned'])
+                self._set_values(ra, 'end-time', [datetime.now()])
+                result.append(ra)
+        return result
+
+    def _update_name_attribute(
+            self,
+            thing_type: str,
+            name: str,
+            attribute: str,
+            value: Any) -> list[Thing] | None:
+        thing = self._get_thing(thing_type, name)
+        if thing is None:
+            return []
+        self._set_values(thing, attribute, [] if value is None else [value])
+        return [thing]
+
+    @write_method
+    def update_action_status(
+            self, action_name: str, action_status: str) -> list[Thing]:
+        """
+        Update Action status.
+
+        :param action_name: action name
+        :param action_status: action_status
+        :return: updated things
+        """
+        return self._update_name_attribute(
+            'Action', action_name, 'action-status', action_status)
+
+    @write_method
+    def delete_component_status(self, component_name: str) -> Literal[True]:
+        """
+        Delete Component status.
+
+        :param component_name: component name
+        :return: True
+        """
+        self._update_name_attribute(
+            'Component', component_name, 'component-status', None)
+        return True
+
+    @write_method
+    def update_component_status(
+            self, component_name: str, component_status: str) -> list[Thing]:
+        """
+        Update Component status.
+
+        :param component_name: component name
+        :param component_status: component status
+        :return: updated things
+        """
+        return self._update_name_attribute(
+            'Component', component_name, 'component-status',
+            component_status)
+
+    @read_method
+    def has_action(self, action_name: str) -> bool:
+        """
+        Check whether model can an specific Action.
+
+        :param action_name: Action name
+        :return: whether the action exists in the model or not
+        """
+        return self._get_thing('Action', action_name) is not None
+
+    @read_method
+    def is_action_required(self, action_name: str) -> bool:
+        """
+        Check whether an Action is required.
+
+        :param action_name: Action name
+        :return: whether the action is required or not
+        """
+        action = self._get_thing('Action', action_name)
+        if action is None:
+            return False
+        return True in self._values(action, 'is-required')
+
+    @read_method
+    def is_action_feasible(self, action_name: str) -> bool:
+        """
+        Check if an Action only has status feasible.
+
+        :param action_name: Action name
+        :return: whether the action is feasible or not
+        """
+        action = self._get_thing('Action', action_name)
+        if action is None:
+            return False
+        return 'feasible' in self._status(action, 'Action')
+
+    @read_method
+    def is_action_selectable(self, action_name: str) -> bool:
+        """
+        Check whether an Action can be selected, i.e., it can be performed.
+
+        :param action_name: Action name
+        :return: whether the action is feasible or not
+        """
+        action = self._get_thing('Action', action_name)
+        if action is None:
+            return True
+        return 'unfeasible' not in self._status(action, 'Action')
+
+    @read_method
+    def get_selectable_actions(self) -> list[str]:
+        """
+        Get the name of selectable Actions.
+
+        :return: name of selectable actions
+        """
+        return [
+            self._name(a) for a in self._instances('Action')
+            if 'unfeasible' not in self._status(a, 'Action')]
+
+    @read_method
+    def get_instances_of_thing_with_status(
+            self, thing: str, status: str) -> list[str]:
+        """
+        Get name of instances of a certain Thing that have a certain status.
+
+        :param thing: thing type to query.
+        :param status: status, a regular expression that must match the
+            whole status
+        :return: name of instances with status.
+        """
+        return [
+            self._name(t) for t in self._instances(thing)
+            if any(re.fullmatch(status, s) for s in self._status(t, thing))]
+
+    def get_solved_functions(self) -> list[str]:
+        """Get functions with status solved."""
+        return self.get_instances_of_thing_with_status(
+            'Function', 'solved')
+
+    def get_solved_components(self) -> list[str]:
+        """Get components with status solved."""
+        return self.get_instances_of_thing_with_status(
+            'Component', 'solved')
+
+    @read_method
+    def get_instances_thing_always_improve(self, thing: str) -> list[str]:
+        """
+        Get name of instances of a certain Thing that have always-improve true.
+
+        :param thing: Thing type to query.
+        :return: name of instances with always-improve true.
+        """
+        return [
+            self._name(t) for t in self._instances(thing)
+            if True in t.get('always-improve')]
+
+    def _get_adaptable_things(self, thing: str) -> list[str]:
+        result = []
+        for t in self._instances(thing):
+            status = self._status(t, thing)
+            if 'unsolved' in status or 'configuration error' in status or \
+               (True in t.get('always-improve') and 'solved' in status):
+                result.append(self._name(t))
+        return result
+
+    @cached_method
+    @read_method
+    def get_adaptable_functions(self) -> list[str]:
+        """
+        Get the name of adaptable Functions.
+
+        Get the name of adaptable Functions. A function is adaptable when its
+        'always-improve' attribute is true, or when it status is 'unsolved' or
+        'configuration error'
+
+        :return: name of adaptable functions
+        """
+        return self._get_adaptable_things('Function')
+
+    @cached_method
+    @read_method
+    def get_adaptable_components(self) -> list[str]:
+        """
+        Get the name of adaptable Components.
+
+        Get the name of adaptable Components. A component is adaptable when its
+        'always-improve' attribute is true, or when it status is 'unsolved' or
+        'configuration error'
+
+        :return: name of adaptable components
+        """
+        return self._get_adaptable_things('Component')
+
+    def _get_unsolved_things(self, thing: str) -> list[str]:
+        return [
+            self._name(t) for t in self._instances(thing)
+            if True in self._values(t, 'is-required')
+            and 'unsolved' in self._status(t, thing)]
+
+    @read_method
+    def get_unsolved_functions(self) -> list[str]:
+        """
+        Get unsolved Functions.
+
+        Get unsolved Functions. A function is unsolved when its 'is-required'
+        attribute is True and its status is 'unsolved'.
+
+        :return: name of unsolved functions
+        """
+        return self._get_unsolved_things('Function')
+
+    @read_method
+    def get_unsolved_components(self) -> list[str]:
+        """
+        Get unsolved Components.
+
+        Get unsolved Components. A component is unsolved when its 'is-required'
+        attribute is True and its status is 'unsolved'.
+
+        :return: name of unsolved components
+        """
+        return self._get_unsolved_things('Component')
+
+    @write_method
+    def update_function_design_priority(
+            self, fd_name: str, value: float) -> list[Thing]:
+        """
+        Update function design priority.
+
+        :param fd_name: function design name
+        :param value: new priority value
+        :return: updated things
+        """
+        return self._update_name_attribute(
+            'function-design', fd_name, 'priority', value)
+
+    def add_measurement(self, name: str, value: str) -> list[Thing] | None:
+        """
+        Add new Quality Attribute or EnvironmentalAttribute measurement.
+
+        Add new Quality Attribute or EnvironmentalAttribute measurement. The
+        new measurement 'latest' attribute is set to true, and the old
+        measurements 'latest' attribute are set to false.
+
+        :param name: QA/EA name
+        :param value: measured value
+        :return: inserted things
+        """
+        return self.add_measurements({name: value})
+
+    @write_method
+    def add_measurements(
+            self, measurements: dict[str, str | float]) -> list[Thing] | None:
+        """
+        Add new measurements for several QAs/EAs.
+
+        The 'latest' attribute of the old measurements is removed, and the
+        new measurements are inserted with 'latest' set to true. Values that
+        can't be converted to a finite float, and measurements of QAs/EAs
+        that do not exist are ignored.
+
+        :param measurements: dict with the form {QA/EA NAME: MEASURED VALUE}
+        :return: inserted things, or None if there is no valid measurement
+        """
+        time = datetime.now()
+        result = []
+        for name, value in measurements.items():
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            attribute = self._get_thing('Attribute', name)
+            if not math.isfinite(value) or attribute is None:
+                continue
+            for m in attribute.get_relations(
+                    'measurement', 'measured-attribute'):
+                if True in m.get('latest'):
+                    self._set_values(m, 'latest', [])
+            result.append(self._insert(
+                'measurement',
+                [('latest', True),
+                 ('measurement-value', value),
+                 ('measurement-time', time)],
+                [('measured-attribute', attribute)]))
+        return result if len(result) > 0 else None
+
+    @write_method
+    def compact_measurements(
+            self,
+            keep_count: int = 0,
+            keep_time: float = 0.0,
+            downsample_period: float = 0.0,
+            aggregate_retention: float = 0.0,
+            now: Optional[datetime] = None
+         ) -> MeasurementCompactionStatsDict:
+        """
+        Remove old measurements, optionally downsampling them into aggregates.
+
+        See
+        :meth:`rosa_kb.typedb_model_interface.ModelInterface.compact_measurements`.
+
+        :param keep_count: number of measurements to keep per QA/EA, 0 means
+            there is no limit by number
+        :param keep_time: time to keep measurements in seconds, 0 means there
+            is no limit by time
+        :param downsample_period: aggregate period in seconds, 0 disables
+            downsampling
+        :param aggregate_retention: time to keep aggregates in seconds, 0
+            means aggregates are kept forever
+        :param now: current time, defaults to `datetime.now()`
+        :return: compaction statistics
+        """
+        stats = {'deleted': 0, 'aggregated': 0, 'expired_aggregates': 0}
+        if keep_count <= 0 and keep_time <= 0.0 and aggregate_retention <= 0.0:
+            return stats
+
+        now = datetime.now() if now is None else now
+        time_cutoff = now - timedelta(seconds=keep_time)
+        aggregate_cutoff = now - timedelta(seconds=aggregate_retention)
+
+        samples = dict()
+        aggregates = dict()
+        for m in self._instances('measurement'):
+            times = m.get('measurement-time')
+            values = m.get('measurement-value')
+            if True in m.get('latest') or len(times) == 0 or \
+               len(values) == 0:
+                continue
+            for a in m.get_players('measured-attribute'):
+                name = self._name(a)
+                if len(m.get('measurement-count')) > 0:
+                    aggregates[(name, times[0])] = m
+                else:
+                    samples.setdefault(name, []).append(
+                        (times[0], values[0], m))
+
+        if keep_count <= 0 and keep_time <= 0.0:
+            samples = dict()
+
+        new_aggregates = dict()
+        for name, _samples in samples.items():
+            # newest first, the latest measurement counts as the first one
+            _samples.sort(key=lambda s: s[0], reverse=True)
+            expired = [
+                s for i, s in enumerate(_samples)
+                if (keep_count <= 0 or i >= keep_count - 1)
+                and (keep_time <= 0.0 or s[0] < time_cutoff)
+            ]
+            stats['deleted'] += len(expired)
+            for time, value, m in expired:
+                self._delete(m)
+                if downsample_period <= 0.0:
+                    continue
+                bucket = datetime.fromtimestamp(
+                    math.floor(time.timestamp() / downsample_period)
+                    * downsample_period)
+                if aggregate_retention > 0.0 and bucket < aggregate_cutoff:
+                    continue
+                _sum, _count = new_aggregates.get((name, bucket), (0.0, 0))
+                new_aggregates[(name, bucket)] = (_sum + value, _count + 1)
+
+        for (name, bucket), (_sum, _count) in new_aggregates.items():
+            if (name, bucket) in aggregates:
+                # merge with the aggregate created by a previous compaction
+                m = aggregates.pop((name, bucket))
+                count = m.get('measurement-count')[0]
+                _sum += m.get('measurement-value')[0] * count
+                _count += count
+                self._delete(m)
+            stats['aggregated'] += 1
+            self._insert(
+                'measurement',
+                [('latest', False),
+                 ('measurement-value', _sum / _count),
+                 ('measurement-time', bucket),
+                 ('measurement-count', _count)],
+                [('measured-attribute', self._get_thing('Attribute', name))])
+
+        if aggregate_retention > 0.0:
+            for (_, time), m in aggregates.items():
+                if time < aggregate_cutoff:
+                    stats['expired_aggregates'] += 1
+                    self._delete(m)
+        return stats
+
+    def _get_measurements(self, name: str) -> list[Thing]:
+        attribute = self._get_thing('Attribute', name)
+        if attribute is None:
+            return []
+        return attribute.get_relations('measurement', 'measured-attribute')
+
+    @read_method
+    def get_latest_measurement(self, name: str) -> float | None:
+        """
+        Get latest measurement value.
+
+        :param name: QA/EA name
+        :return: measurement value, or None if there is no measurement
+        """
+        for m in self._get_measurements(name):
+            if True in m.get('latest') and \
+               len(m.get('measurement-value')) > 0:
+                return m.get('measurement-value')[0]
+        return None
+
+    @read_method
+    def get_measurement(self, name: str, time: datetime) -> float | None:
+        """
+        Get measured value at a certain time.
+
+        :param name: QA/EA name
+        :param time: measurement time
+        :return: measurement value, or None if there is no measurement
+        """
+        for m in self._get_measurements(name):
+            if time in m.get('measurement-time') and \
+               len(m.get('measurement-value')) > 0:
+                return m.get('measurement-value')[0]
+        return None
+
+    @cached_method
+    @read_method
+    def get_selectable_c_configs(self, component_name: str) -> list[str]:
+        """
+        Get the name of selectable component configurations for a Component.
+
+        :param component_name: component name
+        :return: name of selectable component configurations
+        """
+        component = self._get_thing('Component', component_name)
+        if component is None:
+            return []
+        return [
+            self._name(cc) for cc in component.get_relations(
+                'component-configuration', 'component')
+            if 'unfeasible' not in self._status(cc, 'component-configuration')
+        ]
+
+    @cached_method
+    @read_method
+    def get_selectable_fds(self, function_name: str) -> list[str]:
+        """
+        Get the name of selectable funtion designs for a Function.
+
+        :param function_name: function name
+        :return: name of selectable function designs
+        """
+        function = self._get_thing('Function', function_name)
+        if function is None:
+            return []
+        return [
+            self._name(fd) for fd in function.get_relations(
+                'function-design', 'function')
+            if 'unfeasible' not in self._status(fd, 'function-design')]
+
+    @cached_method
+    @read_method
+    def get_function_design_priority(self, fd_name: str) -> list[float]:
+        """
+        Get function design priority value.
+
+        :param fd_name: function design name
+        :return: function design priority value
+        """
+        fd = self._get_thing('function-design', fd_name)
+        return [] if fd is None else list(fd.get('priority'))
+
+    @cached_method
+    @read_method
+    def get_component_configuration_priority(
+            self, cc_name: str) -> list[float]:
+        """
+        Get component configuration priority value.
+
+        :param cc_name: component configuration name
+        :return: component configuration priority value
+        """
+        cc = self._get_thing('component-configuration', cc_name)
+        return [] if cc is None else list(cc.get('priority'))
+
+    @cached_method
+    @read_method
+    def get_planning_snapshot(
+            self,
+            functions: Optional[Iterable[str]] = None,
+            components: Optional[Iterable[str]] = None
+         ) -> PlanningSnapshotDict:
+        """
+        Get all the information required to plan an adaptation.
+
+        See
+        :meth:`rosa_kb.typedb_model_interface.ModelInterface.get_planning_snapshot`.
+
+        :param functions: functions included, all when it is None
+        :param components: components included, all when it is None
+        :return: planning snapshot
+        """
+        snapshot = {
+            'functions': self.get_adaptable_functions(),
+            'fds': [],
+            'components': self.get_adaptable_components(),
+            'c_configs': [],
+        }
+        snapshot['adaptable_functions'] = list(snapshot['functions'])
+        snapshot['adaptable_components'] = list(snapshot['components'])
+        if functions is not None:
+            snapshot['functions'] = [
+                f for f in snapshot['functions'] if f in functions]
+        if components is not None:
+            snapshot['components'] = [
+                c for c in snapshot['components'] if c in components]
+            # the configurations of all requested components are included
+            components = list(components)
+        else:
+            components = list(snapshot['components'])
+        for function in snapshot['functions']:
+            for fd in self.get_selectable_fds(function):
+                priority = self.get_function_design_priority(fd)
+                required_components = \
+                    self.get_components_in_function_design(fd)
+                snapshot['fds'].append({
+                    'function': function,
+                    'name': fd,
+                    'priority': priority[0] if priority else None,
+                    'required_components': required_components,
+                })
+                components.extend(
+                    c for c in required_components if c not in components)
+
+        for component in components:
+            for c_config in self.get_selectable_c_configs(component):
+                priority = self.get_component_configuration_priority(
+                    c_config)
+                snapshot['c_configs'].append({
+                    'component': component,
+                    'name': c_config,
+                    'priority': priority[0] if priority else None,
+                })
+        return snapshot
+
+    @cached_method
+    @read_method
+    def get_status_dependencies(self) -> StatusDependenciesDict:
+        """
+        Get the relations the derived statuses depend on.
+
+        See
+        :meth:`rosa_kb.typedb_model_interface.ModelInterface.get_status_dependencies`.
+
+        :return: status dependencies
+        """
+        def name(thing, attribute):
+            return thing.get(attribute)[0]
+
+        dependencies = {
+            'constraints': dict(),
+            'c_configs': dict(),
+            'fds': dict(),
+            'actions': dict(),
+        }
+        for r in self._instances('constraint'):
+            for a in r.get_players('constraint'):
+                for x in r.get_players('constrained'):
+                    for attribute, x_type in CONSTRAINED_TYPES.items():
+                        if len(x.get(attribute)) > 0:
+                            dependencies['constraints'].setdefault(
+                                name(a, 'attribute-name'), []).append(
+                                    (x_type, name(x, attribute)))
+        for cc in self._instances('component-configuration'):
+            for c in cc.get_players('component'):
+                dependencies['c_configs'][
+                    name(cc, 'component-configuration-name')] = \
+                    name(c, 'component-name')
+        for fd in self._instances('function-design'):
+            for f in fd.get_players('function'):
+                dependencies['fds'][name(fd, 'function-design-name')] = (
+                    name(f, 'function-name'),
+                    [name(c, 'component-name')
+                     for c in fd.get_players('required-component')])
+        for fr in self._instances('functional-requirement'):
+            for a in fr.get_players('action'):
+                for f in fr.get_players('required-function'):
+                    dependencies['actions'].setdefault(
+                        name(a, 'action-name'), []).append(
+                            name(f, 'function-name'))
+        return dependencies
+
+    @read_method
+    def get_relationship_with_attribute(
+            self,
+            entity: str,
+            entity_name: str,
+            relation: str,
+            r_attribute: str,
+            r_value: str | int | float | bool | datetime) -> list[str]:
+        """
+        Get relationship name that has an attr and relates to a certain entity.
+
+        :param entity: entity type
+        :param entity_name: entity name
+        :param relation: relation type
+        :param r_attribute: attribute name
+        :param r_value: attribute value
+        :return: name of individuals of the relation
+        """
+        thing = self._get_thing(entity, entity_name)
+        if thing is None:
+            return []
+        return [
+            self._name(r) for _, r in thing.relations
+            if self._is_type(r.type, relation)
+            and r_value in self._values(r, r_attribute)]
+
+    def select_relationship(
+            self,
+            entity: str,
+            entity_name: str,
+            relation: str,
+            r_name: str) -> list[Thing]:
+        """
+        Select relationship individual, and unselect all other individuals.
+
+        :param entity: entity type
+        :param entity_name: entity name
+        :param relation: relation type
+        :param r_name: relationship name
+        :return: updated things
+        """
+        return self.select_relationships(
+            entity, relation, [(entity_name, r_name)])
+
+    @write_method
+    def select_relationships(
+            self,
+            entity: str,
+            relation: str,
+            selected: list[Tuple[str, str]]) -> list[Thing]:
+        """
+        Select relationship individuals, and unselect all other individuals.
+
+        Set the 'is-selected' attribute of the selected individuals to true,
+        and set 'is-selected' to false for all other 'relation' individuals
+        related to the same entities.
+
+        :param entity: entity type
+        :param relation: relation type
+        :param selected: a list of tuples with the form (ENTITY_NAME, R_NAME)
+            representing which relationship was selected for which entity
+        :return: updated things
+        """
+        selected = dict(selected)
+        selected_names = set(selected.values())
+        result = []
+        for entity_name in selected:
+            thing = self._get_thing(entity, entity_name)
+            if thing is None:
+                continue
+            for _, r in thing.relations:
+                if self._is_type(r.type, relation) and \
+                   True in r.get('is-selected') and \
+                   self._name(r) not in selected_names:
+                    self._set_values(r, 'is-selected', [False])
+                    result.append(r)
+        for r_name in selected_names:
+            r = self._get_thing(relation, r_name)
+            if r is not None:
+                self._set_values(r, 'is-selected', [True])
+                result.append(r)
+        return result
+
+    def select_function_design(self, f_name: str, fd_name: str) -> list[Thing]:
+        """
+        Select function-design 'fd_name' and unselect all other fds.
+
+        :param f_name: function name
+        :param fd_name: function design name
+        :return: updated things
+        """
+        return self.select_relationship(
+            'Function', f_name, 'function-design', fd_name)
+
+    def select_component_configuration(
+            self, c_name: str, cc_name: str) -> list[Thing]:
+        """
+        Select component-configuration 'cc_name' and unselect all other ccs.
+
+        :param c_name: component name
+        :param cc_name: component configuration name
+        :return: updated things
+        """
+        return self.select_relationship(
+            'Component', c_name, 'component-configuration', cc_name)
+
+    @write_method
+    def activate_component(self, c_name: str, value: bool) -> list[Thing]:
+        """
+        Activate a Component.
+
+        Set 'is-active' attribute of a Component to true or false.
+
+        :param c_name: component name
+        :param value: whether the component should be active or not
+        :return: updated things
+        """
+        return self._update_name_attribute(
+            'Component', c_name, 'is-active', value)
+
+    @read_method
+    def is_component_active(self, name: str) -> bool | None:
+        """
+        Check wheter a component is active or not.
+
+        :param name: component name
+        :return: whether the component is active or not, None if it does not
+            have the 'is-active' attribute
+        """
+        component = self._get_thing('Component', name)
+        if component is None or len(component.get('is-active')) == 0:
+            return None
+        return component.get('is-active')[0]
+
+    @write_method
+    def create_reconfiguration_plan(
+            self,
+            c_activate: list[str],
+            c_deactivate: list[str],
+            c_config: list[str]) -> datetime | None:
+        """
+        Create a reconfiguration plan.
+
+        :param c_active: components to activate
+        :param c_deactive: components to deactivate
+        :param c_config: component configurations to select
+        :return: the time the reconfiguration plan was created, or None in case
+            there was a failure creating the reconfiguration plan
+        """
+        if len(c_activate) == 0 and len(c_deactivate) == 0 and \
+           len(c_config) == 0:
+            return None
+
+        adaptations = []
+        for relation, role, thing_type, names in [
+                ('component-activation', 'component', 'Component',
+                 c_activate),
+                ('component-deactivation', 'component', 'Component',
+                 c_deactivate),
+                ('parameter-adaptation', 'component-configuration',
+                 'component-configuration', c_config)]:
+            things = [self._get_thing(thing_type, name) for name in names]
+            if None in things:
+                return None
+            if len(things) > 0:
+                adaptations.append(
+                    (relation, [(role, thing) for thing in things]))
+
+        players = [
+            ('parameter-adaptation' if relation == 'parameter-adaptation'
+             else 'structural-adaptation', self._insert(relation, players=p))
+            for relation, p in adaptations]
+        start_time = self._plan_time()
+        self._insert(
+            'reconfiguration-plan', [('start-time', start_time)], players)
+        return start_time
+
+    @cached_method
+    @read_method
+    def get_components_in_function_design(self, fd_name: str) -> list[str]:
+        """
+        Get components in relation with a function design.
+
+        :param fd_name: name of the function design.
+        :return: component names in relation with fd_name.
+        """
+        fd = self._get_thing('function-design', fd_name)
+        if fd is None:
+            return []
+        return [self._name(c) for c in fd.get_players('required-component')]
+
+    def _is_required_by_function(self, component: Thing) -> bool:
+        return any(
+            True in self._values(f, 'is-required')
+            for fd in component.get_relations(
+                'function-design', 'required-component')
+            for f in fd.get_players('function'))
+
+    @read_method
+    def get_obsolete_components(self) -> list[str]:
+        """
+        Get active components that are not required anymore.
+
+        :return: List with active components that are not required anymore
+        """
+        return [
+            self._name(c) for c in self._instances('Component')
+            if True in c.get('is-active')
+            and not self._is_required_by_function(c)]
+
+    @read_method
+    def get_obsolete_fds(self) -> list[str]:
+        """
+        Get selected fds that are not required anymore.
+
+        :return: List with selected fds that are not required anymore
+        """
+        return [
+            self._name(fd) for fd in self._instances('function-design')
+            if True in fd.get('is-selected') and any(
+                True not in self._values(f, 'is-required')
+                for f in fd.get_players('function'))]
+
+    @read_method
+    def get_obsolete_component_configurations(self) -> list[str]:
+        """
+        Get selected component configurations that are not required anymore.
+
+        :return: List with selected configs that are not required anymore
+        """
+        return [
+            self._name(cc) for cc in self._instances('component-configuration')
+            if True in cc.get('is-selected') and any(
+                not self._is_required_by_function(c)
+                for c in cc.get_players('component'))]
+
+    @write_method
+    def unselect_obsolete_fds_cc(self) -> None:
+        """
+        Unselect all obsolete function designs and component configurations.
+
+        An obsolete function design or component configuration is the one that
+        has 'is-selected' attribute set to true, but it is no required anymore
+        """
+        for fd in self.get_obsolete_fds():
+            self._update_name_attribute(
+                'function-design', fd, 'is-selected', False)
+        for cc in self.get_obsolete_component_configurations():
+            self._update_name_attribute(
+                'component-configuration', cc, 'is-selected', False)
+
+    @write_method
+    def select_fd_and_get_components(
+            self,
+            functions_selected_fd: list[Tuple[str, str]]
+         ) -> Tuple[list[str], list[str]]:
+        """
+        Select function design, and get components to activate and deactivate.
+
+        See
+        :meth:`rosa_kb.typedb_model_interface.ModelInterface.select_fd_and_get_components`.
+
+        :param functions_selected_fd: a list of tuples with the form
+            (FUNCTION_NAME, FD_NAME) representing the function designs that
+            were selected for which function
+        :return: tuple with the form (c_activate, c_deactivate), indicating
+            which components should be activated and deactivated
+        """
+        functions_selected_fd = dict(functions_selected_fd)
+        _c_required = []
+        _c_activate = []
+        for fd_name in functions_selected_fd.values():
+            fd = self._get_thing('function-design', fd_name)
+            if fd is None:
+                continue
+            for c in fd.get_players('required-component'):
+                name = self._name(c)
+                if name in _c_required:
+                    continue
+                _c_required.append(name)
+                if True not in c.get('is-active'):
+                    _c_activate.append(name)
+
+        _c_deactivate = []
+        for f_name, fd_name in functions_selected_fd.items():
+            function = self._get_thing('Function', f_name)
+            if function is None:
+                continue
+            for fd in function.get_relations('function-design', 'function'):
+                if self._name(fd) == fd_name or \
+                   True not in fd.get('is-selected'):
+                    continue
+                for c in fd.get_players('required-component'):
+                    name = self._name(c)
+                    if True in c.get('is-active') and \
+                       name not in _c_required and name not in _c_deactivate:
+                        _c_deactivate.append(name)
+
+        self.select_relationships(
+            'Function', 'function-design', functions_selected_fd.items())
+        return _c_activate, _c_deactivate
+
+    @write_method
+    def select_components_selected_config(
+            self,
+            components_selected_config: list[Tuple[str, str]]) -> list[str]:
+        """
+        Select component configuration and return them.
+
+        :param components_selected_config: a list of tuples with the form
+            (COMPONENT_NAME, CC_NAME) representing the component configurations
+            that were selected for which components
+        :return: list with the name of the component configurations that need
+            to be updated
+        """
+        components_selected_config = dict(components_selected_config)
+        _configs = []
+        for config in components_selected_config.values():
+            cc = self._get_thing('component-configuration', config)
+            if cc is not None and True in cc.get('is-selected'):
+                continue
+            if config not in _configs:
+                _configs.append(config)
+        self.select_relationships(
+            'Component',
+            'component-configuration',
+            components_selected_config.items())
+        return _configs
+
+    @write_method
+    def select_configuration(
+            self,
+            functions_selected_fd: list[Tuple[str, str]],
+            components_selected_config: list[Tuple[str, str]]
+         ) -> datetime | None:
+        """
+        Select configuration and create reconfiguration plan.
+
+        :param functions_selected_fd: a list of tuples with the form
+            (FUNCTION_NAME, FD_NAME) representing the function designs that
+            were selected for which function
+        :param components_selected_config: a list of tuples with the form
+            (COMPONENT_NAME, CC_NAME) representing the component configurations
+            that were selected for which components
+        :return: reconfig plan creation time.
+        """
+        _c_activate, _c_deactivate = \
+            self.select_fd_and_get_components(functions_selected_fd)
+        _configs = self.select_components_selected_config(
+            components_selected_config)
+
+        self.unselect_obsolete_fds_cc()
+        _c_obsolete = self.get_obsolete_components()
+        _c_deactivate.extend(
+            c for c in _c_obsolete if
+            (c not in _c_activate and c not in _c_deactivate))
+
+        return self.create_reconfiguration_plan(
+            _c_activate, _c_deactivate, _configs)
+
+    def _get_latest_plan_time(
+            self,
+            attribute: str,
+            condition: Callable[[Thing], bool]) -> datetime | None:
+        times = [
+            t for rp in self._instances('reconfiguration-plan')
+            if condition(rp) for t in rp.get(attribute)]
+        return max(times) if len(times) > 0 else None
+
+    @read_method
+    def get_latest_reconfiguration_plan_time(self) -> datetime | None:
+        """
+        Get start-time of the most recent reconfiguration plan.
+
+        :return: start-time of the most recent reconfiguration plan.
+        """
+        return self._get_latest_plan_time('start-time', lambda rp: True)
+
+    @read_method
+    def get_latest_pending_reconfiguration_plan_time(self) -> datetime | None:
+        """
+        Get start-time of the most recent pending reconfiguration plan.
+
+        :return: start-time of the most recent pending reconfiguration plan.
+        """
+        return self._get_latest_plan_time(
+            'start-time', lambda rp: len(rp.get('result')) == 0)
+
+    @read_method
+    def get_latest_completed_reconfiguration_plan_time(
+            self) -> datetime | None:
+        """
+        Get end-time of the most recent completed reconfiguration plan.
+
+        :return: end-time of the most recent completed reconfiguration plan.
+        """
+        return self._get_latest_plan_time(
+            'end-time', lambda rp: 'completed' in rp.get('result'))
+
+    def _get_plan_players(
+            self, plan: Thing, role: str, relation: str) -> list[Thing]:
+        return [
+            t for r in plan.get_players(role) if r.type == relation
+            for _, t in r.players]
+
+    @read_method
+    def get_reconfiguration_plan(
+            self, start_time: datetime) -> ReconfigPlanDict:
+        """
+        Get reconfiguration plan with start-time.
+
+        :param start_time: start-time of the desired reconfiguration plan.
+        :return: dict representing the reconfiguration plan, its keys are:
+            start_time, c_activate, c_deactivate, c_config
+        """
+        plan = self._get_plan(start_time)
+        if plan is None:
+            return {
+                'start_time': start_time,
+                'c_activate': [],
+                'c_deactivate': [],
+                'c_config': [],
+            }
+        return {
+            'start_time': start_time,
+            'c_activate': [self._name(c) for c in self._get_plan_players(
+                plan, 'structural-adaptation', 'component-activation')],
+            'c_deactivate': [self._name(c) for c in self._get_plan_players(
+                plan, 'structural-adaptation', 'component-deactivation')],
+            'c_config': [self._name(cc) for cc in self._get_plan_players(
+                plan, 'parameter-adaptation', 'parameter-adaptation')],
+        }
+
+    @read_method
+    def get_latest_reconfiguration_plan(self) -> ReconfigPlanDict | None:
+        """
+        Get latest reconfiguration plan.
+
+        :return: dict representing the reconfiguration plan, its keys are:
+            start_time, c_activate, c_deactivate, c_config
+        """
+        time = self.get_latest_reconfiguration_plan_time()
+        if time is None:
+            return None
+        return self.get_reconfiguration_plan(time)
+
+    @read_method
+    def get_latest_pending_reconfiguration_plan(
+            self) -> ReconfigPlanDict | None:
+        """
+        Get latest pending reconfiguration plan.
+
+        :return: dict representing the reconfiguration plan, its keys are:
+            start_time, c_activate, c_deactivate, c_config
+        """
+        time = self.get_latest_pending_reconfiguration_plan_time()
+        if time is None:
+            return None
+        return self.get_reconfiguration_plan(time)
+
+    @read_method
+    def get_reconfiguration_plan_details(
+            self,
+            start_time: Optional[datetime] = None
+         ) -> ReconfigPlanDetailsDict | None:
+        """
+        Get reconfiguration plan with the attributes of its components.
+
+        :param start_time: start-time of the reconfiguration plan, when it is
+            None the latest pending reconfiguration plan is returned
+        :return: reconfiguration plan, or None if there is no reconfiguration
+            plan
+        """
+        if start_time is None:
+            start_time = self.get_latest_pending_reconfiguration_plan_time()
+        plan = None if start_time is None else self._get_plan(start_time)
+        if plan is None:
+            return None
+        return {
+            'start_time': start_time,
+            'end_time': next(iter(plan.get('end-time')), None),
+            'result': next(iter(plan.get('result')), None),
+            'c_activate': [
+                self._component_dict(c) for c in self._get_plan_players(
+                    plan, 'structural-adaptation', 'component-activation')],
+            'c_deactivate': [
+                self._component_dict(c) for c in self._get_plan_players(
+                    plan, 'structural-adaptation', 'component-deactivation')],
+            'c_config': [self._name(cc) for cc in self._get_plan_players(
+                plan, 'parameter-adaptation', 'parameter-adaptation')],
+        }
+
+    def _plan_time(self) -> datetime:
+        # start-time identifies a plan, so plan times are unique and
+        # increasing even when several plans are created in the same ms
+        time = datetime.fromisoformat(
+            datetime.now().isoformat(timespec='milliseconds'))
+        if self._last_plan_time is not None and \
+           time <= self._last_plan_time:
+            time = self._last_plan_time + timedelta(milliseconds=1)
+        self._last_plan_time = time
+        return time
+
+    def _update_plan(
+            self, plan: Thing, result_value: str) -> None:
+        self._set_values(plan, 'end-time', [self._plan_time()])
+        self._set_values(plan, 'result', [result_value])
+
+    @write_method
+    def update_reconfiguration_plan_result(
+            self,
+            start_time: str | datetime,
+            result_value: Literal['completed', 'failed', 'abandoned']
+         ) -> list[Thing]:
+        """
+        Update reconfiguration plan result.
+
+        :param start_time: reconfiguration plan start_time
+        :param result_value: reconfig plan result
+        :return: updated things
+        """
+        if isinstance(start_time, str):
+            start_time = datetime.fromisoformat(start_time)
+        plan = self._get_plan(start_time)
+        if plan is None:
+            return []
+        self._update_plan(plan, result_value)
+        return [plan]
+
+    @read_method
+    def get_outdated_reconfiguration_plans(self) -> list[datetime]:
+        """
+        Get outdated reconfiguration plans.
+
+        A reconfiguration plan is considered outdated when it doesn't have an
+        `end-time` and its `start-time` is lower than the `end-time` of a
+        reconfiguration plan with result 'completed'.
+
+        :return: start-time of all outdated reconfiguration plans
+        """
+        end_time = self.get_latest_completed_reconfiguration_plan_time()
+        if end_time is None:
+            return []
+        return [
+            t for rp in self._instances('reconfiguration-plan')
+            if len(rp.get('end-time')) == 0
+            for t in rp.get('start-time') if t < end_time]
+
+    @write_method
+    def update_outdated_reconfiguration_plans_result(
+            self) -> list[Thing] | None:
+        """
+        Set outdated reconfiguration plans result to 'abandoned'.
+
+        :return: updated things, or None if there is no outdated plan
+        """
+        outdated_times = self.get_outdated_reconfiguration_plans()
+        if len(outdated_times) == 0:
+            return None
+        result = []
+        for time in outdated_times:
+            plan = self._get_plan(time)
+            self._update_plan(plan, 'abandoned')
+            result.append(plan)
+        return result
+
+    @read_method
+    def get_reconfiguration_plan_result(
+            self, start_time: datetime) -> str | None:
+        """
+        Get result of recongiration plan with `start_time`.
+
+        :param start_time: reconfiguration plan start-time
+        :return: reconfiguration plan result
+        """
+        plan = self._get_plan(start_time)
+        if plan is None:
+            return None
+        return next(iter(plan.get('result')), None)
+
+    @cached_method
+    @read_method
+    def get_component_parameters(
+            self, c_config: str) -> ComponentConfigurationDict | None:
+        """
+        Get ComponentParameters in a component configuration relationship.
+
+        :param c_config: component configuration name.
+        :return: Dict with component-name, parameter-key, parameter-value
+        """
+        cc = self._get_thing('component-configuration', c_config)
+        if cc is None:
+            return None
+        components = cc.get_players('component')
+        params = []
+        for p in cc.get_players('parameter'):
+            if any(len(p.get(a)) == 0 for a in [
+                    'parameter-key', 'parameter-value', 'parameter-type']):
+                continue
+            _type = p.get('parameter-type')[0]
+            params.append({
+                'key': p.get('parameter-key')[0],
+                'value': convert_component_parameter_value_to_py_type(
+                    p.get('parameter-value')[0], _type),
+                'type': _type,
+            })
+        if len(components) == 0 or len(params) == 0:
+            return None
+        return {
+            'component': self._name(components[0]),
+            'component_parameters': params,
+        }
+
+    def _component_dict(self, component: Thing) -> ComponentDict:
+        result_dict = {'type': component.type}
+        attributes = set(component.attributes) | set(
+            self.get_derived_attributes().get(component, dict()))
+        for attribute in sorted(attributes):
+            values = self._values(component, attribute)
+            if len(values) > 0:
+                result_dict[attribute.replace('-', '_')] = values[-1]
+        return result_dict
+
+    @read_method
+    def get_component_all_attributes(
+            self, component: str) -> ComponentDict | None:
+        """
+        Get all attributes owned by a Component, and the Component type.
+
+        :param component: component name.
+        :return: Dict with component type and all its attributes
+        """
+        thing = self._get_thing('Component', component)
+        if thing is None:
+            return None
+        return self._component_dict(thing)
+
+    @read_method
+    def get_active_component_process(self) -> list[ComponentProcessDict]:
+        """
+        Get the component processes that did not end.
+
+        :return: list with the active component processes
+        """
+        return [{
+            'start_time': cp.get('start-time')[0],
+            'pid': cp.get('component-pid')[0],
+            'component': self._name(c)}
+            for cp in self._instances('component-process')
+            if len(cp.get('end-time')) == 0
+            and len(cp.get('component-pid')) > 0
+            and len(cp.get('start-time')) > 0
+            for c in cp.get_players('component')]
+
+    @write_method
+    def set_component_process_end_time(
+            self, start_time: datetime) -> list[Thing]:
+        """
+        Set component process end time.
+
+        :param start_time: component-process start-time.
+        :return: updated things
+        """
+        result = []
+        for cp in self._instances('component-process'):
+            if start_time in cp.get('start-time'):
+                self._set_values(cp, 'end-time', [datetime.now()])
+                result.append(cp)
+        return result
@@ -0,0 +1,176 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Data types shared by the implementations of ROSA's knowledge model."""
+
+from datetime import datetime
+
+from typing import Literal
+from typing import TypedDict
+
+
+class MatchResultDict(TypedDict):
+    """TypedDict for match result."""
+
+    type: str  #: attribute name, e.g., name, age, height etc
+    value_type: str  #: value type, e.g., boolean, long etc
+    value: str  #: value
+
+
+class ReconfigPlanDict(TypedDict):
+    """TypedDict for reconfiguration plan."""
+
+    start_time: datetime  #: reconfig plan start-time
+    c_activate: list[str]  #: components to activate
+    c_deactivate: list[str]  #: components to deactivate
+    c_config: list[str]  #: component configurations to update
+
+
+class ComponentParemeterDict(TypedDict):
+    """TypedDict for ComponentParemeter."""
+
+    key: str  #: component parameter key
+    value: bool | list[bool] | float | list[float] | int | list[int] | str | \
+        list[str]  #: component parameter value
+    type: Literal[
+        'boolean',
+        'boolean_array',
+        'double',
+        'double_array',
+        'long',
+        'long_array',
+        'string',
+        'string_array']  #: component parameter type
+
+
+class ComponentConfigurationDict(TypedDict):
+    """TypedDict for component-configuration."""
+
+    component: str  #: component name
+    component_parameter: list[ComponentParemeterDict]  #: list with parameters
+
+
+class ComponentDict(TypedDict):
+    """TypedDict for Component."""
+
+    type: str  #: the typedb type of the component
+    component_name: str  #: component name
+    is_required: bool  #: whether component is required or not
+    is_active: bool  #: whether component is active or not
+    component_status: str  #: component status
+    package: str  #: package that contains the component
+    executable: str  #: executable that starts the component
+
+
+class ReconfigPlanDetailsDict(TypedDict):
+    """TypedDict for reconfiguration plan with component attributes."""
+
+    start_time: datetime  #: reconfig plan start-time
+    end_time: datetime | None  #: reconfig plan end-time
+    result: str | None  #: reconfig plan result
+    c_activate: list[ComponentDict]  #: components to activate
+    c_deactivate: list[ComponentDict]  #: components to deactivate
+    c_config: list[str]  #: component configurations to update
+
+
+class MeasurementCompactionStatsDict(TypedDict):
+    """TypedDict for measurement compaction statistics."""
+
+    deleted: int  #: number of measurements removed
+    aggregated: int  #: number of aggregate measurements inserted or updated
+    expired_aggregates: int  #: number of aggregate measurements removed
+
+
+class BulkLoadStatsDict(TypedDict):
+    """TypedDict for the result of a bulk load of data files."""
+
+    files: int  #: number of data files loaded
+    chunks: int  #: number of chunks written
+    failed_chunks: int  #: number of chunks whose write failed
+    statements: int  #: number of insert statements written
+    seconds: float  #: duration of the load
+    statements_per_second: float  #: throughput of the load
+
+
+class ComponentProcessDict(TypedDict):
+    """TypedDict for Component."""
+
+    pid: int  #: process pid
+    start_time: str  #: process start-time
+    component: str  #: component name
+
+
+class FunctionDesignSnapshotDict(TypedDict):
+    """TypedDict for a selectable function-design in a planning snapshot."""
+
+    function: str  #: function name
+    name: str  #: function design name
+    priority: float | None  #: function design priority
+    required_components: list[str]  #: names of the required components
+
+
+class ComponentConfigurationSnapshotDict(TypedDict):
+    """TypedDict for a selectable component-configuration in a snapshot."""
+
+    component: str  #: component name
+    name: str  #: component configuration name
+    priority: float | None  #: component configuration priority
+
+
+class PlanningSnapshotDict(TypedDict):
+    """TypedDict for planning snapshot."""
+
+    functions: list[str]  #: adaptable functions
+    fds: list[FunctionDesignSnapshotDict]  #: selectable function designs
+    components: list[str]  #: adaptable components
+    c_configs: list[
+        ComponentConfigurationSnapshotDict]  #: selectable configurations
+    #: all adaptable functions, also in partial snapshots
+    adaptable_functions: list[str]
+    #: all adaptable components, also in partial snapshots
+    adaptable_components: list[str]
+
+
+def convert_component_parameter_value_to_py_type(
+    param: dict[str, MatchResultDict],
+    param_type: Literal[
+        'boolean', 'boolean_array', 'double', 'double_array',
+        'long', 'long_array', 'string', 'string_array']
+) -> bool | list[bool] | float | list[float] | int | list[int] | str | \
+        list[str]:
+    """
+    Convert ComponentParameter value to python type.
+
+    :param param: ComponentParameter value
+    :param param_type: CompomentParameter parameter-type
+    :return: converted value
+    """
+    def process_array(param, func):
+        return [func(p.strip()) for p in param.strip('[]').split(',')]
+
+    if param_type == 'boolean':
+        return param.lower() == 'true'
+    elif param_type == 'boolean_array':
+        return process_array(param, lambda p: p.lower() == 'true')
+    elif param_type == 'double':
+        return float(param)
+    elif param_type == 'double_array':
+        return process_array(param, float)
+    elif param_type == 'long':
+        return int(param)
+    elif param_type == 'long_array':
+        return process_array(param, int)
+    elif param_type == 'string':
+        return param
+    elif param_type == 'string_array':
+        return process_array(param, str)
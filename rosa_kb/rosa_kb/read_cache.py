@@ -0,0 +1,128 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Revision-versioned LRU cache for KB read queries."""
+
+import copy
+import threading
+
+from collections import OrderedDict
+
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import TypedDict
+
+
+class ReadCacheStatsDict(TypedDict):
+    """TypedDict for read cache statistics."""
+
+    hits: int  #: number of lookups answered by the cache
+    misses: int  #: number of lookups that had to query the KB
+    evictions: int  #: entries removed to respect the cache size
+    invalidations: int  #: times the cache was cleared by a new revision
+    size: int  #: number of entries in the cache
+    revision: int  #: KB revision of the cached entries
+
+
+class ReadCache:
+    """
+    LRU cache whose entries are only valid for a single KB revision.
+
+    Every write to the KB increases its revision. Entries are stored with the
+    revision that was current when the query started, and the whole cache is
+    cleared as soon as it is accessed with a newer revision. Cached values are
+    deep-copied when stored and when returned, so callers can modify them.
+    All methods are thread-safe.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        """
+        Create ReadCache.
+
+        :param max_size: maximum number of entries, 0 disables the cache
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._revision = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _check_revision(self, revision: int) -> None:
+        if revision > self._revision:
+            if len(self._entries) > 0:
+                self._invalidations += 1
+            self._entries.clear()
+            self._revision = revision
+
+    def get_or_compute(
+            self,
+            key: Hashable,
+            revision: int,
+            compute: Callable[[], Any]) -> Any:
+        """
+        Get cached value, or compute and cache it.
+
+        :param key: cache key, e.g., method name and arguments
+        :param revision: current KB revision, must be read before `compute`
+            is called
+        :param compute: function that queries the KB
+        :return: cached or computed value
+        """
+        if self.max_size <= 0:
+            return compute()
+        with self._lock:
+            self._check_revision(revision)
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return copy.deepcopy(self._entries[key])
+            self._misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._check_revision(revision)
+            # a write happened while computing, the value may be stale
+            if revision == self._revision:
+                self._entries[key] = copy.deepcopy(value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> ReadCacheStatsDict:
+        """
+        Get cache statistics.
+
+        :return: dict with number of hits, misses, evictions, invalidations,
+            the cache size, and the revision of the cached entries
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'size': len(self._entries),
+                'revision': self._revision,
+            }
@@ -25,7 +25,10 @@ def main():
 
     lc_node = RosaKB('rosa_kb')
 
-    executor = rclpy.executors.MultiThreadedExecutor()
+    # 0 threads uses the default of the executor, the number of CPUs
+    executor_threads = lc_node.get_parameter('executor_threads').value
+    executor = rclpy.executors.MultiThreadedExecutor(
+        num_threads=executor_threads if executor_threads > 0 else None)
     executor.add_node(lc_node)
     try:
         executor.spin()
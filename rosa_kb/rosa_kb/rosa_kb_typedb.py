@@ -12,16 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """ROS wrapper for ROSA's typedb model."""
+import functools
+import json
 import sys
+import threading
+import time
 from datetime import datetime
 
 import rosa_msgs
 from rosa_msgs.msg import Action
+from rosa_msgs.msg import ChangeEvent
 from rosa_msgs.msg import Component
 from rosa_msgs.msg import ComponentConfiguration
 from rosa_msgs.msg import ComponentProcess
+from rosa_msgs.msg import Constraint
 from rosa_msgs.msg import Function
 from rosa_msgs.msg import FunctionDesign
+from rosa_msgs.msg import FunctionalRequirement
 from rosa_msgs.msg import ReconfigurationPlan
 
 from rosa_msgs.srv import ActionQuery
@@ -37,6 +44,8 @@ from rosa_msgs.srv import FunctionalRequirementQuery
 from rosa_msgs.srv import GetComponentParameters
 from rosa_msgs.srv import GetComponentConfigurationPriority
 from rosa_msgs.srv import GetFunctionDesignPriority
+from rosa_msgs.srv import MeasurementWindowQuery
+from rosa_msgs.srv import PlanningSnapshot
 from rosa_msgs.srv import ReconfigurationPlanQuery
 from rosa_msgs.srv import SelectedConfigurations
 from rosa_msgs.srv import SelectableComponentConfigurations
@@ -44,10 +53,26 @@ from rosa_msgs.srv import SelectableFunctionDesigns
 
 from rcl_interfaces.msg import Parameter
 
+import rosa_kb.status_materializer
 import rosa_kb.typedb_model_interface
+from rosa_kb.async_model_interface import AsyncModelInterface
+from rosa_kb.change_events import ChangeRecorder
+from rosa_kb.change_events import ChangesDict
+from rosa_kb.change_events import has_changes
+from rosa_kb.latency_stats import LatencyStats
+from rosa_kb.latency_stats import instrument_methods
+from rosa_kb.measurement_buffer import MeasurementBuffer
+from rosa_kb.measurement_history import MeasurementHistory
+from rosa_kb.measurement_history import compute_window_stats
+from rosa_kb.memory_model_interface import MemoryModelInterface
+from rosa_kb.rw_lock import ReadWriteLock
+from rosa_kb.slow_query_log import SlowQueryLog
+from rosa_kb.tracing import Tracer
+from rosa_kb.sqlite_model_interface import SQLiteModelInterface
 from rosa_kb.typedb_model_interface import ModelInterface
 
 from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+from rclpy.callback_groups import ReentrantCallbackGroup
 from rclpy.lifecycle import State
 from rclpy.lifecycle import TransitionCallbackReturn
 
@@ -56,16 +81,37 @@ from ros_typedb.ros_typedb_interface import set_query_result_value
 
 import diagnostic_msgs.msg
 from diagnostic_msgs.msg import DiagnosticArray
+from diagnostic_msgs.msg import DiagnosticStatus
+from diagnostic_msgs.msg import KeyValue
+
+from std_msgs.msg import String
 
 from rclpy.qos import QoSProfile, QoSReliabilityPolicy, QoSHistoryPolicy
 
+from typedb.driver import TypeDBDriverException
+
+from typing import Optional
+
 
 def publish_event(event_type: str):
-    """Publish event (Decorator)."""
+    """
+    Publish event after func commits its writes (Decorator).
+
+    func records what it changed with :meth:`RosaKB.record_change`. The
+    event is published when func returns, only if it changed something, see
+    :meth:`RosaKB.publish_change_event`. It must wrap :func:`lock_kb`, so
+    the writes are committed and the KB is unlocked when it is published.
+
+    :param event_type: event type
+    :return: func publishing the event
+    """
     def _publish_event(func):
         def inner(*args, **kwargs):
-            args[0].publish_data_event(event_type)
-            return func(*args, **kwargs)
+            with args[0].change_recorder.collect() as changes:
+                result = func(*args, **kwargs)
+            if changes is not None:
+                args[0].publish_change_event(event_type, changes)
+            return result
         return inner
     return _publish_event
 
@@ -86,6 +132,78 @@ def check_lc_active(response):
     return _check_lc_active
 
 
+def lock_kb(write: bool):
+    """
+    Hold the KB lock while func is performed (Decorator).
+
+    :param write: whether func writes in the KB, otherwise it only reads it
+    :return: func holding the KB lock for writing or reading
+    """
+    def _lock_kb(func):
+        def inner(*args, **kwargs):
+            lock = args[0].kb_lock
+            with (lock.write() if write is True else lock.read()):
+                return func(*args, **kwargs)
+        return inner
+    return _lock_kb
+
+
+def measure_latency(name: str):
+    """
+    Record the latency of func in the node latency stats (Decorator).
+
+    :param name: histogram name, e.g., the service name
+    :return: func recording its latency
+    """
+    def _measure_latency(func):
+        def inner(*args, **kwargs):
+            with args[0].latency_stats.measure(name):
+                return func(*args, **kwargs)
+        return inner
+    return _measure_latency
+
+
+def trace_stage(stage: str, start: Optional[bool] = False):
+    """
+    Record func as a stage of a MAPE-K loop trace (Decorator).
+
+    The stage joins the trace in the `trace_id` field of the request, if it
+    has one, otherwise func can set its trace with
+    :meth:`rosa_kb.tracing.Tracer.set_trace_id`.
+
+    :param stage: stage name, e.g., the service name
+    :param start: whether func starts a new trace, e.g., when the loop
+        receives a new input
+    :return: func recorded as a stage
+    """
+    def _trace_stage(func):
+        def inner(*args, **kwargs):
+            trace_id = None
+            if start is True:
+                trace_id = args[0].start_trace()
+            elif len(args) > 1:
+                trace_id = getattr(args[1], 'trace_id', None) or None
+            with args[0].tracer.span(stage, trace_id):
+                return func(*args, **kwargs)
+        return inner
+    return _trace_stage
+
+
+#: latency stats name of the loop started by each stage, see
+#: :meth:`RosaKB.set_reconfiguration_plan_result_service_cb`
+LOOP_LATENCY_NAMES = {
+    '/diagnostics': 'loop.measurement_to_reconfiguration',
+    '~/action/request': 'loop.action_to_reconfiguration',
+}
+
+
+BACKENDS = {
+    'typedb': ModelInterface,
+    'memory': MemoryModelInterface,
+    'sqlite': SQLiteModelInterface,
+}
+
+
 class RosaKB(ROSTypeDBInterface):
     """ROS lifecycle node implementing ROSA's KB."""
 
@@ -95,6 +213,46 @@ class RosaKB(ROSTypeDBInterface):
         super().__init__(node_name, **kwargs)
         self.typedb_interface_class = ModelInterface
 
+        self.declare_parameter('backend', 'typedb')
+        self.declare_parameter('read_cache_size', 256)
+        self.declare_parameter('materialize_status', False)
+        self.declare_parameter('check_fingerprint', False)
+        self.declare_parameter('snapshot_dir', '')
+        self.declare_parameter('bulk_load_workers', 0)
+        self.declare_parameter('bulk_load_chunk_size', 1000)
+        self.declare_parameter('query_workers', 4)
+        self.declare_parameter('executor_threads', 0)
+        self.declare_parameter('stats_period', 0.0)
+        self.declare_parameter('slow_query_log', '')
+        self.declare_parameter('slow_query_threshold', 0.1)
+        self.declare_parameter('trace_buffer_size', 1000)
+        self.declare_parameter('trace_file', '')
+        self.declare_parameter('measurement_flush_period', 0.0)
+        self.declare_parameter('measurement_flush_size', 0)
+        self.declare_parameter('measurement_history_size', 1000)
+        self.declare_parameter('measurement_compaction_period', 0.0)
+        self.declare_parameter('measurement_retention_count', 0)
+        self.declare_parameter('measurement_retention_time', 0.0)
+        self.declare_parameter('measurement_downsample_period', 0.0)
+        self.declare_parameter('measurement_aggregate_retention', 0.0)
+        self.measurement_buffer = MeasurementBuffer()
+        self.measurement_history = MeasurementHistory()
+        self.measurement_flush_lock = threading.Lock()
+        self.measurement_flush_timer = None
+        self.measurement_compaction_timer = None
+        self.async_interface = None
+        self.kb_lock = ReadWriteLock()
+        self.read_cb_group = ReentrantCallbackGroup()
+        self.latency_stats = LatencyStats()
+        self.stats_timer = None
+        self.stats_publisher = None
+        self.stats_diagnostics_publisher = None
+        self.slow_query_log = None
+        self.tracer = Tracer()
+        self.latest_trace_id = ''
+        self.change_recorder = ChangeRecorder()
+        self.change_event_publisher = None
+
     def on_activate(self, state: State) -> TransitionCallbackReturn:
         self.get_logger().info(self.get_name() + ': on_activate() is called.')
         self.active = True
@@ -105,6 +263,23 @@ class RosaKB(ROSTypeDBInterface):
     def on_deactivate(self, state: State) -> TransitionCallbackReturn:
         self.get_logger().info("on_deactivate() is called.")
         self.active = False
+        self.flush_measurements()
+        self.get_logger().info(
+            'measurement buffer stats: {}'.format(
+                self.measurement_buffer.stats()))
+        self.get_logger().info(
+            'read cache stats: {}'.format(
+                self.typedb_interface.read_cache.stats()))
+        self.get_logger().info(
+            'kb lock stats: {}'.format(self.kb_lock.stats()))
+        trace_file = self.get_parameter('trace_file').value
+        if trace_file != '':
+            try:
+                self.get_logger().info('exported {} traces to {}'.format(
+                    self.tracer.export(trace_file), trace_file))
+            except OSError as e:
+                self.get_logger().error(
+                    'failed to export traces: {}'.format(e))
         return super().on_deactivate(state)
 
     def on_configure(self, state: State) -> TransitionCallbackReturn:
@@ -113,7 +288,135 @@ class RosaKB(ROSTypeDBInterface):
 
         :return: transition result
         """
+        # When `materialize_status` is true, the statuses derived by the
+        # schema rules are stored by the writes and reads skip inference
+        # With `backend` 'memory', the KB is kept in python data structures
+        # and no typeDB server is needed. With `backend` 'sqlite', the KB is
+        # persisted in the SQLite file `database_name`
+        backend = self.get_parameter('backend').value
+        if backend not in BACKENDS:
+            self.get_logger().error(
+                'invalid backend {!r}, it must be one of {}'.format(
+                    backend, ', '.join(BACKENDS)))
+            return TransitionCallbackReturn.FAILURE
+        # When `check_fingerprint` is true, the schema and data files are not
+        # loaded again if the database was loaded from the same files and
+        # not modified since, except by measurements with the typedb
+        # backend. When `snapshot_dir` is set, the KB is restored from the
+        # snapshot exported the last time the same files were loaded
+        snapshot_dir = self.get_parameter('snapshot_dir').value
+        if backend == 'typedb' and snapshot_dir != '':
+            self.get_logger().warning(
+                'snapshots are not supported by the typedb backend')
+        # When `slow_query_log` is set, the TypeQL queries that take longer
+        # than `slow_query_threshold` seconds are logged in that file
+        slow_query_log_path = self.get_parameter('slow_query_log').value
+        if slow_query_log_path != '':
+            if backend != 'typedb':
+                self.get_logger().warning(
+                    'the slow query log is only supported by the typedb '
+                    'backend')
+            self.slow_query_log = SlowQueryLog(
+                slow_query_log_path,
+                self.get_parameter('slow_query_threshold').value)
+        self.typedb_interface_class = functools.partial(
+            BACKENDS[backend],
+            cache_size=self.get_parameter('read_cache_size').value,
+            materialize_status=self.get_parameter(
+                'materialize_status').value,
+            check_fingerprint=self.get_parameter('check_fingerprint').value,
+            snapshot_dir=snapshot_dir,
+            bulk_load_workers=self.get_parameter('bulk_load_workers').value,
+            bulk_load_chunk_size=self.get_parameter(
+                'bulk_load_chunk_size').value,
+            slow_query_log=self.slow_query_log)
         config_res = super().on_configure(state)
+        if config_res == TransitionCallbackReturn.SUCCESS and \
+           self.typedb_interface.bulk_load_stats is not None:
+            bulk_load_stats = self.typedb_interface.bulk_load_stats
+            self.get_logger().info(
+                'bulk load stats: {}'.format(bulk_load_stats))
+            # the KB is incomplete when some chunks were not loaded
+            if bulk_load_stats['failed_chunks'] > 0:
+                self.get_logger().error(
+                    'failed to bulk load {} chunks'.format(
+                        bulk_load_stats['failed_chunks']))
+                config_res = TransitionCallbackReturn.FAILURE
+
+        # Services that perform one query per item of their request perform
+        # them at the same time, with up to `query_workers` queries at once
+        if config_res == TransitionCallbackReturn.SUCCESS:
+            instrument_methods(
+                self.typedb_interface, self.latency_stats, 'model.')
+            self.async_interface = AsyncModelInterface(
+                self.typedb_interface,
+                max(self.get_parameter('query_workers').value, 1))
+
+        # Measurements are buffered and written in the KB every
+        # `measurement_flush_period` seconds, or when the buffer has
+        # `measurement_flush_size` attributes. A period of 0 writes them as
+        # soon as they are received.
+        flush_period = self.get_parameter('measurement_flush_period').value
+        self.measurement_buffer = MeasurementBuffer(
+            self.get_parameter('measurement_flush_size').value)
+        diagnostics_cb_group = self.query_cb_group
+        if flush_period > 0.0:
+            diagnostics_cb_group = MutuallyExclusiveCallbackGroup()
+            self.measurement_flush_timer = self.create_timer(
+                flush_period,
+                self.flush_measurements,
+                callback_group=self.query_cb_group
+            )
+
+        # Old measurements are removed, or downsampled, every
+        # `measurement_compaction_period` seconds. A period of 0 disables it.
+        compaction_period = self.get_parameter(
+            'measurement_compaction_period').value
+        if compaction_period > 0.0:
+            self.measurement_compaction_timer = self.create_timer(
+                compaction_period,
+                self.compact_measurements,
+                callback_group=MutuallyExclusiveCallbackGroup()
+            )
+
+        # The latency stats of the services and model interface methods are
+        # published every `stats_period` seconds in `~/stats` and
+        # `/diagnostics`. A period of 0 disables it.
+        stats_period = self.get_parameter('stats_period').value
+        if stats_period > 0.0:
+            self.stats_publisher = self.create_publisher(
+                String, self.get_name() + '/stats', 10)
+            self.stats_diagnostics_publisher = self.create_publisher(
+                DiagnosticArray, '/diagnostics', 10)
+            self.stats_timer = self.create_timer(
+                stats_period,
+                self.publish_stats,
+                callback_group=MutuallyExclusiveCallbackGroup()
+            )
+
+        # The stages of the MAPE-K loop triggered by each measurement or
+        # action request are traced, keeping the newest `trace_buffer_size`
+        # traces. They are exported to `trace_file` on deactivate
+        self.tracer = Tracer(self.get_parameter('trace_buffer_size').value)
+
+        # Besides the event type published in `~/events`, the events are
+        # published in `~/change_events` with the things changed and the KB
+        # revision, so subscribers can skip the events that do not affect
+        # them
+        self.change_event_publisher = self.create_publisher(
+            ChangeEvent, self.get_name() + '/change_events', 10)
+
+        # Recent measurements are also kept in memory, to answer window
+        # queries without querying the KB
+        self.measurement_history = MeasurementHistory(
+            self.get_parameter('measurement_history_size').value)
+        self.measurement_window_service = self.create_service(
+            MeasurementWindowQuery,
+            self.get_name() + '/measurement/window',
+            self.measurement_window_cb,
+            callback_group=MutuallyExclusiveCallbackGroup()
+        )
+
         self.diagnostics_qos = QoSProfile(
             reliability=QoSReliabilityPolicy.RELIABLE,
             history=QoSHistoryPolicy.KEEP_ALL,
@@ -123,10 +426,13 @@ class RosaKB(ROSTypeDBInterface):
             '/diagnostics',
             self.diagnostics_callback,
             self.diagnostics_qos,
-            callback_group=self.query_cb_group
+            callback_group=diagnostics_cb_group
         )
 
         self.action_cb_group = MutuallyExclusiveCallbackGroup()
+        # Services that only read the KB are in a reentrant callback group,
+        # so they are performed at the same time by the executor threads.
+        # Only the writes in the KB are serialized, by `kb_lock`
         self.action_request_service = self.create_service(
             ActionQuery,
             self.get_name() + '/action/request',
@@ -138,7 +444,7 @@ class RosaKB(ROSTypeDBInterface):
             ActionQueryArray,
             self.get_name() + '/action/selectable',
             self.action_selectable_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.action_insert_service = self.create_service(
@@ -152,7 +458,7 @@ class RosaKB(ROSTypeDBInterface):
             ActionQuery,
             self.get_name() + '/action/exists',
             self.action_exists_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.functional_requirement_insert_service = self.create_service(
@@ -166,7 +472,7 @@ class RosaKB(ROSTypeDBInterface):
             AdaptableFunctions,
             self.get_name() + '/function/adaptable',
             self.function_adaptable_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.function_insert_service = self.create_service(
@@ -180,7 +486,7 @@ class RosaKB(ROSTypeDBInterface):
             AdaptableComponents,
             self.get_name() + '/component/adaptable',
             self.component_adaptable_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.component_insert_service = self.create_service(
@@ -200,7 +506,7 @@ class RosaKB(ROSTypeDBInterface):
             ComponentProcessQueryArray,
             self.get_name() + '/component_process/get_active',
             self.component_process_get_active_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.get_component_process_set_end_service = self.create_service(
@@ -214,14 +520,14 @@ class RosaKB(ROSTypeDBInterface):
             SelectableFunctionDesigns,
             self.get_name() + '/function_designs/selectable',
             self.selectable_fd_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.get_fds_priority_service = self.create_service(
             GetFunctionDesignPriority,
             self.get_name() + '/function_designs/priority',
             self.function_design_priority_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.function_design_insert_service = self.create_service(
@@ -235,14 +541,21 @@ class RosaKB(ROSTypeDBInterface):
             SelectableComponentConfigurations,
             self.get_name() + '/component_configuration/selectable',
             self.selectable_c_config_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.get_c_configs_priority_service = self.create_service(
             GetComponentConfigurationPriority,
             self.get_name() + '/component_configuration/priority',
             self.component_configuration_priority_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
+        )
+
+        self.planning_snapshot_service = self.create_service(
+            PlanningSnapshot,
+            self.get_name() + '/planning_snapshot',
+            self.planning_snapshot_cb,
+            callback_group=self.read_cb_group
         )
 
         self.select_configuration_service = self.create_service(
@@ -257,14 +570,14 @@ class RosaKB(ROSTypeDBInterface):
             ReconfigurationPlanQuery,
             self.get_name() + '/reconfiguration_plan/get',
             self.get_reconfiguration_plan_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.get_latest_reconfiguration_plan_service = self.create_service(
             ReconfigurationPlanQuery,
             self.get_name() + '/reconfiguration_plan/get_latest',
             self.get_latest_reconfiguration_plan_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.set_reconfiguration_plan_result_service = self.create_service(
@@ -285,14 +598,14 @@ class RosaKB(ROSTypeDBInterface):
             ComponentQuery,
             self.get_name() + '/component/active/get',
             self.get_component_active_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         self.get_component_parameters_service = self.create_service(
             GetComponentParameters,
             self.get_name() + '/component_parameters/get',
             self.get_component_parameters_cb,
-            callback_group=self.query_cb_group
+            callback_group=self.read_cb_group
         )
 
         return config_res
@@ -304,9 +617,82 @@ class RosaKB(ROSTypeDBInterface):
         :return: transition result
         """
         self.active = False
+        if self.measurement_flush_timer is not None:
+            self.destroy_timer(self.measurement_flush_timer)
+            self.measurement_flush_timer = None
+        if self.measurement_compaction_timer is not None:
+            self.destroy_timer(self.measurement_compaction_timer)
+            self.measurement_compaction_timer = None
+        if self.stats_timer is not None:
+            self.destroy_timer(self.stats_timer)
+            self.stats_timer = None
+            self.destroy_publisher(self.stats_publisher)
+            self.destroy_publisher(self.stats_diagnostics_publisher)
+        self.measurement_buffer.drop()
+        if self.async_interface is not None:
+            self.async_interface.shutdown()
+            self.async_interface = None
+        if self.slow_query_log is not None:
+            self.slow_query_log.close()
+            self.slow_query_log = None
+        if self.change_event_publisher is not None:
+            self.destroy_publisher(self.change_event_publisher)
+            self.change_event_publisher = None
         return super().on_cleanup(state)
 
-    @publish_event(event_type='insert_monitoring_data')
+    def start_trace(self) -> str:
+        """
+        Start a trace of the MAPE-K loop.
+
+        The new trace is the latest one, which the events published outside
+        a stage, and the next planning snapshot, join.
+
+        :return: trace ID
+        """
+        trace_id = self.tracer.new_trace_id()
+        self.latest_trace_id = trace_id
+        return trace_id
+
+    def record_change(self, kind: str, names: list[str]) -> None:
+        """
+        Record things changed by a write, announced in the next event.
+
+        Only successful writes should be recorded, see
+        :meth:`rosa_kb.change_events.ChangeRecorder.record`.
+
+        :param kind: 'attributes', 'components', 'functions', or 'actions'
+        :param names: names of the changed things
+        """
+        self.change_recorder.record(kind, names)
+
+    def publish_change_event(
+            self, event_type: str, changes: ChangesDict) -> None:
+        """
+        Publish an event in the `~/events` and `~/change_events` topics.
+
+        Nothing is published when nothing was changed, e.g., when the write
+        failed.
+
+        :param event_type: event type
+        :param changes: things changed
+        """
+        if not has_changes(changes):
+            return
+        trace_id = self.tracer.get_trace_id() or self.latest_trace_id
+        self.publish_data_event(event_type)
+        if self.change_event_publisher is not None:
+            msg = ChangeEvent()
+            msg.header.stamp = self.get_clock().now().to_msg()
+            msg.event_type = event_type
+            msg.revision = self.typedb_interface.revision
+            msg.attributes = changes['attributes']
+            msg.components = changes['components']
+            msg.functions = changes['functions']
+            msg.actions = changes['actions']
+            msg.trace_id = trace_id
+            self.change_event_publisher.publish(msg)
+        self.tracer.instant('event/' + event_type, trace_id)
+
     def update_measurement(
             self,
             diagnostic_status: diagnostic_msgs.msg.DiagnosticStatus) -> None:
@@ -319,11 +705,101 @@ class RosaKB(ROSTypeDBInterface):
 
         :param diagnostic_status: measurement
         """
-        for value in diagnostic_status.values:
-            self.typedb_interface.add_measurement(
-                value.key, value.value)
+        self.update_measurements(
+            {value.key: value.value for value in diagnostic_status.values})
 
     @publish_event(event_type='insert_monitoring_data')
+    @lock_kb(write=True)
+    def update_measurements(
+            self, measurements: dict[str, str]) -> list | None:
+        """
+        Update several QA/EA attribute measurements in one transaction.
+
+        Update QualityAttribute or EnvironmentalAttribute attribute
+        measurements. Publish 'insert_monitoring_data' event in
+        `rosa_kb/events` topic when they are inserted.
+
+        :param measurements: dict with the form {QA/EA NAME: MEASURED VALUE}
+        :return: query result, or None if the measurements were not inserted
+        """
+        result = self.typedb_interface.add_measurements(measurements)
+        if result is not None:
+            self.record_change('attributes', list(measurements))
+        return result
+
+    def flush_measurements(self) -> None:
+        """
+        Write buffered QA/EA measurements in the KB.
+
+        Only the newest value of each attribute is written, see
+        :class:`rosa_kb.measurement_buffer.MeasurementBuffer`.
+        """
+        with self.measurement_flush_lock:
+            measurements = self.measurement_buffer.pop()
+            if len(measurements) == 0:
+                return
+            if self.update_measurements(measurements) is None:
+                self.measurement_buffer.drop(measurements)
+        self.get_logger().debug(
+            'measurement buffer stats: {}'.format(
+                self.measurement_buffer.stats()))
+
+    def publish_stats(self) -> None:
+        """
+        Publish the latency stats of the services and model methods.
+
+        The stats are published as JSON in the `~/stats` topic, with the form
+        {NAME: STATS}, see
+        :class:`rosa_kb.latency_stats.LatencyStatsDict`. They are also
+        published in the `/diagnostics` topic, with a status for each
+        service or method, whose level is WARN if any of its calls failed.
+        """
+        stats = self.latency_stats.stats()
+        self.stats_publisher.publish(String(data=json.dumps(stats)))
+        msg = DiagnosticArray()
+        msg.header.stamp = self.get_clock().now().to_msg()
+        for name, _stats in stats.items():
+            if _stats['count'] == 0:
+                continue
+            status = DiagnosticStatus()
+            status.level = DiagnosticStatus.WARN \
+                if _stats['errors'] > 0 else DiagnosticStatus.OK
+            status.name = '{}: {}'.format(self.get_name(), name)
+            status.message = 'latency stats'
+            status.hardware_id = self.get_name()
+            status.values = [
+                KeyValue(key=key, value=str(value))
+                for key, value in _stats.items()]
+            msg.status.append(status)
+        self.stats_diagnostics_publisher.publish(msg)
+
+    @lock_kb(write=True)
+    def compact_measurements(self) -> None:
+        """
+        Apply the measurement retention policy.
+
+        Remove old measurements according to the `measurement_retention_*`
+        parameters, and downsample them when `measurement_downsample_period`
+        is larger than 0, see :meth:`ModelInterface.compact_measurements`.
+        """
+        stats = self.typedb_interface.compact_measurements(
+            keep_count=self.get_parameter(
+                'measurement_retention_count').value,
+            keep_time=self.get_parameter(
+                'measurement_retention_time').value,
+            downsample_period=self.get_parameter(
+                'measurement_downsample_period').value,
+            aggregate_retention=self.get_parameter(
+                'measurement_aggregate_retention').value,
+        )
+        if stats is None:
+            self.get_logger().warning('measurement compaction failed')
+            return
+        self.get_logger().debug(
+            'measurement compaction stats: {}'.format(stats))
+
+    @publish_event(event_type='insert_monitoring_data')
+    @lock_kb(write=True)
     def update_component_status(
             self,
             diagnostic_status: diagnostic_msgs.msg.DiagnosticStatus) -> None:
@@ -331,8 +807,8 @@ class RosaKB(ROSTypeDBInterface):
         Update Component status.
 
         Update Component status. Publish 'insert_monitoring_data' event
-        in `rosa_kb/events` topic when called. Recover values: 'recovered' or
-        'ok'. Failure values: 'false', 'failure', or 'error'.
+        in `rosa_kb/events` topic when a status is updated. Recover values:
+        'recovered' or 'ok'. Failure values: 'false', 'failure', or 'error'.
 
         :param diagnostic_status: component status
         """
@@ -340,14 +816,18 @@ class RosaKB(ROSTypeDBInterface):
         failure_values = ['false', 'failure', 'error']
         for value in diagnostic_status.values:
             if value.value.lower() in recover_values:
-                self.typedb_interface.delete_component_status(
-                    value.key)
+                if self.typedb_interface.delete_component_status(
+                        value.key) is not None:
+                    self.record_change('components', [value.key])
                 return None
             if value.value.lower() in failure_values:
-                self.typedb_interface.update_component_status(
-                    value.key, 'failure')
+                if self.typedb_interface.update_component_status(
+                        value.key, 'failure') is not None:
+                    self.record_change('components', [value.key])
 
     @check_lc_active(response=None)
+    @measure_latency(name='/diagnostics')
+    @trace_stage(stage='/diagnostics')
     def diagnostics_callback(
             self, msg: diagnostic_msgs.msg.DiagnosticArray) -> None:
         """
@@ -357,6 +837,10 @@ class RosaKB(ROSTypeDBInterface):
         `message` field is 'component status' or 'component'. Updates QA/EA
         measurement when `message` field is 'qa status', 'qa measurement',
         'ea status', 'ea measurement', or 'attribute measurement'.
+        Measurements are added to the measurement buffer, which keeps only the
+        newest value of each attribute, and are written in a single write
+        transaction when the buffer is flushed. They are also added to the
+        in-memory measurement history.
 
         :param msg: msg published in `/dianostics` topic
         """
@@ -368,16 +852,73 @@ class RosaKB(ROSTypeDBInterface):
             'attribute measurement']
         component_messages = [
             'component status', 'component']
+        # only messages with measurements or component statuses start a
+        # trace, e.g., the latency stats published by this node do not
+        if any(s.message.lower() in measurement_messages + component_messages
+               for s in msg.status):
+            self.tracer.set_trace_id(self.start_trace())
+        timestamp = self.get_clock().now().nanoseconds / 1e9
+        measurements = dict()
         for diagnostic_status in msg.status:
-            # Update measurement
+            # Gather measurements, they are inserted in a single transaction
             if diagnostic_status.message.lower() in measurement_messages:
-                self.update_measurement(diagnostic_status)
+                _measurements = {
+                    v.key: v.value for v in diagnostic_status.values}
+                self.measurement_history.add(_measurements, timestamp)
+                measurements.update(_measurements)
                 continue
             if diagnostic_status.message.lower() in component_messages:
                 self.update_component_status(diagnostic_status)
+        if len(measurements) > 0:
+            flush = self.measurement_buffer.add(measurements)
+            if flush is True or self.measurement_flush_timer is None:
+                self.flush_measurements()
+
+    @check_lc_active(response=MeasurementWindowQuery.Response())
+    @measure_latency(name='~/measurement/window')
+    def measurement_window_cb(
+        self,
+        req: rosa_msgs.srv.MeasurementWindowQuery.Request,
+        res: rosa_msgs.srv.MeasurementWindowQuery.Response
+    ) -> rosa_msgs.srv.MeasurementWindowQuery.Response:
+        """
+        Get QA/EA measurements in a window (callback).
+
+        Callback from service `~/measurement/window`. Get the measurements of
+        a QA/EA in a window and their statistics from the in-memory
+        measurement history, the KB is not queried. The request fails when
+        the window is empty, or a percentile or the EWMA smoothing factor is
+        out of its interval.
+
+        :param req: `~/measurement/window` service request
+        :param res: `~/measurement/window` service response
+        :return: `~/measurement/window` service response
+        """
+        window = self.measurement_history.window(
+            req.attribute_name, req.last_n, req.start_time, req.end_time)
+        stats = None
+        if window is not None:
+            stats = compute_window_stats(
+                window[1], list(req.percentiles), req.ewma_alpha)
+        if stats is None:
+            res.success = False
+            return res
+        res.times = window[0].tolist()
+        res.values = window[1].tolist()
+        res.count = stats['count']
+        res.mean = stats['mean']
+        res.min = stats['min']
+        res.max = stats['max']
+        res.percentiles = stats['percentiles']
+        res.ewma = stats['ewma']
+        res.success = True
+        return res
 
     @check_lc_active(response=ActionQuery.Response())
+    @measure_latency(name='~/action/request')
+    @trace_stage(stage='~/action/request', start=True)
     @publish_event(event_type='action_update')
+    @lock_kb(write=True)
     def action_request_cb(
         self,
         req: rosa_msgs.srv.ActionQuery.Request,
@@ -389,7 +930,7 @@ class RosaKB(ROSTypeDBInterface):
         Callback from service `~/action/request`. Request action when
         `is_required` field is True. Cancel action when `is_required` field
         is False. Publish 'action_update' event in `~/events` topic when
-        called.
+        the action is requested or cancelled.
 
         :param req: `~/action/request` service request
         :param res: `~/action/request` service response
@@ -406,11 +947,15 @@ class RosaKB(ROSTypeDBInterface):
             res.success = True
         else:
             res.success = False
+        if res.success is True:
+            self.record_change('actions', [req.action.name])
         res.action.is_required = self.typedb_interface.is_action_required(
             req.action.name)
         return res
 
     @check_lc_active(response=ActionQuery.Response())
+    @measure_latency(name='~/action/insert')
+    @lock_kb(write=True)
     def action_insert_cb(
         self,
         req: rosa_msgs.srv.ActionQuery.Request,
@@ -431,6 +976,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ActionQuery.Response())
+    @measure_latency(name='~/action/exists')
+    @lock_kb(write=False)
     def action_exists_cb(
         self,
         req: rosa_msgs.srv.ActionQuery.Request,
@@ -450,6 +997,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=FunctionQuery.Response())
+    @measure_latency(name='~/function/insert')
+    @lock_kb(write=True)
     def function_insert_cb(
         self,
         req: rosa_msgs.srv.FunctionQuery.Request,
@@ -470,6 +1019,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ComponentQuery.Response())
+    @measure_latency(name='~/component/insert')
+    @lock_kb(write=True)
     def component_insert_cb(
         self,
         req: rosa_msgs.srv.ComponentQuery.Request,
@@ -496,6 +1047,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ComponentProcessQuery.Response())
+    @measure_latency(name='~/component_process/insert')
+    @lock_kb(write=True)
     def component_process_insert_cb(
         self,
         req: rosa_msgs.srv.ComponentProcessQuery.Request,
@@ -519,6 +1072,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ComponentProcessQueryArray.Response())
+    @measure_latency(name='~/component_process/get_active')
+    @lock_kb(write=False)
     def component_process_get_active_cb(
         self,
         req: rosa_msgs.srv.ComponentProcessQueryArray.Request,
@@ -546,6 +1101,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ComponentProcessQuery.Response())
+    @measure_latency(name='~/component_process/end/set')
+    @lock_kb(write=True)
     def component_process_set_end_cb(
         self,
         req: rosa_msgs.srv.ComponentProcessQuery.Request,
@@ -567,6 +1124,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=FunctionDesignQuery.Response())
+    @measure_latency(name='~/function_design/insert')
+    @lock_kb(write=True)
     def function_design_insert_cb(
         self,
         req: rosa_msgs.srv.FunctionDesignQuery.Request,
@@ -594,6 +1153,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=FunctionalRequirementQuery.Response())
+    @measure_latency(name='~/functional_requirement/insert')
+    @lock_kb(write=True)
     def functional_requirement_insert_cb(
         self,
         req: rosa_msgs.srv.FunctionalRequirementQuery.Request,
@@ -619,6 +1180,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ActionQueryArray.Response())
+    @measure_latency(name='~/action/selectable')
+    @lock_kb(write=False)
     def action_selectable_cb(
         self,
         req: rosa_msgs.srv.ActionQueryArray.Request,
@@ -642,6 +1205,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=AdaptableFunctions.Response())
+    @measure_latency(name='~/function/adaptable')
+    @lock_kb(write=False)
     def function_adaptable_cb(
         self,
         req: rosa_msgs.srv.AdaptableFunctions.Request,
@@ -669,6 +1234,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=AdaptableComponents.Response())
+    @measure_latency(name='~/component/adaptable')
+    @lock_kb(write=False)
     def component_adaptable_cb(
         self,
         req: rosa_msgs.srv.AdaptableComponents.Request,
@@ -699,6 +1266,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=SelectableFunctionDesigns.Response())
+    @measure_latency(name='~/function_designs/selectable')
+    @lock_kb(write=False)
     def selectable_fd_cb(
         self,
         req: rosa_msgs.srv.SelectableFunctionDesigns.Request,
@@ -724,6 +1293,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=SelectableComponentConfigurations.Response())
+    @measure_latency(name='~/component_configuration/selectable')
+    @lock_kb(write=False)
     def selectable_c_config_cb(
         self,
         req: rosa_msgs.srv.SelectableComponentConfigurations.Request,
@@ -750,6 +1321,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=GetFunctionDesignPriority.Response())
+    @measure_latency(name='~/function_designs/priority')
+    @lock_kb(write=False)
     def function_design_priority_cb(
         self,
         req: rosa_msgs.srv.GetFunctionDesignPriority.Request,
@@ -765,8 +1338,9 @@ class RosaKB(ROSTypeDBInterface):
         :param res: `~/function_designs/priority` service response
         :return: `~/function_designs/priority` service response
         """
-        for fd in req.fds:
-            p = self.typedb_interface.get_function_design_priority(fd.name)
+        priorities = self.async_interface.map(
+            'get_function_design_priority', [fd.name for fd in req.fds])
+        for fd, p in zip(req.fds, priorities):
             if p is not None and len(p) > 0:
                 fd.priority = p[0]
             else:
@@ -776,6 +1350,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=GetComponentConfigurationPriority.Response())
+    @measure_latency(name='~/component_configuration/priority')
+    @lock_kb(write=False)
     def component_configuration_priority_cb(
         self,
         req: rosa_msgs.srv.GetComponentConfigurationPriority.Request,
@@ -791,9 +1367,10 @@ class RosaKB(ROSTypeDBInterface):
         :param res: `~/component_configuration/priority` service response
         :return: `~/component_configuration/priority` service response
         """
-        for c_config in req.c_configs:
-            p = self.typedb_interface.get_component_configuration_priority(
-                c_config.name)
+        priorities = self.async_interface.map(
+            'get_component_configuration_priority',
+            [c_config.name for c_config in req.c_configs])
+        for c_config, p in zip(req.c_configs, priorities):
             if p is not None and len(p) > 0:
                 c_config.priority = p[0]
             else:
@@ -802,8 +1379,109 @@ class RosaKB(ROSTypeDBInterface):
         res.success = True
         return res
 
+    @check_lc_active(response=PlanningSnapshot.Response())
+    @measure_latency(name='~/planning_snapshot')
+    @trace_stage(stage='~/planning_snapshot')
+    @lock_kb(write=False)
+    def planning_snapshot_cb(
+        self,
+        req: rosa_msgs.srv.PlanningSnapshot.Request,
+        res: rosa_msgs.srv.PlanningSnapshot.Response
+    ) -> rosa_msgs.srv.PlanningSnapshot.Response:
+        """
+        Get planning snapshot (callback).
+
+        Callback from service `~/planning_snapshot`. Get adaptable functions
+        and components, their selectable function designs and component
+        configurations, and their priorities in a single response. The
+        snapshot joins the trace in the request, or the latest trace when it
+        is empty, whose ID is in the response. When
+        `partial` is True, it only includes the requested functions and
+        components, see :meth:`ModelInterface.get_planning_snapshot`. When
+        `dependencies` is True, the relations the statuses depend on are
+        included, see :meth:`ModelInterface.get_status_dependencies`.
+
+        :param req: `~/planning_snapshot` service request
+        :param res: `~/planning_snapshot` service response
+        :return: `~/planning_snapshot` service response
+        """
+        trace_id = req.trace_id or self.latest_trace_id
+        self.tracer.set_trace_id(trace_id)
+        res.trace_id = trace_id
+        if req.partial is True:
+            snapshot = self.typedb_interface.get_planning_snapshot(
+                tuple(req.functions), tuple(req.components))
+        else:
+            snapshot = self.typedb_interface.get_planning_snapshot()
+        res.functions = [Function(name=f) for f in snapshot['functions']]
+        for fd in snapshot['fds']:
+            _fd = FunctionDesign()
+            _fd.function.name = fd['function']
+            _fd.name = fd['name']
+            _fd.priority = fd['priority'] \
+                if fd['priority'] is not None else sys.float_info.max
+            _fd.required_components = [
+                Component(name=c) for c in fd['required_components']]
+            res.fds.append(_fd)
+        res.components = [Component(name=c) for c in snapshot['components']]
+        res.adaptable_functions = snapshot['adaptable_functions']
+        res.adaptable_components = snapshot['adaptable_components']
+        for c_config in snapshot['c_configs']:
+            _c_config = ComponentConfiguration()
+            _c_config.component.name = c_config['component']
+            _c_config.name = c_config['name']
+            _c_config.priority = c_config['priority'] \
+                if c_config['priority'] is not None else sys.float_info.max
+            res.c_configs.append(_c_config)
+        if req.dependencies is True:
+            self.status_dependencies_to_ros_msg(
+                self.typedb_interface.get_status_dependencies(), res)
+        res.success = True
+        return res
+
+    def status_dependencies_to_ros_msg(
+        self,
+        dependencies: rosa_kb.status_materializer.StatusDependenciesDict,
+        res: rosa_msgs.srv.PlanningSnapshot.Response
+    ) -> rosa_msgs.srv.PlanningSnapshot.Response:
+        """
+        Set the status dependencies fields of a planning snapshot response.
+
+        :param dependencies: relations the statuses depend on
+        :param res: `~/planning_snapshot` service response
+        :return: `~/planning_snapshot` service response
+        """
+        for attribute, constrained in dependencies['constraints'].items():
+            for constrained_type, constrained_name in constrained:
+                res.constraints.append(Constraint(
+                    attribute_name=attribute,
+                    constrained_type=constrained_type,
+                    constrained_name=constrained_name))
+        for fd, (function, components) in dependencies['fds'].items():
+            _fd = FunctionDesign()
+            _fd.function.name = function
+            _fd.name = fd
+            _fd.required_components = [
+                Component(name=c) for c in components]
+            res.all_fds.append(_fd)
+        for c_config, component in dependencies['c_configs'].items():
+            _c_config = ComponentConfiguration()
+            _c_config.component.name = component
+            _c_config.name = c_config
+            res.all_c_configs.append(_c_config)
+        for action, functions in dependencies['actions'].items():
+            functional_requirement = FunctionalRequirement()
+            functional_requirement.action.name = action
+            functional_requirement.required_functions = [
+                Function(name=f) for f in functions]
+            res.functional_requirements.append(functional_requirement)
+        return res
+
     @check_lc_active(response=SelectedConfigurations.Response())
+    @measure_latency(name='~/select_configuration')
+    @trace_stage(stage='~/select_configuration')
     @publish_event(event_type='insert_reconfiguration_plan')
+    @lock_kb(write=True)
     def select_configuration_cb(
         self,
         req: rosa_msgs.srv.SelectedConfigurations.Request,
@@ -814,7 +1492,7 @@ class RosaKB(ROSTypeDBInterface):
 
         Callback from service `~/select_configuration`. Select new
         configuration for the system. Publish `insert_reconfiguration_plan` in
-        `~/events` topic.
+        `~/events` topic when the configuration is selected.
 
         :param req: `~/select_configuration` service request
         :param res: `~/select_configuration` service response
@@ -833,6 +1511,22 @@ class RosaKB(ROSTypeDBInterface):
             res.success = False
         else:
             res.success = True
+            # the plan also deactivates the components no longer required,
+            # which are not in the request
+            reconfig_plan = self.typedb_interface.get_reconfiguration_plan(
+                result)
+            self.record_change(
+                'functions', [f_name for f_name, _ in _selected_fds])
+            self.record_change(
+                'components',
+                [c_name for c_name, _ in _selected_component_configs]
+                + reconfig_plan['c_activate']
+                + reconfig_plan['c_deactivate'])
+            # the executor gets the trace with the reconfiguration plan
+            self.tracer.bind(
+                ('reconfiguration_plan',
+                 result.isoformat(timespec='milliseconds')),
+                self.tracer.get_trace_id())
         return res
 
     def get_component_all_attributes(
@@ -844,34 +1538,49 @@ class RosaKB(ROSTypeDBInterface):
         :return: rosa_msgs.msg.Component msg with all attributes set
         """
         c_dict = self.typedb_interface.get_component_all_attributes(component)
+        if c_dict is None:
+            c_dict = {'component_name': component}
+        return self.component_dict_to_ros_msg(c_dict)
+
+    def component_dict_to_ros_msg(
+        self,
+        c_dict: rosa_kb.typedb_model_interface.ComponentDict
+    ) -> rosa_msgs.msg.Component:
+        """
+        Convert component dict to :class:`rosa_msgs.msg.Component`.
+
+        :param c_dict: dict with the component type and its attributes
+        :return: rosa_msgs.msg.Component msg with all attributes set
+        """
         _component = Component()
-        _component.name = component
-        _component.status = c_dict.pop('component_status', '')
-        _component.package = c_dict.pop('package', '')
-        _component.executable = c_dict.pop('executable', '')
-        _component.node_type = c_dict.pop('type', '')
-        _component.is_active = c_dict.pop('is_active', False)
+        _component.name = c_dict.get('component_name', '')
+        _component.status = c_dict.get('component_status', '')
+        _component.package = c_dict.get('package', '')
+        _component.executable = c_dict.get('executable', '')
+        _component.node_type = c_dict.get('type', '')
+        _component.is_active = c_dict.get('is_active', False)
         return _component
 
     def reconfig_plan_dict_to_ros_msg(
         self,
-        reconfig_plan_dict: rosa_kb.typedb_model_interface.ReconfigPlanDict
+        reconfig_plan_dict:
+            rosa_kb.typedb_model_interface.ReconfigPlanDetailsDict
     ) -> rosa_msgs.msg.ReconfigurationPlan:
         """
         Convert reconfig plan to :class:`rosa_msgs.msg.ReconfigurationPlan`.
 
-        :param reconfig_plan_dict: reconfig plan dict
+        :param reconfig_plan_dict: reconfig plan dict, with the attributes of
+            its components
         :return: reconfig plan rosa msg
         """
         reconfig_plan = ReconfigurationPlan()
         if reconfig_plan_dict is not None:
-            for c_activate in reconfig_plan_dict['c_activate']:
-                _component = self.get_component_all_attributes(c_activate)
-                reconfig_plan.components_activate.append(_component)
-
-            for c_deactivate in reconfig_plan_dict['c_deactivate']:
-                _component = self.get_component_all_attributes(c_deactivate)
-                reconfig_plan.components_deactivate.append(_component)
+            reconfig_plan.components_activate = [
+                self.component_dict_to_ros_msg(c)
+                for c in reconfig_plan_dict['c_activate']]
+            reconfig_plan.components_deactivate = [
+                self.component_dict_to_ros_msg(c)
+                for c in reconfig_plan_dict['c_deactivate']]
 
             for c_config in reconfig_plan_dict['c_config']:
                 _c_config = ComponentConfiguration()
@@ -880,15 +1589,20 @@ class RosaKB(ROSTypeDBInterface):
 
             reconfig_plan.start_time = reconfig_plan_dict['start_time']\
                 .isoformat(timespec='milliseconds')
-
-            _result = self.typedb_interface.get_reconfiguration_plan_result(
-                reconfig_plan_dict['start_time'])
-            if _result is not None:
-                reconfig_plan.result = _result
+            reconfig_plan.trace_id = self.tracer.find(
+                ('reconfiguration_plan', reconfig_plan.start_time)) or ''
+            if reconfig_plan_dict['end_time'] is not None:
+                reconfig_plan.end_time = reconfig_plan_dict['end_time']\
+                    .isoformat(timespec='milliseconds')
+            if reconfig_plan_dict['result'] is not None:
+                reconfig_plan.result = reconfig_plan_dict['result']
 
         return reconfig_plan
 
     @check_lc_active(response=ReconfigurationPlanQuery.Response())
+    @measure_latency(name='~/reconfiguration_plan/get_latest')
+    @trace_stage(stage='~/reconfiguration_plan/get_latest')
+    @lock_kb(write=False)
     def get_latest_reconfiguration_plan_cb(
         self,
         req: rosa_msgs.srv.ReconfigurationPlanQuery.Request,
@@ -905,16 +1619,19 @@ class RosaKB(ROSTypeDBInterface):
         :return: `~/reconfiguration_plan/get_latest` service response
         """
         reconfig_plan_dict = \
-            self.typedb_interface.get_latest_pending_reconfiguration_plan()
+            self.typedb_interface.get_reconfiguration_plan_details()
         if reconfig_plan_dict is not None:
             res.reconfig_plan = self.reconfig_plan_dict_to_ros_msg(
                 reconfig_plan_dict)
+            self.tracer.set_trace_id(res.reconfig_plan.trace_id)
             res.success = True
         else:
             res.success = False
         return res
 
     @check_lc_active(response=ReconfigurationPlanQuery.Response())
+    @measure_latency(name='~/reconfiguration_plan/get')
+    @lock_kb(write=False)
     def get_reconfiguration_plan_cb(
         self,
         req: rosa_msgs.srv.ReconfigurationPlanQuery.Request,
@@ -930,8 +1647,9 @@ class RosaKB(ROSTypeDBInterface):
         :param res: `~/reconfiguration_plan/get` service response
         :return: `~/reconfiguration_plan/get` service response
         """
-        reconfig_plan_dict = self.typedb_interface.get_reconfiguration_plan(
-            datetime.fromisoformat(req.reconfig_plan.start_time))
+        reconfig_plan_dict = \
+            self.typedb_interface.get_reconfiguration_plan_details(
+                datetime.fromisoformat(req.reconfig_plan.start_time))
         if reconfig_plan_dict is not None:
             res.reconfig_plan = self.reconfig_plan_dict_to_ros_msg(
                 reconfig_plan_dict)
@@ -941,6 +1659,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ComponentQuery.Response())
+    @measure_latency(name='~/component/active/set')
+    @lock_kb(write=True)
     def set_component_active_cb(
         self,
         req: rosa_msgs.srv.ComponentQuery.Request,
@@ -966,6 +1686,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ComponentQuery.Response())
+    @measure_latency(name='~/component/active/get')
+    @lock_kb(write=False)
     def get_component_active_cb(
         self,
         req: rosa_msgs.srv.ComponentQuery.Request,
@@ -990,6 +1712,8 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=GetComponentParameters.Response())
+    @measure_latency(name='~/component_parameters/get')
+    @lock_kb(write=False)
     def get_component_parameters_cb(
         self,
         req: rosa_msgs.srv.GetComponentParameters.Request,
@@ -1019,6 +1743,10 @@ class RosaKB(ROSTypeDBInterface):
         return res
 
     @check_lc_active(response=ReconfigurationPlanQuery.Response())
+    @measure_latency(name='~/reconfiguration_plan/result/set')
+    @trace_stage(stage='~/reconfiguration_plan/result/set')
+    @publish_event(event_type='reconfiguration_plan_failed')
+    @lock_kb(write=True)
     def set_reconfiguration_plan_result_service_cb(
         self,
         req: rosa_msgs.srv.ReconfigurationPlanQuery.Request,
@@ -1028,18 +1756,64 @@ class RosaKB(ROSTypeDBInterface):
         Set reconfiguration plan result (callback).
 
         Callback from service `~/reconfiguration_plan/result/set`. Set
-        recongiration plan result.
+        recongiration plan result. It is the last stage of the plan trace,
+        the latency from the start of the trace is recorded in the latency
+        stats, see :data:`LOOP_LATENCY_NAMES`. Publish
+        `reconfiguration_plan_failed` in `rosa_kb/events` topic when the
+        plan was not completed, with the components it activates and
+        deactivates.
 
         :param req: `~/reconfiguration_plan/result/set` service request
         :param res: `~/reconfiguration_plan/result/set` service response
         :return: `~/reconfiguration_plan/result/set` service response
         """
-        res_update = self.typedb_interface.update_reconfiguration_plan_result(
-            req.reconfig_plan.start_time, req.reconfig_plan.result)
+        trace_id = req.reconfig_plan.trace_id or self.tracer.find(
+            ('reconfiguration_plan', req.reconfig_plan.start_time))
+        self.tracer.set_trace_id(trace_id)
+        try:
+            with self.typedb_interface.batch():
+                res_update = self.typedb_interface\
+                    .update_reconfiguration_plan_result(
+                        req.reconfig_plan.start_time, req.reconfig_plan.result)
+                if res_update is not None \
+                   and req.reconfig_plan.result is True:
+                    self.typedb_interface\
+                        .update_outdated_reconfiguration_plans_result()
+                if res_update is not None \
+                   and req.reconfig_plan.result != 'completed':
+                    # the components may not have the statuses of the
+                    # selected configuration
+                    reconfig_plan = \
+                        self.typedb_interface.get_reconfiguration_plan(
+                            datetime.fromisoformat(
+                                req.reconfig_plan.start_time))
+                    self.record_change(
+                        'components',
+                        reconfig_plan['c_activate'] +
+                        reconfig_plan['c_deactivate'])
+        except TypeDBDriverException as e:
+            self.get_logger().error(
+                'failed to set reconfiguration plan result: {}'.format(e))
+            return res
         if res_update is not None:
-            if req.reconfig_plan.result is True:
-                self.typedb_interface\
-                    .update_outdated_reconfiguration_plans_result()
             res.success = True
             res.reconfig_plan.result = req.reconfig_plan.result
+            self.record_loop_latency(trace_id)
         return res
+
+    def record_loop_latency(self, trace_id: str | None) -> None:
+        """
+        Record the latency of a MAPE-K loop trace up to now.
+
+        The latency is recorded in the latency stats with the name of the
+        stage that started the trace, see :data:`LOOP_LATENCY_NAMES`.
+
+        :param trace_id: trace ID
+        """
+        if not trace_id:
+            return
+        trace = self.tracer.get_trace(trace_id)
+        if len(trace) > 0 and trace[0]['name'] in LOOP_LATENCY_NAMES:
+            self.latency_stats.record(
+                LOOP_LATENCY_NAMES[trace[0]['name']],
+                time.time() - trace[0]['start'])
@@ -0,0 +1,163 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Reader/writer lock for the KB operations."""
+
+import contextlib
+import threading
+
+from typing import Iterator
+from typing import TypedDict
+
+
+class ReadWriteLockStatsDict(TypedDict):
+    """TypedDict for reader/writer lock statistics."""
+
+    readers: int  #: number of threads reading
+    readers_waiting: int  #: number of threads waiting to read
+    writers_waiting: int  #: number of threads waiting to write
+    writes: int  #: number of writes performed
+
+
+class ReadWriteLock:
+    """
+    Phase-fair reader/writer lock.
+
+    Any number of threads can hold the lock for reading, while only a single
+    thread can hold it for writing. Reading and writing phases alternate:
+    readers that arrive while a writer is waiting wait for its write, and all
+    readers waiting when a write ends are let in before the next write
+    starts. Thus, neither a burst of writes nor a stream of reads can starve
+    the other.
+
+    The lock is reentrant, and a thread holding it for writing can also read.
+    A thread holding it only for reading cannot write, as two readers
+    upgrading at the same time would wait for each other forever.
+    """
+
+    def __init__(self) -> None:
+        """Create ReadWriteLock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._readers = 0
+        self._readers_waiting = 0
+        self._readers_admitted = 0
+        self._writers_waiting = 0
+        self._writer = None
+        self._write_depth = 0
+        self._phase = 0
+        self._writes = 0
+
+    def _get_reads(self) -> list[bool]:
+        # whether each read held by the current thread is counted in
+        # `_readers`, reads inside a write are not
+        if not hasattr(self._local, 'reads'):
+            self._local.reads = []
+        return self._local.reads
+
+    def acquire_read(self) -> None:
+        """Acquire the lock for reading, blocking until it is available."""
+        reads = self._get_reads()
+        if len(reads) > 0 or self._writer == threading.get_ident():
+            reads.append(False)
+            return
+        with self._condition:
+            if self._writer is not None or self._writers_waiting > 0:
+                self._readers_waiting += 1
+                phase = self._phase
+                self._condition.wait_for(lambda: self._phase != phase)
+                self._readers_admitted -= 1
+            self._readers += 1
+        reads.append(True)
+
+    def release_read(self) -> None:
+        """Release the lock acquired for reading."""
+        reads = self._get_reads()
+        if len(reads) == 0:
+            raise RuntimeError('cannot release un-acquired read lock')
+        if reads.pop() is False:
+            return
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Acquire the lock for writing, blocking until it is available.
+
+        :raises RuntimeError: if the current thread holds the lock only for
+            reading
+        """
+        if self._writer == threading.get_ident():
+            self._write_depth += 1
+            return
+        if len(self._get_reads()) > 0:
+            raise RuntimeError('cannot upgrade read lock to write lock')
+        with self._condition:
+            self._writers_waiting += 1
+            self._condition.wait_for(
+                lambda: self._writer is None and self._readers == 0
+                and self._readers_admitted == 0)
+            self._writers_waiting -= 1
+            self._writer = threading.get_ident()
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """Release the lock acquired for writing."""
+        if self._writer != threading.get_ident():
+            raise RuntimeError('cannot release un-acquired write lock')
+        self._write_depth -= 1
+        if self._write_depth > 0:
+            return
+        with self._condition:
+            self._writer = None
+            self._writes += 1
+            # let in the readers that waited for this write
+            self._readers_admitted += self._readers_waiting
+            self._readers_waiting = 0
+            self._phase += 1
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock for reading (Context manager)."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock for writing (Context manager)."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def stats(self) -> ReadWriteLockStatsDict:
+        """
+        Get lock statistics.
+
+        :return: dict with the number of threads reading, waiting to read,
+            waiting to write, and the number of writes performed
+        """
+        with self._condition:
+            return {
+                'readers': self._readers,
+                'readers_waiting': self._readers_waiting,
+                'writers_waiting': self._writers_waiting,
+                'writes': self._writes,
+            }
@@ -0,0 +1,194 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Log of the TypeQL queries slower than a threshold.
+
+Each slow query is written as a JSON line in a rotating log file, e.g.::
+
+    {"time": "2024-05-02T10:31:07.412", "id": "5d0f3b1c8e2a",
+     "method": "get_adaptable_things_raw", "query_type": "fetch",
+     "infer": true, "duration": 0.734, "result_size": 12,
+     "fingerprint": "match $ea isa Function, has function-name ?; ..."}
+
+The fingerprint is the query with its literals replaced by `?`, so queries
+built by the same method with different names share the same fingerprint
+and `id`.
+"""
+
+import datetime
+import hashlib
+import inspect
+import json
+import logging
+import logging.handlers
+import re
+import threading
+
+from typing import Any
+from typing import Optional
+
+
+_LITERALS = re.compile(
+    r'"(?:[^"\\]|\\.)*"'
+    r'|\b\d{4}-\d{2}-\d{2}T[\d:.]+'
+    r'|(?<![\w$-])-?\d+(?:\.\d+)?(?![\w-])')
+_REPEATED_DISJUNCTIONS = re.compile(r'(\{[^{}]*\})(?: or \1)+')
+
+#: methods that only perform queries built by their callers
+_QUERY_METHODS = {
+    'database_query',
+    'write_queries',
+    'insert_database',
+    'delete_database',
+    'update_database',
+    'fetch_database',
+    'get_database',
+    'get_aggregate_database',
+}
+
+
+def fingerprint_query(query: str) -> str:
+    """
+    Normalize a TypeQL query, removing its literals.
+
+    Strings, datetimes, and numbers are replaced by `?`, repeated
+    disjunctions of the same pattern, as created by
+    :func:`rosa_kb.typedb_model_interface.create_value_disjunction_query`,
+    are replaced by a single one, and whitespace is collapsed.
+
+    :param query: TypeQL query
+    :return: query fingerprint
+    """
+    fingerprint = _LITERALS.sub('?', ' '.join(query.split()))
+    return _REPEATED_DISJUNCTIONS.sub(r'\1 or ...', fingerprint)
+
+
+def get_result_size(result: Any) -> int:
+    """
+    Get the number of answers of a query result.
+
+    :param result: query result
+    :return: number of answers, 0 when the query failed
+    """
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def get_calling_method(obj: Any) -> str | None:
+    """
+    Get the method of an object that issued the query being performed.
+
+    :param obj: object performing the query, e.g., a model interface
+    :return: name of the innermost method of `obj` in the call stack that
+        is not a generic query method, or None if there is none
+    """
+    frame = inspect.currentframe()
+    try:
+        while frame is not None:
+            name = frame.f_code.co_name
+            # decorators, e.g., cached_query, may also have a `self` local
+            if frame.f_locals.get('self') is obj and \
+               hasattr(type(obj), name) and \
+               name not in _QUERY_METHODS and not name.startswith('_'):
+                return name
+            frame = frame.f_back
+    finally:
+        del frame
+    return None
+
+
+class SlowQueryLog:
+    """
+    Rotating log file of slow TypeQL queries.
+
+    The log file is rotated when it reaches `max_bytes`, keeping
+    `backup_count` old files. All methods are thread-safe.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            threshold: Optional[float] = 0.1,
+            max_bytes: Optional[int] = 10 * 1024 * 1024,
+            backup_count: Optional[int] = 5) -> None:
+        """
+        Create SlowQueryLog.
+
+        :param path: path of the log file
+        :param threshold: queries that take longer than this (s) are logged
+        :param max_bytes: size (bytes) of the log file when it is rotated
+        :param backup_count: number of rotated log files kept
+        """
+        self.path = path
+        self.threshold = threshold
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+        # not registered in the logging module, so records are not
+        # propagated to the other handlers
+        self._logger = logging.Logger('rosa_kb.slow_query_log')
+        self._logger.addHandler(self._handler)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def record(
+            self,
+            obj: Any,
+            query_type: str,
+            query: str,
+            duration: float,
+            result: Any,
+            infer: Optional[bool] = None) -> bool:
+        """
+        Log a query if it is slower than the threshold.
+
+        :param obj: object that performed the query, used to find the
+            method that issued it, see :func:`get_calling_method`
+        :param query_type: query type, e.g., 'fetch', 'insert'
+        :param query: TypeQL query
+        :param duration: query duration (s)
+        :param result: query result
+        :param infer: whether the query was performed with inference
+        :return: whether the query was logged
+        """
+        if duration <= self.threshold:
+            return False
+        fingerprint = fingerprint_query(query)
+        entry = {
+            'time': datetime.datetime.now().isoformat(
+                timespec='milliseconds'),
+            'id': hashlib.sha1(fingerprint.encode()).hexdigest()[:12],
+            'method': get_calling_method(obj),
+            'query_type': query_type,
+            'infer': infer,
+            'duration': round(duration, 6),
+            'result_size': get_result_size(result),
+            'fingerprint': fingerprint,
+        }
+        self._logger.warning(json.dumps(entry))
+        with self._lock:
+            self._count += 1
+        return True
+
+    @property
+    def count(self) -> int:
+        """Number of queries logged."""
+        with self._lock:
+            return self._count
+
+    def close(self) -> None:
+        """Close the log file."""
+        self._handler.close()
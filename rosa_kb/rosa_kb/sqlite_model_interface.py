@@ -0,0 +1,794 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Implementation of ROSA's knowledge model persisted in SQLite.
+
+The things are stored in three indexed tables, `thing`, `has` and `plays`,
+with the instances, their attributes and the role players of the relations.
+The statuses derived by the rules in `schema.tql` are computed in SQL, rule
+by rule, see :data:`STATUS_RULES`.
+
+The tables are generic, instead of one table per entity type, since the
+schema files define the types, their attributes, and roles, and they can
+be extended without changing this module. The query plans do not depend on
+the schema or the data: `has` is only accessed by thing or by attribute
+and value, and `plays` by relation or by player and role, each with a
+covering index, so the queries never scan them. The derived statuses join
+the indexed `isa` table, and only `thing` is scanned to rebuild it.
+`ANALYZE` is not run, so the plans do not change as the KB grows.
+"""
+
+import contextlib
+import sqlite3
+
+from datetime import datetime
+
+from rosa_kb.kb_snapshot import fingerprint_files
+from rosa_kb.kb_snapshot import get_paths
+from rosa_kb.memory_model_interface import MemoryModelInterface
+from rosa_kb.memory_model_interface import STATUS_ATTRIBUTES
+from rosa_kb.memory_model_interface import Thing
+from rosa_kb.slow_query_log import SlowQueryLog
+
+from typing import Any
+from typing import Callable
+from typing import Generator
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+
+TABLES = '''
+    CREATE TABLE IF NOT EXISTS metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS type_hierarchy (
+        type TEXT PRIMARY KEY,
+        supertype TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS thing (
+        id INTEGER PRIMARY KEY,
+        type TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS thing_type ON thing (type);
+    CREATE TABLE IF NOT EXISTS has (
+        thing INTEGER NOT NULL,
+        attribute TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        value NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS has_thing ON has (thing, attribute, value);
+    CREATE INDEX IF NOT EXISTS has_attribute ON has (attribute, value);
+    CREATE TABLE IF NOT EXISTS plays (
+        relation INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        player INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS plays_relation ON plays (relation, role);
+    CREATE INDEX IF NOT EXISTS plays_player ON plays (player, role);
+'''
+
+#: tables with the instances of each type and the derived attributes,
+#: recomputed by the queries created by :func:`create_derivation_queries`
+DERIVED_TABLES = '''
+    CREATE TEMP TABLE isa (
+        thing INTEGER NOT NULL,
+        type TEXT NOT NULL
+    );
+    CREATE INDEX temp.isa_type ON isa (type, thing);
+    CREATE INDEX temp.isa_thing ON isa (thing, type);
+    CREATE TEMP TABLE required (
+        thing INTEGER PRIMARY KEY
+    );
+    CREATE TEMP TABLE status (
+        thing INTEGER NOT NULL,
+        attribute TEXT NOT NULL,
+        value TEXT NOT NULL,
+        UNIQUE (attribute, thing, value)
+    );
+'''
+
+
+def _links(relation: str, role: str, related_role: str) -> str:
+    return f'''
+        SELECT p.player AS thing, r.player AS related
+        FROM plays AS p
+        JOIN isa ON isa.thing = p.relation AND isa.type = '{relation}'
+        JOIN plays AS r
+            ON r.relation = p.relation AND r.role = '{related_role}'
+        WHERE p.role = '{role}'
+    '''
+
+
+def _relation_players(relation: str, role: str) -> str:
+    return f'''
+        SELECT p.player AS thing, p.relation AS related
+        FROM plays AS p
+        JOIN isa ON isa.thing = p.relation AND isa.type = '{relation}'
+        WHERE p.role = '{role}'
+    '''
+
+
+def _values(values: Iterable[str]) -> str:
+    return ', '.join("'{}'".format(value) for value in values)
+
+
+def _has_status(view: str, thing: str, values: Iterable[str]) -> str:
+    return f'''EXISTS (
+        SELECT 1 FROM {view} AS s
+        WHERE s.thing = {thing} AND s.value IN ({_values(values)}))'''
+
+
+def _related(
+        link: str,
+        status_view: Optional[str] = None,
+        condition: str = '1',
+        selected: bool = False) -> str:
+    join = ''
+    if selected:
+        join += ' JOIN selected ON selected.thing = l.related'
+    if status_view is not None:
+        join += f' JOIN {status_view} AS ls ON ls.thing = l.related'
+    return f'''EXISTS (
+        SELECT 1 FROM {link} AS l{join}
+        WHERE l.thing = t.thing AND {condition})'''
+
+
+_REQUIRED = 't.thing IN (SELECT thing FROM required)'
+_NOT_REQUIRED = 't.thing NOT IN (SELECT thing FROM required)'
+_SELECTED = 't.thing IN (SELECT thing FROM selected)'
+_NOT_SELECTED = 't.thing NOT IN (SELECT thing FROM selected)'
+_VIOLATED = 't.thing IN (SELECT thing FROM violated)'
+_ALL_SOLVED = '''NOT EXISTS (
+    SELECT 1 FROM component_status AS s
+    WHERE s.thing = l.related AND s.value != 'solved')'''
+
+#: views used by the status rules, with the form (NAME, SELECT STATEMENT)
+VIEWS = [
+    ('type_closure', '''
+        WITH RECURSIVE sub (type, supertype) AS (
+            SELECT DISTINCT type, type FROM thing
+            UNION
+            SELECT sub.type, h.supertype FROM sub
+            JOIN type_hierarchy AS h ON h.type = sub.supertype
+        )
+        SELECT thing.id AS thing, sub.supertype AS type
+        FROM thing JOIN sub ON sub.type = thing.type
+    '''),
+    ('selected', '''
+        SELECT thing FROM has WHERE attribute = 'is-selected' AND value = 1
+    '''),
+    ('active', '''
+        SELECT thing FROM has WHERE attribute = 'is-active' AND value = 1
+    '''),
+    ('component_cc', _relation_players(
+        'component-configuration', 'component')),
+    ('fd_component', '''
+        SELECT p.relation AS thing, p.player AS related FROM plays AS p
+        JOIN isa ON isa.thing = p.relation AND isa.type = 'function-design'
+        WHERE p.role = 'required-component'
+    '''),
+    ('function_fd', _relation_players('function-design', 'function')),
+    ('action_function', _links(
+        'functional-requirement', 'action', 'required-function')),
+    ('action_required', '''
+        SELECT thing FROM has WHERE attribute = 'is-required' AND value = 1
+        UNION
+        SELECT p.player FROM plays AS p
+        JOIN isa ON isa.thing = p.relation AND isa.type = 'required-action'
+        WHERE p.role = 'action' AND NOT EXISTS (
+            SELECT 1 FROM has
+            WHERE has.thing = p.relation AND has.attribute = 'result')
+    '''),
+    ('requirement', '''
+        SELECT thing FROM action_required
+        UNION
+        SELECT af.related FROM action_function AS af
+        JOIN action_required AS r ON r.thing = af.thing
+        UNION
+        SELECT fc.related FROM fd_component AS fc
+        JOIN selected ON selected.thing = fc.thing
+    '''),
+    ('latest_measurement', '''
+        SELECT p.player AS attribute, v.value AS value FROM plays AS p
+        JOIN isa ON isa.thing = p.relation AND isa.type = 'measurement'
+        JOIN has AS l ON l.thing = p.relation
+            AND l.attribute = 'latest' AND l.value = 1
+        JOIN has AS v ON v.thing = p.relation
+            AND v.attribute = 'measurement-value'
+        WHERE p.role = 'measured-attribute'
+    '''),
+    ('constraint_evaluation', '''
+        SELECT c.relation AS thing, CASE WHEN
+            CASE COALESCE(op.value, '>=')
+                WHEN '>=' THEN m.value >= av.value
+                WHEN '>' THEN m.value > av.value
+                WHEN '<=' THEN m.value <= av.value
+                ELSE m.value < av.value
+            END
+            THEN 'satisfied' ELSE 'violated' END AS value
+        FROM plays AS c
+        JOIN isa ON isa.thing = c.relation AND isa.type = 'constraint'
+        JOIN has AS av ON av.thing = c.relation
+            AND av.attribute = 'attribute-value'
+        JOIN latest_measurement AS m ON m.attribute = c.player
+        LEFT JOIN has AS op ON op.thing = c.relation
+            AND op.attribute = 'constraint-operator'
+        WHERE c.role = 'constraint'
+            AND COALESCE(op.value, '>=') IN ('>=', '>', '<=', '<')
+        UNION
+        SELECT c.relation, 'not evaluated' FROM plays AS c
+        JOIN isa ON isa.thing = c.relation AND isa.type = 'constraint'
+        WHERE c.role = 'constraint'
+            AND EXISTS (
+                SELECT 1 FROM plays AS x
+                WHERE x.relation = c.relation AND x.role = 'constrained')
+            AND NOT EXISTS (
+                SELECT 1 FROM latest_measurement AS m
+                WHERE m.attribute = c.player)
+    '''),
+    ('constraint_status', '''
+        SELECT thing, value FROM status WHERE attribute = 'constraint-status'
+    '''),
+    ('violated', '''
+        SELECT x.player AS thing FROM plays AS x
+        JOIN constraint_status AS s ON s.thing = x.relation
+            AND s.value = 'violated'
+        WHERE x.role = 'constrained'
+    '''),
+]
+
+#: rules deriving each status, with the form
+#: {THING TYPE: [(STATUS, CONDITION)]}. The rules are applied in order, and
+#: each condition is a function that receives the name of the view with the
+#: statuses of the thing type, and returns a SQL expression on the instance
+#: `t.thing`
+STATUS_RULES: dict[str, list[Tuple[str, Callable[[str], str]]]] = {
+    'component-configuration': [
+        ('unfeasible', lambda status: _VIOLATED),
+        ('feasible', lambda status: f'''
+            NOT {_has_status(status, 't.thing', ['unfeasible'])}'''),
+    ],
+    'Component': [
+        ('unfeasible', lambda status: f'''
+            ({_related('component_cc')} AND NOT {_related(
+                'component_cc', 'component_configuration_status',
+                "ls.value != 'unfeasible'")})
+            OR {_VIOLATED}'''),
+        ('configuration error', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(
+                status, 't.thing', ['unfeasible', 'failure'])}
+            AND {_related(
+                'component_cc', 'component_configuration_status',
+                "ls.value = 'unfeasible'", selected=True)}'''),
+        ('unsolved', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'failure', 'configuration error'])}
+            AND t.thing NOT IN (SELECT thing FROM active)'''),
+        ('solved', lambda status: f'''
+            {_REQUIRED} AND t.thing IN (SELECT thing FROM active)
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'failure', 'configuration error',
+                'unsolved'])}
+            AND ({_related(
+                'component_cc', 'component_configuration_status',
+                "ls.value = 'feasible'", selected=True)}
+                OR NOT {_related('component_cc')})'''),
+        ('feasible', lambda status: f'''
+            {_NOT_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'failure', 'configuration error', 'unsolved',
+                'solved'])}
+            AND ({_related(
+                'component_cc', 'component_configuration_status',
+                "ls.value = 'feasible'")}
+                OR NOT {_related('component_cc')})'''),
+    ],
+    'function-design': [
+        ('unfeasible', lambda status: f'''
+            {_related('fd_component', 'component_status', 'NOT ' + _has_status(
+                'component_status', 'l.related', [
+                    'configuration error', 'unsolved', 'solved',
+                    'feasible']))}
+            OR {_VIOLATED}'''),
+        ('implicit configuration error', lambda status: f'''
+            {_SELECTED}
+            AND NOT {_has_status(status, 't.thing', ['unfeasible'])}
+            AND {_related(
+                'fd_component', 'component_status',
+                "ls.value = 'configuration error' AND NOT " + _has_status(
+                    'component_status', 'l.related', ['unfeasible']))}'''),
+        ('unsolved', lambda status: f'''
+            {_SELECTED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'implicit configuration error'])}
+            AND {_related(
+                'fd_component', 'component_status',
+                'ls.value NOT IN ({})'.format(_values([
+                    'failure', 'unfeasible', 'configuration error',
+                    'solved'])))}'''),
+        ('solved', lambda status: f'''
+            {_SELECTED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'implicit configuration error', 'unsolved'])}
+            AND {_related('fd_component', condition=_ALL_SOLVED)}'''),
+        ('feasible', lambda status: f'''
+            {_NOT_SELECTED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'implicit configuration error', 'unsolved',
+                'solved'])}
+            AND {_related('fd_component', condition='NOT ' + _has_status(
+                'component_status', 'l.related',
+                ['unfeasible', 'failure']))}'''),
+    ],
+    'Function': [
+        ('unfeasible', lambda status: f'''
+            NOT {_related(
+                'function_fd', 'function_design_status',
+                "ls.value != 'unfeasible'")}'''),
+        ('configuration error', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', ['unfeasible'])}
+            AND {_related(
+                'function_fd', 'function_design_status',
+                "ls.value = 'unfeasible'", selected=True)}'''),
+        ('implicit configuration error', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(
+                status, 't.thing', ['unfeasible', 'configuration error'])}
+            AND {_related(
+                'function_fd', 'function_design_status',
+                "ls.value = 'implicit configuration error'",
+                selected=True)}'''),
+        ('solved', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'configuration error',
+                'implicit configuration error'])}
+            AND {_related(
+                'function_fd', 'function_design_status',
+                "ls.value = 'solved'", selected=True)}'''),
+        ('unsolved', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'configuration error',
+                'implicit configuration error', 'solved'])}
+            AND NOT {_related(
+                'function_fd', 'function_design_status',
+                'ls.value IN ({})'.format(_values([
+                    'unfeasible', 'implicit configuration error',
+                    'feasible', 'solved'])),
+                selected=True)}'''),
+        ('feasible', lambda status: f'''
+            {_NOT_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'configuration error',
+                'implicit configuration error', 'unsolved', 'solved'])}
+            AND {_related(
+                'function_fd', 'function_design_status',
+                "ls.value != 'unfeasible'")}'''),
+    ],
+    'Action': [
+        ('unfeasible', lambda status: f'''
+            {_related(
+                'action_function', 'function_status',
+                "ls.value = 'unfeasible'")}
+            OR {_VIOLATED}'''),
+        ('implicit configuration error', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', ['unfeasible'])}
+            AND {_related(
+                'action_function', 'function_status',
+                'ls.value IN ({})'.format(_values([
+                    'configuration error',
+                    'implicit configuration error'])))}'''),
+        ('unsolved', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'implicit configuration error'])}
+            AND {_related(
+                'action_function', 'function_status',
+                "ls.value = 'unsolved'")}'''),
+        ('solved', lambda status: f'''
+            {_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'implicit configuration error', 'unsolved'])}
+            AND {_related(
+                'action_function', 'function_status',
+                "ls.value = 'solved'")}'''),
+        ('feasible', lambda status: f'''
+            {_NOT_REQUIRED}
+            AND NOT {_has_status(status, 't.thing', [
+                'unfeasible', 'implicit configuration error', 'unsolved',
+                'solved'])}
+            AND {_related(
+                'action_function', 'function_status',
+                "ls.value != 'unfeasible'")}'''),
+    ],
+}
+
+
+def create_views() -> list[Tuple[str, str]]:
+    """
+    Create the views used to derive the statuses.
+
+    Besides the :data:`VIEWS`, there is one view per status attribute,
+    named after it, e.g., `component_status`, with the statuses in the
+    `status` table, and a `derived_attribute` view with the statuses and
+    'is-required' attributes that are not stored in the KB.
+
+    :return: list of tuples with the form (NAME, SELECT STATEMENT), in the
+        order they must be created
+    """
+    views = list(VIEWS)
+    for attribute in STATUS_ATTRIBUTES.values():
+        if attribute != 'constraint-status':
+            views.append((attribute.replace('-', '_'), f'''
+                SELECT thing, value FROM status WHERE attribute = '{attribute}'
+            '''))
+    views.append(('derived_attribute', '''
+        SELECT thing, attribute, value FROM (
+            SELECT thing, attribute, value FROM status
+            UNION ALL
+            SELECT thing, 'is-required', 1 FROM required) AS d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM has AS h WHERE h.thing = d.thing
+            AND h.attribute = d.attribute AND h.value = d.value)
+    '''))
+    return views
+
+
+def create_derivation_queries() -> list[str]:
+    """
+    Create the queries that derive the statuses and 'is-required'.
+
+    First, the instances of each type and the required things are computed.
+    Then, the `status` table is filled with the statuses stored in the KB,
+    the constraint statuses, and the statuses derived by each rule in
+    :data:`STATUS_RULES`, in order. Thus, each rule sees the statuses
+    derived by the previous ones, as the rules in `schema.tql` do.
+
+    :return: queries, in the order they must be performed
+    """
+    queries = [
+        'DELETE FROM isa',
+        'INSERT INTO isa SELECT thing, type FROM type_closure',
+        'DELETE FROM required',
+        'INSERT INTO required SELECT DISTINCT thing FROM requirement',
+        'DELETE FROM status',
+        '''INSERT OR IGNORE INTO status
+           SELECT thing, attribute, value FROM has
+           WHERE attribute IN ({})'''.format(
+            _values(STATUS_ATTRIBUTES.values())),
+        '''INSERT OR IGNORE INTO status
+           SELECT thing, 'constraint-status', value
+           FROM constraint_evaluation''',
+    ]
+    for thing_type, rules in STATUS_RULES.items():
+        attribute = STATUS_ATTRIBUTES[thing_type]
+        view = attribute.replace('-', '_')
+        for status, condition in rules:
+            queries.append(f'''
+                INSERT OR IGNORE INTO status
+                SELECT t.thing, '{attribute}', '{status}' FROM isa AS t
+                WHERE t.type = '{thing_type}' AND ({condition(view)})
+            ''')
+    return queries
+
+
+def to_sql_value(value: Any) -> Tuple[str, Any]:
+    """
+    Convert an attribute value to the value stored in SQLite.
+
+    :param value: attribute value
+    :return: tuple with the form (VALUE TYPE, SQL VALUE)
+    """
+    if isinstance(value, bool):
+        return 'boolean', int(value)
+    if isinstance(value, int):
+        return 'long', value
+    if isinstance(value, float):
+        return 'double', value
+    if isinstance(value, datetime):
+        return 'datetime', value.isoformat()
+    return 'string', str(value)
+
+
+def from_sql_value(kind: str, value: Any) -> Any:
+    """
+    Convert a value stored in SQLite to the attribute value.
+
+    :param kind: value type, as returned by :func:`to_sql_value`
+    :param value: SQL value
+    :return: attribute value
+    """
+    if kind == 'boolean':
+        return bool(value)
+    if kind == 'datetime':
+        return datetime.fromisoformat(value)
+    if kind == 'double':
+        return float(value)
+    return value
+
+
+class SQLiteModelInterface(MemoryModelInterface):
+    """
+    ROSA knowledge model persisted in a SQLite database.
+
+    Implements the same interface as
+    :class:`rosa_kb.memory_model_interface.MemoryModelInterface`. Every write
+    is stored in SQLite, and committed when the outermost
+    :meth:`batch` finishes. The things are also kept in memory, indexed as
+    in :class:`MemoryModelInterface`, but the statuses and the 'is-required'
+    attribute are derived in SQL by the queries created by
+    :func:`create_derivation_queries`.
+    """
+
+    def __init__(
+            self,
+            address: Optional[str] = None,
+            database_name: Optional[str] = None,
+            schema_path: Optional[list[str] | str] = None,
+            data_path: Optional[list[str] | str] = None,
+            force_database: Optional[bool] = False,
+            force_data: Optional[bool] = False,
+            infer: Optional[bool] = False,
+            cache_size: Optional[int] = 256,
+            materialize_status: Optional[bool] = False,
+            check_fingerprint: Optional[bool] = False,
+            snapshot_dir: Optional[str] = None,
+            bulk_load_workers: Optional[int] = 0,
+            bulk_load_chunk_size: Optional[int] = 1000,
+            slow_query_log: Optional[SlowQueryLog] = None) -> None:
+        """
+        Create SQLiteModelInterface.
+
+        The data files are only loaded when the database is empty, or when
+        `force_database` or `force_data` are true. Otherwise, the things
+        stored in the database are loaded.
+
+        When `check_fingerprint` is true, the things stored in the database
+        are only kept if they were loaded from the same schema and data
+        files, and not modified since, see
+        :attr:`MemoryModelInterface.fingerprint`. In that case,
+        `force_database` and `force_data` are ignored. Otherwise, the stored
+        things are deleted and the data files are loaded, or restored from
+        their snapshot when `snapshot_dir` is set.
+
+        :param address: ignored
+        :param database_name: path of the SQLite database file, when it is
+            empty or ':memory:' the database is not persisted
+        :param schema_path: path of the schema files
+        :param data_path: path of the data files
+        :param force_database: if the database should be deleted
+        :param force_data: if the data stored should be deleted
+        :param infer: only kept in :attr:`MemoryModelInterface.infer`,
+            statuses are always derived
+        :param cache_size: maximum number of cached reads, 0 disables the
+            cache
+        :param materialize_status: only sets
+            :attr:`MemoryModelInterface.infer` to False, statuses are always
+            derived
+        :param check_fingerprint: if the stored things should only be kept
+            when they match the schema and data files
+        :param snapshot_dir: directory of the KB snapshots, snapshots are
+            not used when it is None or empty
+        :param bulk_load_workers: ignored, the data files are loaded by
+            :meth:`load_data`, writes are serialized by the KB lock
+        :param bulk_load_chunk_size: ignored
+        :param slow_query_log: ignored, TypeQL queries are not performed
+        """
+        self._ids = dict()
+        self._connection = sqlite3.connect(
+            database_name or ':memory:', check_same_thread=False)
+        self._connection.executescript(TABLES)
+
+        schema_path = get_paths(schema_path)
+        data_path = get_paths(data_path)
+        fingerprint = fingerprint_files(schema_path + data_path)
+        stored_fingerprint = self._connection.execute(
+            "SELECT value FROM metadata WHERE key = 'fingerprint'"
+        ).fetchone()
+        if check_fingerprint and stored_fingerprint == (fingerprint,):
+            force_database = False
+            force_data = False
+        elif check_fingerprint:
+            force_data = True
+        if force_database:
+            self._drop_database()
+            self._connection.executescript(TABLES)
+        if force_data:
+            self._connection.executescript(
+                'DELETE FROM metadata; DELETE FROM plays; DELETE FROM has; '
+                'DELETE FROM thing;')
+        self._connection.commit()
+
+        super().__init__(
+            schema_path=schema_path,
+            infer=infer,
+            cache_size=cache_size,
+            materialize_status=materialize_status)
+        self._create_views()
+
+        if self._connection.execute(
+                'SELECT 1 FROM thing LIMIT 1').fetchone() is not None:
+            self._load_things()
+            if stored_fingerprint is not None:
+                self.fingerprint = stored_fingerprint[0]
+            return
+
+        self._load_data_files(fingerprint, data_path, snapshot_dir)
+        self._store_fingerprint()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _drop_database(self) -> None:
+        for (name,) in self._connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+                ).fetchall():
+            self._connection.execute(f'DROP TABLE IF EXISTS {name}')
+
+    def _create_views(self) -> None:
+        self._connection.execute('DELETE FROM type_hierarchy')
+        self._connection.executemany(
+            'INSERT INTO type_hierarchy (type, supertype) VALUES (?, ?)',
+            self._supertypes.items())
+        self._connection.executescript(DERIVED_TABLES)
+        for name, select in create_views():
+            self._connection.execute(f'CREATE TEMP VIEW {name} AS {select}')
+        self._connection.commit()
+
+    def _load_things(self) -> None:
+        things = {
+            thing_id: Thing(thing_type)
+            for thing_id, thing_type in self._connection.execute(
+                'SELECT id, type FROM thing ORDER BY id')}
+        for thing_id, attribute, kind, value in self._connection.execute(
+                'SELECT thing, attribute, kind, value FROM has '
+                'ORDER BY rowid'):
+            things[thing_id].attributes.setdefault(attribute, []).append(
+                from_sql_value(kind, value))
+        for relation, role, player in self._connection.execute(
+                'SELECT relation, role, player FROM plays ORDER BY rowid'):
+            things[relation].players.append((role, things[player]))
+        for thing_id, thing in things.items():
+            self._ids[thing] = thing_id
+            super()._link(thing)
+        self._update_last_plan_time()
+        self._version += 1
+
+    def _store_fingerprint(self) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM metadata WHERE key = 'fingerprint'")
+            if self.fingerprint is not None:
+                self._connection.execute(
+                    "INSERT INTO metadata (key, value) "
+                    "VALUES ('fingerprint', ?)", (self.fingerprint,))
+            self._connection.commit()
+
+    def bump_revision(self) -> int:
+        """
+        Increase the KB revision, and clear its stored fingerprint.
+
+        :return: new KB revision
+        """
+        with self._lock:
+            if self.fingerprint is not None:
+                self._connection.execute(
+                    "DELETE FROM metadata WHERE key = 'fingerprint'")
+                if self._batch_depth == 0:
+                    self._connection.commit()
+            return super().bump_revision()
+
+    def restore_snapshot(self, path: str) -> list[Thing]:
+        """
+        Replace all things in the KB with the ones in a snapshot file.
+
+        See :meth:`MemoryModelInterface.restore_snapshot`, the snapshot
+        fingerprint is also stored in the database.
+
+        :param path: path of the snapshot file
+        :return: restored things
+        """
+        with self._lock:
+            restored = super().restore_snapshot(path)
+            self._store_fingerprint()
+        return restored
+
+    @contextlib.contextmanager
+    def batch(self) -> Generator:
+        """
+        Perform all writes issued inside it atomically.
+
+        See :meth:`MemoryModelInterface.batch`. The changes are committed in
+        the database when the outermost batch finishes.
+
+        :return: the model interface
+        """
+        with self._lock:
+            outermost = self._batch_depth == 0
+            try:
+                with super().batch():
+                    yield self
+            finally:
+                if outermost:
+                    self._connection.commit()
+
+    def _link(self, thing: Thing) -> None:
+        super()._link(thing)
+        if thing in self._ids:
+            self._connection.execute(
+                'INSERT INTO thing (id, type) VALUES (?, ?)',
+                (self._ids[thing], thing.type))
+        else:
+            self._ids[thing] = self._connection.execute(
+                'INSERT INTO thing (type) VALUES (?)', (thing.type,)
+            ).lastrowid
+        thing_id = self._ids[thing]
+        self._insert_values(thing_id, [
+            (attribute, value)
+            for attribute, values in thing.attributes.items()
+            for value in values])
+        self._connection.executemany(
+            'INSERT INTO plays (relation, role, player) VALUES (?, ?, ?)',
+            [(thing_id, role, self._ids[player])
+             for role, player in thing.players])
+
+    def _unlink(self, thing: Thing) -> None:
+        super()._unlink(thing)
+        thing_id = self._ids[thing]
+        self._connection.execute('DELETE FROM thing WHERE id = ?', (thing_id,))
+        self._connection.execute(
+            'DELETE FROM has WHERE thing = ?', (thing_id,))
+        self._connection.execute(
+            'DELETE FROM plays WHERE relation = ?', (thing_id,))
+
+    def _replace_values(
+            self, thing: Thing, attribute: str, values: list) -> None:
+        super()._replace_values(thing, attribute, values)
+        thing_id = self._ids[thing]
+        self._connection.execute(
+            'DELETE FROM has WHERE thing = ? AND attribute = ?',
+            (thing_id, attribute))
+        self._insert_values(thing_id, [(attribute, v) for v in values])
+
+    def _insert_values(
+            self, thing_id: int, values: list[Tuple[str, Any]]) -> None:
+        self._connection.executemany(
+            'INSERT INTO has (thing, attribute, kind, value) '
+            'VALUES (?, ?, ?, ?)',
+            [(thing_id, attribute, *to_sql_value(value))
+             for attribute, value in values])
+
+    def _derive(self) -> dict[Thing, dict[str, set]]:
+        for query in create_derivation_queries():
+            self._connection.execute(query)
+        if self._batch_depth == 0:
+            self._connection.commit()
+
+        things = {thing_id: thing for thing, thing_id in self._ids.items()}
+        derived = dict()
+        for thing_id, attribute, value in self._connection.execute(
+                'SELECT thing, attribute, value FROM derived_attribute'):
+            if attribute == 'is-required':
+                value = bool(value)
+            derived.setdefault(things[thing_id], dict()).setdefault(
+                attribute, set()).add(value)
+        return derived
@@ -0,0 +1,292 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Incremental materialization of the statuses derived by the schema rules.
+
+The statuses and the 'is-required' attribute derived by the rules in
+`schema.tql` are stored as `materialized-*` attributes, which are subtypes of
+the derived attributes. Thus, queries performed with `infer=False` see them as
+regular statuses, and they can be told apart from the statuses inserted by the
+user when they need to be recomputed.
+"""
+
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import TypedDict
+
+
+#: derived attributes of each thing type, with the values the rules derive
+MATERIALIZED_ATTRIBUTES = {
+    'constraint': [
+        ('constraint-status', ['violated', 'not evaluated', 'satisfied']),
+    ],
+    'component-configuration': [
+        ('component-configuration-status', ['unfeasible', 'feasible']),
+    ],
+    'Component': [
+        ('component-status', [
+            'unfeasible', 'configuration error', 'unsolved', 'solved',
+            'feasible']),
+        ('is-required', [True]),
+    ],
+    'function-design': [
+        ('function-design-status', [
+            'unfeasible', 'implicit configuration error', 'unsolved',
+            'solved', 'feasible']),
+    ],
+    'Function': [
+        ('function-status', [
+            'unfeasible', 'configuration error',
+            'implicit configuration error', 'unsolved', 'solved', 'feasible']),
+        ('is-required', [True]),
+    ],
+    'Action': [
+        ('action-status', [
+            'unfeasible', 'implicit configuration error', 'unsolved',
+            'solved', 'feasible']),
+        ('is-required', [True]),
+    ],
+}
+
+#: name attribute of each thing type that can be constrained
+CONSTRAINED_TYPES = {
+    'component-configuration-name': 'component-configuration',
+    'component-name': 'Component',
+    'function-design-name': 'function-design',
+    'action-name': 'Action',
+}
+
+
+class StatusDependenciesDict(TypedDict):
+    """TypedDict for the relations the derived statuses depend on."""
+
+    #: {QA/EA NAME: [(CONSTRAINED TYPE, CONSTRAINED NAME)]}
+    constraints: dict[str, list[Tuple[str, str]]]
+    #: {COMPONENT CONFIGURATION NAME: COMPONENT NAME}
+    c_configs: dict[str, str]
+    #: {FUNCTION DESIGN NAME: (FUNCTION NAME, [COMPONENT NAMES])}
+    fds: dict[str, Tuple[str, list[str]]]
+    #: {ACTION NAME: [FUNCTION NAMES]}
+    actions: dict[str, list[str]]
+
+
+#: queries to fetch the relations the derived statuses depend on
+DEPENDENCIES_QUERIES = {
+    'constraints': '''
+        match
+            $r (constraint: $a, constrained: $x) isa constraint;
+            $a has attribute-name $a-name;
+            $x has name $x-name;
+        fetch $a-name; $x-name;
+    ''',
+    'c_configs': '''
+        match
+            $cc (component: $c) isa component-configuration,
+                has component-configuration-name $cc-name;
+            $c has component-name $c-name;
+        fetch $cc-name; $c-name;
+    ''',
+    'fds': '''
+        match
+            $fd (function: $f) isa function-design,
+                has function-design-name $fd-name;
+            $f has function-name $f-name;
+        fetch
+            $fd-name; $f-name;
+            components: {
+                match
+                    $fd (required-component: $c);
+                    $c has component-name $c-name;
+                fetch $c-name;
+            };
+    ''',
+    'actions': '''
+        match
+            (action: $a, required-function: $f) isa functional-requirement;
+            $a has action-name $a-name;
+            $f has function-name $f-name;
+        fetch $a-name; $f-name;
+    ''',
+}
+
+
+def parse_dependencies(
+        results: dict[str, list[dict]]) -> StatusDependenciesDict:
+    """
+    Parse the result of the :data:`DEPENDENCIES_QUERIES`.
+
+    :param results: dict with the form {QUERY KEY: FETCH QUERY RESULT}
+    :return: dependencies of the derived statuses
+    """
+    dependencies = {
+        'constraints': dict(),
+        'c_configs': dict(),
+        'fds': dict(),
+        'actions': dict(),
+    }
+    for r in results.get('constraints', []):
+        x_name = r.get('x-name')
+        x_type = CONSTRAINED_TYPES.get(x_name.get('type').get('label'))
+        if x_type is None:
+            continue
+        dependencies['constraints'].setdefault(
+            r.get('a-name').get('value'), []).append(
+                (x_type, x_name.get('value')))
+    for r in results.get('c_configs', []):
+        dependencies['c_configs'][r.get('cc-name').get('value')] = \
+            r.get('c-name').get('value')
+    for r in results.get('fds', []):
+        dependencies['fds'][r.get('fd-name').get('value')] = (
+            r.get('f-name').get('value'),
+            [c.get('c-name').get('value') for c in r.get('components')])
+    for r in results.get('actions', []):
+        dependencies['actions'].setdefault(
+            r.get('a-name').get('value'), []).append(
+                r.get('f-name').get('value'))
+    return dependencies
+
+
+def get_affected_things(
+        dependencies: StatusDependenciesDict,
+        changes: dict[str, set[str]]) -> dict[str, set[str]]:
+    """
+    Get the things whose derived statuses may be affected by changes.
+
+    The supported change types are:
+
+    - 'Attribute': new measurements of QAs/EAs
+    - 'Action': actions that were requested or cancelled
+    - 'Function': functions whose selected function design changed
+    - 'function-design': function designs selected or unselected
+    - 'component-configuration': component configurations selected or
+      unselected
+    - 'Component': components whose status or 'is-active' attribute changed
+
+    The things directly changed are propagated along the rules, i.e.,
+    constraints affect the things they constrain, component configurations
+    affect their component, components affect the function designs that
+    require them, function designs affect their function, and functions
+    affect the actions that require them.
+
+    :param dependencies: dependencies of the derived statuses
+    :param changes: dict with the form {CHANGE TYPE: NAMES}
+    :return: dict with the form {THING TYPE: NAMES}, the constraints are
+        identified by the name of their QA/EA
+    """
+    affected = {thing_type: set() for thing_type in MATERIALIZED_ATTRIBUTES}
+    fds_by_function = dict()
+    fds_by_component = dict()
+    for fd, (function, components) in dependencies['fds'].items():
+        fds_by_function.setdefault(function, set()).add(fd)
+        for component in components:
+            fds_by_component.setdefault(component, set()).add(fd)
+    actions_by_function = dict()
+    for action, functions in dependencies['actions'].items():
+        for function in functions:
+            actions_by_function.setdefault(function, set()).add(action)
+
+    for attribute in changes.get('Attribute', []):
+        if attribute not in dependencies['constraints']:
+            continue
+        affected['constraint'].add(attribute)
+        for thing_type, name in dependencies['constraints'][attribute]:
+            affected[thing_type].add(name)
+    for action in changes.get('Action', []):
+        affected['Action'].add(action)
+        affected['Function'].update(dependencies['actions'].get(action, []))
+    affected['component-configuration'].update(
+        changes.get('component-configuration', []))
+    affected['Component'].update(changes.get('Component', []))
+    selected_fds = set(changes.get('function-design', []))
+    for function in changes.get('Function', []):
+        selected_fds.update(fds_by_function.get(function, []))
+    for fd in selected_fds:
+        affected['function-design'].add(fd)
+        if fd in dependencies['fds']:
+            affected['Component'].update(dependencies['fds'][fd][1])
+
+    for cc in affected['component-configuration']:
+        if cc in dependencies['c_configs']:
+            affected['Component'].add(dependencies['c_configs'][cc])
+    for component in affected['Component']:
+        affected['function-design'].update(
+            fds_by_component.get(component, []))
+    for fd in affected['function-design']:
+        if fd in dependencies['fds']:
+            affected['Function'].add(dependencies['fds'][fd][0])
+    for function in affected['Function']:
+        affected['Action'].update(actions_by_function.get(function, []))
+    return affected
+
+
+def _convert_value(value: str | bool) -> str:
+    if isinstance(value, bool):
+        return str(value).lower()
+    return "'{}'".format(value)
+
+
+def _create_name_disjunction(names: Iterable[str]) -> str:
+    return ' or '.join(
+        '{{$name == {};}}'.format(_convert_value(name))
+        for name in sorted(names)) + ';'
+
+
+def create_materialization_queries(
+        affected: Optional[dict[str, set[str]]] = None
+         ) -> list[Tuple[str, str]]:
+    """
+    Create the queries to recompute the materialized statuses.
+
+    First, the materialized attributes of the affected things are deleted,
+    then the values derived by the rules are inserted as materialized
+    attributes. The queries must be performed in a single write transaction
+    with inference enabled.
+
+    :param affected: dict with the form {THING TYPE: NAMES} with the things
+        to recompute, as returned by :func:`get_affected_things`. When it is
+        None, all things are recomputed
+    :return: list of tuples with the form (QUERY_TYPE, QUERY)
+    """
+    deletes = []
+    inserts = []
+    for thing_type, attributes in MATERIALIZED_ATTRIBUTES.items():
+        if thing_type == 'constraint':
+            match_thing = '''
+                $t (constraint: $a) isa constraint;
+                $a has attribute-name $name;
+            '''
+        else:
+            match_thing = '$t isa {}, has {}-name $name;'.format(
+                thing_type, thing_type.lower())
+        if affected is not None:
+            names = affected.get(thing_type, set())
+            if len(names) == 0:
+                continue
+            match_thing += _create_name_disjunction(names)
+        for attribute, values in attributes:
+            deletes.append(('delete', f'''
+                match
+                    {match_thing}
+                    $t has materialized-{attribute} $v;
+                delete $t has $v;
+            '''))
+            for value in values:
+                value = _convert_value(value)
+                inserts.append(('insert', f'''
+                    match
+                        {match_thing}
+                        $t has {attribute} {value};
+                    insert $t has materialized-{attribute} {value};
+                '''))
+    return deletes + inserts
@@ -0,0 +1,389 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Parser for the subset of TypeQL used in ROSA's schema and data files.
+
+Only what is needed to load a KB without typeDB is supported: the type
+hierarchy declared in schema files, insert queries without a match clause,
+such as the ones in `rosa_kb/test/test_data`, and match queries made of
+conjunctions of statements, such as `$c isa Component, has component-name
+$name;`.
+"""
+
+import re
+
+from datetime import datetime
+
+from typing import Tuple
+from typing import TypedDict
+
+
+class TQLThingDict(TypedDict):
+    """TypedDict for a thing declared in an insert query."""
+
+    variable: str  #: unique variable name, generated when omitted
+    type: str | None  #: thing type, None when the statement extends a var
+    attributes: list[Tuple[str, str | int | float | bool | datetime]]
+    players: list[Tuple[str, str]]  #: (ROLE, VARIABLE) of the role players
+    #: (ATTRIBUTE, VARIABLE) of the attributes matched to a variable, always
+    #: empty in insert queries
+    variables: list[Tuple[str, str]]
+
+
+class TQLMatchQueryDict(TypedDict):
+    """TypedDict for a match query."""
+
+    patterns: list[TQLThingDict]  #: statements of the match clause
+    fetch: list[str] | None  #: fetched variables, None for get queries
+    get: list[str]  #: variables of the get clause, all when it is empty
+    count: bool  #: whether the answers of the get clause are counted
+
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<comment>\#[^\n]*)
+        | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+        | (?P<datetime>\d{4}-\d{2}-\d{2}T[\d:.]+)
+        | (?P<variable>\$[\w-]+)
+        | (?P<symbol>[(),:;])
+        | (?P<word>[^\s(),:;"'\#]+)
+        | (?P<invalid>\S)
+    )''', re.VERBOSE)
+
+_SUB_RE = re.compile(r'^\s*([\w-]+)\s+sub\s+([\w-]+)', re.MULTILINE)
+
+
+def tokenize(text: str) -> list[Tuple[str, str]]:
+    """
+    Split TypeQL text into tokens, ignoring comments.
+
+    :param text: TypeQL text
+    :return: list of tuples with the form (TOKEN KIND, TOKEN)
+    :raises ValueError: when the text contains an invalid token
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'invalid':
+            position = match.start(kind)
+            raise ValueError(
+                'invalid TypeQL at position {}: {!r}'.format(
+                    position, text[position:position + 20]))
+        if kind != 'comment':
+            tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+def parse_value(kind: str, token: str) -> str | int | float | bool | datetime:
+    """
+    Convert a value token to its python type.
+
+    :param kind: token kind, as returned by :func:`tokenize`
+    :param token: token
+    :return: converted value
+    :raises ValueError: when the token is not a value
+    """
+    if kind == 'string':
+        return token[1:-1].replace('\\' + token[0], token[0])
+    if kind == 'datetime':
+        return datetime.fromisoformat(token)
+    if kind == 'word':
+        if token in ('true', 'false'):
+            return token == 'true'
+        if re.fullmatch(r'[+-]?\d+', token):
+            return int(token)
+        return float(token)
+    raise ValueError('invalid TypeQL value: {!r}'.format(token))
+
+
+def format_value(value: str | int | float | bool | datetime) -> str:
+    """
+    Convert a python value to a value token, see :func:`parse_value`.
+
+    :param value: value
+    :return: value token, datetimes are truncated to milliseconds
+    """
+    if isinstance(value, str):
+        return '"{}"'.format(value.replace('"', '\\"'))
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='milliseconds')
+    return str(value)
+
+
+def parse_schema_types(text: str) -> dict[str, str]:
+    """
+    Get the type hierarchy declared in a TypeQL schema.
+
+    Rules are ignored.
+
+    :param text: TypeQL schema
+    :return: dict with the form {TYPE: SUPERTYPE}
+    """
+    text = re.sub(r'#[^\n]*', '', text)
+    return {sub: sup for sub, sup in _SUB_RE.findall(text)}
+
+
+def _parse_statement(
+        tokens: list[Tuple[str, str]],
+        match: bool = False) -> TQLThingDict:
+    thing = {
+        'variable': None,
+        'type': None,
+        'attributes': [],
+        'players': [],
+        'variables': [],
+    }
+    i = 0
+
+    def expect(value):
+        nonlocal i
+        if i >= len(tokens) or tokens[i][1] != value:
+            found = tokens[i][1] if i < len(tokens) else 'end of statement'
+            raise ValueError(
+                'invalid TypeQL: expected {!r}, found {!r}'.format(
+                    value, found))
+        i += 1
+
+    if tokens[i][0] == 'variable':
+        thing['variable'] = tokens[i][1][1:]
+        i += 1
+    if i < len(tokens) and tokens[i][1] == '(':
+        i += 1
+        while True:
+            role = tokens[i][1]
+            i += 1
+            expect(':')
+            if tokens[i][0] != 'variable':
+                raise ValueError(
+                    'invalid TypeQL: expected variable, found {!r}'.format(
+                        tokens[i][1]))
+            thing['players'].append((role, tokens[i][1][1:]))
+            i += 1
+            if tokens[i][1] == ')':
+                i += 1
+                break
+            expect(',')
+    if i < len(tokens) and tokens[i][1] == 'isa':
+        i += 1
+        thing['type'] = tokens[i][1]
+        i += 1
+        if i < len(tokens):
+            expect(',')
+    while i < len(tokens):
+        expect('has')
+        attribute = tokens[i][1]
+        if match and tokens[i + 1][0] == 'variable':
+            thing['variables'].append((attribute, tokens[i + 1][1][1:]))
+        else:
+            thing['attributes'].append(
+                (attribute, parse_value(*tokens[i + 1])))
+        i += 2
+        if i < len(tokens):
+            expect(',')
+    return thing
+
+
+def parse_insert_query(text: str) -> list[TQLThingDict]:
+    """
+    Parse insert queries without a match clause.
+
+    Each statement declares a new thing, e.g., `$c isa Component, has
+    component-name "c1";`, or adds attributes to a thing declared in the
+    same query, e.g., `$c has is-active true;`. Several insert queries can
+    be concatenated, variables are only shared within a query.
+
+    :param text: TypeQL insert queries
+    :return: things in the order they are declared, the variables of
+        different queries are renamed to be unique
+    :raises ValueError: when the text is not a supported insert query
+    """
+    tokens = tokenize(text)
+    things = []
+    statement = []
+    query = -1
+    for kind, token in tokens:
+        if kind == 'word' and token in ('insert', 'match', 'define'):
+            if len(statement) > 0:
+                raise ValueError(
+                    'invalid TypeQL: unterminated statement before '
+                    '{!r}'.format(token))
+            if token != 'insert':
+                raise ValueError(
+                    'only insert queries are supported, found {!r}'.format(
+                        token))
+            query += 1
+            continue
+        if query < 0:
+            raise ValueError('invalid TypeQL: expected insert query')
+        if token != ';':
+            statement.append((kind, token))
+            continue
+        if len(statement) > 0:
+            thing = _parse_statement(statement)
+            if thing['variable'] is None:
+                thing['variable'] = '_{}'.format(len(things))
+            else:
+                thing['variable'] = '{}.{}'.format(query, thing['variable'])
+            thing['players'] = [
+                (role, '{}.{}'.format(query, variable))
+                for role, variable in thing['players']]
+            things.append(thing)
+        statement = []
+    if len(statement) > 0:
+        raise ValueError('invalid TypeQL: missing ";" at the end')
+    return things
+
+
+def split_insert_query(text: str) -> list[list[str]]:
+    """
+    Split insert queries into groups of statements independent of each other.
+
+    Statements of the same query that share a variable are in the same
+    group, so each group can be inserted in a different transaction. The
+    variables are renamed with the group index as suffix, e.g., `$c` in the
+    third group becomes `$c_2`, so several groups can be joined in one
+    query.
+
+    :param text: TypeQL insert queries without a match clause
+    :return: groups of statements, without the ';' at the end, in the order
+        of their first statement
+    :raises ValueError: when the text is not a supported insert query
+    """
+    statements = []
+    parents = dict()
+
+    def find(variable):
+        while parents[variable] != variable:
+            parents[variable] = parents[parents[variable]]
+            variable = parents[variable]
+        return variable
+
+    statement = []
+    query = -1
+    for kind, token in tokenize(text):
+        if kind == 'word' and token in ('insert', 'match', 'define'):
+            if len(statement) > 0:
+                raise ValueError(
+                    'invalid TypeQL: unterminated statement before '
+                    '{!r}'.format(token))
+            if token != 'insert':
+                raise ValueError(
+                    'only insert queries are supported, found {!r}'.format(
+                        token))
+            query += 1
+            continue
+        if query < 0:
+            raise ValueError('invalid TypeQL: expected insert query')
+        if token != ';':
+            statement.append((kind, token))
+            continue
+        if len(statement) == 0:
+            continue
+        variables = [
+            (query, token) for kind, token in statement
+            if kind == 'variable']
+        root = (query, len(statements)) if len(variables) == 0 \
+            else variables[0]
+        parents.setdefault(root, root)
+        for variable in variables:
+            parents.setdefault(variable, variable)
+            parents[find(variable)] = find(root)
+        statements.append((root, statement))
+        statement = []
+    if len(statement) > 0:
+        raise ValueError('invalid TypeQL: missing ";" at the end')
+
+    groups = dict()
+    for root, statement in statements:
+        groups.setdefault(find(root), []).append(statement)
+    return [
+        [' '.join(
+            '{}_{}'.format(token, index) if kind == 'variable' else token
+            for kind, token in statement) for statement in group]
+        for index, group in enumerate(groups.values())]
+
+
+def parse_match_query(text: str) -> TQLMatchQueryDict:
+    """
+    Parse match query whose match clause is a conjunction of statements.
+
+    Each statement matches a thing, e.g., `$c isa Component, has
+    component-name $name;`, or adds constraints to a thing matched in the
+    same query, e.g., `$c has is-active true;`. Attribute values can be
+    variables, and relation players are always variables. The match clause
+    is followed by a fetch clause with variables, e.g., `fetch $name;`, or
+    by a get clause, optionally followed by `count;`. Disjunctions,
+    negations, and value comparisons are not supported.
+
+    :param text: TypeQL match query
+    :return: parsed query, the variables are given without `$`, and the
+        statements without variable get a unique one starting with `_`
+    :raises ValueError: when the text is not a supported match query
+    """
+    tokens = tokenize(text)
+    if len(tokens) == 0 or tokens[0] != ('word', 'match'):
+        raise ValueError('invalid TypeQL: expected match query')
+    query = {'patterns': [], 'fetch': None, 'get': [], 'count': False}
+    clause = 'match'
+    statement = []
+    for kind, token in tokens[1:]:
+        if token != ';':
+            statement.append((kind, token))
+            continue
+        if len(statement) == 0:
+            continue
+        if statement[0] == ('word', 'fetch') and clause == 'match':
+            clause = 'fetch'
+            query['fetch'] = []
+            statement = statement[1:]
+        elif statement[0] == ('word', 'get') and clause == 'match':
+            clause = 'get'
+            statement = statement[1:]
+            query['get'] = [
+                token[1:] for kind, token in statement
+                if kind == 'variable']
+            if len(statement) != max(2 * len(query['get']) - 1, 0):
+                raise ValueError('invalid TypeQL: invalid get clause')
+            statement = []
+            continue
+        elif statement == [('word', 'count')] and clause == 'get' \
+                and not query['count']:
+            query['count'] = True
+            statement = []
+            continue
+
+        if clause == 'match':
+            try:
+                thing = _parse_statement(statement, match=True)
+            except IndexError:
+                raise ValueError(
+                    'invalid TypeQL: incomplete statement: {!r}'.format(
+                        ' '.join(token for _, token in statement)))
+            if thing['variable'] is None:
+                thing['variable'] = '_{}'.format(len(query['patterns']))
+            query['patterns'].append(thing)
+        elif clause == 'fetch' and len(statement) == 1 \
+                and statement[0][0] == 'variable':
+            query['fetch'].append(statement[0][1][1:])
+        else:
+            raise ValueError(
+                'invalid TypeQL: unsupported {} clause: {!r}'.format(
+                    clause, ' '.join(token for _, token in statement)))
+        statement = []
+    if len(statement) > 0:
+        raise ValueError('invalid TypeQL: missing ";" at the end')
+    if len(query['patterns']) == 0 or clause == 'match':
+        raise ValueError('invalid TypeQL: expected fetch or get clause')
+    return query
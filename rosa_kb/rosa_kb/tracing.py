@@ -0,0 +1,275 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Traces of the stages of ROSA's MAPE-K loop.
+
+A trace follows an input of the loop, e.g., a measurement, through the
+stages it triggers: the events published by the KB, the planning snapshot
+and configuration selected by the planner, and the reconfiguration plan
+fetched and performed by the executor. The trace ID is carried by the
+`trace_id` fields of the planning snapshot, selected configurations and
+reconfiguration plan messages.
+
+Traces can be exported in the Chrome trace event format, and opened with
+`chrome://tracing` or https://ui.perfetto.dev, see :meth:`Tracer.export`.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+from typing import Any
+from typing import Hashable
+from typing import Iterator
+from typing import Optional
+from typing import TypedDict
+
+
+class SpanDict(TypedDict):
+    """TypedDict for a stage of a trace."""
+
+    name: str  #: stage name, e.g., the service name
+    start: float  #: start time (s since epoch)
+    end: float  #: end time (s since epoch), equal to `start` for events
+
+
+class Tracer:
+    """
+    Bounded store of traces, with the stages of each trace.
+
+    Stages are recorded with :meth:`span`, which keeps the trace ID of the
+    stage in the calling thread, so nested stages and events join the same
+    trace. Only the newest `max_traces` traces are kept. All methods are
+    thread-safe.
+    """
+
+    def __init__(self, max_traces: Optional[int] = 1000) -> None:
+        """
+        Create Tracer.
+
+        :param max_traces: number of traces kept
+        """
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._traces = OrderedDict()
+        self._keys = dict()
+        self._trace_keys = dict()
+
+    @staticmethod
+    def new_trace_id() -> str:
+        """
+        Create a trace ID.
+
+        :return: random hex trace ID
+        """
+        return uuid.uuid4().hex[:16]
+
+    def _get_stack(self) -> list[list[str | None]]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def get_trace_id(self) -> str | None:
+        """
+        Get the trace ID of the stage performed by the calling thread.
+
+        :return: trace ID, or None if the calling thread is not in a stage
+            or the stage is not part of a trace
+        """
+        stack = self._get_stack()
+        return stack[-1][0] if len(stack) > 0 else None
+
+    def set_trace_id(self, trace_id: str | None) -> None:
+        """
+        Set the trace ID of the stage performed by the calling thread.
+
+        Used by stages that only know their trace after they start, e.g.,
+        after fetching a reconfiguration plan.
+
+        :param trace_id: trace ID, empty or None when the stage is not part
+            of a trace
+        """
+        stack = self._get_stack()
+        if len(stack) > 0:
+            stack[-1][0] = trace_id or None
+
+    @contextlib.contextmanager
+    def span(
+            self,
+            name: str,
+            trace_id: Optional[str] = None) -> Iterator[None]:
+        """
+        Record the block as a stage of a trace (Context manager).
+
+        The stage is recorded when the block exits, in the trace it has at
+        that moment, see :meth:`set_trace_id`. Stages that are not part of a
+        trace are not recorded.
+
+        :param name: stage name
+        :param trace_id: trace ID, when it is None the stage joins the trace
+            of the enclosing stage
+        """
+        stack = self._get_stack()
+        if trace_id is None and len(stack) > 0:
+            trace_id = stack[-1][0]
+        stack.append([trace_id or None])
+        start = time.time()
+        try:
+            yield
+        finally:
+            trace_id = stack.pop()[0]
+            self.add(trace_id, name, start, time.time())
+
+    def instant(self, name: str, trace_id: Optional[str] = None) -> None:
+        """
+        Record an event of a trace, e.g., a published event.
+
+        :param name: event name
+        :param trace_id: trace ID, the trace of the calling thread's stage
+            when it is None
+        """
+        if trace_id is None:
+            trace_id = self.get_trace_id()
+        timestamp = time.time()
+        self.add(trace_id, name, timestamp, timestamp)
+
+    def add(
+            self,
+            trace_id: str | None,
+            name: str,
+            start: float,
+            end: float) -> None:
+        """
+        Record a stage of a trace.
+
+        :param trace_id: trace ID, nothing is recorded when it is empty or
+            None
+        :param name: stage name
+        :param start: start time (s since epoch)
+        :param end: end time (s since epoch)
+        """
+        if not trace_id:
+            return
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            if spans is None:
+                spans = self._traces[trace_id] = []
+                while len(self._traces) > max(self.max_traces, 1):
+                    evicted, _ = self._traces.popitem(last=False)
+                    for key in self._trace_keys.pop(evicted, []):
+                        self._keys.pop(key, None)
+            spans.append({'name': name, 'start': start, 'end': end})
+
+    def bind(self, key: Hashable, trace_id: str | None) -> None:
+        """
+        Associate a key with a trace, e.g., a reconfiguration plan.
+
+        The key is forgotten when the trace is evicted.
+
+        :param key: key
+        :param trace_id: trace ID, nothing is done when it is empty or None
+        """
+        if not trace_id:
+            return
+        with self._lock:
+            if trace_id not in self._traces:
+                return
+            self._keys[key] = trace_id
+            self._trace_keys.setdefault(trace_id, []).append(key)
+
+    def find(self, key: Hashable) -> str | None:
+        """
+        Get the trace associated with a key.
+
+        :param key: key
+        :return: trace ID, or None if the key is not associated with a trace
+        """
+        with self._lock:
+            return self._keys.get(key)
+
+    def get_trace(self, trace_id: str) -> list[SpanDict]:
+        """
+        Get the stages of a trace.
+
+        :param trace_id: trace ID
+        :return: stages, sorted by start time
+        """
+        with self._lock:
+            spans = [dict(span) for span in self._traces.get(trace_id, [])]
+        return sorted(spans, key=lambda span: span['start'])
+
+    def get_traces(self) -> dict[str, list[SpanDict]]:
+        """
+        Get the stages of all traces.
+
+        :return: dict with the form {TRACE ID: STAGES}, oldest trace first
+        """
+        with self._lock:
+            trace_ids = list(self._traces)
+        return {trace_id: self.get_trace(trace_id) for trace_id in trace_ids}
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Convert the traces to the Chrome trace event format.
+
+        Each trace is shown in its own row, named after the trace ID.
+
+        :return: dict with the form {'traceEvents': [EVENTS]}
+        """
+        events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 0,
+            'args': {'name': 'ROSA MAPE-K loop'}}]
+        for tid, (trace_id, spans) in enumerate(
+                self.get_traces().items(), start=1):
+            events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                'args': {'name': trace_id}})
+            for span in spans:
+                event = {
+                    'name': span['name'],
+                    'cat': 'rosa',
+                    'ts': span['start'] * 1e6,
+                    'pid': 1,
+                    'tid': tid,
+                    'args': {'trace_id': trace_id},
+                }
+                if span['end'] > span['start']:
+                    event['ph'] = 'X'
+                    event['dur'] = (span['end'] - span['start']) * 1e6
+                else:
+                    event['ph'] = 'i'
+                    event['s'] = 't'
+                events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path: str) -> int:
+        """
+        Write the traces to a file in the Chrome trace event format.
+
+        :param path: path of the JSON file, it is replaced atomically
+        :return: number of traces written
+        """
+        chrome_trace = self.to_chrome_trace()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(chrome_trace, file)
+        os.replace(tmp_path, path)
+        return sum(
+            1 for event in chrome_trace['traceEvents']
+            if event['name'] == 'thread_name')
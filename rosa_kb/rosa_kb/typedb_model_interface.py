@@ -17,114 +17,159 @@ from ros_typedb.typedb_interface import TypeDBInterface
 from ros_typedb.typedb_interface import convert_query_type_to_py_type
 from ros_typedb.typedb_interface import convert_py_type_to_query_type
 from datetime import datetime
+from datetime import timedelta
+
+import contextlib
+import functools
+import math
+import threading
+import time
+
+from rosa_kb.bulk_loader import bulk_load
+from rosa_kb.kb_snapshot import fingerprint_files
+from rosa_kb.kb_snapshot import get_paths
+from rosa_kb.model_types import BulkLoadStatsDict
+from rosa_kb.model_types import ComponentConfigurationDict
+from rosa_kb.model_types import ComponentConfigurationSnapshotDict  # noqa
+from rosa_kb.model_types import ComponentDict
+from rosa_kb.model_types import ComponentParemeterDict  # noqa: F401
+from rosa_kb.model_types import ComponentProcessDict
+from rosa_kb.model_types import convert_component_parameter_value_to_py_type
+from rosa_kb.model_types import FunctionDesignSnapshotDict  # noqa: F401
+from rosa_kb.model_types import MatchResultDict
+from rosa_kb.model_types import MeasurementCompactionStatsDict
+from rosa_kb.model_types import PlanningSnapshotDict
+from rosa_kb.model_types import ReconfigPlanDetailsDict
+from rosa_kb.model_types import ReconfigPlanDict
+from rosa_kb.read_cache import ReadCache
+from rosa_kb.slow_query_log import SlowQueryLog
+from rosa_kb.status_materializer import DEPENDENCIES_QUERIES
+from rosa_kb.status_materializer import StatusDependenciesDict
+from rosa_kb.status_materializer import create_materialization_queries
+from rosa_kb.status_materializer import get_affected_things
+from rosa_kb.status_materializer import parse_dependencies
 
 from typedb.driver import ConceptMap
-
+from typedb.driver import SessionType
+from typedb.driver import TransactionType
+from typedb.driver import TypeDBDriverException
+from typedb.driver import TypeDBOptions
+
+from typing import Callable
+from typing import Generator
+from typing import Iterable
 from typing import Iterator
 from typing import Literal
 from typing import Tuple
-from typing import TypedDict
 from typing import Optional
 
 
-class MatchResultDict(TypedDict):
-    """TypedDict for match result."""
-
-    type: str  #: attribute name, e.g., name, age, height etc
-    value_type: str  #: value type, e.g., boolean, long etc
-    value: str  #: value
-
-
-class ReconfigPlanDict(TypedDict):
-    """TypedDict for reconfiguration plan."""
-
-    start_time: datetime  #: reconfig plan start-time
-    c_activate: list[str]  #: components to activate
-    c_deactivate: list[str]  #: components to deactivate
-    c_config: list[str]  #: component configurations to update
-
+#: maximum number of values matched by each query that removes the attributes
+#: of the measurements removed by :meth:`ModelInterface.compact_measurements`
+ORPHAN_VALUES_PER_QUERY = 100
 
-class ComponentParemeterDict(TypedDict):
-    """TypedDict for ComponentParemeter."""
 
-    key: str  #: component parameter key
-    value: bool | list[bool] | float | list[float] | int | list[int] | str | \
-        list[str]  #: component parameter value
-    type: Literal[
-        'boolean',
-        'boolean_array',
-        'double',
-        'double_array',
-        'long',
-        'long_array',
-        'string',
-        'string_array']  #: component parameter type
-
-
-class ComponentConfigurationDict(TypedDict):
-    """TypedDict for component-configuration."""
+def create_value_disjunction_query(
+        variable: str,
+        values: Iterable[str | int | float | bool | datetime]) -> str:
+    """
+    Create a query pattern constraining a variable to a set of values.
 
-    component: str  #: component name
-    component_parameter: list[ComponentParemeterDict]  #: list with parameters
+    :param variable: variable name, without the `$` prefix
+    :param values: values the variable can be equal to
+    :return: query pattern, e.g., `{$name == "a";} or {$name == "b";};`
+    """
+    values = [convert_py_type_to_query_type(v) for v in values]
+    if len(values) == 1:
+        return f'${variable} == {values[0]};'
+    return ' or '.join(
+        f'{{${variable} == {value};}}' for value in values) + ';'
 
 
-class ComponentDict(TypedDict):
-    """TypedDict for Component."""
+def resolve_query_answer(answer):
+    """
+    Wait for a query answer and return its content.
 
-    type: str  #: the typedb type of the component
-    component_name: str  #: component name
-    is_required: bool  #: whether component is required or not
-    is_active: bool  #: whether component is active or not
-    component_status: str  #: component status
-    package: str  #: package that contains the component
-    executable: str  #: executable that starts the component
+    :param answer: answer returned by a typedb transaction query
+    :return: list with the answer content for iterators, or the resolved
+        value for promises
+    """
+    if hasattr(answer, 'resolve'):
+        return answer.resolve()
+    if isinstance(answer, Iterator):
+        return list(answer)
+    return answer
 
 
-class ComponentProcessDict(TypedDict):
-    """TypedDict for Component."""
+def convert_query_answer(query_type: str, answer):
+    """
+    Convert a query answer to the format returned by `database_query`.
 
-    pid: int  #: process pid
-    start_time: str  #: process start-time
-    component: str  #: component name
+    :param query_type: query type, e.g., 'fetch', 'insert', 'get_aggregate'
+    :param answer: answer returned by a typedb transaction query
+    :return: list with the answer content, or the aggregate value
+    """
+    answer = resolve_query_answer(answer)
+    if query_type == 'get_aggregate' and answer is not None:
+        return answer.get()
+    return answer
 
 
-def convert_component_parameter_value_to_py_type(
-    param: dict[str, MatchResultDict],
-    param_type: Literal[
-        'boolean', 'boolean_array', 'double', 'double_array',
-        'long', 'long_array', 'string', 'string_array']
-) -> bool | list[bool] | float | list[float] | int | list[int] | str | \
-        list[str]:
+def cached_query(func):
     """
-    Convert ComponentParameter value to python type.
+    Cache the result of a read method until the KB changes (Decorator).
 
-    :param param: ComponentParameter value
-    :param param_type: CompomentParameter parameter-type
-    :return: converted value
+    The cache key is the method name and its arguments, see
+    :class:`rosa_kb.read_cache.ReadCache`.
     """
-    def process_array(param, func):
-        return [func(p.strip()) for p in param.strip('[]').split(',')]
-
-    if param_type == 'boolean':
-        return param.lower() == 'true'
-    elif param_type == 'boolean_array':
-        return process_array(param, lambda p: p.lower() == 'true')
-    elif param_type == 'double':
-        return float(param)
-    elif param_type == 'double_array':
-        return process_array(param, float)
-    elif param_type == 'long':
-        return int(param)
-    elif param_type == 'long_array':
-        return process_array(param, int)
-    elif param_type == 'string':
-        return param
-    elif param_type == 'string_array':
-        return process_array(param, str)
+    @functools.wraps(func)
+    def inner(*args, **kwargs):
+        self = args[0]
+        # reads in an open transaction may see uncommitted writes
+        if self.get_open_transaction() is not None:
+            return func(*args, **kwargs)
+        key = (func.__name__, args[1:], tuple(sorted(kwargs.items())))
+        return self.read_cache.get_or_compute(
+            key, self.revision, lambda: func(*args, **kwargs))
+    return inner
 
 
 class ModelInterface(TypeDBInterface):
-    """Class to interact with the ROSA knowledge model in typeDB."""
+    """
+    Class to interact with the ROSA knowledge model in typeDB.
+
+    Every write transaction performed through this class increases the KB
+    :attr:`revision`. Methods decorated with :func:`cached_query` cache their
+    results until the revision changes, writes performed by other typeDB
+    clients are not detected.
+
+    Queries performed inside :meth:`batch` share a single write transaction,
+    which is only committed when the outermost batch exits.
+
+    When `materialize_status` is true, the statuses derived by the schema
+    rules are stored in the KB by every write transaction, see
+    :meth:`materialize_statuses`, and reads are performed without inference.
+
+    The data files are only loaded when the database is new or empty, or
+    when `force_data` is true.
+
+    When `check_fingerprint` is true, the fingerprint of the schema and data
+    files is stored in the database after all of them are loaded, and
+    removed by the first write that is not runtime-only, see
+    :meth:`runtime_writes`. When the database is created again from the same
+    files and still has their fingerprint, they are not loaded again, and
+    `force_database` and `force_data` are ignored. Snapshots are not
+    supported, `snapshot_dir` is ignored.
+
+    When `bulk_load_workers` is greater than 0, the data files are loaded
+    with :meth:`bulk_load`, in chunks of `bulk_load_chunk_size` statements.
+    The fingerprint is not stored when some chunks failed, see
+    :attr:`bulk_load_stats`.
+
+    When `slow_query_log` is set, the data queries that take longer than its
+    threshold are logged, with the method that issued them, see
+    :class:`rosa_kb.slow_query_log.SlowQueryLog`.
+    """
 
     def __init__(
             self,
@@ -134,17 +179,547 @@ class ModelInterface(TypeDBInterface):
             data_path: Optional[list[str] | str] = None,
             force_database: Optional[bool] = False,
             force_data: Optional[bool] = False,
-            infer: Optional[bool] = False) -> None:
-
+            infer: Optional[bool] = False,
+            cache_size: Optional[int] = 256,
+            materialize_status: Optional[bool] = False,
+            check_fingerprint: Optional[bool] = False,
+            snapshot_dir: Optional[str] = None,
+            bulk_load_workers: Optional[int] = 0,
+            bulk_load_chunk_size: Optional[int] = 1000,
+            slow_query_log: Optional[SlowQueryLog] = None) -> None:
+
+        #: log of the slow queries, None when they are not logged
+        self.slow_query_log = slow_query_log
+        #: statistics of the bulk load of the data files, None when they were
+        #: not bulk loaded
+        self.bulk_load_stats = None
+        #: fingerprint of the schema and data files the KB was loaded from,
+        #: None when it is unknown or the KB was modified after loading them
+        self.fingerprint = None
+        self.revision = 0
+        self._revision_lock = threading.Lock()
+        self.read_cache = ReadCache(cache_size)
+        self._local = threading.local()
+        self.materialize_status = False
+
+        # connect without loading anything, the database is created when it
+        # does not exist, then it is checked to decide what is loaded
         super().__init__(
-            address,
-            database_name,
-            schema_path,
-            data_path,
-            force_database,
-            force_data,
-            infer
-        )
+            address, database_name, None, None, False, False, infer)
+        fingerprint = None
+        if check_fingerprint:
+            fingerprint = fingerprint_files(
+                get_paths(schema_path) + get_paths(data_path))
+        complete = True
+        if fingerprint is None \
+           or self.get_stored_fingerprint() != fingerprint:
+            if fingerprint is not None:
+                # the stored data was not loaded from these files
+                force_data = True
+            complete = self._load_files(
+                database_name, schema_path, data_path, force_database,
+                force_data, bulk_load_workers, bulk_load_chunk_size)
+        else:
+            self.fingerprint = fingerprint
+            fingerprint = None
+        if materialize_status:
+            self.materialize_status = True
+            self.infer = False
+            self.materialize_statuses()
+        if fingerprint is not None and complete is True:
+            self.store_fingerprint(fingerprint)
+
+    def _load_files(
+            self,
+            database_name: str,
+            schema_path: Optional[list[str] | str],
+            data_path: Optional[list[str] | str],
+            force_database: bool,
+            force_data: bool,
+            bulk_load_workers: int,
+            bulk_load_chunk_size: int) -> bool:
+        # the data files are only loaded in new or empty databases, or when
+        # `force_data` is true. Returns whether all data was loaded
+        if force_database:
+            self.driver.databases.get(database_name).delete()
+            self.driver.databases.create(database_name)
+        for path in get_paths(schema_path):
+            with open(path, 'r') as schema_file:
+                self.database_query(
+                    SessionType.SCHEMA, TransactionType.WRITE, 'define',
+                    schema_file.read())
+        if force_data and not force_database:
+            self.delete_all_data()
+        elif not self._is_empty():
+            return True
+        if bulk_load_workers > 0:
+            self.bulk_load_stats = self.bulk_load(
+                data_path, bulk_load_workers, bulk_load_chunk_size)
+            return self.bulk_load_stats['failed_chunks'] == 0
+        for path in get_paths(data_path):
+            self.load_data(path)
+        return True
+
+    def _is_empty(self) -> bool:
+        result = self.get_database('''
+            match $thing isa thing;
+            get $thing; limit 1;
+        ''')
+        return result is None or len(result) == 0
+
+    @contextlib.contextmanager
+    def runtime_writes(self) -> Generator:
+        """
+        Declare the writes performed inside it as runtime-only.
+
+        Runtime-only writes, e.g., measurements, do not modify the things
+        loaded from the schema and data files, so they keep the stored
+        :attr:`fingerprint`.
+        """
+        depth = getattr(self._local, 'runtime_writes', 0)
+        self._local.runtime_writes = depth + 1
+        try:
+            yield
+        finally:
+            self._local.runtime_writes = depth
+
+    def _note_model_write(self) -> None:
+        if getattr(self._local, 'runtime_writes', 0) == 0:
+            self._local.model_writes = True
+
+    def bump_revision(self) -> int:
+        """
+        Increase the KB revision, invalidating cached reads.
+
+        The first time it is called after the KB is loaded for writes that
+        are not runtime-only, see :meth:`runtime_writes`, it also removes the
+        stored :attr:`fingerprint`.
+
+        :return: new KB revision
+        """
+        model_writes = getattr(self._local, 'model_writes', False)
+        self._local.model_writes = False
+        with self._revision_lock:
+            self.revision += 1
+            revision = self.revision
+            fingerprint = self.fingerprint
+            if model_writes:
+                self.fingerprint = None
+        if model_writes and fingerprint is not None:
+            self.delete_database('''
+                match $kb isa KnowledgeBase;
+                delete $kb isa KnowledgeBase;
+            ''')
+        return revision
+
+    def delete_all_data(self) -> bool:
+        """
+        Delete all data in the database, keeping its schema.
+
+        :return: whether the data was deleted
+        """
+        return self.delete_database('''
+            match $thing isa thing;
+            delete $thing isa thing;
+        ''') is not None
+
+    def bulk_load(
+            self,
+            data_path: list[str] | str,
+            workers: Optional[int] = 4,
+            chunk_size: Optional[int] = 1000,
+            progress: Optional[Callable[[int, int], None]] = None
+             ) -> BulkLoadStatsDict:
+        """
+        Load data files in parallel chunks.
+
+        Each chunk is written in its own write transaction, see
+        :func:`rosa_kb.bulk_loader.bulk_load`. When statuses are
+        materialized, they are only materialized once, after all chunks are
+        written.
+
+        :param data_path: path of the data files
+        :param workers: number of chunks written in parallel
+        :param chunk_size: number of statements in each chunk
+        :param progress: function called with the number of statements
+            written and the total number of statements
+        :return: load statistics
+        """
+        def write_chunk(query):
+            with self.record_changes(None):
+                return self.write_queries([('insert', query)]) is not None
+        stats = bulk_load(
+            data_path, write_chunk, self.load_data, workers, chunk_size,
+            progress)
+        if self.materialize_status:
+            self.materialize_statuses()
+        return stats
+
+    def get_stored_fingerprint(self) -> str | None:
+        """
+        Get fingerprint of the files the database was loaded from.
+
+        :return: stored fingerprint, or None when the database was modified
+            after loading the files or it has no schema
+        """
+        query = '''
+            match $kb isa KnowledgeBase, has kb-fingerprint $fingerprint;
+            get $fingerprint;
+        '''
+        try:
+            result = self.get_database(query)
+        except TypeDBDriverException:
+            return None
+        if result is None or len(result) == 0:
+            return None
+        return result[0].get('fingerprint').as_attribute().get_value()
+
+    def store_fingerprint(self, fingerprint: str) -> bool:
+        """
+        Store fingerprint of the files the database was loaded from.
+
+        :param fingerprint: fingerprint of the schema and data files, see
+            :func:`rosa_kb.kb_snapshot.fingerprint_files`
+        :return: whether the fingerprint was stored
+        """
+        result = self.write_queries([
+            ('delete', '''
+                match $kb isa KnowledgeBase;
+                delete $kb isa KnowledgeBase;
+            '''),
+            ('insert', f'''
+                insert $kb isa KnowledgeBase,
+                    has kb-fingerprint "{fingerprint}";
+            '''),
+        ])
+        if result is None:
+            return False
+        with self._revision_lock:
+            self.fingerprint = fingerprint
+        return True
+
+    def get_open_transaction(
+            self, transaction_type: Optional[TransactionType] = None):
+        """
+        Get the transaction opened by :meth:`batch` or :meth:`snapshot`.
+
+        :param transaction_type: only return the open transaction if it has
+            this type, any type when it is None
+        :return: transaction open in the calling thread, or None when there
+            is no open transaction
+        """
+        transaction = getattr(self._local, 'transaction', None)
+        if transaction_type is not None and \
+           getattr(self._local, 'transaction_type', None) != transaction_type:
+            return None
+        return transaction
+
+    @contextlib.contextmanager
+    def _open_transaction(
+            self,
+            transaction_type: TransactionType,
+            infer: Optional[bool] = None):
+        previous = (
+            getattr(self._local, 'transaction', None),
+            getattr(self._local, 'transaction_type', None))
+        with self.driver.session(
+                self.database_name, SessionType.DATA) as session:
+            options = TypeDBOptions(
+                infer=self.infer if infer is None else infer)
+            with session.transaction(
+                    transaction_type, options) as transaction:
+                self._local.transaction = transaction
+                self._local.transaction_type = transaction_type
+                try:
+                    yield transaction
+                finally:
+                    self._local.transaction, self._local.transaction_type = \
+                        previous
+                if transaction_type == TransactionType.WRITE:
+                    transaction.commit()
+
+    @contextlib.contextmanager
+    def batch(self) -> Generator:
+        """
+        Perform all queries issued in the calling thread in one transaction.
+
+        Context manager that opens a write transaction for all data queries
+        performed inside it, including reads, which see the uncommitted
+        writes. Nested batches join the outermost one, and the transaction is
+        committed once, when the outermost batch exits. When an exception is
+        raised inside the batch, the transaction is closed without committing
+        and the exception is propagated. Query errors inside a batch raise
+        :class:`typedb.driver.TypeDBDriverException` instead of returning
+        None. The KB :attr:`revision` is increased once per batch.
+
+        When statuses are materialized, the batch transaction is opened with
+        inference enabled, and the statuses affected by its writes are
+        materialized before reads inside the batch and before it is
+        committed.
+
+        Example::
+
+            with model.batch():
+                model.select_function_design('f1', 'f1_fd1')
+                model.activate_component('c1', True)
+
+        :return: the open write transaction
+        """
+        transaction = self.get_open_transaction(TransactionType.WRITE)
+        if transaction is not None:
+            yield transaction
+            return
+
+        infer = True if self.materialize_status else None
+        try:
+            with self._open_transaction(
+                    TransactionType.WRITE, infer) as transaction:
+                yield transaction
+                self._materialize_pending(transaction)
+        finally:
+            self._local.changes = dict()
+            self._local.unknown_changes = False
+            self.bump_revision()
+
+    @contextlib.contextmanager
+    def snapshot(self) -> Generator:
+        """
+        Perform all reads issued in the calling thread in one transaction.
+
+        Context manager that opens a read transaction for all data reads
+        performed inside it, so they all see the same state of the KB, even
+        when other threads write to it. The transaction is closed when the
+        context manager exits. Writes performed inside a snapshot use their
+        own transactions, and are not visible to the reads in the snapshot. A
+        snapshot opened inside a batch or another snapshot joins it. Query
+        errors inside a snapshot raise
+        :class:`typedb.driver.TypeDBDriverException` instead of returning
+        None.
+
+        Example::
+
+            with model.snapshot():
+                functions = model.get_adaptable_functions()
+                components = model.get_adaptable_components()
+
+        :return: the open transaction
+        """
+        transaction = self.get_open_transaction()
+        if transaction is not None:
+            yield transaction
+            return
+
+        with self._open_transaction(TransactionType.READ) as transaction:
+            yield transaction
+
+    def database_query(
+            self,
+            session_type: SessionType | str,
+            transaction_type: TransactionType | str,
+            query_type: str,
+            query: str,
+            options: Optional[TypeDBOptions] = None):
+        """
+        Perform query and bump the KB revision after write transactions.
+
+        Inside :meth:`batch` and :meth:`snapshot`, data queries are performed
+        in their transaction. See
+        :meth:`ros_typedb.typedb_interface.TypeDBInterface.database_query`
+        """
+        if self.slow_query_log is None:
+            return self._database_query(
+                session_type, transaction_type, query_type, query, options)
+        result = None
+        start = time.perf_counter()
+        try:
+            result = self._database_query(
+                session_type, transaction_type, query_type, query, options)
+        finally:
+            self._log_slow_query(
+                query_type, query, start, result,
+                self.infer if options is None else options.infer)
+        return result
+
+    def _database_query(
+            self,
+            session_type: SessionType | str,
+            transaction_type: TransactionType | str,
+            query_type: str,
+            query: str,
+            options: Optional[TypeDBOptions] = None):
+        transaction = self.get_open_transaction()
+        is_write = transaction_type in (TransactionType.WRITE, 'write')
+        is_data = session_type in (SessionType.DATA, 'data')
+        if is_write and self.get_open_transaction(
+                TransactionType.WRITE) is None:
+            transaction = None
+            if is_data and self.materialize_status:
+                # the statuses are materialized in the write transaction
+                try:
+                    with self.batch():
+                        return self._database_query(
+                            session_type, transaction_type, query_type,
+                            query, options)
+                except TypeDBDriverException:
+                    return None
+        if transaction is not None and is_data:
+            if is_write:
+                self._note_write()
+            elif self.get_open_transaction(
+                    TransactionType.WRITE) is not None:
+                self._materialize_pending(transaction)
+            return convert_query_answer(
+                query_type, getattr(transaction.query, query_type)(query))
+
+        args = [] if options is None else [options]
+        if is_write:
+            self._note_model_write()
+        try:
+            return super().database_query(
+                session_type, transaction_type, query_type, query, *args)
+        finally:
+            if is_write:
+                self.bump_revision()
+
+    def write_queries(
+            self,
+            queries: list[Tuple[Literal['insert', 'delete', 'update'], str]]
+         ) -> list[ConceptMap] | None:
+        """
+        Perform several write queries in a single write transaction.
+
+        The queries are performed in order, and the transaction is only
+        committed when all of them succeed. Inside :meth:`batch`, the queries
+        are performed in the batch transaction and errors are propagated.
+
+        :param queries: list of tuples with the form (QUERY_TYPE, QUERY)
+        :return: concatenated results of the insert and update queries, or
+            None when the transaction failed
+        """
+        result = []
+        try:
+            with self.batch() as transaction:
+                self._note_write()
+                for query_type, query in queries:
+                    start = time.perf_counter()
+                    answer = resolve_query_answer(
+                        getattr(transaction.query, query_type)(query))
+                    self._log_slow_query(query_type, query, start, answer)
+                    if isinstance(answer, list):
+                        result.extend(answer)
+        except TypeDBDriverException:
+            if self.get_open_transaction() is not None:
+                raise
+            return None
+        return result
+
+    def _log_slow_query(
+            self,
+            query_type: str,
+            query: str,
+            start: float,
+            result,
+            infer: Optional[bool] = None) -> None:
+        if self.slow_query_log is not None:
+            self.slow_query_log.record(
+                self, query_type, query, time.perf_counter() - start, result,
+                infer)
+
+    @contextlib.contextmanager
+    def record_changes(
+            self,
+            change_type: Optional[str] = None,
+            names: Iterable[str] = ()) -> Generator:
+        """
+        Declare what is changed by the writes performed inside it.
+
+        Used to only recompute the materialized statuses that may be affected
+        by the writes, see
+        :func:`rosa_kb.status_materializer.get_affected_things` for the
+        supported change types. When `change_type` is None, the writes do not
+        affect any status. Writes performed outside this context manager may
+        affect any status, and all statuses are recomputed.
+
+        Example::
+
+            with model.record_changes('Component', ['c1']):
+                model.update_attribute_in_thing(
+                    'Component', 'component-name', 'c1', 'is-active', True)
+
+        :param change_type: type of the changed things
+        :param names: name of the changed things
+        """
+        scopes = self._local.__dict__.setdefault('change_scopes', [])
+        scopes.append((change_type, set(names)))
+        try:
+            yield
+        finally:
+            scopes.pop()
+
+    def _note_write(self) -> None:
+        self._note_model_write()
+        scopes = getattr(self._local, 'change_scopes', [])
+        if len(scopes) == 0:
+            self._local.unknown_changes = True
+            return
+        changes = self._local.__dict__.setdefault('changes', dict())
+        for change_type, names in scopes:
+            if change_type is not None:
+                changes.setdefault(change_type, set()).update(names)
+
+    def _materialize_pending(self, transaction) -> None:
+        if not self.materialize_status:
+            return
+        changes = getattr(self._local, 'changes', dict())
+        if getattr(self._local, 'unknown_changes', False):
+            changes = None
+        elif len(changes) == 0:
+            return
+        self._local.changes = dict()
+        self._local.unknown_changes = False
+        self._materialize(transaction, changes)
+
+    def _materialize(
+            self, transaction, changes: Optional[dict[str, set[str]]]) -> None:
+        affected = None
+        if changes is not None:
+            dependencies = parse_dependencies({
+                key: resolve_query_answer(transaction.query.fetch(query))
+                for key, query in DEPENDENCIES_QUERIES.items()
+            })
+            affected = get_affected_things(dependencies, changes)
+        for query_type, query in create_materialization_queries(affected):
+            resolve_query_answer(getattr(transaction.query, query_type)(query))
+
+    def materialize_statuses(
+            self, changes: Optional[dict[str, set[str]]] = None) -> bool:
+        """
+        Store the statuses derived by the schema rules in the KB.
+
+        The statuses derived by the rules, and the 'is-required' attribute,
+        are inferred and stored as `materialized-*` attributes, which are
+        subtypes of the derived attributes. Thus, they can be read without
+        inference. Materialization is incremental, only the things whose
+        statuses may be affected by `changes` are recomputed, see
+        :mod:`rosa_kb.status_materializer`. It is performed automatically by
+        every write when `materialize_status` is true, this method is only
+        needed after the KB is modified by other typeDB clients.
+
+        :param changes: dict with the form {CHANGE TYPE: NAMES}, all statuses
+            are recomputed when it is None
+        :return: whether the statuses were materialized
+        """
+        try:
+            with self._open_transaction(
+                    TransactionType.WRITE, True) as transaction:
+                self._materialize(transaction, changes)
+        except TypeDBDriverException:
+            if self.get_open_transaction() is not None:
+                raise
+            return False
+        finally:
+            self.bump_revision()
+        return True
 
     def insert_action(self, action_name: str) -> Iterator[ConceptMap] | None:
         """
@@ -278,10 +853,11 @@ class ModelInterface(TypeDBInterface):
             ('component-pid', pid),
             ('start-time', datetime.now()),
         ]
-        return self.insert_relationship(
-            'component-process',
-            related_dict,
-            attribute_list)
+        with self.record_changes():
+            return self.insert_relationship(
+                'component-process',
+                related_dict,
+                attribute_list)
 
     def request_action(
             self,
@@ -317,7 +893,8 @@ class ModelInterface(TypeDBInterface):
             [('start-time', datetime.now())],
             prefix='ra'
         )
-        return self.insert_database(query)
+        with self.record_changes('Action', [action_name]):
+            return self.insert_database(query)
 
     def cancel_action(self, action_name: str) -> Iterator[ConceptMap] | None:
         """
@@ -339,7 +916,8 @@ class ModelInterface(TypeDBInterface):
                 $ra has result 'abandoned';
                 $ra has end-time {end_time};
         """
-        return self.insert_database(query)
+        with self.record_changes('Action', [action_name]):
+            return self.insert_database(query)
 
     def update_action_status(
             self,
@@ -352,13 +930,14 @@ class ModelInterface(TypeDBInterface):
         :param action_status: action_status
         :return: insert query result
         """
-        return self.update_attribute_in_thing(
-            'Action',
-            'action-name',
-            action_name,
-            'action-status',
-            action_status
-        )
+        with self.record_changes('Action', [action_name]):
+            return self.update_attribute_in_thing(
+                'Action',
+                'action-name',
+                action_name,
+                'action-status',
+                action_status
+            )
 
     def delete_component_status(
             self, component_name: str) -> Literal[True] | None:
@@ -368,11 +947,12 @@ class ModelInterface(TypeDBInterface):
         :param component_name: component name
         :return: delete query result
         """
-        return self.delete_attribute_from_thing(
-            'Component',
-            'component-name',
-            component_name,
-            'component-status')
+        with self.record_changes('Component', [component_name]):
+            return self.delete_attribute_from_thing(
+                'Component',
+                'component-name',
+                component_name,
+                'component-status')
 
     def update_component_status(
             self,
@@ -385,13 +965,14 @@ class ModelInterface(TypeDBInterface):
         :param component_status: component status
         :return: delete query result
         """
-        return self.update_attribute_in_thing(
-            'Component',
-            'component-name',
-            component_name,
-            'component-status',
-            component_status
-        )
+        with self.record_changes('Component', [component_name]):
+            return self.update_attribute_in_thing(
+                'Component',
+                'component-name',
+                component_name,
+                'component-status',
+                component_status
+            )
 
     def has_action(self, action_name: str) -> bool:
         """
@@ -543,6 +1124,7 @@ class ModelInterface(TypeDBInterface):
         query_result = self.fetch_database(query)
         return query_result
 
+    @cached_query
     def get_adaptable_functions(self) -> list[str]:
         """
         Get the name of adaptable Functions.
@@ -556,6 +1138,7 @@ class ModelInterface(TypeDBInterface):
         query_result = self.get_adaptable_things_raw('Function')
         return [r.get('name').get('value') for r in query_result]
 
+    @cached_query
     def get_adaptable_components(self) -> list[str]:
         """
         Get the name of adaptable Components.
@@ -642,27 +1225,352 @@ class ModelInterface(TypeDBInterface):
         :param value: measured value
         :return: query result
         """
-        query = f"""
+        return self.add_measurements({name: value})
+
+    def add_measurements(
+            self,
+            measurements: dict[str, str | float]) -> list[ConceptMap] | None:
+        """
+        Add new measurements for several QAs/EAs in one write transaction.
+
+        Add new Quality Attribute or EnvironmentalAttribute measurements. The
+        'latest' attribute of the old measurements of all attributes in
+        `measurements` is cleared with a single delete query, and the new
+        measurements are inserted with 'latest' set to true, all in the same
+        write transaction. Values that can't be converted to a finite float
+        are ignored.
+
+        :param measurements: dict with the form {QA/EA NAME: MEASURED VALUE}
+        :return: query result, or None if there is no valid measurement or the
+            transaction failed
+        """
+        _measurements = {}
+        for name, value in measurements.items():
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            if math.isfinite(value):
+                _measurements[name] = value
+        if len(_measurements) == 0:
+            return None
+
+        queries = [('delete', f"""
             match
-                $attr isa Attribute, has attribute-name "{name}";
+                $attr isa Attribute, has attribute-name $name;
+                {create_value_disjunction_query('name', _measurements)}
                 $m (measured-attribute:$attr) isa measurement,
                     has latest $latest;
                 $latest == true;
             delete $m has $latest;
-        """
-        self.delete_from_database(query)
+        """)]
 
         time = convert_py_type_to_query_type(datetime.now())
-        query = f"""
+        for name, value in _measurements.items():
+            name = convert_py_type_to_query_type(name)
+            value = convert_py_type_to_query_type(value)
+            queries.append(('insert', f"""
+                match
+                    $attr isa Attribute, has attribute-name {name};
+                insert
+                    $m (measured-attribute:$attr) isa measurement,
+                        has latest true,
+                        has measurement-value {value},
+                        has measurement-time {time};
+            """))
+        with self.record_changes('Attribute', _measurements.keys()), \
+             self.runtime_writes():
+            return self.write_queries(queries)
+
+    def _fetch_expired_measurements(
+            self,
+            name: str,
+            keep_count: int,
+            time_cutoff: datetime | None
+         ) -> Tuple[str, list[Tuple[datetime, float]]] | None:
+        """
+        Fetch the measurements of a QA/EA removed by a compaction.
+
+        The cut-off time by number is the time of the `keep_count`-th most
+        recent measurement, counting the latest one, and it is found with a
+        sorted query, so only the removed measurements are fetched. The
+        latest measurement and the aggregates are never removed.
+
+        :param name: QA/EA name
+        :param keep_count: number of measurements to keep, 0 means there is
+            no limit by number
+        :param time_cutoff: measurements older than this are removed, None
+            means there is no limit by time
+        :return: tuple with the form (MATCH CONDITIONS ON $time, [(TIME,
+            VALUE)]) with the removed measurements, or None if a query failed
+        """
+        _name = convert_py_type_to_query_type(name)
+        match_query = f'''
             match
-                $attr isa Attribute, has attribute-name "{name}";
-            insert
+                $attr isa Attribute, has attribute-name {_name};
                 $m (measured-attribute:$attr) isa measurement,
-                    has latest true,
-                    has measurement-value {value},
-                    has measurement-time {time};
-        """
-        return self.insert_database(query)
+                    has measurement-time $time;
+                not {{ $m has latest true; }};
+                not {{ $m has measurement-count $count; }};
+        '''
+        conditions = ''
+        if keep_count > 0:
+            # the latest measurement counts as the first one
+            result = self.get_database(match_query + f'''
+                get $time;
+                sort $time desc; offset {keep_count - 1}; limit 1;
+            ''')
+            if result is None:
+                return None
+            if len(result) == 0:
+                return conditions, []
+            threshold = result[0].get('time').as_attribute().get_value()
+            conditions += '$time <= {};'.format(
+                convert_py_type_to_query_type(threshold))
+        if time_cutoff is not None:
+            conditions += '$time < {};'.format(
+                convert_py_type_to_query_type(time_cutoff))
+
+        result = self.fetch_database(match_query + f'''
+                {conditions}
+                $m has measurement-value $value;
+            fetch $time; $value;
+        ''')
+        if result is None:
+            return None
+        return conditions, [
+            (convert_query_type_to_py_type(r.get('time')),
+             r.get('value').get('value'))
+            for r in result]
+
+    def _fetch_aggregates(
+            self,
+            buckets: Iterable[Tuple[str, datetime]]
+         ) -> dict[Tuple[str, datetime], Tuple[float, int]] | None:
+        """
+        Fetch the aggregates of QAs/EAs created by previous compactions.
+
+        Only the aggregates between the first and last bucket of each QA/EA
+        are fetched.
+
+        :param buckets: tuples with the form (QA/EA NAME, PERIOD START)
+        :return: dict with the form {(QA/EA NAME, PERIOD START): (MEAN
+            VALUE, COUNT)}, or None if a query failed
+        """
+        buckets_by_name = {}
+        for name, bucket in buckets:
+            buckets_by_name.setdefault(name, []).append(bucket)
+        aggregates = {}
+        for name, times in buckets_by_name.items():
+            _name = convert_py_type_to_query_type(name)
+            _first = convert_py_type_to_query_type(min(times))
+            _last = convert_py_type_to_query_type(max(times))
+            result = self.fetch_database(f'''
+                match
+                    $attr isa Attribute, has attribute-name {_name};
+                    $m (measured-attribute:$attr) isa measurement,
+                        has measurement-time $time,
+                        has measurement-value $value,
+                        has measurement-count $count;
+                    $time >= {_first}; $time <= {_last};
+                fetch $time; $value; $count;
+            ''')
+            if result is None:
+                return None
+            for r in result:
+                bucket = convert_query_type_to_py_type(r.get('time'))
+                aggregates[(name, bucket)] = (
+                    r.get('value').get('value'), r.get('count').get('value'))
+        return aggregates
+
+    def compact_measurements(
+            self,
+            keep_count: int = 0,
+            keep_time: float = 0.0,
+            downsample_period: float = 0.0,
+            aggregate_retention: float = 0.0,
+            now: Optional[datetime] = None
+         ) -> MeasurementCompactionStatsDict | None:
+        """
+        Remove old measurements, optionally downsampling them into aggregates.
+
+        A measurement is kept when it is one of the `keep_count` most recent
+        measurements of its QA/EA, or when it is not older than `keep_time`
+        seconds. The latest measurement of each QA/EA is always kept. When
+        `downsample_period` is larger than 0, the removed measurements are
+        replaced by one aggregate measurement per QA/EA and period, with the
+        mean value, the period start as 'measurement-time', and the number of
+        samples as 'measurement-count'. Aggregates older than
+        `aggregate_retention` seconds are removed. The attributes of the
+        removed measurements that are not owned by any measurement anymore
+        are removed as well. Only the removed measurements are read, see
+        :meth:`_fetch_expired_measurements`, and all changes are performed in
+        a single write transaction.
+
+        :param keep_count: number of measurements to keep per QA/EA, 0 means
+            there is no limit by number
+        :param keep_time: time to keep measurements in seconds, 0 means there
+            is no limit by time
+        :param downsample_period: aggregate period in seconds, 0 disables
+            downsampling
+        :param aggregate_retention: time to keep aggregates in seconds, 0
+            means aggregates are kept forever
+        :param now: current time, defaults to `datetime.now()`
+        :return: compaction statistics, or None if the transaction failed
+        """
+        stats = {'deleted': 0, 'aggregated': 0, 'expired_aggregates': 0}
+        if keep_count <= 0 and keep_time <= 0.0 and aggregate_retention <= 0.0:
+            return stats
+
+        now = datetime.now() if now is None else now
+        time_cutoff = now - timedelta(seconds=keep_time)
+        aggregate_cutoff = now - timedelta(seconds=aggregate_retention)
+
+        samples = {}
+        if keep_count > 0 or keep_time > 0.0:
+            names = self.fetch_database('''
+                match $attr isa Attribute, has attribute-name $name;
+                fetch $name;
+            ''')
+            if names is None:
+                return None
+            for r in names:
+                name = r.get('name').get('value')
+                result = self._fetch_expired_measurements(
+                    name, keep_count, time_cutoff if keep_time > 0.0 else None)
+                if result is None:
+                    return None
+                if len(result[1]) > 0:
+                    samples[name] = result
+
+        queries = []
+        # values of the removed measurements, their attributes are removed
+        # when no other measurement owns them
+        removed = {'time': [], 'value': set(), 'count': set()}
+        new_aggregates = {}
+        for name, (conditions, expired) in samples.items():
+            stats['deleted'] += len(expired)
+            removed['time'].append(max(t for t, _ in expired))
+            removed['value'].update(value for _, value in expired)
+            _name = convert_py_type_to_query_type(name)
+            queries.append(('delete', f'''
+                match
+                    $attr isa Attribute, has attribute-name {_name};
+                    $m (measured-attribute:$attr) isa measurement,
+                        has measurement-time $time;
+                    {conditions}
+                    not {{ $m has latest true; }};
+                    not {{ $m has measurement-count $count; }};
+                delete $m isa measurement;
+            '''))
+            if downsample_period <= 0.0:
+                continue
+            for sample_time, value in expired:
+                bucket = datetime.fromtimestamp(
+                    math.floor(sample_time.timestamp() / downsample_period)
+                    * downsample_period)
+                if aggregate_retention > 0.0 and bucket < aggregate_cutoff:
+                    continue
+                _sum, _count = new_aggregates.get((name, bucket), (0.0, 0))
+                new_aggregates[(name, bucket)] = (_sum + value, _count + 1)
+
+        aggregates = self._fetch_aggregates(new_aggregates.keys())
+        if aggregates is None:
+            return None
+        for (name, bucket), (_sum, _count) in new_aggregates.items():
+            _name = convert_py_type_to_query_type(name)
+            _bucket = convert_py_type_to_query_type(bucket)
+            if (name, bucket) in aggregates:
+                # merge with the aggregate created by a previous compaction
+                value, count = aggregates[(name, bucket)]
+                _sum += value * count
+                _count += count
+                removed['value'].add(value)
+                removed['count'].add(count)
+                queries.append(('delete', f'''
+                    match
+                        $attr isa Attribute, has attribute-name {_name};
+                        $m (measured-attribute:$attr) isa measurement,
+                            has measurement-time {_bucket},
+                            has measurement-count $count;
+                    delete $m isa measurement;
+                '''))
+            stats['aggregated'] += 1
+            queries.append(('insert', f'''
+                match
+                    $attr isa Attribute, has attribute-name {_name};
+                insert
+                    $m (measured-attribute:$attr) isa measurement,
+                        has latest false,
+                        has measurement-value {_sum / _count},
+                        has measurement-time {_bucket},
+                        has measurement-count {_count};
+            '''))
+
+        if aggregate_retention > 0.0:
+            _cutoff = convert_py_type_to_query_type(aggregate_cutoff)
+            expired_aggregates = self.fetch_database(f'''
+                match
+                    $m isa measurement,
+                        has measurement-time $time,
+                        has measurement-value $value,
+                        has measurement-count $count;
+                    $time < {_cutoff};
+                fetch $time; $value; $count;
+            ''')
+            if expired_aggregates is None:
+                return None
+            if len(expired_aggregates) > 0:
+                stats['expired_aggregates'] = len(expired_aggregates)
+                removed['time'].append(max(
+                    convert_query_type_to_py_type(r.get('time'))
+                    for r in expired_aggregates))
+                for r in expired_aggregates:
+                    removed['value'].add(r.get('value').get('value'))
+                    removed['count'].add(r.get('count').get('value'))
+                queries.append(('delete', f'''
+                    match
+                        $m isa measurement,
+                            has measurement-time $time,
+                            has measurement-count $count;
+                        $time < {_cutoff};
+                    delete $m isa measurement;
+                '''))
+
+        if len(queries) == 0:
+            return stats
+
+        # remove the attributes of the removed measurements that are not
+        # owned by any measurement anymore, the merged aggregates' times are
+        # owned by the new aggregates
+        if len(removed['time']) > 0:
+            _time = convert_py_type_to_query_type(max(removed['time']))
+            queries.append(('delete', f'''
+                match
+                    $a isa measurement-time;
+                    $a <= {_time};
+                    not {{ $owner has $a; }};
+                delete $a isa measurement-time;
+            '''))
+        for attribute, values in [
+                ('measurement-value', removed['value']),
+                ('measurement-count', removed['count'])]:
+            values = sorted(values)
+            for i in range(0, len(values), ORPHAN_VALUES_PER_QUERY):
+                _values = create_value_disjunction_query(
+                    'a', values[i:i + ORPHAN_VALUES_PER_QUERY])
+                queries.append(('delete', f'''
+                    match
+                        $a isa {attribute};
+                        {_values}
+                        not {{ $owner has $a; }};
+                    delete $a isa {attribute};
+                '''))
+        # the latest measurements are kept, no status is affected
+        with self.record_changes(), self.runtime_writes():
+            if self.write_queries(queries) is None:
+                return None
+        return stats
 
     def get_latest_measurement(self, name: str) -> float | None:
         """
@@ -705,6 +1613,7 @@ class ModelInterface(TypeDBInterface):
             return None
         return query_result[0].get('value').get('value')
 
+    @cached_query
     def get_selectable_c_configs(self, component_name: str) -> list[str]:
         """
         Get the name of selectable component configurations for a Component.
@@ -725,6 +1634,7 @@ class ModelInterface(TypeDBInterface):
         result = self.fetch_database(query)
         return [r.get('name').get('value') for r in result]
 
+    @cached_query
     def get_selectable_fds(self, function_name: str) -> list[str]:
         """
         Get the name of selectable funtion designs for a Function.
@@ -745,6 +1655,7 @@ class ModelInterface(TypeDBInterface):
         result = self.fetch_database(query)
         return [r.get('name').get('value') for r in result]
 
+    @cached_query
     def get_function_design_priority(self, fd_name: str) -> list[str]:
         """
         Get function design priority value.
@@ -755,6 +1666,7 @@ class ModelInterface(TypeDBInterface):
         return self.fetch_attribute_from_thing(
             'function-design', [('function-design-name', fd_name)], 'priority')
 
+    @cached_query
     def get_component_configuration_priority(self, cc_name: str) -> list[str]:
         """
         Get component configuration priority value.
@@ -767,6 +1679,99 @@ class ModelInterface(TypeDBInterface):
             [('component-configuration-name', cc_name)],
             'priority')
 
+    @cached_query
+    def get_planning_snapshot(
+            self,
+            functions: Optional[Iterable[str]] = None,
+            components: Optional[Iterable[str]] = None
+         ) -> PlanningSnapshotDict:
+        """
+        Get all the information required to plan an adaptation.
+
+        The snapshot contains the adaptable functions with their selectable
+        function designs, and the adaptable components with their selectable
+        component configurations, including their priorities. Since selecting
+        a function design may require new components, the selectable
+        configurations of all the components required by the selectable
+        function designs are included as well. All queries are performed in a
+        single read transaction, see :meth:`snapshot`.
+
+        A partial snapshot, used for incremental planning, only includes the
+        adaptable functions in `functions` and the adaptable components in
+        `components`. It includes the selectable configurations of all
+        `components`, adaptable or not, and of the components required by
+        the selectable function designs. The names of all adaptable
+        functions and components are always included, so the planner can
+        drop the decisions of the ones that are not adaptable anymore.
+
+        :param functions: functions included, all when it is None. It must be
+            hashable, e.g., a tuple, as the result is cached
+        :param components: components included, all when it is None. It must
+            be hashable, e.g., a tuple, as the result is cached
+        :return: planning snapshot
+        """
+        with self.snapshot():
+            snapshot = {
+                'functions': self.get_adaptable_functions(),
+                'fds': [],
+                'components': self.get_adaptable_components(),
+                'c_configs': [],
+            }
+            snapshot['adaptable_functions'] = list(snapshot['functions'])
+            snapshot['adaptable_components'] = list(snapshot['components'])
+            if functions is not None:
+                snapshot['functions'] = [
+                    f for f in snapshot['functions'] if f in functions]
+            if components is not None:
+                snapshot['components'] = [
+                    c for c in snapshot['components'] if c in components]
+                # the configurations of all requested components are included
+                components = list(components)
+            else:
+                components = list(snapshot['components'])
+            for function in snapshot['functions']:
+                for fd in self.get_selectable_fds(function):
+                    priority = self.get_function_design_priority(fd)
+                    required_components = \
+                        self.get_components_in_function_design(fd)
+                    snapshot['fds'].append({
+                        'function': function,
+                        'name': fd,
+                        'priority': priority[0] if priority else None,
+                        'required_components': required_components,
+                    })
+                    components.extend(
+                        c for c in required_components if c not in components)
+
+            for component in components:
+                for c_config in self.get_selectable_c_configs(component):
+                    priority = self.get_component_configuration_priority(
+                        c_config)
+                    snapshot['c_configs'].append({
+                        'component': component,
+                        'name': c_config,
+                        'priority': priority[0] if priority else None,
+                    })
+        return snapshot
+
+    @cached_query
+    def get_status_dependencies(self) -> StatusDependenciesDict:
+        """
+        Get the relations the derived statuses depend on.
+
+        E.g., which function designs and component configurations are
+        constrained by each QA/EA. Used to find the functions and components
+        affected by a change, see
+        :func:`rosa_kb.status_materializer.get_affected_things`.
+
+        :return: status dependencies
+        """
+        with self.snapshot():
+            return parse_dependencies({
+                key: self.fetch_database(query)
+                for key, query in DEPENDENCIES_QUERIES.items()
+            })
+
     def get_relationship_with_attribute(
             self,
             entity: str,
@@ -822,22 +1827,67 @@ class ModelInterface(TypeDBInterface):
         :param r_name: relationship name
         :return: update query result
         """
-        current_selected = self.get_relationship_with_attribute(
-            entity, entity_name, relation, 'is-selected', True)
-        for r in current_selected:
-            if r != r_name:
-                self.update_attribute_in_thing(
-                    relation,
-                    '{}-name'.format(relation),
-                    r,
-                    'is-selected',
-                    False)
-        return self.update_attribute_in_thing(
-            relation,
-            '{}-name'.format(relation),
-            r_name,
-            'is-selected',
-            True)
+        return self.select_relationships(
+            entity, relation, [(entity_name, r_name)])
+
+    def select_relationships(
+            self,
+            entity: str,
+            relation: str,
+            selected: list[Tuple[str, str]]) -> list[ConceptMap] | None:
+        """
+        Select relationship individuals, and unselect all other individuals.
+
+        Set the 'is-selected' attribute of the selected individuals to true,
+        and set 'is-selected' to false for all other 'relation' individuals
+        related to the same entities. All updates are performed in a single
+        write transaction, regardless of the number of selected individuals.
+
+        :param entity: entity type
+        :param relation: relation type
+        :param selected: a list of tuples with the form (ENTITY_NAME, R_NAME)
+            representing which relationship was selected for which entity
+        :return: update query result
+        """
+        selected = dict(selected)
+        if len(selected) == 0:
+            return []
+        match_entities = create_value_disjunction_query(
+            'e-name', selected.keys())
+        match_selected = create_value_disjunction_query(
+            'r-name', selected.values())
+        unselect_query = f'''
+            match
+                $e isa {entity}, has {entity.lower()}-name $e-name;
+                {match_entities}
+                $r ($e) isa {relation}, has {relation}-name $r-name,
+                    has is-selected $s;
+                $s == true;
+                not {{ {match_selected} }};
+            delete $r has $s;
+            insert $r has is-selected false;
+        '''
+        delete_selected_query = f'''
+            match
+                $r isa {relation}, has {relation}-name $r-name,
+                    has is-selected $s;
+                {match_selected}
+            delete $r has $s;
+        '''
+        insert_selected_query = f'''
+            match
+                $r isa {relation}, has {relation}-name $r-name;
+                {match_selected}
+            insert $r has is-selected true;
+        '''
+        # selecting a component configuration changes the component status
+        change_type = 'Function' if entity == 'Function' else 'Component'
+        with self.record_changes(change_type, selected.keys()):
+            return self.write_queries([
+                ('update', unselect_query),
+                ('delete', delete_selected_query),
+                ('insert', insert_selected_query),
+            ])
 
     def select_function_design(
             self, f_name: str, fd_name: str) -> Iterator[ConceptMap] | None:
@@ -882,12 +1932,13 @@ class ModelInterface(TypeDBInterface):
         :param value: whether the component should be active or not
         :return: update query result
         """
-        return self.update_attribute_in_thing(
-            'Component',
-            'component-name',
-            c_name,
-            'is-active',
-            value)
+        with self.record_changes('Component', [c_name]):
+            return self.update_attribute_in_thing(
+                'Component',
+                'component-name',
+                c_name,
+                'is-active',
+                value)
 
     def is_component_active(self, name: str) -> bool:
         """
@@ -980,7 +2031,8 @@ class ModelInterface(TypeDBInterface):
         )
 
         query = match_query + insert_query
-        insert_result = self.insert_database(query)
+        with self.record_changes():
+            insert_result = self.insert_database(query)
         if insert_result is None:
             return None
         return datetime.fromisoformat(
@@ -996,7 +2048,9 @@ class ModelInterface(TypeDBInterface):
         Set the 'is-selected' attribute of the function desings in
         `functions_selected_fd` to true, and returns a tuple with a list with
         the components that need to be activated and a list with the components
-        that need to be deactivated.
+        that need to be deactivated. Components required by any of the
+        selected function designs are never deactivated. The number of queries
+        does not depend on the number of function designs.
 
         :param functions_selected_fd: a list of tuples with the form
             (FUNCTION_NAME, FD_NAME) representing the function designs that
@@ -1004,37 +2058,57 @@ class ModelInterface(TypeDBInterface):
         :return: tuple with the form (c_activate, c_deactivate), indicating
             which components should be activated and deactivated
         """
+        functions_selected_fd = dict(functions_selected_fd)
+        if len(functions_selected_fd) == 0:
+            return [], []
+
+        # components required by the selected fds and whether they are active
+        match_fds = create_value_disjunction_query(
+            'fd-name', functions_selected_fd.values())
+        query = f'''
+            match
+                $fd (required-component: $c) isa function-design,
+                    has function-design-name $fd-name;
+                {match_fds}
+                $c isa Component, has component-name $c-name;
+            fetch $c-name; $c: is-active;
+        '''
+        _c_required = []
         _c_activate = []
+        for r in self.fetch_database(query):
+            c = r.get('c-name').get('value')
+            if c in _c_required:
+                continue
+            _c_required.append(c)
+            c_active = [
+                a.get('value') for a in r.get('c').get('is-active', [])]
+            if True not in c_active:
+                _c_activate.append(c)
+
+        # active components required by the fds currently selected
+        match_functions = create_value_disjunction_query(
+            'f-name', functions_selected_fd.keys())
+        query = f'''
+            match
+                $f isa Function, has function-name $f-name;
+                {match_functions}
+                $fd (function: $f, required-component: $c) isa function-design,
+                    has function-design-name $fd-name, has is-selected true;
+                $c isa Component, has component-name $c-name,
+                    has is-active true;
+            fetch $f-name; $fd-name; $c-name;
+        '''
         _c_deactivate = []
-        for function, fd in functions_selected_fd:
-            # select components that need to be activated
-            for c in self.get_components_in_function_design(fd):
-                c_active = self.fetch_attribute_from_thing(
-                    'Component', [('component-name', c)], 'is-active')
-                if True not in c_active:
-                    _c_activate.append(c)
-            # select components that need to be deactivated
-            fd_selected = self.fetch_attribute_from_thing(
-                'function-design',
-                [('function-design-name', fd)],
-                'is-selected')
-            if len(fd_selected) == 0  \
-               or len(fd_selected) > 0 and fd_selected[0] is False:
-                _fd = self.get_relationship_with_attribute(
-                    'Function',
-                    function,
-                    'function-design',
-                    'is-selected',
-                    True
-                )
-                if len(_fd) > 0:
-                    for c in self.get_components_in_function_design(_fd[0]):
-                        c_active = self.fetch_attribute_from_thing(
-                            'Component', [('component-name', c)], 'is-active')
-                        if c not in _c_activate and len(c_active) > 0 \
-                           and c_active[0] is True:
-                            _c_deactivate.append(c)
-            self.select_function_design(function, fd)
+        for r in self.fetch_database(query):
+            function = r.get('f-name').get('value')
+            fd = r.get('fd-name').get('value')
+            c = r.get('c-name').get('value')
+            if fd != functions_selected_fd[function] \
+               and c not in _c_required and c not in _c_deactivate:
+                _c_deactivate.append(c)
+
+        self.select_relationships(
+            'Function', 'function-design', functions_selected_fd.items())
         return _c_activate, _c_deactivate
 
     def select_components_selected_config(
@@ -1054,17 +2128,30 @@ class ModelInterface(TypeDBInterface):
         :return: list with the name of the component configurations that need
             to be updated
         """
+        components_selected_config = dict(components_selected_config)
+        if len(components_selected_config) == 0:
+            return []
+
+        match_configs = create_value_disjunction_query(
+            'name', components_selected_config.values())
+        query = f'''
+            match
+                $cc isa component-configuration,
+                    has component-configuration-name $name,
+                    has is-selected true;
+                {match_configs}
+            fetch $name;
+        '''
+        _selected = [
+            r.get('name').get('value') for r in self.fetch_database(query)]
         _configs = []
-        for component, config in components_selected_config:
-            config_selected = self.fetch_attribute_from_thing(
-                'component-configuration',
-                [('component-configuration-name', config)],
-                'is-selected'
-            )
-            if len(config_selected) == 0  \
-               or len(config_selected) > 0 and config_selected[0] is False:
+        for config in components_selected_config.values():
+            if config not in _selected and config not in _configs:
                 _configs.append(config)
-            self.select_component_configuration(component, config)
+        self.select_relationships(
+            'Component',
+            'component-configuration',
+            components_selected_config.items())
         return _configs
 
     def get_obsolete_components(self) -> list[str]:
@@ -1131,22 +2218,24 @@ class ModelInterface(TypeDBInterface):
         has 'is-selected' attribute set to true, but it is no required anymore
         """
         _fds = self.get_obsolete_fds()
-        for _fd in _fds:
-            self.update_attribute_in_thing(
-                'function-design',
-                'function-design-name',
-                _fd,
-                'is-selected',
-                False)
+        with self.record_changes('function-design', _fds):
+            for _fd in _fds:
+                self.update_attribute_in_thing(
+                    'function-design',
+                    'function-design-name',
+                    _fd,
+                    'is-selected',
+                    False)
 
         _ccs = self.get_obsolete_component_configurations()
-        for _cc in _ccs:
-            self.update_attribute_in_thing(
-                'component-configuration',
-                'component-configuration-name',
-                _cc,
-                'is-selected',
-                False)
+        with self.record_changes('component-configuration', _ccs):
+            for _cc in _ccs:
+                self.update_attribute_in_thing(
+                    'component-configuration',
+                    'component-configuration-name',
+                    _cc,
+                    'is-selected',
+                    False)
 
     def select_configuration(
             self,
@@ -1164,20 +2253,27 @@ class ModelInterface(TypeDBInterface):
             that were selected for which components
         :return: reconfig plan creation time.
         """
-        _c_activate, _c_deactivate = self.select_fd_and_get_components(
-            functions_selected_fd)
-        _configs = self.select_components_selected_config(
-            components_selected_config)
-
-        self.unselect_obsolete_fds_cc()
-        _c_obsolete = self.get_obsolete_components()
-        _c_deactivate.extend(
-            c for c in _c_obsolete if
-            (c not in _c_activate and c not in _c_deactivate))
-
-        return self.create_reconfiguration_plan(
-            _c_activate, _c_deactivate, _configs)
+        try:
+            with self.batch():
+                _c_activate, _c_deactivate = \
+                    self.select_fd_and_get_components(functions_selected_fd)
+                _configs = self.select_components_selected_config(
+                    components_selected_config)
+
+                self.unselect_obsolete_fds_cc()
+                _c_obsolete = self.get_obsolete_components()
+                _c_deactivate.extend(
+                    c for c in _c_obsolete if
+                    (c not in _c_activate and c not in _c_deactivate))
+
+                return self.create_reconfiguration_plan(
+                    _c_activate, _c_deactivate, _configs)
+        except TypeDBDriverException:
+            if self.get_open_transaction() is not None:
+                raise
+            return None
 
+    @cached_query
     def get_components_in_function_design(self, fd_name: str) -> list[str]:
         """
         Get components in relation with a function design.
@@ -1258,36 +2354,39 @@ class ModelInterface(TypeDBInterface):
         :return: dict representing the reconfiguration plan, its keys are:
             start_time, c_activate, c_deactivate, c_config
         """
-        query = f'''
-            match (structural-adaptation:$ca_) isa reconfiguration-plan,
-                has start-time {start_time.isoformat(timespec='milliseconds')};
-            $ca_ (component:$ca) isa component-activation;
-            $ca isa Component, has component-name $c_activate;
-            fetch $c_activate;
-        '''
-        result = self.fetch_database(query)
-        c_activate = [r.get('c_activate').get('value') for r in result]
+        _start_time = start_time.isoformat(timespec='milliseconds')
+        with self.snapshot():
+            query = f'''
+                match (structural-adaptation:$ca_) isa reconfiguration-plan,
+                    has start-time {_start_time};
+                $ca_ (component:$ca) isa component-activation;
+                $ca isa Component, has component-name $c_activate;
+                fetch $c_activate;
+            '''
+            result = self.fetch_database(query)
+            c_activate = [r.get('c_activate').get('value') for r in result]
 
-        query = f'''
-            match (structural-adaptation:$cd_) isa reconfiguration-plan,
-                has start-time {start_time.isoformat(timespec='milliseconds')};
-            $cd_ (component:$cd) isa component-deactivation;
-            $cd isa Component, has component-name $c_deactivate;
-            fetch $c_deactivate;
-        '''
-        result = self.fetch_database(query)
-        c_deactivate = [r.get('c_deactivate').get('value') for r in result]
+            query = f'''
+                match (structural-adaptation:$cd_) isa reconfiguration-plan,
+                    has start-time {_start_time};
+                $cd_ (component:$cd) isa component-deactivation;
+                $cd isa Component, has component-name $c_deactivate;
+                fetch $c_deactivate;
+            '''
+            result = self.fetch_database(query)
+            c_deactivate = [r.get('c_deactivate').get('value') for r in result]
+
+            query = f'''
+                match (parameter-adaptation:$pa) isa reconfiguration-plan,
+                    has start-time {_start_time};
+                $pa (component-configuration:$cc) isa parameter-adaptation;
+                $cc isa component-configuration,
+                    has component-configuration-name $c_config;
+                fetch $c_config;
+            '''
+            result = self.fetch_database(query)
+            c_config = [r.get('c_config').get('value') for r in result]
 
-        query = f'''
-            match (parameter-adaptation:$pa) isa reconfiguration-plan,
-                has start-time {start_time.isoformat(timespec='milliseconds')};
-            $pa (component-configuration:$cc) isa parameter-adaptation;
-            $cc isa component-configuration,
-                has component-configuration-name $c_config;
-            fetch $c_config;
-        '''
-        result = self.fetch_database(query)
-        c_config = [r.get('c_config').get('value') for r in result]
         reconfig_plan_dict = {
             'start_time': start_time,
             'c_activate': c_activate,
@@ -1325,6 +2424,81 @@ class ModelInterface(TypeDBInterface):
         reconfig_plan_dict['start_time'] = time
         return reconfig_plan_dict
 
+    def get_reconfiguration_plan_details(
+            self,
+            start_time: Optional[datetime] = None
+         ) -> ReconfigPlanDetailsDict | None:
+        """
+        Get reconfiguration plan with the attributes of its components.
+
+        Get the reconfiguration plan, its result, and all attributes of the
+        components to activate and deactivate with a single fetch query.
+
+        :param start_time: start-time of the desired reconfiguration plan.
+            When it is None, the most recent pending reconfiguration plan is
+            returned
+        :return: dict representing the reconfiguration plan, or None when
+            there is no reconfiguration plan
+        """
+        if start_time is None:
+            match_plan = 'not { $rp has result $result; };'
+        else:
+            match_plan = '$time == {};'.format(
+                start_time.isoformat(timespec='milliseconds'))
+        query = f'''
+            match
+                $rp isa reconfiguration-plan, has start-time $time;
+                {match_plan}
+            fetch
+                $time;
+                $rp: result, end-time;
+                c_activate: {{
+                    match
+                        $rp (structural-adaptation: $ca_);
+                        $ca_ (component: $c) isa component-activation;
+                    fetch $c: attribute;
+                }};
+                c_deactivate: {{
+                    match
+                        $rp (structural-adaptation: $cd_);
+                        $cd_ (component: $c) isa component-deactivation;
+                    fetch $c: attribute;
+                }};
+                c_config: {{
+                    match
+                        $rp (parameter-adaptation: $pa);
+                        $pa (component-configuration: $cc)
+                            isa parameter-adaptation;
+                        $cc has component-configuration-name $c_config;
+                    fetch $c_config;
+                }};
+            sort $time desc; limit 1;
+        '''
+        result = self.fetch_database(query)
+        if result is None or len(result) == 0:
+            return None
+
+        result = result[0]
+        plan_attributes = {
+            attr_name: convert_query_type_to_py_type(attr[0])
+            for attr_name, attr in result.get('rp').items()
+            if attr_name != 'type' and len(attr) > 0
+        }
+        return {
+            'start_time': convert_query_type_to_py_type(result.get('time')),
+            'end_time': plan_attributes.get('end-time'),
+            'result': plan_attributes.get('result'),
+            'c_activate': [
+                self._component_dict_from_fetch(r.get('c'))
+                for r in result.get('c_activate')],
+            'c_deactivate': [
+                self._component_dict_from_fetch(r.get('c'))
+                for r in result.get('c_deactivate')],
+            'c_config': [
+                r.get('c_config').get('value')
+                for r in result.get('c_config')],
+        }
+
     def update_reconfiguration_plan_result(
         self,
         start_time: str | datetime,
@@ -1352,7 +2526,8 @@ class ModelInterface(TypeDBInterface):
                 }
             ]
         }
-        return self.update_attributes_in_thing(match_dict)
+        with self.record_changes():
+            return self.update_attributes_in_thing(match_dict)
 
     def get_outdated_reconfiguration_plans(self) -> list[datetime]:
         """
@@ -1386,21 +2561,28 @@ class ModelInterface(TypeDBInterface):
 
         :return: update query result
         """
-        outdated_times = self.get_outdated_reconfiguration_plans()
-        if len(outdated_times) == 0:
-            return None
+        try:
+            with self.batch():
+                outdated_times = self.get_outdated_reconfiguration_plans()
+                if len(outdated_times) == 0:
+                    return None
 
-        update_plans = [{
-            'attributes': {'start-time': time},
-            'update_attributes': {
-                'end-time': datetime.now(),
-                'result': 'abandoned'}
-        } for time in outdated_times]
+                update_plans = [{
+                    'attributes': {'start-time': time},
+                    'update_attributes': {
+                        'end-time': datetime.now(),
+                        'result': 'abandoned'}
+                } for time in outdated_times]
 
-        match_dict = {
-            'reconfiguration-plan': update_plans
-        }
-        return self.update_attributes_in_thing(match_dict)
+                match_dict = {
+                    'reconfiguration-plan': update_plans
+                }
+                with self.record_changes():
+                    return self.update_attributes_in_thing(match_dict)
+        except TypeDBDriverException:
+            if self.get_open_transaction() is not None:
+                raise
+            return None
 
     def get_reconfiguration_plan_result(
             self, start_time: datetime) -> str | None:
@@ -1422,6 +2604,7 @@ class ModelInterface(TypeDBInterface):
             return None
         return convert_query_type_to_py_type(result[0].get('result'))
 
+    @cached_query
     def get_component_parameters(
             self, c_config: str) -> ComponentConfigurationDict | None:
         """
@@ -1489,6 +2672,14 @@ class ModelInterface(TypeDBInterface):
             result_dict[attr_name] = attr_value
         return result_dict
 
+    def _component_dict_from_fetch(self, concept: dict) -> ComponentDict:
+        result_dict = {}
+        result_dict['type'] = concept.get('type').get('label')
+        for attr in concept.get('attribute'):
+            attr_name = attr.get('type').get('label').replace('-', '_')
+            result_dict[attr_name] = convert_query_type_to_py_type(attr)
+        return result_dict
+
     def get_active_component_process(self) -> ComponentProcessDict | None:
         """
         Get all attributes owned by a Component, and the Component type.
@@ -1523,10 +2714,11 @@ class ModelInterface(TypeDBInterface):
         :param start_time: component-process start-time.
         :return: update query result
         """
-        return self.update_attribute_in_thing(
-            'component-process',
-            'start-time',
-            start_time,
-            'end-time',
-            datetime.now()
-        )
+        with self.record_changes():
+            return self.update_attribute_in_thing(
+                'component-process',
+                'start-time',
+                start_time,
+                'end-time',
+                datetime.now()
+            )
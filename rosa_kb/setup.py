@@ -26,7 +26,8 @@ setup(
     tests_require=['pytest'],
     entry_points={
         'console_scripts': [
-            'rosa_kb = rosa_kb.rosa_kb_node:main'
+            'rosa_kb = rosa_kb.rosa_kb_node:main',
+            'rosa_kb_bulk_load = rosa_kb.bulk_loader:main',
         ],
     },
 )
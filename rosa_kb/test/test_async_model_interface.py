@@ -0,0 +1,68 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import pytest
+import threading
+from rosa_kb.async_model_interface import AsyncModelInterface
+from rosa_kb.memory_model_interface import MemoryModelInterface
+
+
+@pytest.fixture
+def kb_interface():
+    kb_interface = AsyncModelInterface(MemoryModelInterface(
+        "",
+        "",
+        ["config/schema.tql", "config/ros_schema.tql"],
+        ["test/test_data/test_data.tql", "test/test_data/ros_test_data.tql"],
+    ))
+    yield kb_interface
+    kb_interface.shutdown()
+
+
+def test_future(kb_interface):
+    future = kb_interface.get_selectable_fds('function2')
+    assert future.result() == \
+        kb_interface.model.get_selectable_fds('function2')
+
+
+def test_map(kb_interface):
+    functions = kb_interface.get_adaptable_functions().result()
+    assert kb_interface.map('get_selectable_fds', functions) == [
+        kb_interface.model.get_selectable_fds(f) for f in functions]
+
+
+def test_run(kb_interface):
+    async def get_priorities():
+        return await asyncio.gather(*[
+            kb_interface.run('get_function_design_priority', fd)
+            for fd in ['f2_fd1_c2_c3', 'f2_fd2_c4_c5']])
+    assert asyncio.run(get_priorities()) == [[2.0], [1.0]]
+
+
+def test_concurrent_calls():
+    class Model:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def wait(self, value):
+            self.barrier.wait()
+            return value
+
+    kb_interface = AsyncModelInterface(Model(), max_workers=3)
+    assert kb_interface.map('wait', [1, 2, 3]) == [1, 2, 3]
+    kb_interface.shutdown()
+
+
+def test_unknown_attribute(kb_interface):
+    with pytest.raises(AttributeError):
+        kb_interface.revision
@@ -0,0 +1,75 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from rosa_kb.bulk_loader import bulk_load
+from rosa_kb.bulk_loader import create_chunks
+from rosa_kb.bulk_loader import generate_architecture_model
+from rosa_kb.memory_model_interface import MemoryModelInterface
+from rosa_kb.sqlite_model_interface import SQLiteModelInterface
+
+
+schema_path = ["config/schema.tql", "config/ros_schema.tql"]
+
+
+def test_create_chunks():
+    chunks = create_chunks([['$a_0 isa A'], ['$b_1 isa B', '$c_1 isa C']], 1)
+    assert chunks == [
+        ('insert\n$a_0 isa A;\n', 1),
+        ('insert\n$b_1 isa B;\n$c_1 isa C;\n', 2)]
+
+
+@pytest.mark.parametrize("interface_class", [
+    MemoryModelInterface, SQLiteModelInterface])
+def test_bulk_load(interface_class, tmp_path):
+    data_path = str(tmp_path / 'data.tql')
+    with open(data_path, 'w') as file:
+        file.write(generate_architecture_model(50))
+    kb_interface = interface_class("", "", schema_path)
+    progress = []
+    stats = kb_interface.bulk_load(
+        ["test/test_data/test_data.tql", data_path], 4, 30,
+        lambda written, total: progress.append((written, total)))
+    assert stats['files'] == 2 and stats['failed_chunks'] == 0 \
+        and stats['statements'] > 300 \
+        and progress[-1] == (300, 300) \
+        and kb_interface.get_selectable_c_configs('c42') == [
+            'c42_low', 'c42_high'] \
+        and kb_interface.get_components_in_function_design(
+            'f2_fd1_c2_c3') == ['component2', 'component3']
+
+
+def test_bulk_load_failed_chunk(tmp_path):
+    data_path = str(tmp_path / 'data.tql')
+    with open(data_path, 'w') as file:
+        file.write('''
+            insert $c isa Component, has component-name "component1";
+            insert $c isa Component, has component-name "new_component";
+        ''')
+    kb_interface = MemoryModelInterface(
+        "", "", schema_path, "test/test_data/test_data.tql")
+    stats = kb_interface.bulk_load(data_path, 2, 1)
+    assert stats['chunks'] == 2 and stats['failed_chunks'] == 1 \
+        and kb_interface.get_component_all_attributes(
+            'new_component') is not None
+
+
+def test_bulk_load_unsupported_file(tmp_path):
+    data_path = str(tmp_path / 'data.tql')
+    with open(data_path, 'w') as file:
+        file.write('match $c isa Component; insert $c has is-active true;')
+    loaded = []
+    stats = bulk_load(
+        data_path, lambda query: True, loaded.append)
+    assert loaded == [data_path] and stats['files'] == 1 \
+        and stats['chunks'] == 0
@@ -0,0 +1,70 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+
+import pytest
+
+from rosa_kb.change_events import ChangeRecorder
+from rosa_kb.change_events import has_changes
+
+
+def test_collect():
+    recorder = ChangeRecorder()
+    recorder.record('attributes', ['ignored'])
+    with recorder.collect() as changes:
+        recorder.record('attributes', ['obstacles', 'battery'])
+        recorder.record('attributes', ['obstacles'])
+        recorder.record('components', ['c1'])
+        assert has_changes(changes) is False
+    assert changes == {
+        'attributes': ['obstacles', 'battery'],
+        'components': ['c1'],
+        'functions': [],
+        'actions': [],
+    }
+    assert has_changes(changes) is True
+
+
+def test_nested_collect():
+    recorder = ChangeRecorder()
+    with recorder.collect() as changes:
+        with recorder.collect() as nested_changes:
+            recorder.record('actions', ['a1'])
+        assert nested_changes is None
+    assert changes['actions'] == ['a1']
+
+
+def test_collect_exception():
+    recorder = ChangeRecorder()
+    with pytest.raises(RuntimeError):
+        with recorder.collect():
+            raise RuntimeError
+    with recorder.collect() as changes:
+        pass
+    assert has_changes(changes) is False
+
+
+def test_collect_per_thread():
+    recorder = ChangeRecorder()
+    with recorder.collect() as changes:
+        thread = threading.Thread(
+            target=recorder.record, args=('functions', ['f1']))
+        thread.start()
+        thread.join()
+    assert has_changes(changes) is False
+
+
+def test_invalid_kind():
+    with pytest.raises(ValueError):
+        ChangeRecorder().record('fds', ['fd1'])
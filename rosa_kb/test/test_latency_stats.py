@@ -0,0 +1,84 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import threading
+
+from rosa_kb.latency_stats import LatencyHistogram
+from rosa_kb.latency_stats import LatencyStats
+from rosa_kb.latency_stats import get_bucket
+from rosa_kb.latency_stats import get_bucket_limit
+from rosa_kb.latency_stats import instrument_methods
+from rosa_kb.memory_model_interface import MemoryModelInterface
+
+
+@pytest.mark.parametrize('latency', [1e-6, 3.3e-5, 0.01, 0.5, 12.0])
+def test_bucket(latency):
+    bucket = get_bucket(latency)
+    assert get_bucket_limit(bucket - 1) < latency <= \
+        get_bucket_limit(bucket) * (1 + 1e-9)
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for i in range(1, 101):
+        histogram.record(i * 0.001, error=(i == 100))
+    stats = histogram.stats()
+    assert stats['count'] == 100 and stats['errors'] == 1
+    assert stats['mean'] == pytest.approx(0.0505)
+    assert stats['max'] == pytest.approx(0.1)
+    for key, expected in (('p50', 0.05), ('p95', 0.095), ('p99', 0.099)):
+        assert expected <= stats[key] <= expected * 1.19
+
+
+def test_histogram_threads():
+    histogram = LatencyHistogram()
+
+    def record():
+        for _ in range(1000):
+            histogram.record(0.001)
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.stats()['count'] == 4000
+
+
+def test_measure_error():
+    stats = LatencyStats()
+    with stats.measure('ok'):
+        pass
+    with pytest.raises(ValueError):
+        with stats.measure('error'):
+            raise ValueError()
+    result = stats.stats()
+    assert list(result) == ['error', 'ok']
+    assert result['error']['errors'] == 1 and result['ok']['errors'] == 0
+
+
+def test_instrument_methods():
+    model = MemoryModelInterface(
+        "",
+        "",
+        ["config/schema.tql", "config/ros_schema.tql"],
+        ["test/test_data/test_data.tql", "test/test_data/ros_test_data.tql"],
+    )
+    stats = LatencyStats()
+    instrument_methods(model, stats, 'model.')
+    with model.batch():
+        model.get_selectable_fds('function2')
+    model.get_selectable_fds('function1')
+    result = stats.stats()
+    assert result['model.get_selectable_fds']['count'] == 2
+    assert 'model.batch' not in result
@@ -0,0 +1,48 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from rosa_kb.measurement_buffer import MeasurementBuffer
+
+
+def test_measurement_buffer_coalesce():
+    buffer = MeasurementBuffer()
+    buffer.add({'qa1': '1.0', 'qa2': '2.0'})
+    buffer.add({'qa1': '1.5'})
+    pending = buffer.pop()
+    stats = buffer.stats()
+    assert pending == {'qa2': '2.0', 'qa1': '1.5'} and \
+        stats['received'] == 3 and stats['coalesced'] == 1 and \
+        stats['flushed'] == 2 and stats['pending'] == 0
+
+
+@pytest.mark.parametrize("max_size, measurements, expected", [
+    (0, {'qa1': 1.0, 'qa2': 2.0}, False),
+    (2, {'qa1': 1.0}, False),
+    (2, {'qa1': 1.0, 'qa2': 2.0}, True),
+])
+def test_measurement_buffer_size_threshold(max_size, measurements, expected):
+    buffer = MeasurementBuffer(max_size)
+    assert buffer.add(measurements) is expected
+
+
+def test_measurement_buffer_drop():
+    buffer = MeasurementBuffer()
+    buffer.add({'qa1': 1.0, 'qa2': 2.0})
+    failed = buffer.pop()
+    buffer.add({'qa3': 3.0})
+    buffer.drop(failed)
+    buffer.drop()
+    stats = buffer.stats()
+    assert len(buffer) == 0 and stats['dropped'] == 3 and \
+        stats['flushed'] == 0
@@ -0,0 +1,89 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import math
+import pytest
+
+from rosa_kb.measurement_history import MeasurementHistory
+from rosa_kb.measurement_history import RingBuffer
+from rosa_kb.measurement_history import compute_window_stats
+
+
+def test_ring_buffer_overwrite_oldest():
+    buffer = RingBuffer(3)
+    for i in range(5):
+        buffer.append(float(i), i * 10.0)
+    times, values = buffer.get()
+    assert len(buffer) == 3 and times.tolist() == [2.0, 3.0, 4.0] \
+        and values.tolist() == [20.0, 30.0, 40.0]
+
+
+def test_measurement_history_ignores_invalid_values():
+    history = MeasurementHistory(10)
+    history.add({'qa1': '1.5', 'qa2': 'not a number', 'qa3': 'nan'}, 1.0)
+    assert history.names() == ['qa1'] \
+        and history.window('qa1')[1].tolist() == [1.5] \
+        and history.window('qa2') is None
+
+
+@pytest.mark.parametrize('last_n, start_time, end_time, expected', [
+    (0, 0.0, 0.0, [0.0, 1.0, 2.0, 3.0, 4.0]),
+    (2, 0.0, 0.0, [3.0, 4.0]),
+    (0, 1.0, 3.0, [1.0, 2.0, 3.0]),
+    (2, 1.0, 3.0, [2.0, 3.0]),
+    (0, 10.0, 0.0, []),
+])
+def test_measurement_history_window(last_n, start_time, end_time, expected):
+    history = MeasurementHistory(10)
+    for i in range(5):
+        history.add({'qa1': i}, float(i))
+    times, values = history.window('qa1', last_n, start_time, end_time)
+    assert values.tolist() == expected and times.tolist() == expected
+
+
+def test_compute_window_stats():
+    stats = compute_window_stats(
+        [1.0, 2.0, 3.0, 4.0], percentiles=[50.0, 100.0], ewma_alpha=0.5)
+    # ewma: 1.0 -> 1.5 -> 2.25 -> 3.125
+    assert stats == {
+        'count': 4,
+        'mean': 2.5,
+        'min': 1.0,
+        'max': 4.0,
+        'percentiles': [2.5, 4.0],
+        'ewma': 3.125,
+    }
+
+
+def test_compute_window_stats_no_ewma():
+    stats = compute_window_stats([1.0])
+    assert math.isnan(stats['ewma']) and stats['percentiles'] == [] \
+        and compute_window_stats([]) is None
+
+
+@pytest.mark.parametrize("percentiles, ewma_alpha", [
+    ([101.0], 0.0),
+    ([-1.0], 0.0),
+    ([math.nan], 0.0),
+    ([], 1.5),
+    ([], -0.5),
+    ([], math.nan),
+])
+def test_compute_window_stats_invalid(percentiles, ewma_alpha):
+    assert compute_window_stats([1.0, 2.0], percentiles, ewma_alpha) is None
+
+
+def test_measurement_history_disabled():
+    history = MeasurementHistory(0)
+    history.add({'qa1': 1.0})
+    assert history.window_stats('qa1') is None
@@ -0,0 +1,291 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from rosa_kb.memory_model_interface import MemoryModelInterface
+from rosa_kb.sqlite_model_interface import SQLiteModelInterface
+from datetime import datetime
+from datetime import timedelta
+
+
+@pytest.fixture(params=[MemoryModelInterface, SQLiteModelInterface])
+def kb_interface(request):
+    kb_interface = request.param(
+        "",
+        "",
+        ["config/schema.tql", "config/ros_schema.tql"],
+        ["test/test_data/test_data.tql", "test/test_data/ros_test_data.tql"],
+    )
+    return kb_interface
+
+
+def get_constraint_status(kb_interface, config_name):
+    derived = kb_interface.get_derived_attributes()
+    return [
+        status for thing, attributes in derived.items()
+        if thing.type == 'constraint' and any(
+            config_name in c.get('component-configuration-name')
+            for c in thing.get_players('constrained'))
+        for status in attributes.get('constraint-status', [])]
+
+
+def test_request_action(kb_interface):
+    kb_interface.request_action('action1', 'ea1')
+    assert kb_interface.is_action_required('action1') is True \
+        and kb_interface.request_action('action1') is None
+
+
+def test_cancel_action(kb_interface):
+    kb_interface.request_action('action1')
+    kb_interface.cancel_action('action1')
+    assert kb_interface.is_action_required('action1') is False
+
+
+@pytest.mark.parametrize("thing, status, exp", [
+    ('Action', 'feasible', 'action_feasible'),
+    ('Action', 'unfeasible', 'action_unfeasible'),
+    ('Function', 'unsolved', 'f_unsolved'),
+    ('Component', 'unsolved', 'c_unsolved'),
+    ('function-design', 'unsolved', 'fd_unsolved'),
+    ('Component', 'unfeasible|unsolved', 'c_unsolved'),
+])
+def test_get_instances_of_thing_with_status(kb_interface, thing, status, exp):
+    result = kb_interface.get_instances_of_thing_with_status(thing, status)
+    assert exp in result
+
+
+@pytest.mark.parametrize("att_value, config_name, constraint_status", [
+    (2.5, 'high param', 'violated'),
+    (3.25, 'high param >=', 'satisfied'),
+    (3.25, 'high param >', 'violated'),
+    (3.5, 'high param <=', 'violated'),
+    (2.5, 'high param <', 'satisfied'),
+    ('', 'low param', 'not evaluated'),
+])
+def test_constraint_status(
+        kb_interface, att_value, config_name, constraint_status):
+    if att_value != '':
+        kb_interface.add_measurement('ea1', att_value)
+    assert get_constraint_status(kb_interface, config_name) == [
+        constraint_status]
+
+
+@pytest.mark.parametrize("type, name", [
+    ('Action', 'action_constrained'),
+    ('function-design', 'fd_constrained'),
+    ('Component', 'c_constrained'),
+    ('component-configuration', 'cc_constrained'),
+])
+def test_constraint_status_propagation(kb_interface, type, name):
+    status = kb_interface.fetch_attribute_from_thing(
+        type, [(type.lower() + '-name', name)], type.lower() + '-status')
+    assert 'unfeasible' in status
+
+
+def test_status_updated_by_measurement(kb_interface):
+    kb_interface.add_measurement('ea1', 3.0)
+    unfeasible = kb_interface.get_selectable_c_configs('component1')
+    kb_interface.add_measurement('ea1', 4.0)
+    feasible = kb_interface.get_selectable_c_configs('component1')
+    assert 'high param' not in unfeasible and 'high param' in feasible
+
+
+@pytest.mark.parametrize("functions, t_required, t_status", [
+    ([('function1', 'configuration error')], True,
+     'implicit configuration error'),
+    ([('function1', 'unsolved'), ('function2', 'solved')], True, 'unsolved'),
+    ([('function1', 'unsolved')], False, 'feasible'),
+    ([('function1', 'solved'), ('function2', 'solved')], True, 'solved'),
+])
+def test_action_status(kb_interface, functions, t_required, t_status):
+    for f in functions:
+        kb_interface.update_attribute_in_thing(
+            'Function', 'function-name', f[0], 'function-status', f[1])
+    kb_interface.update_attribute_in_thing(
+        'Action', 'action-name', 'action1', 'is-required', t_required)
+    status = kb_interface.fetch_attribute_from_thing(
+        'Action', [('action-name', 'action1')], 'action-status')
+    assert t_status in status
+
+
+def test_add_measurements(kb_interface):
+    kb_interface.add_measurements(
+        {'ea1': 2.5, 'ea_measurement': 'nan', 'unknown': 1.0})
+    assert kb_interface.get_latest_measurement('ea1') == 2.5 \
+        and kb_interface.get_latest_measurement('ea_measurement') == 1.0
+
+
+def test_compact_measurements(kb_interface):
+    now = datetime.now()
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        kb_interface.add_measurement('ea1', value)
+    stats = kb_interface.compact_measurements(
+        keep_count=2, now=now + timedelta(seconds=1))
+    assert stats['deleted'] == 2 \
+        and kb_interface.get_latest_measurement('ea1') == 4.0
+
+
+def test_select_configuration(kb_interface):
+    kb_interface.request_action('action1')
+    start_time = kb_interface.select_configuration(
+        [('function2', 'f2_fd1_c2_c3')], [('component1', 'low param')])
+    plan = kb_interface.get_reconfiguration_plan(start_time)
+    fd = kb_interface.get_relationship_with_attribute(
+        'Function', 'function2', 'function-design', 'is-selected', True)
+    assert fd == ['f2_fd1_c2_c3'] \
+        and plan['c_activate'] == ['component2', 'component3'] \
+        and plan['c_config'] == ['low param'] \
+        and kb_interface.get_latest_pending_reconfiguration_plan_time() \
+        == start_time
+
+
+def test_create_reconfiguration_plan_unknown_component(kb_interface):
+    revision = kb_interface.revision
+    result = kb_interface.create_reconfiguration_plan(
+        ['component2', 'unknown'], [], [])
+    assert result is None \
+        and kb_interface.get_latest_reconfiguration_plan() is None \
+        and kb_interface.revision == revision + 1
+
+
+def test_update_outdated_reconfiguration_plans_result(kb_interface):
+    start_time_1 = kb_interface.create_reconfiguration_plan(
+        ['component2'], [], [])
+    start_time_2 = kb_interface.create_reconfiguration_plan(
+        ['component3'], [], [])
+    kb_interface.update_reconfiguration_plan_result(start_time_2, 'completed')
+    kb_interface.update_outdated_reconfiguration_plans_result()
+    assert start_time_1 < start_time_2 \
+        and kb_interface.get_reconfiguration_plan_result(
+            start_time_1) == 'abandoned' \
+        and kb_interface.get_reconfiguration_plan_result(
+            start_time_2) == 'completed'
+
+
+def test_batch_rollback(kb_interface):
+    with pytest.raises(RuntimeError):
+        with kb_interface.batch():
+            kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+            kb_interface.insert_component('new_component')
+            raise RuntimeError
+    assert kb_interface.get_function_design_priority(
+        'f2_fd1_c2_c3') == [2.0] \
+        and kb_interface.get_component_all_attributes('new_component') is None
+
+
+def test_insert_database(kb_interface):
+    result = kb_interface.insert_database('''
+        insert
+            $c isa Component, has component-name "new_component";
+            $f isa Function, has function-name "new_function";
+            (function: $f, required-component: $c) isa function-design,
+                has function-design-name "new_fd";
+    ''')
+    assert len(result) == 3 \
+        and kb_interface.get_components_in_function_design('new_fd') == [
+            'new_component'] \
+        and kb_interface.insert_database(
+            'insert $c isa Component, has component-name "component1";'
+        ) is None \
+        and kb_interface.insert_database(
+            'match $c isa Component; insert $c has is-active true;') is None
+
+
+def test_fetch_database(kb_interface):
+    result = kb_interface.fetch_database('''
+        match
+            $c isa Component, has component-status "unsolved",
+                has name $name;
+        fetch $name; $c;
+    ''')
+    count = kb_interface.get_aggregate_database('''
+        match $c isa Component, has component-status "unsolved";
+        get; count;
+    ''')
+    assert {'value': 'c_unsolved', 'type': {
+            'label': 'component-name', 'root': 'attribute',
+            'value_type': 'string'}} in [r['name'] for r in result] \
+        and result[0]['c'] == {
+            'type': {'label': 'Component', 'root': 'entity'}} \
+        and count == len(result) \
+        and kb_interface.fetch_database(
+            'match $c isa Component; get; count;') is None
+
+
+@pytest.mark.parametrize("method", [
+    'database_query', 'get_database', 'delete_database', 'update_database'])
+def test_generic_query_not_supported(kb_interface, method):
+    with pytest.raises(NotImplementedError, match='does not perform'):
+        getattr(kb_interface, method)('match $c isa Component; get;')
+
+
+def test_write_inside_snapshot(kb_interface):
+    with kb_interface.snapshot():
+        kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+        during = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+        kb_interface.update_function_design_priority('f2_fd1_c2_c3', 6.0)
+    assert during == [2.0] \
+        and kb_interface.get_function_design_priority('f2_fd1_c2_c3') == [
+            6.0]
+
+
+def test_get_component_all_attributes(kb_interface):
+    kb_interface.select_function_design('f_unsolved', 'fd_unsolved')
+    result = kb_interface.get_component_all_attributes('c_unsolved')
+    assert result['type'] == 'Component' \
+        and result['component_name'] == 'c_unsolved' \
+        and result['component_status'] == 'unsolved' \
+        and result['is_required'] is True
+
+
+def test_fingerprint_cleared_by_write(kb_interface):
+    fingerprint = kb_interface.fingerprint
+    kb_interface.request_action('action1')
+    assert fingerprint is not None and kb_interface.fingerprint is None
+
+
+def test_snapshot(kb_interface, tmp_path):
+    kb_interface.request_action('action1')
+    kb_interface.export_snapshot(str(tmp_path / 'snapshot'))
+    restored = MemoryModelInterface(
+        "", "", ["config/schema.tql", "config/ros_schema.tql"])
+    restored.restore_snapshot(str(tmp_path / 'snapshot'))
+    assert restored.is_action_required('action1') is True \
+        and restored.get_components_in_function_design('f2_fd1_c2_c3') == [
+            'component2', 'component3'] \
+        and restored.get_instances_of_thing_with_status(
+            'Action', 'feasible') == \
+        kb_interface.get_instances_of_thing_with_status('Action', 'feasible')
+
+
+def test_get_status_dependencies(kb_interface):
+    dependencies = kb_interface.get_status_dependencies()
+    assert ('component-configuration', 'low param') in \
+        dependencies['constraints']['ea1'] \
+        and dependencies['c_configs']['low param'] == 'component1' \
+        and dependencies['fds']['f2_fd1_c2_c3'] == (
+            'function2', ['component2', 'component3']) \
+        and dependencies['actions']['action1'] == ['function1', 'function2']
+
+
+def test_get_planning_snapshot_partial(kb_interface):
+    snapshot = kb_interface.get_planning_snapshot(
+        functions=['f_always_improve'], components=['c_always_improve'])
+    assert snapshot['functions'] == ['f_always_improve'] \
+        and [fd['name'] for fd in snapshot['fds']] == [
+            'f_improve_fd1', 'f_improve_fd2'] \
+        and snapshot['components'] == ['c_always_improve'] \
+        and [c['name'] for c in snapshot['c_configs']] == [
+            'c_improve_fd1', 'c_improve_fd2'] \
+        and 'f_unsolved' in snapshot['adaptable_functions'] \
+        and 'c_unsolved' in snapshot['adaptable_components']
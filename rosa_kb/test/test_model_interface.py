@@ -12,24 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pytest
-from rosa_kb.typedb_model_interface import ModelInterface
-from rosa_kb.typedb_model_interface \
-    import convert_component_parameter_value_to_py_type
+from rosa_kb.model_types import convert_component_parameter_value_to_py_type
+from rosa_kb.sqlite_model_interface import SQLiteModelInterface
 from datetime import datetime
-
-
-@pytest.fixture
-def kb_interface():
-    kb_interface = ModelInterface(
+from datetime import timedelta
+
+
+def create_kb_interface(backend, **kwargs):
+    schema_path = ["config/schema.tql", "config/ros_schema.tql"]
+    data_path = [
+        "test/test_data/test_data.tql", "test/test_data/ros_test_data.tql"]
+    if backend == 'sqlite':
+        return SQLiteModelInterface(
+            "", ":memory:", schema_path, data_path, **kwargs)
+    typedb_model_interface = pytest.importorskip(
+        'rosa_kb.typedb_model_interface')
+    return typedb_model_interface.ModelInterface(
         "localhost:1729",
         "test_model_interface",
-        ["config/schema.tql", "config/ros_schema.tql"],
-        ["test/test_data/test_data.tql", "test/test_data/ros_test_data.tql"],
+        schema_path,
+        data_path,
         force_database=True,
         force_data=True,
-        infer=True
+        **kwargs
     )
-    return kb_interface
+
+
+@pytest.fixture(params=['typedb', 'sqlite'])
+def kb_interface(request):
+    return create_kb_interface(request.param, infer=True)
+
+
+@pytest.fixture(params=['typedb', 'sqlite'])
+def materialized_kb_interface(request):
+    return create_kb_interface(
+        request.param, infer=True, materialize_status=True)
 
 
 def test_request_action(kb_interface):
@@ -124,6 +141,69 @@ def test_add_measurement(kb_interface):
     assert value == measured_value
 
 
+def test_add_measurements(kb_interface):
+    measurements = {'ea_measurement': '1.42', 'ea1': 2.5}
+    kb_interface.add_measurements(measurements)
+    query = """
+        match
+            $attr isa Attribute, has attribute-name "ea_measurement";
+            $m (measured-attribute:$attr) isa measurement, has latest true;
+        get;
+        count;
+    """
+    n_latest = kb_interface.get_aggregate_database(query)
+    assert kb_interface.get_latest_measurement('ea_measurement') == 1.42 \
+        and kb_interface.get_latest_measurement('ea1') == 2.5 \
+        and n_latest == 1
+
+
+def test_add_measurements_invalid_value(kb_interface):
+    result = kb_interface.add_measurements({'ea_measurement': 'not a number'})
+    assert result is None \
+        and kb_interface.get_latest_measurement('ea_measurement') == 1.0
+
+
+def count_measurements(kb_interface, name):
+    query = f"""
+        match
+            $attr isa Attribute, has attribute-name "{name}";
+            $m (measured-attribute:$attr) isa measurement;
+        get;
+        count;
+    """
+    return kb_interface.get_aggregate_database(query)
+
+
+def test_compact_measurements(kb_interface):
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        kb_interface.add_measurement('ea1', value)
+    stats = kb_interface.compact_measurements(keep_count=2)
+    assert stats == {'deleted': 2, 'aggregated': 0, 'expired_aggregates': 0} \
+        and count_measurements(kb_interface, 'ea1') == 2 \
+        and kb_interface.get_latest_measurement('ea1') == 4.0
+
+
+def test_compact_measurements_downsample(kb_interface):
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        kb_interface.add_measurement('ea1', value)
+    stats = kb_interface.compact_measurements(
+        keep_time=60.0,
+        downsample_period=100 * 365 * 24 * 3600.0,
+        now=datetime.now() + timedelta(days=1))
+    query = """
+        match
+            $attr isa Attribute, has attribute-name "ea1";
+            $m (measured-attribute:$attr) isa measurement,
+                has measurement-value $value, has measurement-count $count;
+        fetch $value; $count;
+    """
+    result = kb_interface.fetch_database(query)
+    assert stats['deleted'] == 4 and stats['aggregated'] == 2 \
+        and count_measurements(kb_interface, 'ea1') == 2 \
+        and result[0].get('value').get('value') == 2.0 \
+        and result[0].get('count').get('value') == 3
+
+
 def test_select_function_design(kb_interface):
     kb_interface.select_function_design('function2', 'f2_fd1_c2_c3')
     fd1_selected = kb_interface.fetch_attribute_from_thing(
@@ -163,6 +243,22 @@ def test_select_component_configuration(kb_interface):
            low_selected[0] is True
 
 
+def test_select_fd_and_get_components(kb_interface):
+    c_activate, c_deactivate = kb_interface.select_fd_and_get_components([
+        ('f_reconfigure_fd', 'fd_reconfig_2'),
+        ('function2', 'f2_fd1_c2_c3'),
+    ])
+    selected = kb_interface.get_relationship_with_attribute(
+        'Function', 'f_reconfigure_fd', 'function-design', 'is-selected', True)
+    unselected = kb_interface.get_relationship_with_attribute(
+        'Function', 'f_reconfigure_fd', 'function-design', 'is-selected',
+        False)
+    assert 'component_reconfig_2' in c_activate \
+        and 'c_still_required' not in c_activate \
+        and c_deactivate == ['component_reconfig_1'] \
+        and selected == ['fd_reconfig_2'] and unselected == ['fd_reconfig_1']
+
+
 @pytest.mark.parametrize("c_activate, c_deactivate, c_config", [
    (['component2', 'component3'], ['component4', 'component5'], ['low param']),
    ([], ['component4', 'component5'], ['low param']),
@@ -339,6 +435,52 @@ def test_get_instances_of_thing_with_status(kb_interface, thing, status, exp):
     assert exp in result
 
 
+@pytest.mark.parametrize("thing, status, exp", [
+    ('Action', 'feasible', 'action_feasible'),
+    ('Action', 'unfeasible', 'action_unfeasible'),
+    ('Function', 'unsolved', 'f_unsolved'),
+    ('Component', 'unsolved', 'c_unsolved'),
+    ('function-design', 'unsolved', 'fd_unsolved'),
+])
+def test_get_instances_of_thing_with_materialized_status(
+        materialized_kb_interface, thing, status, exp):
+    result = materialized_kb_interface.get_instances_of_thing_with_status(
+        thing, status)
+    assert materialized_kb_interface.infer is False and exp in result
+
+
+def test_materialize_statuses_measurement(materialized_kb_interface):
+    query = """
+        match
+            $cc isa component-configuration,
+                has component-configuration-name "high param",
+                has component-configuration-status $status;
+        fetch $status;
+    """
+
+    def get_status():
+        result = materialized_kb_interface.fetch_database(query)
+        return [r.get('status').get('value') for r in result]
+
+    materialized_kb_interface.add_measurement('ea1', 3.0)
+    unfeasible = get_status()
+    materialized_kb_interface.add_measurement('ea1', 4.0)
+    feasible = get_status()
+    assert unfeasible == ['unfeasible'] and feasible == ['feasible']
+
+
+def test_materialize_statuses_selection(materialized_kb_interface):
+    materialized_kb_interface.select_function_design('function1', 'f1_fd1')
+    query = """
+        match
+            $c isa Component, has component-name "component1",
+                has is-required $required;
+        fetch $required;
+    """
+    result = materialized_kb_interface.fetch_database(query)
+    assert True in [r.get('required').get('value') for r in result]
+
+
 @pytest.mark.parametrize("thing, exp", [
     ('Function', 'f_always_improve'),
     ('Component', 'c_always_improve'),
@@ -369,6 +511,61 @@ def test_get_components_in_function_design(kb_interface):
     assert all(r in result for r in expected_result)
 
 
+def test_read_cache_invalidated_by_write(kb_interface):
+    first = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+    cached = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+    hits = kb_interface.read_cache.stats()['hits']
+    kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+    updated = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+    assert first == cached == [2.0] and hits >= 1 and updated == [5.0]
+
+
+def test_get_planning_snapshot(kb_interface):
+    snapshot = kb_interface.get_planning_snapshot()
+    fds = [(fd['function'], fd['name'], fd['priority'])
+           for fd in snapshot['fds']]
+    c_configs = [(cc['component'], cc['name'], cc['priority'])
+                 for cc in snapshot['c_configs']]
+    assert 'f_always_improve' in snapshot['functions'] \
+        and ('f_always_improve', 'f_improve_fd1', 1.0) in fds \
+        and ('f_always_improve', 'f_improve_fd2', 3.0) in fds \
+        and 'c_always_improve' in snapshot['components'] \
+        and ('c_always_improve', 'c_improve_fd1', 2.0) in c_configs \
+        and ('c_always_improve', 'c_improve_fd2', None) in c_configs
+
+
+def test_batch(kb_interface):
+    revision = kb_interface.revision
+    with kb_interface.batch():
+        kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+        kb_interface.activate_component('component2', True)
+        # reads inside the batch see the uncommitted writes
+        priority = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+    assert priority == [5.0] \
+        and kb_interface.is_component_active('component2') is True \
+        and kb_interface.revision == revision + 1
+
+
+def test_batch_rollback(kb_interface):
+    with pytest.raises(RuntimeError):
+        with kb_interface.batch():
+            kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+            raise RuntimeError
+    assert kb_interface.get_function_design_priority(
+        'f2_fd1_c2_c3') == [2.0]
+
+
+def test_snapshot(kb_interface):
+    with kb_interface.snapshot():
+        before = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+        # writes inside a snapshot are not visible to its reads
+        kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+        during = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+    after = kb_interface.get_function_design_priority('f2_fd1_c2_c3')
+    assert before == during == [2.0] and after == [5.0] \
+        and kb_interface.get_open_transaction() is None
+
+
 def test_get_latest_reconfiguration_plan_time(kb_interface):
     c_activate = ['component2', 'component3']
     c_deactivate = ['component4', 'component5']
@@ -422,6 +619,24 @@ def test_get_latest_reconfiguration_plan(kb_interface):
         sorted(c_config) == sorted(reconfig_plan['c_config'])
 
 
+def test_get_reconfiguration_plan_details(kb_interface):
+    kb_interface.create_reconfiguration_plan(
+        ['component2'], ['component4'], ['low param'])
+    start_time = kb_interface.create_reconfiguration_plan(
+        ['component3'], ['component5'], ['low param'])
+    latest = kb_interface.get_reconfiguration_plan_details()
+    reconfig_plan = kb_interface.get_reconfiguration_plan_details(start_time)
+    assert latest == reconfig_plan \
+        and reconfig_plan['start_time'] == start_time \
+        and reconfig_plan['result'] is None \
+        and [c['component_name'] for c in reconfig_plan['c_activate']] == \
+        ['component3'] \
+        and reconfig_plan['c_activate'][0]['type'] == 'Component' \
+        and [c['component_name'] for c in reconfig_plan['c_deactivate']] == \
+        ['component5'] \
+        and reconfig_plan['c_config'] == ['low param']
+
+
 def test_update_reconfiguration_plan_result(kb_interface):
     c_activate = ['component2', 'component3']
     c_deactivate = ['component4', 'component5']
@@ -654,3 +869,15 @@ def test_get_active_component_process(kb_interface):
 ])
 def test_has_action(kb_interface, action_name, result):
     assert kb_interface.has_action(action_name) == result
+
+
+def test_fingerprint_kept_by_measurements():
+    kb_interface = create_kb_interface('typedb', check_fingerprint=True)
+    fingerprint = kb_interface.fingerprint
+    kb_interface.add_measurement('ea_measurement', 1.32)
+    assert fingerprint is not None \
+        and kb_interface.fingerprint == fingerprint \
+        and kb_interface.get_stored_fingerprint() == fingerprint
+    kb_interface.request_action('action1')
+    assert kb_interface.fingerprint is None \
+        and kb_interface.get_stored_fingerprint() is None
@@ -0,0 +1,65 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from rosa_kb.read_cache import ReadCache
+
+
+def test_read_cache_hit():
+    cache = ReadCache()
+    calls = []
+    for _ in range(3):
+        result = cache.get_or_compute(
+            ('method', ('arg',)), 0, lambda: calls.append(1) or ['value'])
+    stats = cache.stats()
+    assert result == ['value'] and len(calls) == 1 and \
+        stats['hits'] == 2 and stats['misses'] == 1
+
+
+def test_read_cache_returns_copy():
+    cache = ReadCache()
+    cache.get_or_compute('key', 0, lambda: ['value']).append('changed')
+    assert cache.get_or_compute('key', 0, lambda: []) == ['value']
+
+
+def test_read_cache_revision_invalidation():
+    cache = ReadCache()
+    cache.get_or_compute('key', 0, lambda: 'old')
+    result = cache.get_or_compute('key', 1, lambda: 'new')
+    assert result == 'new' and cache.stats()['invalidations'] == 1
+
+
+def test_read_cache_stale_value_not_stored():
+    cache = ReadCache()
+
+    def compute():
+        # another thread wrote in the KB while the query was running
+        cache.get_or_compute('other', 1, lambda: 'other')
+        return 'stale'
+    cache.get_or_compute('key', 0, compute)
+    assert cache.get_or_compute('key', 1, lambda: 'new') == 'new'
+
+
+def test_read_cache_lru_eviction():
+    cache = ReadCache(max_size=2)
+    cache.get_or_compute('a', 0, lambda: 'a')
+    cache.get_or_compute('b', 0, lambda: 'b')
+    cache.get_or_compute('a', 0, lambda: 'a')
+    cache.get_or_compute('c', 0, lambda: 'c')
+    result = cache.get_or_compute('b', 0, lambda: 'b2')
+    assert result == 'b2' and cache.stats()['evictions'] == 2
+
+
+def test_read_cache_disabled():
+    cache = ReadCache(max_size=0)
+    cache.get_or_compute('key', 0, lambda: 'old')
+    assert cache.get_or_compute('key', 0, lambda: 'new') == 'new'
@@ -23,6 +23,7 @@ import rclpy
 import traceback
 
 from threading import Thread
+from types import SimpleNamespace
 
 import sys
 
@@ -54,6 +55,7 @@ from rosa_msgs.srv import GetComponentParameters
 from rosa_msgs.srv import GetComponentConfigurationPriority
 from rosa_msgs.srv import ReconfigurationPlanQuery
 from rosa_msgs.srv import GetFunctionDesignPriority
+from rosa_msgs.srv import PlanningSnapshot
 from rosa_msgs.srv import SelectedConfigurations
 from rosa_msgs.srv import SelectableComponentConfigurations
 from rosa_msgs.srv import SelectableFunctionDesigns
@@ -65,6 +67,9 @@ from ros_typedb_msgs.srv import Query
 
 from rclpy.node import Node
 
+from rosa_kb.rosa_kb_typedb import RosaKB
+from rosa_kb.rw_lock import ReadWriteLock
+
 
 @launch_pytest.fixture
 def generate_test_description():
@@ -860,6 +865,33 @@ def test_rosa_kb_get_component_configuration_priority():
         rclpy.shutdown()
 
 
+@pytest.mark.launch(fixture=generate_test_description)
+def test_rosa_kb_planning_snapshot():
+    rclpy.init()
+    try:
+        node = MakeTestNode()
+        node.start_node()
+        node.activate_rosa_kb()
+        node.planning_snapshot_srv = node.create_client(
+            PlanningSnapshot, '/rosa_kb/planning_snapshot')
+
+        request = PlanningSnapshot.Request()
+        response = node.call_service(node.planning_snapshot_srv, request)
+        functions = [f.name for f in response.functions]
+        fds = [(fd.function.name, fd.name, fd.priority)
+               for fd in response.fds]
+        components = [c.name for c in response.components]
+        c_configs = [(cc.component.name, cc.name, cc.priority)
+                     for cc in response.c_configs]
+        assert response.success is True \
+            and 'f_always_improve' in functions \
+            and ('f_always_improve', 'f_improve_fd1', 1.0) in fds \
+            and 'c_always_improve' in components \
+            and ('c_always_improve', 'c_improve_fd1', 2.0) in c_configs
+    finally:
+        rclpy.shutdown()
+
+
 @pytest.mark.launch(fixture=generate_test_description)
 def test_rosa_kb_select_configuration():
     rclpy.init()
@@ -1159,3 +1191,30 @@ class MakeTestNode(Node):
         if res.success is False:
             self.get_logger().error(
                 'State change  req error. Requested {}'.format(state_req))
+
+
+def test_compact_measurements_holds_write_lock():
+    kb_lock = ReadWriteLock()
+    blocked = []
+
+    def read_kb():
+        with kb_lock.read():
+            pass
+
+    def compact_measurements(**kwargs):
+        # readers must wait until the compaction is done
+        reader = Thread(target=read_kb)
+        reader.start()
+        reader.join(timeout=0.2)
+        blocked.append(reader.is_alive())
+        return dict()
+
+    rosa_kb = SimpleNamespace(
+        kb_lock=kb_lock,
+        typedb_interface=SimpleNamespace(
+            compact_measurements=compact_measurements),
+        get_parameter=lambda name: SimpleNamespace(value=0),
+        get_logger=lambda: SimpleNamespace(
+            debug=lambda msg: None, warning=lambda msg: None))
+    RosaKB.compact_measurements(rosa_kb)
+    assert blocked == [True] and kb_lock.stats()['writes'] == 1
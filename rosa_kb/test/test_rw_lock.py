@@ -0,0 +1,124 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import threading
+import time
+
+from rosa_kb.rw_lock import ReadWriteLock
+
+
+def wait_until(condition, timeout=5.0):
+    start = time.monotonic()
+    while not condition():
+        assert time.monotonic() - start < timeout
+        time.sleep(0.001)
+
+
+def test_concurrent_reads():
+    lock = ReadWriteLock()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def read():
+        with lock.read():
+            barrier.wait()
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert lock.stats()['readers'] == 0
+
+
+def test_write_excludes_reads():
+    lock = ReadWriteLock()
+    events = []
+
+    def read():
+        with lock.read():
+            events.append('read')
+    with lock.write():
+        thread = threading.Thread(target=read)
+        thread.start()
+        wait_until(lambda: lock.stats()['readers_waiting'] == 1)
+        events.append('write')
+    thread.join()
+    assert events == ['write', 'read']
+
+
+def test_reentrant():
+    lock = ReadWriteLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    with lock.read():
+        with lock.read():
+            pass
+    stats = lock.stats()
+    assert stats['writes'] == 1 and stats['readers'] == 0
+
+
+def test_upgrade_fails():
+    lock = ReadWriteLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+
+
+def test_writer_not_starved():
+    lock = ReadWriteLock()
+    events = []
+
+    def write():
+        with lock.write():
+            events.append('write')
+
+    def read():
+        with lock.read():
+            events.append('read')
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        wait_until(lambda: lock.stats()['writers_waiting'] == 1)
+        # new readers wait for the writer
+        reader = threading.Thread(target=read)
+        reader.start()
+        wait_until(lambda: lock.stats()['readers_waiting'] == 1)
+    writer.join()
+    reader.join()
+    assert events == ['write', 'read']
+
+
+def test_reader_not_starved():
+    lock = ReadWriteLock()
+    events = []
+
+    def write(name):
+        with lock.write():
+            events.append(name)
+
+    def read():
+        with lock.read():
+            events.append('read')
+    with lock.write():
+        reader = threading.Thread(target=read)
+        reader.start()
+        wait_until(lambda: lock.stats()['readers_waiting'] == 1)
+        writer = threading.Thread(target=write, args=('write',))
+        writer.start()
+        wait_until(lambda: lock.stats()['writers_waiting'] == 1)
+    # the reader waiting for the first write goes before the next write
+    reader.join()
+    writer.join()
+    assert events == ['read', 'write']
@@ -0,0 +1,73 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+
+from rosa_kb.slow_query_log import SlowQueryLog
+from rosa_kb.slow_query_log import fingerprint_query
+
+
+def test_fingerprint_query():
+    query = '''
+        match $c isa Component, has component-name "c1",
+            has priority 2.5, has start-time 2024-01-01T10:00:00.000;
+        {$name == "a";} or {$name == "b";} or {$name == "c";};
+        $c3 isa Function, has count -3;
+    '''
+    assert fingerprint_query(query) == (
+        'match $c isa Component, has component-name ?, has priority ?, '
+        'has start-time ?; {$name == ?;} or ...; '
+        '$c3 isa Function, has count ?;')
+
+
+def test_fingerprint_query_same_shape():
+    assert fingerprint_query('match $f has function-name "f1";') == \
+        fingerprint_query('match  $f has function-name "f2";')
+
+
+class Model:
+    def __init__(self, log):
+        self.log = log
+
+    def database_query(self, query, duration, result):
+        return self.log.record(self, 'fetch', query, duration, result)
+
+    def get_selectable_fds(self, function_name):
+        return self.database_query(
+            f'match $f has function-name "{function_name}";', 0.5, [1, 2])
+
+
+def test_slow_query_log(tmp_path):
+    path = os.path.join(tmp_path, 'slow_queries.log')
+    log = SlowQueryLog(path, threshold=0.1)
+    model = Model(log)
+    assert model.get_selectable_fds('f1') is True
+    assert model.database_query('match $x isa thing;', 0.05, []) is False
+    log.close()
+    with open(path) as file:
+        entries = [json.loads(line) for line in file]
+    assert len(entries) == 1 and log.count == 1
+    assert entries[0]['method'] == 'get_selectable_fds'
+    assert entries[0]['result_size'] == 2
+    assert entries[0]['fingerprint'] == 'match $f has function-name ?;'
+
+
+def test_slow_query_log_rotation(tmp_path):
+    path = os.path.join(tmp_path, 'slow_queries.log')
+    log = SlowQueryLog(path, threshold=0.0, max_bytes=1000, backup_count=2)
+    for _ in range(50):
+        log.record(None, 'fetch', 'match $x isa thing;', 1.0, None)
+    log.close()
+    assert sorted(os.listdir(tmp_path)) == [
+        'slow_queries.log', 'slow_queries.log.1', 'slow_queries.log.2']
@@ -0,0 +1,149 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from rosa_kb.sqlite_model_interface import SQLiteModelInterface
+from rosa_kb.sqlite_model_interface import create_derivation_queries
+from rosa_kb.sqlite_model_interface import from_sql_value
+from rosa_kb.sqlite_model_interface import to_sql_value
+from datetime import datetime
+
+
+schema_path = ["config/schema.tql", "config/ros_schema.tql"]
+data_path = [
+    "test/test_data/test_data.tql", "test/test_data/ros_test_data.tql"]
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return str(tmp_path / 'rosa_kb.sqlite')
+
+
+@pytest.mark.parametrize("value", [
+    True, 3, 2.5, 'high param',
+    datetime(2023, 10, 18, 10, 30, 0, 250000),
+])
+def test_sql_value_round_trip(value):
+    result = from_sql_value(*to_sql_value(value))
+    assert result == value and type(result) is type(value)
+
+
+def test_persistence(database_path):
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path)
+    kb_interface.request_action('action1')
+    kb_interface.update_function_design_priority('f2_fd1_c2_c3', 5.0)
+    start_time = kb_interface.create_reconfiguration_plan(
+        ['component2'], [], [])
+    kb_interface.close()
+
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path)
+    assert kb_interface.is_action_required('action1') is True \
+        and kb_interface.get_function_design_priority(
+            'f2_fd1_c2_c3') == [5.0] \
+        and kb_interface.get_latest_reconfiguration_plan_time() == start_time \
+        and 'action_feasible' in \
+        kb_interface.get_instances_of_thing_with_status('Action', 'feasible')
+
+
+def test_rollback_not_persisted(database_path):
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path)
+    with pytest.raises(RuntimeError):
+        with kb_interface.batch():
+            kb_interface.insert_component('new_component')
+            raise RuntimeError
+    kb_interface.close()
+
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path)
+    assert kb_interface.get_component_all_attributes('new_component') is None
+
+
+@pytest.mark.parametrize("force_database, force_data", [
+    (True, False),
+    (False, True),
+])
+def test_force_data(database_path, force_database, force_data):
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path)
+    kb_interface.request_action('action1')
+    kb_interface.close()
+
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path,
+        force_database=force_database, force_data=force_data)
+    assert kb_interface.is_action_required('action1') is False
+
+
+def test_check_fingerprint(database_path, tmp_path):
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path, check_fingerprint=True)
+    fingerprint = kb_interface.fingerprint
+    kb_interface.close()
+
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path, force_data=True,
+        check_fingerprint=True)
+    kb_interface.insert_component('new_component')
+    assert kb_interface.fingerprint is None
+    kb_interface.close()
+
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path, check_fingerprint=True)
+    assert fingerprint is not None \
+        and kb_interface.fingerprint == fingerprint \
+        and kb_interface.get_component_all_attributes(
+            'new_component') is None
+
+
+def test_check_fingerprint_data_changed(database_path, tmp_path):
+    new_data_path = str(tmp_path / 'data.tql')
+    with open(new_data_path, 'w') as file:
+        file.write('insert $c isa Component, has component-name "c1";')
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path, check_fingerprint=True)
+    kb_interface.close()
+
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path + [new_data_path],
+        check_fingerprint=True)
+    assert kb_interface.get_component_all_attributes('c1') is not None
+
+
+def test_snapshot_dir(database_path, tmp_path, monkeypatch):
+    snapshot_dir = str(tmp_path / 'snapshots')
+    SQLiteModelInterface(
+        "", "", schema_path, data_path, snapshot_dir=snapshot_dir)
+
+    def load_data(self, path):
+        raise AssertionError('data file loaded')
+    monkeypatch.setattr(SQLiteModelInterface, 'load_data', load_data)
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path, snapshot_dir=snapshot_dir)
+    assert kb_interface.fingerprint is not None \
+        and kb_interface.get_components_in_function_design(
+            'f2_fd1_c2_c3') == ['component2', 'component3']
+
+
+def test_derivation_queries_use_indexes(database_path):
+    kb_interface = SQLiteModelInterface(
+        "", database_path, schema_path, data_path)
+    plans = [
+        detail for query in create_derivation_queries() + [
+            'SELECT thing, attribute, value FROM derived_attribute']
+        for _, _, _, detail in kb_interface._connection.execute(
+            'EXPLAIN QUERY PLAN ' + query)]
+    assert len(plans) > 0 and not any(
+        detail.startswith(('SCAN has', 'SCAN plays')) for detail in plans)
@@ -0,0 +1,104 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from rosa_kb.status_materializer import create_materialization_queries
+from rosa_kb.status_materializer import get_affected_things
+from rosa_kb.status_materializer import parse_dependencies
+
+
+def fetched_name(value, label='name'):
+    return {'value': value, 'type': {'label': label}}
+
+
+@pytest.fixture
+def dependencies():
+    return parse_dependencies({
+        'constraints': [
+            {'a-name': fetched_name('ea1'),
+             'x-name': fetched_name('cc1', 'component-configuration-name')},
+            {'a-name': fetched_name('ea2'),
+             'x-name': fetched_name('f1_fd2', 'function-design-name')},
+        ],
+        'c_configs': [
+            {'cc-name': fetched_name('cc1'), 'c-name': fetched_name('c1')},
+            {'cc-name': fetched_name('cc2'), 'c-name': fetched_name('c1')},
+        ],
+        'fds': [
+            {'fd-name': fetched_name('f1_fd1'), 'f-name': fetched_name('f1'),
+             'components': [{'c-name': fetched_name('c1')}]},
+            {'fd-name': fetched_name('f1_fd2'), 'f-name': fetched_name('f1'),
+             'components': [{'c-name': fetched_name('c2')}]},
+            {'fd-name': fetched_name('f2_fd1'), 'f-name': fetched_name('f2'),
+             'components': [{'c-name': fetched_name('c3')}]},
+        ],
+        'actions': [
+            {'a-name': fetched_name('a1'), 'f-name': fetched_name('f1')},
+            {'a-name': fetched_name('a2'), 'f-name': fetched_name('f2')},
+        ],
+    })
+
+
+def test_parse_dependencies(dependencies):
+    assert dependencies['constraints'] == {
+        'ea1': [('component-configuration', 'cc1')],
+        'ea2': [('function-design', 'f1_fd2')],
+    } and dependencies['fds']['f1_fd1'] == ('f1', ['c1']) and \
+        dependencies['actions'] == {'a1': ['f1'], 'a2': ['f2']}
+
+
+def test_affected_things_measurement(dependencies):
+    affected = get_affected_things(dependencies, {'Attribute': {'ea1'}})
+    assert affected == {
+        'constraint': {'ea1'},
+        'component-configuration': {'cc1'},
+        'Component': {'c1'},
+        'function-design': {'f1_fd1'},
+        'Function': {'f1'},
+        'Action': {'a1'},
+    }
+
+
+def test_affected_things_unconstrained_attribute(dependencies):
+    affected = get_affected_things(dependencies, {'Attribute': {'ea3'}})
+    assert all(len(names) == 0 for names in affected.values())
+
+
+def test_affected_things_function_selection(dependencies):
+    affected = get_affected_things(dependencies, {'Function': {'f1'}})
+    assert affected['function-design'] == {'f1_fd1', 'f1_fd2'} and \
+        affected['Component'] == {'c1', 'c2'} and \
+        affected['Function'] == {'f1'} and affected['Action'] == {'a1'}
+
+
+def test_affected_things_action(dependencies):
+    affected = get_affected_things(dependencies, {'Action': {'a2'}})
+    assert affected['Function'] == {'f2'} and \
+        affected['Action'] == {'a2'} and \
+        len(affected['Component']) == 0
+
+
+def test_materialization_queries_order():
+    queries = create_materialization_queries()
+    query_types = [query_type for query_type, _ in queries]
+    first_insert = query_types.index('insert')
+    assert all(t == 'delete' for t in query_types[:first_insert]) and \
+        all(t == 'insert' for t in query_types[first_insert:])
+
+
+def test_materialization_queries_affected():
+    queries = create_materialization_queries({'Component': {'c1'}})
+    assert len(queries) > 0 and all(
+        'isa Component' in query and "'c1'" in query
+        for _, query in queries) and \
+        any('materialized-is-required true' in q for _, q in queries)
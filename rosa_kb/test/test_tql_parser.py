@@ -0,0 +1,127 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from rosa_kb.tql_parser import format_value
+from rosa_kb.tql_parser import parse_insert_query
+from rosa_kb.tql_parser import parse_match_query
+from rosa_kb.tql_parser import parse_schema_types
+from rosa_kb.tql_parser import parse_value
+from rosa_kb.tql_parser import split_insert_query
+from rosa_kb.tql_parser import tokenize
+from datetime import datetime
+
+
+def test_parse_schema_types():
+    with open('config/schema.tql', 'r') as file:
+        types = parse_schema_types(file.read())
+    assert types['Component'] == 'entity' \
+        and types['function-design'] == 'relation' \
+        and types['QualityAttribute'] == 'Attribute' \
+        and 'implicit-action-is-required' not in types
+
+
+def test_parse_insert_query():
+    things = parse_insert_query('''
+        insert
+            # comment
+            $c isa Component, has component-name "c1", has is-active true;
+            $c has priority 1.5;
+            (required-component: $c) isa function-design,
+                has start-time 2023-10-18T10:30:00.250;
+        insert $c isa Component, has component-name 'c2';
+    ''')
+    assert [t['variable'] for t in things] == ['0.c', '0.c', '_2', '1.c'] \
+        and things[0]['attributes'] == [
+            ('component-name', 'c1'), ('is-active', True)] \
+        and things[1]['type'] is None \
+        and things[1]['attributes'] == [('priority', 1.5)] \
+        and things[2]['players'] == [('required-component', '0.c')] \
+        and things[2]['attributes'] == [
+            ('start-time', datetime(2023, 10, 18, 10, 30, 0, 250000))]
+
+
+def test_parse_test_data():
+    things = []
+    for path in ['test/test_data/test_data.tql',
+                 'test/test_data/ros_test_data.tql']:
+        with open(path, 'r') as file:
+            things.extend(parse_insert_query(file.read()))
+    assert len(things) > 0 and all(
+        t['type'] is not None or t['variable'][0] != '_' for t in things)
+
+
+@pytest.mark.parametrize("query", [
+    'match $c isa Component; insert $c has is-active true;',
+    'define Component sub entity;',
+    'insert $c isa Component, has component-name "c1"',
+    '$c isa Component;',
+])
+def test_parse_insert_query_invalid(query):
+    with pytest.raises(ValueError):
+        parse_insert_query(query)
+
+
+def test_split_insert_query():
+    groups = split_insert_query('''
+        insert
+            $c isa Component, has component-name "c1";
+            $f isa Function, has function-name "f1";
+            (function: $f, required-component: $c) isa function-design;
+            $c2 isa Component, has component-name "c2";
+        insert $c isa Component, has component-name "c3";
+    ''')
+    assert len(groups) == 3 and len(groups[0]) == 3 \
+        and groups[1] == [
+            '$c2_1 isa Component , has component-name "c2"'] \
+        and groups[2] == [
+            '$c_2 isa Component , has component-name "c3"'] \
+        and parse_insert_query(
+            'insert ' + ';'.join(groups[0] + groups[2]) + ';')[0][
+                'attributes'] == [('component-name', 'c1')]
+
+
+def test_parse_match_query():
+    query = parse_match_query('''
+        match
+            $c isa Component, has component-name "c1", has is-active $a;
+            (function: $f, required-component: $c) isa function-design;
+        fetch $a; $f;
+    ''')
+    patterns = query['patterns']
+    assert query['fetch'] == ['a', 'f'] and len(patterns) == 2 \
+        and patterns[0]['attributes'] == [('component-name', 'c1')] \
+        and patterns[0]['variables'] == [('is-active', 'a')] \
+        and patterns[1]['variable'] == '_1' \
+        and patterns[1]['players'] == [
+            ('function', 'f'), ('required-component', 'c')] \
+        and parse_match_query(
+            'match $c isa Component; get $c; count;')['count'] is True
+
+
+@pytest.mark.parametrize("query", [
+    'match $c isa Component;',
+    'match $c isa Component; fetch $c: component-name;',
+    'match $c isa Component; not { $c has is-active true; }; get;',
+    'insert $c isa Component;',
+])
+def test_parse_match_query_invalid(query):
+    with pytest.raises(ValueError):
+        parse_match_query(query)
+
+
+@pytest.mark.parametrize("value", [
+    'c "1"', 2, 1.5, True, datetime(2023, 10, 18, 10, 30, 0, 250000)])
+def test_format_value(value):
+    kind, token = tokenize(format_value(value))[0]
+    assert parse_value(kind, token) == value
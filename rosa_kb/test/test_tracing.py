@@ -0,0 +1,62 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+
+from rosa_kb.tracing import Tracer
+
+
+def test_nested_spans():
+    tracer = Tracer()
+    trace_id = tracer.new_trace_id()
+    with tracer.span('/diagnostics', trace_id):
+        with tracer.span('update_measurements'):
+            tracer.instant('event/insert_monitoring_data')
+    assert tracer.get_trace_id() is None
+    names = [span['name'] for span in tracer.get_trace(trace_id)]
+    assert names == [
+        '/diagnostics', 'update_measurements', 'event/insert_monitoring_data']
+
+
+def test_set_trace_id():
+    tracer = Tracer()
+    with tracer.span('no trace'):
+        pass
+    with tracer.span('~/reconfiguration_plan/get_latest'):
+        tracer.set_trace_id('t1')
+    assert list(tracer.get_traces()) == ['t1']
+
+
+def test_bind_and_eviction():
+    tracer = Tracer(max_traces=2)
+    for trace_id in ['t1', 't2', 't3']:
+        tracer.add(trace_id, 'stage', 0.0, 1.0)
+        tracer.bind(('plan', trace_id), trace_id)
+    assert list(tracer.get_traces()) == ['t2', 't3']
+    assert tracer.find(('plan', 't1')) is None
+    assert tracer.find(('plan', 't3')) == 't3'
+
+
+def test_export(tmp_path):
+    tracer = Tracer()
+    tracer.add('t1', '/diagnostics', 1.0, 1.5)
+    tracer.add('t1', 'event/insert_monitoring_data', 1.5, 1.5)
+    path = os.path.join(tmp_path, 'trace.json')
+    assert tracer.export(path) == 1
+    with open(path) as file:
+        events = json.load(file)['traceEvents']
+    spans = [e for e in events if e['ph'] in ('X', 'i')]
+    assert spans[0]['ts'] == 1e6 and spans[0]['dur'] == 0.5e6
+    assert spans[1]['ph'] == 'i'
+    assert all(e['args']['trace_id'] == 't1' for e in spans)
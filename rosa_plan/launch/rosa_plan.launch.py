@@ -12,15 +12,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from launch import LaunchDescription
+from launch.actions import DeclareLaunchArgument
+from launch.substitutions import LaunchConfiguration
 from launch_ros.actions import Node
 
 
 def generate_launch_description():
+    min_planning_interval = LaunchConfiguration('min_planning_interval')
+    max_planning_wait = LaunchConfiguration('max_planning_wait')
+    incremental_planning = LaunchConfiguration('incremental_planning')
+    global_optimization = LaunchConfiguration('global_optimization')
+    activation_cost = LaunchConfiguration('activation_cost')
+    deactivation_cost = LaunchConfiguration('deactivation_cost')
+    optimization_time_limit = LaunchConfiguration('optimization_time_limit')
+    plan_memo_size = LaunchConfiguration('plan_memo_size')
+
+    min_planning_interval_arg = DeclareLaunchArgument(
+        'min_planning_interval',
+        default_value='0.0',
+        description='minimum time (s) between planning runs, and without '
+                    'KB events before planning'
+    )
+
+    max_planning_wait_arg = DeclareLaunchArgument(
+        'max_planning_wait',
+        default_value='1.0',
+        description='time (s) the first KB event waits for planning when '
+                    'events keep arriving, must be > 0 if '
+                    'min_planning_interval is'
+    )
+
+    incremental_planning_arg = DeclareLaunchArgument(
+        'incremental_planning',
+        default_value='False',
+        description='only plan the things affected by the KB events'
+    )
+
+    global_optimization_arg = DeclareLaunchArgument(
+        'global_optimization',
+        default_value='False',
+        description='select the configuration with the lowest total cost'
+    )
+
+    activation_cost_arg = DeclareLaunchArgument(
+        'activation_cost',
+        default_value='1.0',
+        description='cost of activating a component'
+    )
+
+    deactivation_cost_arg = DeclareLaunchArgument(
+        'deactivation_cost',
+        default_value='1.0',
+        description='cost of deactivating a component'
+    )
+
+    optimization_time_limit_arg = DeclareLaunchArgument(
+        'optimization_time_limit',
+        default_value='0.5',
+        description='longest time (s) taken by the configuration optimizer'
+    )
+
+    plan_memo_size_arg = DeclareLaunchArgument(
+        'plan_memo_size',
+        default_value='128',
+        description='planning decisions kept for reuse, 0 disables it'
+    )
+
     configuration_planner_node = Node(
         package='rosa_plan',
         executable='configuration_planner_node',
+        parameters=[{
+            'min_planning_interval': min_planning_interval,
+            'max_planning_wait': max_planning_wait,
+            'incremental_planning': incremental_planning,
+            'global_optimization': global_optimization,
+            'activation_cost': activation_cost,
+            'deactivation_cost': deactivation_cost,
+            'optimization_time_limit': optimization_time_limit,
+            'plan_memo_size': plan_memo_size,
+        }]
     )
 
     return LaunchDescription([
+        min_planning_interval_arg,
+        max_planning_wait_arg,
+        incremental_planning_arg,
+        global_optimization_arg,
+        activation_cost_arg,
+        deactivation_cost_arg,
+        optimization_time_limit_arg,
+        plan_memo_size_arg,
         configuration_planner_node,
     ])
@@ -0,0 +1,527 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Global optimization of the selected configuration.
+
+Instead of selecting the function design with the lowest priority for each
+function independently, the optimizer selects the whole configuration, i.e.,
+one function design for each adaptable function, and one component
+configuration for each required component, minimizing::
+
+    sum(priority of the selected function designs)
+    + sum(priority of the selected component configurations)
+    + activation_cost * (number of components activated)
+    + deactivation_cost * (number of components deactivated)
+
+The required components are the adaptable components and the components
+required by the selected function designs, so components shared by several
+function designs are only paid once. As a 0-1 integer program, with a
+variable x[fd] for each selectable function design and y[c] for each
+component::
+
+    minimize    sum(p[fd] * x[fd]) + sum(w[c] * y[c])
+    subject to  sum(x[fd] for fd of f) == 1     for each adaptable function f
+                x[fd] <= y[c]                    for each c required by fd
+                y[c] == 1                        for each adaptable component c
+
+where w[c] is the lowest priority of the configurations of c plus its
+activation cost, or minus its deactivation cost when c is active. Functions
+that do not share components are independent, so each group of functions
+sharing components is solved separately with a depth-first branch and bound,
+which is built in and does not need an external solver.
+
+The lowest-priority selection, as in
+:meth:`ConfigurationPlanner.plan_function_adaptation`, improved by a local
+search, is always available, so a valid configuration is returned when the
+time limit is reached before the optimum is proven. Reading the snapshot,
+which takes time linear in its size, is not interrupted by the time limit.
+"""
+
+import sys
+import time
+
+from rosa_plan.incremental_planning import get_best_candidates
+
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import TypedDict
+
+
+class OptimizationResultDict(TypedDict):
+    """TypedDict for the configuration selected by the optimizer."""
+
+    #: selected function designs, with the form [(FUNCTION, FD)]
+    selected_fds: list[Tuple[str, str]]
+    #: selected component configurations, with the form
+    #: [(COMPONENT, CONFIGURATION)]
+    selected_c_configs: list[Tuple[str, str]]
+    #: components required by the selected configuration
+    required_components: list[str]
+    cost: float  #: cost of the selected configuration
+    optimal: bool  #: whether the configuration is proven to be optimal
+    nodes: int  #: number of branch and bound nodes explored
+    solve_time: float  #: time (s) taken to select the configuration
+
+
+class ConfigurationOptimizerStatsDict(TypedDict):
+    """TypedDict for configuration optimizer statistics."""
+
+    runs: int  #: number of optimizations
+    optimal_runs: int  #: optimizations proven to be optimal
+    nodes: int  #: branch and bound nodes explored
+    max_solve_time: float  #: longest time (s) taken by an optimization
+
+
+def is_unknown_priority(priority: float | None) -> bool:
+    """
+    Check if a priority is unknown.
+
+    The KB sets the priority of the planning snapshot candidates without a
+    priority to `sys.float_info.max`.
+
+    :param priority: priority
+    :return: whether the priority is unknown
+    """
+    return priority is None or priority >= sys.float_info.max
+
+
+class _Cluster:
+    """Functions sharing components, optimized together."""
+
+    def __init__(self, functions: list[str]) -> None:
+        self.functions = functions
+        self.selection = dict()
+        self.optimal = False
+
+
+class ConfigurationOptimizer:
+    """
+    Select the configuration with the lowest total cost.
+
+    The active components are the components required by the last
+    configuration applied, which must be set with
+    :attr:`active_components`. Components of the functions that are not
+    adaptable are not in the planning snapshot, so they are not considered.
+    """
+
+    def __init__(
+            self,
+            activation_cost: Optional[float] = 1.0,
+            deactivation_cost: Optional[float] = 1.0,
+            time_limit: Optional[float] = 0.5,
+            clock: Optional[Callable[[], float]] = time.monotonic) -> None:
+        """
+        Create ConfigurationOptimizer.
+
+        :param activation_cost: cost of activating a component
+        :param deactivation_cost: cost of deactivating a component
+        :param time_limit: longest time (s) an optimization takes, the best
+            configuration found so far is returned when it is reached
+        :param clock: function returning the current time (s)
+        """
+        self.activation_cost = activation_cost
+        self.deactivation_cost = deactivation_cost
+        self.time_limit = time_limit
+        self.clock = clock
+        #: components required by the last configuration applied
+        self.active_components = set()
+        self._runs = 0
+        self._optimal_runs = 0
+        self._nodes = 0
+        self._max_solve_time = 0.0
+        self._deadline = 0.0
+        self._nodes_explored = 0
+
+    def optimize(self, snapshot: Any) -> OptimizationResultDict:
+        """
+        Select the configuration with the lowest total cost.
+
+        :param snapshot: `/rosa_kb/planning_snapshot` response
+        :return: selected configuration
+        """
+        start = self.clock()
+        deadline = start + self.time_limit
+        self._deadline = deadline
+        self._nodes_explored = 0
+
+        # candidates keep the snapshot order, so ties are broken as in
+        # ConfigurationPlanner.plan_function_adaptation
+        self._candidates = {f.name: [] for f in snapshot.functions}
+        self._fd_components = dict()
+        priorities = dict()
+        for fd in snapshot.fds:
+            candidates = self._candidates.get(fd.function.name)
+            if candidates is None:
+                continue
+            candidates.append(fd.name)
+            self._fd_components[fd.name] = list(dict.fromkeys(
+                [c.name for c in fd.required_components]))
+            priorities[fd.name] = fd.priority
+        self._candidates = {
+            f: fds for f, fds in self._candidates.items() if len(fds) > 0}
+        self._c_configs = get_best_candidates(
+            snapshot.c_configs, lambda cc: cc.component.name)
+        fixed = list(dict.fromkeys(c.name for c in snapshot.components))
+        self._fixed = set(fixed)
+        self._set_costs(priorities, fixed)
+
+        # the lowest-priority selection is valid, so it is returned when
+        # the time limit is reached before it is improved
+        fd_cost = self._fd_cost.__getitem__
+        selection = {
+            function: min(fds, key=fd_cost)
+            for function, fds in self._candidates.items()}
+        clusters = None
+        if self.clock() < deadline:
+            clusters = self._get_clusters()
+        skipped = clusters is None
+        if skipped is True:
+            clusters = []
+        # a valid configuration is found for all clusters before
+        # optimizing any of them, so one is available at the time limit
+        for cluster in clusters:
+            cluster.selection = {f: selection[f] for f in cluster.functions}
+            self._local_search(cluster)
+            selection.update(cluster.selection)
+        # the remaining time is split among the clusters not optimized yet,
+        # smaller clusters first, so the time they do not use is left to
+        # the larger ones
+        clusters.sort(key=lambda cluster: len(cluster.functions))
+        for index, cluster in enumerate(clusters):
+            now = self.clock()
+            # setting up the search of a cluster takes time too
+            if now >= deadline:
+                break
+            self._branch_and_bound(
+                cluster, now + (deadline - now) / (len(clusters) - index))
+            selection.update(cluster.selection)
+
+        selected_fds = [
+            (function, selection[function]) for function in self._candidates]
+        required_components = dict.fromkeys(fixed)
+        for _, fd in selected_fds:
+            required_components.update(
+                dict.fromkeys(self._fd_components[fd]))
+        required_components = list(required_components)
+        selected_c_configs = [
+            (component, self._c_configs[component].name)
+            for component in required_components
+            if component in self._c_configs]
+
+        cost = self.get_cost(selected_fds, required_components)
+        solve_time = self.clock() - start
+        optimal = skipped is False and all(
+            cluster.optimal for cluster in clusters)
+        self._runs += 1
+        self._optimal_runs += 1 if optimal else 0
+        self._nodes += self._nodes_explored
+        self._max_solve_time = max(self._max_solve_time, solve_time)
+        return {
+            'selected_fds': selected_fds,
+            'selected_c_configs': selected_c_configs,
+            'required_components': required_components,
+            'cost': cost,
+            'optimal': optimal,
+            'nodes': self._nodes_explored,
+            'solve_time': solve_time,
+        }
+
+    def _set_costs(
+            self, priorities: dict[str, float], fixed: list[str]) -> None:
+        # unknown priorities cost more than any configuration with known
+        # priorities, so they are only selected when there is no other option
+        known = [
+            priority for priority in priorities.values()
+            if not is_unknown_priority(priority)]
+        known.extend(
+            cc.priority for cc in self._c_configs.values()
+            if not is_unknown_priority(cc.priority))
+        components = set(fixed).union(*self._fd_components.values())
+        self._unknown_cost = 1.0 + sum(abs(p) for p in known) + len(
+            components) * (abs(self.activation_cost) +
+                           abs(self.deactivation_cost))
+
+        self._fd_cost = {
+            fd: self._get_priority_cost(priority)
+            for fd, priority in priorities.items()}
+        # cost of requiring a component, the deactivation cost of all active
+        # components is added to the total cost and saved when they are
+        # required
+        self._weight = dict()
+        for component in components:
+            weight = 0.0
+            if component in self._c_configs:
+                weight = self._get_priority_cost(
+                    self._c_configs[component].priority)
+            if component in self.active_components:
+                weight -= self.deactivation_cost
+            else:
+                weight += self.activation_cost
+            self._weight[component] = weight
+        self._base_cost = self.deactivation_cost * len(
+            components & self.active_components)
+        self._base_cost += sum(self._weight[c] for c in self._fixed)
+
+    def _get_priority_cost(self, priority: float | None) -> float:
+        if is_unknown_priority(priority):
+            return self._unknown_cost
+        return priority
+
+    def get_cost(
+            self,
+            selected_fds: Iterable[Tuple[str, str]],
+            required_components: Iterable[str]) -> float:
+        """
+        Get the cost of a configuration of the last optimized snapshot.
+
+        :param selected_fds: selected function designs, with the form
+            [(FUNCTION, FD)]
+        :param required_components: components required by the configuration
+        :return: total cost
+        """
+        required_components = set(required_components)
+        return self._base_cost + sum(
+            self._fd_cost[fd] for _, fd in selected_fds) + sum(
+            self._weight[c] for c in required_components - self._fixed)
+
+    def _get_clusters(self) -> list[_Cluster] | None:
+        # union-find of the functions sharing components, adaptable
+        # components are always required, so they do not couple functions,
+        # None is returned when the time limit is reached
+        parent = {function: function for function in self._candidates}
+
+        def find(function):
+            while parent[function] != function:
+                parent[function] = parent[parent[function]]
+                function = parent[function]
+            return function
+
+        owner = dict()
+        for index, (function, fds) in enumerate(self._candidates.items()):
+            if index % 256 == 255 and self.clock() >= self._deadline:
+                return None
+            for fd in fds:
+                for component in self._fd_components[fd]:
+                    if component in self._fixed:
+                        continue
+                    if component not in owner:
+                        owner[component] = function
+                    else:
+                        parent[find(function)] = find(owner[component])
+        clusters = dict()
+        for function in self._candidates:
+            clusters.setdefault(find(function), []).append(function)
+        return [_Cluster(functions) for functions in clusters.values()]
+
+    def _get_delta(
+            self,
+            refcount: dict[str, int],
+            remove: str | None,
+            add: str) -> float:
+        # cost change of replacing the fd `remove` with `add`
+        delta = self._fd_cost[add]
+        removed = set()
+        if remove is not None:
+            delta -= self._fd_cost[remove]
+            removed = set(self._fd_components[remove])
+            for component in removed:
+                if component not in self._fixed \
+                   and refcount.get(component, 0) == 1:
+                    delta -= self._weight[component]
+        for component in self._fd_components[add]:
+            if component in self._fixed:
+                continue
+            count = refcount.get(component, 0)
+            if component in removed:
+                count -= 1
+            if count == 0:
+                delta += self._weight[component]
+        return delta
+
+    def _update_refcount(
+            self,
+            refcount: dict[str, int],
+            fd: str,
+            increment: int) -> None:
+        for component in self._fd_components[fd]:
+            if component not in self._fixed:
+                refcount[component] = refcount.get(component, 0) + increment
+
+    def _local_search(self, cluster: _Cluster) -> None:
+        # start from the selection of the cluster, then move single
+        # functions to another fd while it lowers the cost
+        refcount = dict()
+        for fd in cluster.selection.values():
+            self._update_refcount(refcount, fd, 1)
+        improved = True
+        while improved is True and self.clock() < self._deadline:
+            improved = False
+            for function in cluster.functions:
+                current = cluster.selection[function]
+                best, best_delta = None, -1e-9
+                for fd in self._candidates[function]:
+                    if fd == current:
+                        continue
+                    delta = self._get_delta(refcount, current, fd)
+                    if delta < best_delta:
+                        best, best_delta = fd, delta
+                if best is not None:
+                    self._update_refcount(refcount, current, -1)
+                    self._update_refcount(refcount, best, 1)
+                    cluster.selection[function] = best
+                    improved = True
+
+    def _branch_and_bound(
+            self, cluster: _Cluster, deadline: float) -> None:
+        functions = cluster.functions
+        fd_components = {
+            fd: [c for c in self._fd_components[fd] if c not in self._fixed]
+            for f in functions for fd in self._candidates[f]}
+        fd_function = {
+            fd: f for f in functions for fd in self._candidates[f]}
+        # lower bound of the cost of requiring each component, shared among
+        # the functions that may require it
+        users = dict()
+        for fd, components in fd_components.items():
+            for component in components:
+                users.setdefault(component, []).append(fd)
+        share = dict()
+        for component, fds in users.items():
+            weight = self._weight[component]
+            count = len({fd_function[fd] for fd in fds})
+            share[component] = weight / count if weight > 0.0 else weight
+
+        # lower bound of each fd, with the components not required yet
+        fd_bound = {
+            fd: self._fd_cost[fd] + sum(share[c] for c in components)
+            for fd, components in fd_components.items()}
+        f_bound = {
+            f: min(fd_bound[fd] for fd in self._candidates[f])
+            for f in functions}
+
+        def get_second(f):
+            bounds = sorted(fd_bound[fd] for fd in self._candidates[f])
+            return bounds[1] - bounds[0] if len(bounds) > 1 else 0.0
+
+        # functions with the largest difference between their best fds are
+        # decided first
+        order = sorted(functions, key=get_second, reverse=True)
+        refcount = dict()
+        assigned = set()
+        best = sum(self._fd_cost[fd] for fd in cluster.selection.values())
+        best += sum(self._weight[c] for c in {
+            c for fd in cluster.selection.values()
+            for c in fd_components[fd]})
+        tolerance = 1e-9 * max(1.0, abs(best))
+        state = {'cost': 0.0, 'remaining': sum(f_bound.values())}
+
+        def update_bounds(fds):
+            for f in {fd_function[fd] for fd in fds}:
+                bound = min(fd_bound[fd] for fd in self._candidates[f])
+                if f not in assigned:
+                    state['remaining'] += bound - f_bound[f]
+                f_bound[f] = bound
+
+        def select(fd):
+            f = fd_function[fd]
+            assigned.add(f)
+            state['remaining'] -= f_bound[f]
+            state['cost'] += self._fd_cost[fd]
+            changed = []
+            for component in fd_components[fd]:
+                refcount[component] = refcount.get(component, 0) + 1
+                if refcount[component] == 1:
+                    state['cost'] += self._weight[component]
+                    for user in users[component]:
+                        fd_bound[user] -= share[component]
+                    changed.extend(users[component])
+            update_bounds(changed)
+
+        def unselect(fd):
+            f = fd_function[fd]
+            changed = []
+            for component in fd_components[fd]:
+                refcount[component] -= 1
+                if refcount[component] == 0:
+                    state['cost'] -= self._weight[component]
+                    for user in users[component]:
+                        fd_bound[user] += share[component]
+                    changed.extend(users[component])
+            update_bounds(changed)
+            state['cost'] -= self._fd_cost[fd]
+            assigned.discard(f)
+            state['remaining'] += f_bound[f]
+
+        # iterative depth-first search, each frame has the candidates of a
+        # function sorted by their bound, the next one to try, and the
+        # selected one
+        def push(depth):
+            fds = sorted(
+                self._candidates[order[depth]], key=lambda x: fd_bound[x])
+            frames.append([fds, 0, None])
+
+        frames = []
+        push(0)
+        timed_out = False
+        iterations = 0
+        while len(frames) > 0:
+            iterations += 1
+            if iterations % 64 == 1 and self.clock() >= deadline:
+                timed_out = True
+                break
+            frame = frames[-1]
+            fds, index, selected = frame
+            if selected is not None:
+                unselect(selected)
+                frame[2] = None
+            if index == len(fds):
+                frames.pop()
+                continue
+            fd = fds[index]
+            frame[1] = index + 1
+            f = fd_function[fd]
+            bound = state['cost'] + fd_bound[fd] + \
+                state['remaining'] - f_bound[f]
+            if bound >= best - tolerance:
+                # the other candidates have larger bounds
+                frame[1] = len(fds)
+                continue
+            select(fd)
+            frame[2] = fd
+            self._nodes_explored += 1
+            if len(frames) == len(order):
+                if state['cost'] < best - tolerance:
+                    best = state['cost']
+                    cluster.selection = {
+                        order[depth]: frames[depth][2]
+                        for depth in range(len(order))}
+            else:
+                push(len(frames))
+        cluster.optimal = timed_out is False
+
+    def stats(self) -> ConfigurationOptimizerStatsDict:
+        """
+        Get configuration optimizer statistics.
+
+        :return: dict with the number of optimizations, how many were proven
+            optimal, the number of nodes explored, and the longest solve time
+        """
+        return {
+            'runs': self._runs,
+            'optimal_runs': self._optimal_runs,
+            'nodes': self._nodes,
+            'max_solve_time': self._max_solve_time,
+        }
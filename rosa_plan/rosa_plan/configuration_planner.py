@@ -17,18 +17,24 @@ from rclpy.lifecycle import Node
 from rclpy.lifecycle import State
 from rclpy.lifecycle import TransitionCallbackReturn
 
+from rosa_msgs.msg import ChangeEvent
 from rosa_msgs.msg import ComponentConfiguration
 from rosa_msgs.msg import FunctionDesign
 
-from rosa_msgs.srv import AdaptableFunctions
-from rosa_msgs.srv import AdaptableComponents
-from rosa_msgs.srv import GetComponentConfigurationPriority
-from rosa_msgs.srv import GetFunctionDesignPriority
+from rosa_msgs.srv import PlanningSnapshot
 from rosa_msgs.srv import SelectedConfigurations
-from rosa_msgs.srv import SelectableComponentConfigurations
-from rosa_msgs.srv import SelectableFunctionDesigns
 
-from std_msgs.msg import String
+from rosa_plan.configuration_optimizer import ConfigurationOptimizer
+from rosa_plan.incremental_planning import IncrementalPlanner
+from rosa_plan.plan_memo import PlanMemo
+from rosa_plan.plan_memo import fingerprint_snapshot
+from rosa_plan.planning_scheduler import PlanningScheduler
+
+
+#: KB events that trigger planning
+PLANNING_EVENTS = ['insert_monitoring_data', 'action_update']
+# events of the configurations selected by the planner
+SELECTION_EVENTS = ['insert_reconfiguration_plan']
 
 
 def check_lc_active(func):
@@ -38,55 +44,96 @@ def check_lc_active(func):
     return inner
 
 
+def create_selected_configurations(selected_fds, selected_c_configs):
+    selected_config = SelectedConfigurations.Request()
+    for function, fd in selected_fds:
+        selected_fd = FunctionDesign()
+        selected_fd.function.name = function
+        selected_fd.name = fd
+        selected_config.selected_fds.append(selected_fd)
+    for component, c_config in selected_c_configs:
+        selected_cc = ComponentConfiguration()
+        selected_cc.component.name = component
+        selected_cc.name = c_config
+        selected_config.selected_component_configs.append(selected_cc)
+    return selected_config
+
+
 class ConfigurationPlanner(Node):
     """Configuration planner."""
 
     def __init__(self, node_name, **kwargs):
         self.active = False
         super().__init__(node_name, **kwargs)
+        self.declare_parameter('min_planning_interval', 0.0)
+        self.declare_parameter('max_planning_wait', 1.0)
+        self.declare_parameter('incremental_planning', False)
+        self.declare_parameter('global_optimization', False)
+        self.declare_parameter('activation_cost', 1.0)
+        self.declare_parameter('deactivation_cost', 1.0)
+        self.declare_parameter('optimization_time_limit', 0.5)
+        self.declare_parameter('plan_memo_size', 128)
+        self.planning_scheduler = PlanningScheduler()
+        self.planning_timer = None
+        self.incremental_planning = False
+        self.incremental_planner = IncrementalPlanner()
+        self.global_optimization = False
+        self.configuration_optimizer = ConfigurationOptimizer()
+        self.plan_memo = PlanMemo()
+        self.plan_fingerprint = None
+        self.planning_trace_id = ''
 
     def on_configure(self, state: State) -> TransitionCallbackReturn:
         self.get_logger().info(self.get_name() + ': on_configure() is called.')
 
+        # Planning runs are at least `min_planning_interval` seconds apart,
+        # and events are planned once no event arrived for that long, but at
+        # most `max_planning_wait` seconds after the first one, so bursts of
+        # events are handled by a single planning run. Action updates are
+        # planned immediately
+        try:
+            self.planning_scheduler = PlanningScheduler(
+                self.get_parameter('min_planning_interval').value,
+                self.get_parameter('max_planning_wait').value)
+        except ValueError as error:
+            self.get_logger().error(
+                'invalid planning scheduler parameters: {}'.format(error))
+            return TransitionCallbackReturn.FAILURE
+        # With `incremental_planning`, only the functions and components
+        # affected by the events are planned again, see
+        # :mod:`rosa_plan.incremental_planning`
+        self.incremental_planning = self.get_parameter(
+            'incremental_planning').value
+        self.incremental_planner = IncrementalPlanner()
+        # With `global_optimization`, the whole configuration is selected
+        # minimizing the total priority and the cost of (de)activating
+        # components, see :mod:`rosa_plan.configuration_optimizer`. It plans
+        # everything, so `incremental_planning` is not used
+        self.global_optimization = self.get_parameter(
+            'global_optimization').value
+        self.configuration_optimizer = ConfigurationOptimizer(
+            self.get_parameter('activation_cost').value,
+            self.get_parameter('deactivation_cost').value,
+            self.get_parameter('optimization_time_limit').value)
+        # Decisions are reused while the planning inputs do not change, and
+        # they are not selected again when they were already applied with
+        # the same inputs, see :mod:`rosa_plan.plan_memo`. A
+        # `plan_memo_size` of 0 disables it
+        self.plan_memo = PlanMemo(self.get_parameter('plan_memo_size').value)
+        self.plan_fingerprint = None
+        # events and planning runs are in the same group, so events received
+        # while planning are handled by the next run
+        self.planning_cb_group = MutuallyExclusiveCallbackGroup()
         self.event_sub = self.create_subscription(
-            String,
-            '/rosa_kb/events',
+            ChangeEvent,
+            '/rosa_kb/change_events',
             self.event_cb,
             10,
-            callback_group=MutuallyExclusiveCallbackGroup())
-
-        self.component_adaptable_srv = self.create_client(
-            AdaptableComponents,
-            '/rosa_kb/component/adaptable',
-            callback_group=MutuallyExclusiveCallbackGroup())
-
-        self.function_adaptable_srv = self.create_client(
-            AdaptableFunctions,
-            '/rosa_kb/function/adaptable',
-            callback_group=MutuallyExclusiveCallbackGroup()
-        )
-
-        self.selectable_fds_srv = self.create_client(
-            SelectableFunctionDesigns,
-            '/rosa_kb/function_designs/selectable',
-            callback_group=MutuallyExclusiveCallbackGroup()
-        )
-
-        self.selectable_c_configs_srv = self.create_client(
-            SelectableComponentConfigurations,
-            '/rosa_kb/component_configuration/selectable',
-            callback_group=MutuallyExclusiveCallbackGroup()
-        )
+            callback_group=self.planning_cb_group)
 
-        self.get_fds_priority_srv = self.create_client(
-            GetFunctionDesignPriority,
-            '/rosa_kb/function_designs/priority',
-            callback_group=MutuallyExclusiveCallbackGroup()
-        )
-
-        self.get_c_configs_priority_srv = self.create_client(
-            GetComponentConfigurationPriority,
-            '/rosa_kb/component_configuration/priority',
+        self.planning_snapshot_srv = self.create_client(
+            PlanningSnapshot,
+            '/rosa_kb/planning_snapshot',
             callback_group=MutuallyExclusiveCallbackGroup()
         )
 
@@ -107,101 +154,254 @@ class ConfigurationPlanner(Node):
     def on_deactivate(self, state: State) -> TransitionCallbackReturn:
         self.get_logger().info("on_deactivate() is called.")
         self.active = False
+        self.get_logger().info(
+            'planning scheduler stats: {}'.format(
+                self.planning_scheduler.stats()))
+        self.get_logger().info(
+            'plan memo stats: {}'.format(self.plan_memo.stats()))
+        if self.global_optimization is True:
+            self.get_logger().info(
+                'configuration optimizer stats: {}'.format(
+                    self.configuration_optimizer.stats()))
+        elif self.incremental_planning is True:
+            self.get_logger().info(
+                'incremental planning stats: {}'.format(
+                    self.incremental_planner.stats()))
         return super().on_deactivate(state)
 
     def on_cleanup(self, state: State) -> TransitionCallbackReturn:
         self.get_logger().info('on_cleanup() is called.')
         self.active = False
+        self.schedule_planning(None)
         self.destroy_subscription(self.event_sub)
         return TransitionCallbackReturn.SUCCESS
 
-    def plan_function_adaptation(self):
-        # get adaptable functions
+    def get_planning_snapshot(self, request=None):
+        if request is None:
+            request = PlanningSnapshot.Request()
+        # the snapshot joins the trace of the events being planned
+        request.trace_id = self.planning_trace_id
+        snapshot = self.call_service(self.planning_snapshot_srv, request)
+        if snapshot is None or snapshot.success is False:
+            return None
+        return snapshot
+
+    def plan_function_adaptation(self, snapshot=None):
+        if snapshot is None:
+            snapshot = self.get_planning_snapshot()
         selected_functions_fds = []
-        functions = self.call_service(
-            self.function_adaptable_srv, AdaptableFunctions.Request())
-        # get feasible fds
-        if functions is not None:
-            for function in functions.functions:
-                request = SelectableFunctionDesigns.Request()
-                request.function = function
-                fds = self.call_service(self.selectable_fds_srv, request)
-                if fds is not None:
-                    # get fds priority
-                    request = GetFunctionDesignPriority.Request()
-                    request.fds = fds.fds
-                    fds = self.call_service(
-                        self.get_fds_priority_srv, request)
-                    # sort fds
-                    if fds is not None:
-                        sorted_fds = sorted(
-                            fds.fds, key=lambda x: x.priority)
-                        if len(sorted_fds) > 0:
-                            selected_fd = FunctionDesign()
-                            selected_fd.function.name = function.name
-                            selected_fd.name = \
-                                sorted_fds[0].name
-                            selected_functions_fds.append(selected_fd)
+        if snapshot is None:
+            return selected_functions_fds
+        for function in snapshot.functions:
+            # sort fds by priority
+            sorted_fds = sorted(
+                [fd for fd in snapshot.fds
+                 if fd.function.name == function.name],
+                key=lambda x: x.priority)
+            if len(sorted_fds) > 0:
+                selected_fd = FunctionDesign()
+                selected_fd.function.name = function.name
+                selected_fd.name = sorted_fds[0].name
+                selected_functions_fds.append(selected_fd)
         return selected_functions_fds
 
-    def plan_component_adaptation(self, selected_functions_fds=[]):
-        # get adaptable components
+    def plan_component_adaptation(
+            self, selected_functions_fds=[], snapshot=None):
+        if snapshot is None:
+            snapshot = self.get_planning_snapshot()
         selected_component_configs = []
-        _selected_fds = [
-            fd.name for fd in selected_functions_fds]
-        components = self.call_service(
-            self.component_adaptable_srv,
-            AdaptableComponents.Request(selected_fds=_selected_fds))
-        # get feasible component configs
-        if components is not None:
-            for component in components.components:
-                request = SelectableComponentConfigurations.Request()
-                request.component = component
-                c_configs = self.call_service(
-                    self.selectable_c_configs_srv, request)
-
-                if c_configs is not None:
-                    # get component configs priority
-                    request = GetComponentConfigurationPriority.Request()
-                    request.c_configs = c_configs.c_configs
-                    c_configs = self.call_service(
-                        self.get_c_configs_priority_srv, request)
-
-                    # sort fds
-                    sorted_cc = sorted(
-                        c_configs.c_configs,
-                        key=lambda x: x.priority,
-                    )
-                    if len(sorted_cc) > 0:
-                        selected_cc = ComponentConfiguration()
-                        selected_cc.component.name = component.name
-                        selected_cc.name = \
-                            sorted_cc[0].name
-                        selected_component_configs.append(selected_cc)
+        if snapshot is None:
+            return selected_component_configs
+        # components required by the selected fds are also adaptable
+        components = [c.name for c in snapshot.components]
+        _selected_fds = [fd.name for fd in selected_functions_fds]
+        for fd in snapshot.fds:
+            if fd.name in _selected_fds:
+                components.extend(
+                    c.name for c in fd.required_components
+                    if c.name not in components)
 
+        for component in components:
+            # sort component configs by priority
+            sorted_cc = sorted(
+                [cc for cc in snapshot.c_configs
+                 if cc.component.name == component],
+                key=lambda x: x.priority)
+            if len(sorted_cc) > 0:
+                selected_cc = ComponentConfiguration()
+                selected_cc.component.name = component
+                selected_cc.name = sorted_cc[0].name
+                selected_component_configs.append(selected_cc)
         return selected_component_configs
 
+    def get_memoized_decision(self, snapshot, *settings):
+        # sets the fingerprint of the inputs being planned
+        self.plan_fingerprint = None
+        if snapshot is None or self.plan_memo.max_size <= 0:
+            return None
+        self.plan_fingerprint = fingerprint_snapshot(snapshot, *settings)
+        return self.plan_memo.get(self.plan_fingerprint)
+
     def plan_adaptation(self):
-        selected_functions_fds = self.plan_function_adaptation()
-        selected_component_configs = self.plan_component_adaptation(
-            selected_functions_fds)
-
-        selected_config = SelectedConfigurations.Request()
-        selected_config.selected_fds = selected_functions_fds
-        selected_config.selected_component_configs = \
-            selected_component_configs
+        snapshot = self.get_planning_snapshot()
+        decision = self.get_memoized_decision(snapshot)
+        if decision is not None:
+            selected_config = create_selected_configurations(*decision)
+        else:
+            selected_functions_fds = self.plan_function_adaptation(snapshot)
+            selected_component_configs = self.plan_component_adaptation(
+                selected_functions_fds, snapshot)
+
+            selected_config = SelectedConfigurations.Request()
+            selected_config.selected_fds = selected_functions_fds
+            selected_config.selected_component_configs = \
+                selected_component_configs
+            if self.plan_fingerprint is not None:
+                self.plan_memo.put(self.plan_fingerprint, (
+                    [(fd.function.name, fd.name)
+                     for fd in selected_functions_fds],
+                    [(cc.component.name, cc.name)
+                     for cc in selected_component_configs]))
+        # the selection joins the trace of the snapshot it was planned with
+        if snapshot is not None:
+            selected_config.trace_id = snapshot.trace_id
+        return selected_config
+
+    def plan_incremental_adaptation(self, changes, full=False):
+        # decisions depend on the previous runs, they are not memoized
+        self.plan_fingerprint = None
+        scope = None if full is True \
+            else self.incremental_planner.get_scope(changes)
+        request = PlanningSnapshot.Request()
+        if scope is None:
+            request.dependencies = True
+        else:
+            # requested even if nothing is affected, as it has the names of
+            # the adaptable functions and components
+            request.partial = True
+            request.functions = scope[0]
+            request.components = scope[1]
+        snapshot = self.get_planning_snapshot(request)
+        if snapshot is None:
+            # decisions may be outdated, the next run plans everything
+            self.incremental_planner.reset()
+            return SelectedConfigurations.Request()
+        unplanned = self.incremental_planner.update(snapshot, scope)
+        if len(unplanned[0]) > 0 or len(unplanned[1]) > 0:
+            # things that became adaptable outside of the scope
+            request = PlanningSnapshot.Request()
+            request.partial = True
+            request.functions = unplanned[0]
+            request.components = unplanned[1]
+            _snapshot = self.get_planning_snapshot(request)
+            if _snapshot is None:
+                self.incremental_planner.reset()
+                return SelectedConfigurations.Request()
+            self.incremental_planner.update(_snapshot, unplanned)
+
+        selected_config = create_selected_configurations(
+            *self.incremental_planner.get_selection())
+        selected_config.trace_id = snapshot.trace_id
         return selected_config
 
+    def plan_optimal_adaptation(self):
+        snapshot = self.get_planning_snapshot()
+        if snapshot is None:
+            self.plan_fingerprint = None
+            return SelectedConfigurations.Request(), None
+        optimizer = self.configuration_optimizer
+        decision = self.get_memoized_decision(
+            snapshot,
+            'global_optimization',
+            optimizer.activation_cost,
+            optimizer.deactivation_cost,
+            tuple(sorted(optimizer.active_components)))
+        if decision is None:
+            result = optimizer.optimize(snapshot)
+            if result['optimal'] is False:
+                self.get_logger().warning(
+                    'configuration optimization reached the time limit, '
+                    'optimum not proven')
+            decision = (
+                result['selected_fds'],
+                result['selected_c_configs'],
+                result['required_components'])
+            if self.plan_fingerprint is not None:
+                self.plan_memo.put(self.plan_fingerprint, decision)
+        selected_config = create_selected_configurations(*decision[:2])
+        selected_config.trace_id = snapshot.trace_id
+        return selected_config, decision[2]
+
     @check_lc_active
     def event_cb(self, msg):
-        if msg.data == 'insert_monitoring_data' or msg.data == 'action_update':
+        if msg.event_type not in PLANNING_EVENTS:
+            # other changes, e.g., a failed reconfiguration, may leave the KB
+            # without the last configuration applied
+            if msg.event_type not in SELECTION_EVENTS:
+                self.plan_memo.set_applied(None)
+            return
+        delay = self.planning_scheduler.add(
+            msg.event_type,
+            {'attributes': msg.attributes,
+             'components': msg.components,
+             'functions': msg.functions,
+             'actions': msg.actions},
+            msg.revision,
+            msg.trace_id)
+        self.schedule_planning(delay)
+
+    def schedule_planning(self, delay):
+        # a delay of None cancels the scheduled run
+        if self.planning_timer is not None:
+            self.destroy_timer(self.planning_timer)
+            self.planning_timer = None
+        if delay is None:
+            return
+        if delay <= 0.0:
+            self.planning_cb()
+            return
+        self.planning_timer = self.create_timer(
+            delay, self.planning_cb, callback_group=self.planning_cb_group)
+
+    def planning_cb(self):
+        if self.planning_timer is not None:
+            self.destroy_timer(self.planning_timer)
+            self.planning_timer = None
+        pending = self.planning_scheduler.pop()
+        if pending is None or self.active is False:
+            return
+        self.planning_trace_id = pending['trace_id']
+        required_components = None
+        if self.global_optimization is True:
+            selected_config, required_components = \
+                self.plan_optimal_adaptation()
+        elif self.incremental_planning is True:
+            # action updates change which functions are required, they are
+            # planned in full, which also refreshes the dependencies
+            selected_config = self.plan_incremental_adaptation(
+                pending['changes'],
+                full='action_update' in pending['event_types'])
+        else:
             selected_config = self.plan_adaptation()
-            # update kb with selected fds and component configs
-            if len(selected_config.selected_fds) > 0 \
-               or len(selected_config.selected_component_configs) > 0 \
-               or msg.data == 'action_update':
-                self.call_service(
-                    self.select_configuration_srv, selected_config)
+        # the KB already has the configuration planned with the same inputs
+        if self.plan_memo.needs_selection(
+                self.plan_fingerprint,
+                force='action_update' in pending['event_types']) is False:
+            return
+        # update kb with selected fds and component configs
+        if len(selected_config.selected_fds) > 0 \
+           or len(selected_config.selected_component_configs) > 0 \
+           or 'action_update' in pending['event_types']:
+            response = self.call_service(
+                self.select_configuration_srv, selected_config)
+            applied = response is not None and response.success is True
+            self.plan_memo.set_applied(
+                self.plan_fingerprint if applied is True else None)
+            # the components required by the applied configuration are
+            # active when planning the next one
+            if required_components is not None and applied is True:
+                self.configuration_optimizer.active_components = set(
+                    required_components)
 
     def call_service(self, cli, request):
         if cli.wait_for_service(timeout_sec=5.0) is False:
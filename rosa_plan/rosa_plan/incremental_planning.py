@@ -0,0 +1,283 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Incremental planning, limited to the things affected by KB changes.
+
+The planner keeps the function design selected for each adaptable function,
+the component configuration selected for each component, and the relations
+the statuses depend on, e.g., which function designs and component
+configurations are constrained by each QA/EA. After a change, only the
+functions and components whose selectable candidates could be affected are
+planned again, with a partial planning snapshot, and the decisions for the
+other ones are reused. Functions and components can also stop or start being
+adaptable because of writes that are not planning events, e.g., when a
+reconfiguration solves them. Thus, the decisions of the ones that are not
+adaptable anymore are dropped, and the ones that became adaptable are planned
+as well.
+"""
+
+from rosa_kb.status_materializer import StatusDependenciesDict
+from rosa_kb.status_materializer import get_affected_things
+
+from typing import Any
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import TypedDict
+
+
+#: change type of each kind of thing in the KB change events, see
+#: :func:`rosa_kb.status_materializer.get_affected_things`
+CHANGE_TYPES = {
+    'attributes': 'Attribute',
+    'components': 'Component',
+    'functions': 'Function',
+    'actions': 'Action',
+}
+
+
+class IncrementalPlanningStatsDict(TypedDict):
+    """TypedDict for incremental planning statistics."""
+
+    full_runs: int  #: planning runs that planned everything
+    incremental_runs: int  #: planning runs limited to the affected things
+    planned_functions: int  #: functions planned by the incremental runs
+    reused_functions: int  #: function decisions reused by incremental runs
+
+
+def parse_snapshot_dependencies(snapshot: Any) -> StatusDependenciesDict:
+    """
+    Get the status dependencies of a planning snapshot response.
+
+    :param snapshot: `/rosa_kb/planning_snapshot` response requested with
+        `dependencies` set to True
+    :return: relations the statuses depend on
+    """
+    dependencies = {
+        'constraints': dict(),
+        'c_configs': dict(),
+        'fds': dict(),
+        'actions': dict(),
+    }
+    for constraint in snapshot.constraints:
+        dependencies['constraints'].setdefault(
+            constraint.attribute_name, []).append(
+                (constraint.constrained_type, constraint.constrained_name))
+    for fd in snapshot.all_fds:
+        dependencies['fds'][fd.name] = (
+            fd.function.name, [c.name for c in fd.required_components])
+    for c_config in snapshot.all_c_configs:
+        dependencies['c_configs'][c_config.name] = c_config.component.name
+    for requirement in snapshot.functional_requirements:
+        dependencies['actions'].setdefault(
+            requirement.action.name, []).extend(
+                f.name for f in requirement.required_functions)
+    return dependencies
+
+
+def get_best_candidates(
+        candidates: Iterable[Any], get_key) -> dict[str, Any]:
+    """
+    Get the candidate with the lowest priority for each key.
+
+    When several candidates have the lowest priority, the first one is
+    selected.
+
+    :param candidates: function designs or component configurations
+    :param get_key: function returning the key of a candidate, e.g., its
+        function name
+    :return: dict with the form {KEY: CANDIDATE}
+    """
+    best = dict()
+    for candidate in candidates:
+        key = get_key(candidate)
+        if key not in best or candidate.priority < best[key].priority:
+            best[key] = candidate
+    return best
+
+
+class IncrementalPlanner:
+    """
+    Keep the planning decisions between planning runs.
+
+    Call :meth:`get_scope` with the changes in the KB to get the functions
+    and components to plan, request a partial planning snapshot with them,
+    and update the decisions with :meth:`update`. When the scope is None,
+    e.g., before the first run, a full snapshot with the status dependencies
+    must be requested instead. A partial snapshot must be requested even if
+    the scope is empty, as it has the names of all adaptable functions and
+    components.
+    """
+
+    def __init__(self) -> None:
+        """Create IncrementalPlanner."""
+        #: relations the statuses depend on, None before the first full run
+        self.dependencies = None
+        # {KIND: NAMES} of the things in the dependencies
+        self._known = dict()
+        # {ADAPTABLE FUNCTION: SELECTED FD or None}
+        self._fds = dict()
+        # adaptable components, dict keys keep their order
+        self._components = dict()
+        # {COMPONENT: SELECTED COMPONENT CONFIGURATION}
+        self._c_configs = dict()
+        self._full_runs = 0
+        self._incremental_runs = 0
+        self._planned_functions = 0
+        self._reused_functions = 0
+
+    def reset(self) -> None:
+        """Forget all decisions, the next run plans everything."""
+        self.dependencies = None
+        self._known = dict()
+        self._fds = dict()
+        self._components = dict()
+        self._c_configs = dict()
+
+    def _set_dependencies(self, dependencies: StatusDependenciesDict) -> None:
+        self.dependencies = dependencies
+        self._known = {
+            'functions': {
+                function for function, _ in dependencies['fds'].values()},
+            'components': set(dependencies['c_configs'].values()).union(
+                *(components for _, components
+                  in dependencies['fds'].values())),
+        }
+
+    def get_scope(
+            self,
+            changes: dict[str, Iterable[str]]
+         ) -> Tuple[list[str], list[str]] | None:
+        """
+        Get the functions and components affected by changes in the KB.
+
+        :param changes: things changed, with the form {KIND: NAMES}, see
+            :data:`CHANGE_TYPES`
+        :return: tuple with the form (FUNCTIONS, COMPONENTS), or None if
+            everything must be planned, i.e., before the first run or when a
+            changed function or component is not in the dependencies
+        """
+        if self.dependencies is None:
+            return None
+        _changes = dict()
+        for kind, names in changes.items():
+            if kind not in CHANGE_TYPES:
+                continue
+            names = set(names)
+            if kind in self._known and not names <= self._known[kind]:
+                return None
+            _changes[CHANGE_TYPES[kind]] = names
+        affected = get_affected_things(self.dependencies, _changes)
+        return sorted(affected['Function']), sorted(affected['Component'])
+
+    def update(
+            self,
+            snapshot: Any,
+            scope: Optional[Tuple[list[str], list[str]]] = None
+         ) -> Tuple[list[str], list[str]]:
+        """
+        Plan the functions and components of a planning snapshot.
+
+        The decisions of the functions and components that are not adaptable
+        anymore are dropped.
+
+        :param snapshot: `/rosa_kb/planning_snapshot` response, with the
+            status dependencies when `scope` is None
+        :param scope: tuple with the form (FUNCTIONS, COMPONENTS) the partial
+            snapshot was requested with, or None for a full snapshot
+        :return: tuple with the form (FUNCTIONS, COMPONENTS) with the
+            adaptable functions and components that were not planned, e.g.,
+            because they became adaptable outside of `scope`. They must be
+            planned with another partial snapshot
+        """
+        if scope is None:
+            self.reset()
+            self._set_dependencies(parse_snapshot_dependencies(snapshot))
+            self._full_runs += 1
+        else:
+            for function in scope[0]:
+                self._fds.pop(function, None)
+            for component in scope[1]:
+                self._components.pop(component, None)
+                self._c_configs.pop(component, None)
+            self._incremental_runs += 1
+            self._planned_functions += len(scope[0])
+            self._reused_functions += len(self._fds)
+
+        best_fds = get_best_candidates(
+            snapshot.fds, lambda fd: fd.function.name)
+        for function in snapshot.functions:
+            self._fds[function.name] = best_fds.get(function.name)
+        for component in snapshot.components:
+            self._components[component.name] = True
+
+        # the components whose configurations are in the snapshot
+        components = list(scope[1]) if scope is not None else []
+        components.extend(c.name for c in snapshot.components)
+        components.extend(
+            c.name for fd in snapshot.fds for c in fd.required_components)
+        for component in components:
+            self._c_configs.pop(component, None)
+        self._c_configs.update(get_best_candidates(
+            snapshot.c_configs, lambda cc: cc.component.name))
+
+        adaptable_functions = set(snapshot.adaptable_functions)
+        adaptable_components = set(snapshot.adaptable_components)
+        for function in set(self._fds) - adaptable_functions:
+            del self._fds[function]
+        for component in set(self._components) - adaptable_components:
+            del self._components[component]
+        return (
+            [f for f in snapshot.adaptable_functions if f not in self._fds],
+            [c for c in snapshot.adaptable_components
+             if c not in self._components])
+
+    def get_selection(
+            self) -> Tuple[list[Tuple[str, str]], list[Tuple[str, str]]]:
+        """
+        Get the selected configuration.
+
+        The components required by the selected function designs are
+        adaptable as well, as in
+        :meth:`ConfigurationPlanner.plan_component_adaptation`.
+
+        :return: tuple with the form (SELECTED FDS, SELECTED CONFIGURATIONS),
+            with lists of tuples with the form (FUNCTION, FD) and
+            (COMPONENT, CONFIGURATION)
+        """
+        selected_fds = [
+            (function, fd.name) for function, fd in self._fds.items()
+            if fd is not None]
+        components = dict(self._components)
+        for fd in self._fds.values():
+            if fd is not None:
+                components.update(
+                    dict.fromkeys(c.name for c in fd.required_components))
+        selected_c_configs = [
+            (component, self._c_configs[component].name)
+            for component in components if component in self._c_configs]
+        return selected_fds, selected_c_configs
+
+    def stats(self) -> IncrementalPlanningStatsDict:
+        """
+        Get incremental planning statistics.
+
+        :return: dict with the number of full and incremental runs, and the
+            number of functions planned and reused by the incremental runs
+        """
+        return {
+            'full_runs': self._full_runs,
+            'incremental_runs': self._incremental_runs,
+            'planned_functions': self._planned_functions,
+            'reused_functions': self._reused_functions,
+        }
@@ -0,0 +1,208 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the configuration optimizer with generated models.
+
+The generated models are split in subsystems, whose function designs share
+the components of their subsystem, e.g., the sensors and controllers of a
+robot arm. Run it with::
+
+    ros2 run rosa_plan optimizer_benchmark --fds 100 1000 5000
+
+For each model size, it prints the time taken by the optimizer, whether the
+optimum was proven within the time limit, and the cost of the optimized
+configuration compared to the lowest-priority one.
+"""
+
+import argparse
+import random
+
+from types import SimpleNamespace
+
+from rosa_plan.configuration_optimizer import ConfigurationOptimizer
+
+from typing import Any
+from typing import Optional
+from typing import TypedDict
+
+
+class BenchmarkResultDict(TypedDict):
+    """TypedDict for the result of a benchmark run."""
+
+    fds: int  #: number of function designs
+    functions: int  #: number of adaptable functions
+    components: int  #: number of components
+    greedy_cost: float  #: cost of the lowest-priority configuration
+    cost: float  #: cost of the optimized configuration
+    optimal: bool  #: whether the optimum was proven
+    nodes: int  #: number of branch and bound nodes explored
+    solve_time: float  #: time (s) taken by the optimizer
+
+
+def generate_snapshot(
+        n_fds: int,
+        fds_per_function: Optional[int] = 4,
+        functions_per_subsystem: Optional[int] = 5,
+        components_per_subsystem: Optional[int] = 8,
+        components_per_fd: Optional[int] = 3,
+        c_configs_per_component: Optional[int] = 2,
+        seed: Optional[int] = 0) -> Any:
+    """
+    Generate a planning snapshot.
+
+    :param n_fds: number of function designs
+    :param fds_per_function: function designs of each function
+    :param functions_per_subsystem: functions of each subsystem
+    :param components_per_subsystem: components of each subsystem
+    :param components_per_fd: components required by each function design
+    :param c_configs_per_component: configurations of each component
+    :param seed: random seed
+    :return: object with the same fields as the
+        `/rosa_kb/planning_snapshot` response
+    """
+    rng = random.Random(seed)
+    snapshot = SimpleNamespace(
+        functions=[], fds=[], components=[], c_configs=[])
+    n_functions = max(n_fds // fds_per_function, 1)
+    components = []
+    for f in range(n_functions):
+        subsystem = f // functions_per_subsystem
+        if f % functions_per_subsystem == 0:
+            components = [
+                'c{}_{}'.format(subsystem, c)
+                for c in range(components_per_subsystem)]
+            for component in components:
+                for c_config in range(c_configs_per_component):
+                    snapshot.c_configs.append(SimpleNamespace(
+                        component=SimpleNamespace(name=component),
+                        name='{}_cc{}'.format(component, c_config),
+                        priority=float(rng.randint(0, 5))))
+        function = 'f{}'.format(f)
+        snapshot.functions.append(SimpleNamespace(name=function))
+        for fd in range(fds_per_function):
+            snapshot.fds.append(SimpleNamespace(
+                function=SimpleNamespace(name=function),
+                name='{}_fd{}'.format(function, fd),
+                priority=float(rng.randint(0, 10)),
+                required_components=[
+                    SimpleNamespace(name=c) for c in rng.sample(
+                        components,
+                        min(components_per_fd, len(components)))]))
+    return snapshot
+
+
+def run_benchmark(
+        n_fds: int,
+        activation_cost: Optional[float] = 1.0,
+        deactivation_cost: Optional[float] = 1.0,
+        time_limit: Optional[float] = 1.0,
+        seed: Optional[int] = 0,
+        **kwargs) -> BenchmarkResultDict:
+    """
+    Optimize the configuration of a generated model.
+
+    Half of the components, picked randomly, are active.
+
+    :param n_fds: number of function designs
+    :param activation_cost: cost of activating a component
+    :param deactivation_cost: cost of deactivating a component
+    :param time_limit: optimizer time limit (s)
+    :param seed: random seed
+    :param kwargs: other arguments of :func:`generate_snapshot`
+    :return: benchmark result
+    """
+    snapshot = generate_snapshot(n_fds, seed=seed, **kwargs)
+    components = sorted({
+        c.name for fd in snapshot.fds for c in fd.required_components})
+    optimizer = ConfigurationOptimizer(
+        activation_cost, deactivation_cost, time_limit)
+    optimizer.active_components = set(
+        random.Random(seed).sample(components, len(components) // 2))
+    result = optimizer.optimize(snapshot)
+
+    greedy_fds = dict()
+    for fd in snapshot.fds:
+        function = fd.function.name
+        if function not in greedy_fds \
+           or fd.priority < greedy_fds[function].priority:
+            greedy_fds[function] = fd
+    greedy_cost = optimizer.get_cost(
+        [(f, fd.name) for f, fd in greedy_fds.items()],
+        {c.name for fd in greedy_fds.values()
+         for c in fd.required_components})
+    return {
+        'fds': len(snapshot.fds),
+        'functions': len(snapshot.functions),
+        'components': len(components),
+        'greedy_cost': greedy_cost,
+        'cost': result['cost'],
+        'optimal': result['optimal'],
+        'nodes': result['nodes'],
+        'solve_time': result['solve_time'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the configuration optimizer')
+    parser.add_argument(
+        '--fds', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000],
+        help='number of function designs of each model')
+    parser.add_argument(
+        '--fds-per-function', type=int, default=4,
+        help='function designs of each function')
+    parser.add_argument(
+        '--functions-per-subsystem', type=int, default=5,
+        help='functions sharing the components of a subsystem')
+    parser.add_argument(
+        '--components-per-subsystem', type=int, default=8,
+        help='components of each subsystem')
+    parser.add_argument(
+        '--activation-cost', type=float, default=1.0,
+        help='cost of activating a component')
+    parser.add_argument(
+        '--deactivation-cost', type=float, default=1.0,
+        help='cost of deactivating a component')
+    parser.add_argument(
+        '--time-limit', type=float, default=1.0,
+        help='optimizer time limit (s)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    row = '{:>7} {:>9} {:>10} {:>11} {:>10} {:>9} {:>8} {:>10}'
+    print(row.format(
+        'fds', 'functions', 'components', 'greedy cost', 'cost', 'time (s)',
+        'optimal', 'nodes'))
+    for n_fds in args.fds:
+        result = run_benchmark(
+            n_fds,
+            args.activation_cost,
+            args.deactivation_cost,
+            args.time_limit,
+            args.seed,
+            fds_per_function=args.fds_per_function,
+            functions_per_subsystem=args.functions_per_subsystem,
+            components_per_subsystem=args.components_per_subsystem)
+        print(row.format(
+            result['fds'],
+            result['functions'],
+            result['components'],
+            '{:.1f}'.format(result['greedy_cost']),
+            '{:.1f}'.format(result['cost']),
+            '{:.3f}'.format(result['solve_time']),
+            str(result['optimal']),
+            result['nodes']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Memoization of the planning decisions, keyed on the planning inputs.
+
+The planner decisions only depend on the planning snapshot, i.e., the
+adaptable functions and components, their selectable function designs and
+component configurations, and their priorities, and on the planner
+settings. The fingerprint of these inputs identifies the decision, so
+decisions can be reused while the inputs do not change, and the selected
+configuration does not need to be sent to the KB again when it was already
+applied with the same inputs.
+"""
+
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from typing import Any
+from typing import Hashable
+from typing import Optional
+from typing import TypedDict
+
+
+class PlanMemoStatsDict(TypedDict):
+    """TypedDict for plan memo statistics."""
+
+    hits: int  #: decisions reused
+    misses: int  #: decisions not found
+    size: int  #: number of decisions kept
+    skipped_selections: int  #: selections not sent, as already applied
+
+
+def fingerprint_snapshot(snapshot: Any, *settings: Hashable) -> str:
+    """
+    Get the fingerprint of the planning inputs.
+
+    The order of the snapshot entries is part of the fingerprint, as it
+    breaks ties between candidates with the same priority. The snapshot
+    trace ID is not part of it.
+
+    :param snapshot: `/rosa_kb/planning_snapshot` response
+    :param settings: planner settings the decision depends on
+    :return: hex fingerprint
+    """
+    inputs = (
+        tuple(f.name for f in snapshot.functions),
+        tuple(
+            (fd.function.name, fd.name, fd.priority,
+             tuple(c.name for c in fd.required_components))
+            for fd in snapshot.fds),
+        tuple(c.name for c in snapshot.components),
+        tuple(
+            (cc.component.name, cc.name, cc.priority)
+            for cc in snapshot.c_configs),
+        settings,
+    )
+    return hashlib.blake2b(
+        repr(inputs).encode(), digest_size=16).hexdigest()
+
+
+class PlanMemo:
+    """
+    Bounded memo table of planning decisions.
+
+    Keeps the decisions of the `max_size` most recently used fingerprints,
+    and the fingerprint of the last decision applied in the KB. All methods
+    are thread-safe.
+    """
+
+    def __init__(self, max_size: Optional[int] = 128) -> None:
+        """
+        Create PlanMemo.
+
+        :param max_size: number of decisions kept, 0 disables the memo
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._decisions = OrderedDict()
+        self._applied = None
+        self._hits = 0
+        self._misses = 0
+        self._skipped_selections = 0
+
+    def get(self, fingerprint: str) -> Any | None:
+        """
+        Get the decision planned with some inputs.
+
+        :param fingerprint: fingerprint of the planning inputs
+        :return: decision, or None if it is not in the memo
+        """
+        with self._lock:
+            decision = self._decisions.get(fingerprint)
+            if decision is None:
+                self._misses += 1
+                return None
+            self._decisions.move_to_end(fingerprint)
+            self._hits += 1
+            return decision
+
+    def put(self, fingerprint: str, decision: Any) -> None:
+        """
+        Add the decision planned with some inputs.
+
+        The least recently used decision is evicted when the memo is full.
+
+        :param fingerprint: fingerprint of the planning inputs
+        :param decision: decision, it must not be modified afterwards
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._decisions[fingerprint] = decision
+            self._decisions.move_to_end(fingerprint)
+            while len(self._decisions) > self.max_size:
+                self._decisions.popitem(last=False)
+
+    def set_applied(self, fingerprint: str | None) -> None:
+        """
+        Set the fingerprint of the last decision applied in the KB.
+
+        :param fingerprint: fingerprint of the planning inputs, None when
+            the applied decision is unknown, e.g., after a failed selection or
+            reconfiguration
+        """
+        with self._lock:
+            self._applied = fingerprint
+
+    def needs_selection(
+            self,
+            fingerprint: str | None,
+            force: Optional[bool] = False) -> bool:
+        """
+        Check if the decision of some inputs must be selected in the KB.
+
+        It does not when it is the last decision applied, which is counted
+        as a skipped selection. Otherwise, the last decision applied is
+        forgotten, as the KB changed since it was applied, until the new
+        selection is applied with :meth:`set_applied`. So after planning
+        some other inputs, the decision of the first ones is selected again
+        even if nothing was selected for the other inputs.
+
+        :param fingerprint: fingerprint of the planning inputs
+        :param force: whether to select it even if it was the last decision
+            applied, e.g., after an action update
+        :return: whether the decision must be selected
+        """
+        with self._lock:
+            if force is False and fingerprint is not None \
+               and fingerprint == self._applied:
+                self._skipped_selections += 1
+                return False
+            self._applied = None
+            return True
+
+    def clear(self) -> None:
+        """Forget all decisions."""
+        with self._lock:
+            self._decisions.clear()
+            self._applied = None
+
+    def __len__(self) -> int:
+        """Return number of decisions kept."""
+        with self._lock:
+            return len(self._decisions)
+
+    def stats(self) -> PlanMemoStatsDict:
+        """
+        Get plan memo statistics.
+
+        :return: dict with the number of hits, misses, decisions kept, and
+            selections skipped
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._decisions),
+                'skipped_selections': self._skipped_selections,
+            }
@@ -0,0 +1,224 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Scheduler that collapses bursts of KB events into single planning runs."""
+
+import threading
+import time
+
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import TypedDict
+
+
+class PendingEventsDict(TypedDict):
+    """TypedDict for the events handled by a planning run."""
+
+    event_types: list[str]  #: types of the events, in order of arrival
+    count: int  #: number of events
+    #: things changed by the events, with the form {KIND: NAMES}, e.g.,
+    #: {'attributes': ['battery_level']}
+    changes: dict[str, list[str]]
+    revision: int  #: newest KB revision of the events
+    #: MAPE-K loop trace of the first traced event, empty when no event is
+    #: traced
+    trace_id: str
+    wait: float  #: time (s) since the first event
+
+
+class PlanningSchedulerStatsDict(TypedDict):
+    """TypedDict for planning scheduler statistics."""
+
+    events: int  #: number of events received
+    runs: int  #: number of planning runs
+    immediate_runs: int  #: runs due as soon as their event arrived
+    coalescing_ratio: float  #: events per planning run
+    max_wait: float  #: longest time (s) an event waited for its run
+    pending: int  #: events waiting for a planning run
+
+
+class PlanningScheduler:
+    """
+    Decide when the planner runs, collapsing bursts of events.
+
+    Consecutive planning runs are at least `min_interval` seconds apart.
+    Once that spacing has passed, a run is due when no event arrived for
+    `min_interval` seconds, so a burst of events is handled by a single run,
+    or when the first pending event has waited `max_wait` seconds, so a
+    steady stream of events is still planned. Events of the
+    `immediate_events` types, e.g., action updates, are due as soon as they
+    arrive, regardless of the spacing. With a `min_interval` of 0 every
+    event is due immediately.
+
+    Events are added with :meth:`add`, which returns how long to wait before
+    planning, and the run takes all pending events with :meth:`pop`. All
+    methods are thread-safe.
+    """
+
+    def __init__(
+            self,
+            min_interval: Optional[float] = 0.0,
+            max_wait: Optional[float] = 1.0,
+            immediate_events: Optional[Iterable[str]] = ('action_update',),
+            clock: Optional[Callable[[], float]] = time.monotonic) -> None:
+        """
+        Create PlanningScheduler.
+
+        :param min_interval: minimum time (s) between planning runs, and
+            without events before planning
+        :param max_wait: time (s) the first pending event waits for planning
+            when events keep arriving, it must be greater than 0 when
+            `min_interval` is
+        :param immediate_events: types of the events planned immediately
+        :param clock: function returning the current time (s)
+        :raises ValueError: when `min_interval` is greater than 0 and
+            `max_wait` is not
+        """
+        if min_interval > 0.0 and max_wait <= 0.0:
+            raise ValueError(
+                'max_wait must be greater than 0 when min_interval is, '
+                'otherwise a steady stream of events is never planned')
+        self.min_interval = min_interval
+        self.max_wait = max_wait
+        self.immediate_events = set(immediate_events)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._event_types = []
+        self._changes = dict()
+        self._revision = 0
+        self._trace_id = ''
+        self._first_time = None
+        self._last_time = None
+        self._last_run = None
+        self._immediate = False
+        self._events = 0
+        self._runs = 0
+        self._immediate_runs = 0
+        self._max_wait = 0.0
+
+    def add(
+            self,
+            event_type: str,
+            changes: Optional[dict[str, Iterable[str]]] = None,
+            revision: Optional[int] = 0,
+            trace_id: Optional[str] = '') -> float:
+        """
+        Add an event.
+
+        :param event_type: event type, e.g., 'insert_monitoring_data'
+        :param changes: things changed by the event, with the form
+            {KIND: NAMES}
+        :param revision: KB revision of the event
+        :param trace_id: MAPE-K loop trace of the event, empty when it is not
+            traced
+        :return: time (s) until planning is due
+        """
+        now = self.clock()
+        with self._lock:
+            self._events += 1
+            self._event_types.append(event_type)
+            for kind, names in (changes or dict()).items():
+                self._changes.setdefault(kind, dict()).update(
+                    dict.fromkeys(names))
+            self._revision = max(self._revision, revision)
+            if self._trace_id == '':
+                self._trace_id = trace_id
+            if self._first_time is None:
+                self._first_time = now
+            self._last_time = now
+            if event_type in self.immediate_events:
+                self._immediate = True
+            return self._get_delay(now)
+
+    def _get_delay(self, now: float) -> float | None:
+        if self._first_time is None:
+            return None
+        if self._immediate is True or self.min_interval <= 0.0:
+            return 0.0
+        due = min(
+            self._last_time + self.min_interval,
+            self._first_time + self.max_wait)
+        if self._last_run is not None:
+            due = max(due, self._last_run + self.min_interval)
+        return max(due - now, 0.0)
+
+    def get_delay(self) -> float | None:
+        """
+        Get the time until planning is due.
+
+        :return: time (s) until planning is due, or None if no event is
+            pending
+        """
+        now = self.clock()
+        with self._lock:
+            return self._get_delay(now)
+
+    def pop(self) -> PendingEventsDict | None:
+        """
+        Take all pending events, to be handled by a planning run.
+
+        :return: the pending events, or None if there are none
+        """
+        now = self.clock()
+        with self._lock:
+            if self._first_time is None:
+                return None
+            wait = now - self._first_time
+            pending = {
+                'event_types': self._event_types,
+                'count': len(self._event_types),
+                'changes': {
+                    kind: list(names)
+                    for kind, names in self._changes.items()},
+                'revision': self._revision,
+                'trace_id': self._trace_id,
+                'wait': wait,
+            }
+            self._runs += 1
+            if self._immediate is True or self.min_interval <= 0.0:
+                self._immediate_runs += 1
+            self._max_wait = max(self._max_wait, wait)
+            self._last_run = now
+            self._event_types = []
+            self._changes = dict()
+            self._trace_id = ''
+            self._first_time = None
+            self._last_time = None
+            self._immediate = False
+            return pending
+
+    def __len__(self) -> int:
+        """Return number of pending events."""
+        with self._lock:
+            return len(self._event_types)
+
+    def stats(self) -> PlanningSchedulerStatsDict:
+        """
+        Get scheduler statistics.
+
+        :return: dict with the number of events received and planning runs,
+            the number of events per run, the longest wait, and the number of
+            pending events
+        """
+        with self._lock:
+            handled = self._events - len(self._event_types)
+            return {
+                'events': self._events,
+                'runs': self._runs,
+                'immediate_runs': self._immediate_runs,
+                'coalescing_ratio':
+                    handled / self._runs if self._runs > 0 else 0.0,
+                'max_wait': self._max_wait,
+                'pending': len(self._event_types),
+            }
@@ -24,7 +24,8 @@ setup(
     tests_require=['pytest'],
     entry_points={
         'console_scripts': [
-            'configuration_planner_node = rosa_plan.configuration_planner_node:main'
+            'configuration_planner_node = rosa_plan.configuration_planner_node:main',
+            'optimizer_benchmark = rosa_plan.optimizer_benchmark:main'
         ],
     },
 )
@@ -0,0 +1,56 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Factories of planning snapshots shared by the planner unit tests."""
+
+from types import SimpleNamespace
+
+
+def thing(name):
+    return SimpleNamespace(name=name)
+
+
+def fd(function, name, priority, components=()):
+    return SimpleNamespace(
+        function=thing(function), name=name, priority=priority,
+        required_components=[thing(c) for c in components])
+
+
+def c_config(component, name, priority):
+    return SimpleNamespace(
+        component=thing(component), name=name, priority=priority)
+
+
+def snapshot(
+        fds=(), components=(), c_configs=(), functions=None,
+        adaptable_functions=None, adaptable_components=None, trace_id=''):
+    # same fields as the `/rosa_kb/planning_snapshot` response, the
+    # functions are the ones of the fds when they are not given
+    if functions is None:
+        functions = dict.fromkeys(_fd.function.name for _fd in fds)
+    return SimpleNamespace(
+        functions=[thing(f) for f in functions],
+        fds=list(fds),
+        components=[thing(c) for c in components],
+        c_configs=list(c_configs),
+        adaptable_functions=list(
+            functions if adaptable_functions is None
+            else adaptable_functions),
+        adaptable_components=list(
+            components if adaptable_components is None
+            else adaptable_components),
+        constraints=[],
+        all_fds=[],
+        all_c_configs=[],
+        functional_requirements=[],
+        trace_id=trace_id)
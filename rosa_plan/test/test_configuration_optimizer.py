@@ -0,0 +1,102 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+
+from rosa_plan.configuration_optimizer import ConfigurationOptimizer
+from rosa_plan.optimizer_benchmark import generate_snapshot
+from rosa_plan.optimizer_benchmark import run_benchmark
+
+from snapshot_factories import c_config
+from snapshot_factories import fd
+from snapshot_factories import snapshot
+
+
+def test_lowest_priority_without_costs():
+    optimizer = ConfigurationOptimizer(0.0, 0.0)
+    result = optimizer.optimize(snapshot(
+        [fd('f1', 'f1_fd1', 2.0, ['c1']),
+         fd('f1', 'f1_fd2', 1.0, ['c2']),
+         fd('f1', 'f1_fd3', 1.0, ['c3']),
+         fd('f2', 'f2_fd1', 0.0, ['c3'])],
+        ['c4'],
+        [c_config('c2', 'c2_cc1', 1.0),
+         c_config('c2', 'c2_cc2', 2.0),
+         c_config('c4', 'c4_cc1', 0.0)]))
+    assert result['selected_fds'] == [('f1', 'f1_fd3'), ('f2', 'f2_fd1')] \
+        and result['selected_c_configs'] == [('c4', 'c4_cc1')] \
+        and result['required_components'] == ['c4', 'c3'] \
+        and result['cost'] == 1.0 and result['optimal'] is True
+
+
+def test_shared_components():
+    optimizer = ConfigurationOptimizer(2.0, 0.0)
+    result = optimizer.optimize(snapshot(
+        [fd('f1', 'f1_fd1', 0.0, ['c1']),
+         fd('f1', 'f1_fd2', 1.0, ['c2']),
+         fd('f2', 'f2_fd1', 0.0, ['c2'])]))
+    assert result['selected_fds'] == [('f1', 'f1_fd2'), ('f2', 'f2_fd1')] \
+        and result['cost'] == 3.0
+
+
+def test_active_components():
+    optimizer = ConfigurationOptimizer(1.0, 1.0)
+    optimizer.active_components = {'c2'}
+    result = optimizer.optimize(snapshot(
+        [fd('f1', 'f1_fd1', 0.0, ['c1']),
+         fd('f1', 'f1_fd2', 1.5, ['c2'])]))
+    assert result['selected_fds'] == [('f1', 'f1_fd2')] \
+        and result['cost'] == 1.5
+
+
+def test_unknown_priority():
+    optimizer = ConfigurationOptimizer(1.0, 1.0)
+    result = optimizer.optimize(snapshot(
+        [fd('f1', 'f1_fd1', sys.float_info.max),
+         fd('f1', 'f1_fd2', 5.0, ['c1', 'c2']),
+         fd('f2', 'f2_fd1', sys.float_info.max)]))
+    assert result['selected_fds'] == [('f1', 'f1_fd2'), ('f2', 'f2_fd1')] \
+        and result['cost'] < sys.float_info.max
+
+
+def test_time_limit():
+    optimizer = ConfigurationOptimizer(1.0, 1.0, time_limit=0.0)
+    result = optimizer.optimize(snapshot(
+        [fd('f1', 'f1_fd1', 0.0, ['c1']),
+         fd('f1', 'f1_fd2', 1.0, ['c2']),
+         fd('f2', 'f2_fd1', 0.0, ['c2'])]))
+    assert result['optimal'] is False \
+        and [f for f, _ in result['selected_fds']] == ['f1', 'f2'] \
+        and optimizer.stats()['runs'] == 1
+
+
+def test_time_limit_large_snapshot():
+    large_snapshot = generate_snapshot(20000)
+    optimizer = ConfigurationOptimizer(1.0, 1.0, time_limit=0.5)
+    result = optimizer.optimize(large_snapshot)
+    fds = {fd.name: fd for fd in large_snapshot.fds}
+    required = {
+        c.name for _, name in result['selected_fds']
+        for c in fds[name].required_components}
+    assert result['solve_time'] <= 0.5 + 0.1 \
+        and [f for f, _ in result['selected_fds']] == [
+            f.name for f in large_snapshot.functions] \
+        and all(fds[name].function.name == f
+                for f, name in result['selected_fds']) \
+        and set(result['required_components']) == required
+
+
+def test_benchmark():
+    result = run_benchmark(200, time_limit=10.0)
+    assert result['fds'] == 200 and result['optimal'] is True \
+        and result['cost'] <= result['greedy_cost']
@@ -28,10 +28,10 @@ import sys
 from lifecycle_msgs.srv import ChangeState
 from rclpy.node import Node
 
-from std_msgs.msg import String
 from rosa_plan.configuration_planner import ConfigurationPlanner
 from ros_typedb_msgs.srv import Query
 
+from rosa_msgs.msg import ChangeEvent
 from rosa_msgs.msg import ComponentConfiguration
 from rosa_msgs.msg import FunctionDesign
 
@@ -145,6 +145,33 @@ def test_plan_adaptation():
         rclpy.shutdown()
 
 
+@pytest.mark.launch(fixture=generate_test_description)
+def test_plan_adaptation_memoized():
+    rclpy.init()
+    try:
+        configuration_planner = create_configuration_planner()
+
+        node = MakeTestNode(test_node)
+        node.start_node()
+
+        node.activate_lc_node(configuration_planner_name)
+        node.activate_lc_node(rosa_kb_name)
+
+        result = configuration_planner.plan_adaptation()
+        fingerprint = configuration_planner.plan_fingerprint
+        memoized = configuration_planner.plan_adaptation()
+
+        assert fingerprint is not None \
+            and configuration_planner.plan_fingerprint == fingerprint \
+            and configuration_planner.plan_memo.stats()['hits'] == 1 \
+            and memoized.selected_fds == result.selected_fds \
+            and memoized.selected_component_configs == \
+            result.selected_component_configs
+    finally:
+        configuration_planner.destroy_node()
+        rclpy.shutdown()
+
+
 @pytest.mark.launch(fixture=generate_test_description)
 def test_manual_event_cb():
     rclpy.init()
@@ -157,8 +184,8 @@ def test_manual_event_cb():
         node.activate_lc_node(configuration_planner_name)
         node.activate_lc_node(rosa_kb_name)
 
-        event = String()
-        event.data = 'insert_monitoring_data'
+        event = ChangeEvent()
+        event.event_type = 'insert_monitoring_data'
         result = configuration_planner.event_cb(event)
 
         node.query_srv = node.create_client(
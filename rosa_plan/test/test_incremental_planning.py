@@ -0,0 +1,137 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from types import SimpleNamespace
+
+from rosa_plan.incremental_planning import IncrementalPlanner
+
+from snapshot_factories import c_config
+from snapshot_factories import fd
+from snapshot_factories import snapshot
+
+
+def add_dependencies(_snapshot):
+    _snapshot.constraints = [
+        SimpleNamespace(
+            attribute_name='ea1',
+            constrained_type='function-design',
+            constrained_name='f1_fd2'),
+        SimpleNamespace(
+            attribute_name='ea2',
+            constrained_type='component-configuration',
+            constrained_name='c3_cc1'),
+    ]
+    _snapshot.all_fds = [
+        fd('f1', 'f1_fd1', 0.0, ['c1']),
+        fd('f1', 'f1_fd2', 0.0, ['c2']),
+        fd('f2', 'f2_fd1', 0.0, ['c2']),
+    ]
+    _snapshot.all_c_configs = [
+        c_config('c1', 'c1_cc1', 0.0),
+        c_config('c2', 'c2_cc1', 0.0),
+        c_config('c3', 'c3_cc1', 0.0),
+        c_config('c3', 'c3_cc2', 0.0),
+    ]
+    return _snapshot
+
+
+def create_planner():
+    planner = IncrementalPlanner()
+    planner.update(add_dependencies(snapshot(
+        [fd('f1', 'f1_fd1', 2.0, ['c1']),
+         fd('f1', 'f1_fd2', 1.0, ['c2']),
+         fd('f2', 'f2_fd1', 1.0, ['c2'])],
+        ['c3'],
+        [c_config('c2', 'c2_cc1', 1.0),
+         c_config('c3', 'c3_cc1', 1.0),
+         c_config('c3', 'c3_cc2', 2.0)])))
+    return planner
+
+
+def test_full_planning():
+    planner = IncrementalPlanner()
+    assert planner.get_scope({'attributes': ['ea1']}) is None
+    planner = create_planner()
+    selected_fds, selected_c_configs = planner.get_selection()
+    assert selected_fds == [('f1', 'f1_fd2'), ('f2', 'f2_fd1')]
+    assert sorted(selected_c_configs) == [
+        ('c2', 'c2_cc1'), ('c3', 'c3_cc1')]
+
+
+def test_scope():
+    planner = create_planner()
+    assert planner.get_scope({'attributes': ['ea1']}) == (['f1'], [])
+    assert planner.get_scope({'attributes': ['ea2']}) == ([], ['c3'])
+    assert planner.get_scope({'attributes': ['unconstrained']}) == ([], [])
+    assert planner.get_scope({'components': ['unknown']}) is None
+
+
+def test_incremental_planning():
+    planner = create_planner()
+    # ea1 made f1_fd2 unfeasible
+    scope = planner.get_scope({'attributes': ['ea1']})
+    unplanned = planner.update(snapshot(
+        [fd('f1', 'f1_fd1', 2.0, ['c1'])],
+        [],
+        [c_config('c1', 'c1_cc1', 1.0),
+         c_config('c2', 'c2_cc1', 1.0)],
+        adaptable_functions=['f1', 'f2'],
+        adaptable_components=['c3']), scope)
+    assert unplanned == ([], [])
+    selected_fds, selected_c_configs = planner.get_selection()
+    assert sorted(selected_fds) == [('f1', 'f1_fd1'), ('f2', 'f2_fd1')]
+    assert sorted(selected_c_configs) == [
+        ('c1', 'c1_cc1'), ('c2', 'c2_cc1'), ('c3', 'c3_cc1')]
+    stats = planner.stats()
+    assert stats['full_runs'] == 1 and stats['incremental_runs'] == 1 \
+        and stats['planned_functions'] == 1 \
+        and stats['reused_functions'] == 1
+
+
+def test_incremental_planning_not_adaptable():
+    planner = create_planner()
+    # ea2 made c3 solved, so it is no longer adaptable
+    scope = planner.get_scope({'attributes': ['ea2']})
+    planner.update(snapshot(
+        adaptable_functions=['f1', 'f2'], adaptable_components=[]), scope)
+    assert sorted(planner.get_selection()[1]) == [('c2', 'c2_cc1')]
+
+
+def test_solved_outside_of_scope():
+    planner = create_planner()
+    # a reconfiguration solved f2, which is not an event
+    scope = planner.get_scope({'attributes': ['unconstrained']})
+    unplanned = planner.update(snapshot(
+        adaptable_functions=['f1'], adaptable_components=['c3']), scope)
+    selected_fds, selected_c_configs = planner.get_selection()
+    assert unplanned == ([], []) and selected_fds == [('f1', 'f1_fd2')] \
+        and sorted(selected_c_configs) == [
+            ('c2', 'c2_cc1'), ('c3', 'c3_cc1')]
+
+
+def test_adaptable_outside_of_scope():
+    planner = create_planner()
+    scope = planner.get_scope({'attributes': ['unconstrained']})
+    unplanned = planner.update(snapshot(
+        adaptable_functions=['f1', 'f2', 'f3'],
+        adaptable_components=['c3', 'c4']), scope)
+    assert unplanned == (['f3'], ['c4'])
+    planner.update(snapshot(
+        [fd('f3', 'f3_fd1', 1.0)], ['c4'],
+        [c_config('c4', 'c4_cc1', 1.0)],
+        adaptable_functions=['f1', 'f2', 'f3'],
+        adaptable_components=['c3', 'c4']), unplanned)
+    selected_fds, selected_c_configs = planner.get_selection()
+    assert sorted(selected_fds) == [
+        ('f1', 'f1_fd2'), ('f2', 'f2_fd1'), ('f3', 'f3_fd1')] \
+        and ('c4', 'c4_cc1') in selected_c_configs
@@ -0,0 +1,75 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from rosa_plan.plan_memo import PlanMemo
+from rosa_plan.plan_memo import fingerprint_snapshot
+
+from snapshot_factories import c_config
+from snapshot_factories import fd
+from snapshot_factories import snapshot
+
+
+def memo_snapshot(fd_priority=1.0, trace_id=''):
+    return snapshot(
+        [fd('f1', 'f1_fd1', fd_priority, ['c1'])],
+        ['c2'],
+        [c_config('c1', 'c1_cc1', 1.0)],
+        trace_id=trace_id)
+
+
+def test_fingerprint_snapshot():
+    fingerprint = fingerprint_snapshot(memo_snapshot())
+    assert fingerprint == fingerprint_snapshot(
+        memo_snapshot(trace_id='abc')) \
+        and fingerprint != fingerprint_snapshot(
+            memo_snapshot(fd_priority=2.0)) \
+        and fingerprint != fingerprint_snapshot(memo_snapshot(), 'setting')
+
+
+def test_lru_eviction():
+    memo = PlanMemo(max_size=2)
+    memo.put('a', 1)
+    memo.put('b', 2)
+    assert memo.get('a') == 1
+    memo.put('c', 3)
+    assert memo.get('b') is None and memo.get('a') == 1 \
+        and memo.get('c') == 3 and len(memo) == 2
+    stats = memo.stats()
+    assert stats['hits'] == 3 and stats['misses'] == 1 and stats['size'] == 2
+
+
+def test_disabled():
+    memo = PlanMemo(max_size=0)
+    memo.put('a', 1)
+    assert memo.get('a') is None and len(memo) == 0
+
+
+def test_needs_selection():
+    memo = PlanMemo()
+    assert memo.needs_selection(None) is True \
+        and memo.needs_selection('a') is True
+    memo.set_applied('a')
+    assert memo.needs_selection('a') is False \
+        and memo.needs_selection('a', force=True) is True
+    memo.set_applied('a')
+    memo.set_applied(None)
+    assert memo.needs_selection('a') is True \
+        and memo.stats()['skipped_selections'] == 1
+
+
+def test_needs_selection_after_other_inputs():
+    # A is applied, nothing is selected for B, so A is selected again
+    memo = PlanMemo()
+    memo.set_applied('a')
+    assert memo.needs_selection('b') is True \
+        and memo.needs_selection('a') is True
@@ -0,0 +1,119 @@
+# Copyright 2023 Gustavo Rezende Silva
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from rosa_plan.planning_scheduler import PlanningScheduler
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_immediate_without_interval():
+    scheduler = PlanningScheduler(clock=FakeClock())
+    assert scheduler.get_delay() is None
+    assert scheduler.add('insert_monitoring_data') == 0.0
+    assert scheduler.pop()['count'] == 1
+    assert scheduler.pop() is None
+
+
+def test_burst_is_coalesced():
+    clock = FakeClock()
+    scheduler = PlanningScheduler(0.5, 2.0, clock=clock)
+    for i in range(10):
+        clock.time = i * 0.1
+        delay = scheduler.add(
+            'insert_monitoring_data',
+            {'attributes': ['a{}'.format(i % 3)]},
+            revision=i)
+        assert delay == pytest.approx(0.5)
+    clock.time = 1.4
+    pending = scheduler.pop()
+    assert pending['count'] == 10
+    assert pending['changes'] == {'attributes': ['a0', 'a1', 'a2']}
+    assert pending['revision'] == 9
+    assert pending['wait'] == pytest.approx(1.4)
+    stats = scheduler.stats()
+    assert stats['runs'] == 1 and stats['coalescing_ratio'] == 10.0
+
+
+def test_trace_of_first_traced_event():
+    scheduler = PlanningScheduler(0.5, 2.0, clock=FakeClock())
+    scheduler.add('insert_monitoring_data')
+    scheduler.add('insert_monitoring_data', trace_id='t1')
+    scheduler.add('insert_monitoring_data', trace_id='t2')
+    assert scheduler.pop()['trace_id'] == 't1'
+    scheduler.add('insert_monitoring_data')
+    assert scheduler.pop()['trace_id'] == ''
+
+
+def test_max_wait():
+    clock = FakeClock()
+    scheduler = PlanningScheduler(0.5, 1.0, clock=clock)
+    scheduler.add('insert_monitoring_data')
+    clock.time = 0.8
+    assert scheduler.add('insert_monitoring_data') == pytest.approx(0.2)
+    clock.time = 1.2
+    assert scheduler.get_delay() == 0.0
+
+
+def test_action_update_is_immediate():
+    clock = FakeClock()
+    scheduler = PlanningScheduler(0.5, 1.0, clock=clock)
+    assert scheduler.add('insert_monitoring_data') == pytest.approx(0.5)
+    assert scheduler.add('action_update') == 0.0
+    pending = scheduler.pop()
+    assert pending['event_types'] == [
+        'insert_monitoring_data', 'action_update']
+    assert scheduler.stats()['immediate_runs'] == 1
+    assert scheduler.add('insert_monitoring_data') == pytest.approx(0.5)
+    assert len(scheduler) == 1
+
+
+def test_steady_stream_is_planned_with_min_interval():
+    clock = FakeClock()
+    scheduler = PlanningScheduler(0.5, 1.0, clock=clock)
+    run_times = []
+    for i in range(50):
+        clock.time = i * 0.1
+        scheduler.add('insert_monitoring_data')
+        if scheduler.get_delay() == 0.0:
+            scheduler.pop()
+            run_times.append(clock.time)
+    spacing = [b - a for a, b in zip(run_times, run_times[1:])]
+    # the delay is only checked when an event arrives, every 0.1 s
+    assert len(run_times) >= 4 \
+        and all(s >= 0.5 - 1e-9 for s in spacing) \
+        and scheduler.stats()['max_wait'] <= 1.1 + 1e-9
+
+
+def test_min_interval_from_last_run():
+    clock = FakeClock()
+    scheduler = PlanningScheduler(0.5, 0.2, clock=clock)
+    scheduler.add('insert_monitoring_data')
+    clock.time = 0.2
+    scheduler.pop()
+    clock.time = 0.25
+    # max_wait is due at 0.45, but the last run was at 0.2
+    assert scheduler.add('insert_monitoring_data') == pytest.approx(0.45)
+
+
+def test_max_wait_required_with_min_interval():
+    with pytest.raises(ValueError):
+        PlanningScheduler(0.5, 0.0, clock=FakeClock())